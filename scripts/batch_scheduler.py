@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Batch Scheduler for Raspberry Pi Deployment System
+
+Keeps the set of active deployment batches in memory as priority queues so
+that /api/config can pick the batch for a device without querying
+deployment_batches on every request.
+
+Routing:
+- Each active batch is queued under four routes: (venue, product),
+  (venue, any), (any, product) and (any, any)
+- A device asking for a product/venue gets the highest priority batch on
+  the most specific route that has one, so KXP2 and RXP2 batches (or
+  batches for different venues) can run concurrently
+- Ties are broken by batch id (oldest first), matching get_all_batches
+
+Consistency:
+- In-process mutations (start, pause, priority, assignment, completion)
+  are applied directly through apply()
+- Mutations from other processes (web interface vs deployment server) are
+  detected through the trigger-maintained batch_queue_state.version
+  counter; a mismatch triggers a full reload of active batches
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import heapq
+import logging
+import sqlite3
+import threading
+from typing import Optional, Dict, List, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+Route = Tuple[Optional[str], Optional[str]]
+
+
+class BatchScheduler:
+    """
+    In-memory priority queue of active deployment batches.
+
+    Heaps hold (-priority, batch_id) entries and are cleaned lazily: an
+    entry is discarded when its batch is no longer active or its priority
+    has changed since it was pushed. Peeking the best batch for a route is
+    therefore O(1) amortized.
+    """
+
+    def __init__(self):
+        """Initialize an empty scheduler (loaded on first sync)."""
+        self._lock = threading.RLock()
+        self._batches: Dict[int, Dict[str, Any]] = {}
+        self._heaps: Dict[Route, List[Tuple[int, int]]] = {}
+        self._version: Optional[int] = None
+
+    @staticmethod
+    def _routes(batch: Dict[str, Any]) -> List[Route]:
+        """Return every route a batch is reachable from."""
+        venue_code = batch['venue_code']
+        product_type = batch['product_type']
+        return [
+            (venue_code, product_type),
+            (venue_code, None),
+            (None, product_type),
+            (None, None)
+        ]
+
+    @staticmethod
+    def read_version(conn: sqlite3.Connection) -> Optional[int]:
+        """
+        Read the current batch queue version.
+
+        Args:
+            conn: Open database connection
+
+        Returns:
+            Version counter, or None if batch_queue_state is unavailable
+        """
+        try:
+            row = conn.execute("SELECT version FROM batch_queue_state WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def _push(self, batch: Dict[str, Any]) -> None:
+        """Queue an active batch on all of its routes."""
+        entry = (-batch['priority'], batch['id'])
+        for route in self._routes(batch):
+            heapq.heappush(self._heaps.setdefault(route, []), entry)
+
+    def _peek(self, route: Route) -> Optional[Dict[str, Any]]:
+        """Return the best live batch on a route, discarding stale entries."""
+        heap = self._heaps.get(route)
+        while heap:
+            neg_priority, batch_id = heap[0]
+            batch = self._batches.get(batch_id)
+            if batch is not None and batch['priority'] == -neg_priority:
+                return batch
+            heapq.heappop(heap)
+        return None
+
+    def load(self, conn: sqlite3.Connection) -> None:
+        """
+        Rebuild the queues from all active batches in the database.
+
+        Args:
+            conn: Open database connection
+        """
+        with self._lock:
+            version = self.read_version(conn)
+            cursor = conn.execute("SELECT * FROM deployment_batches WHERE status = 'active'")
+            columns = [col[0] for col in cursor.description]
+
+            self._batches = {}
+            self._heaps = {}
+            for row in cursor.fetchall():
+                batch = dict(zip(columns, row))
+                self._batches[batch['id']] = batch
+                self._push(batch)
+
+            self._version = version
+            logger.debug(f"Batch scheduler loaded {len(self._batches)} active batches (version {version})")
+
+    def sync(self, conn: sqlite3.Connection) -> None:
+        """
+        Reload if another connection changed a batch's status, priority or
+        remaining count.
+
+        Costs a single primary key lookup when nothing has changed.
+
+        Args:
+            conn: Open database connection
+        """
+        with self._lock:
+            version = self.read_version(conn)
+            if version is None or version != self._version:
+                self.load(conn)
+
+    def apply(self, batch: Dict[str, Any], version: Optional[int]) -> None:
+        """
+        Apply an in-process batch mutation.
+
+        Args:
+            batch: Current batch row (after the mutation)
+            version: batch_queue_state version read in the mutating transaction
+        """
+        with self._lock:
+            if self._version is None or version is None or version != self._version + 1:
+                # Missed a change from another process - reload on next sync
+                self._version = None
+                return
+
+            self._version = version
+            self._update(batch)
+
+    def _update(self, batch: Dict[str, Any]) -> None:
+        """Insert, reprioritize or drop a batch according to its status."""
+        current = self._batches.get(batch['id'])
+
+        if batch['status'] != 'active':
+            self._batches.pop(batch['id'], None)
+            return
+
+        self._batches[batch['id']] = dict(batch)
+        if current is None or current['priority'] != batch['priority']:
+            self._push(batch)
+
+    def next_batch(
+        self,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Select the batch a device should be assigned from.
+
+        Tries (venue, product), then (any venue, product). When the device
+        does not report a product type, the venue route and finally the
+        global highest priority batch are used.
+
+        Args:
+            venue_code: Venue reported by the device (optional)
+            product_type: Product type reported by the device (optional)
+
+        Returns:
+            Copy of the selected batch dict, or None if no batch matches
+        """
+        if product_type:
+            routes = [(venue_code, product_type), (None, product_type)] if venue_code else [(None, product_type)]
+        else:
+            routes = [(venue_code, None), (None, None)] if venue_code else [(None, None)]
+
+        with self._lock:
+            for route in routes:
+                batch = self._peek(route)
+                if batch is not None:
+                    return dict(batch)
+        return None
+
+    def active_batches(self) -> List[Dict[str, Any]]:
+        """
+        Get all active batches in scheduling order.
+
+        Returns:
+            List of batch dicts ordered by priority (highest first), then id
+        """
+        with self._lock:
+            batches = sorted(self._batches.values(), key=lambda b: (-b['priority'], b['id']))
+            return [dict(b) for b in batches]
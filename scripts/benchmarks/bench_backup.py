@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Online Backup
+
+Runs a deployment-server style writer (one /api/config deployment insert
+every few milliseconds, as its own transaction) against a large database
+and reports its latency while nothing else runs and while a backup runs:
+
+- backup API, one step (whole file in one call)
+- backup API in steps with a pause between steps, without a held
+  snapshot: every commit by the writer restarts the copy
+- backup API in steps within one read snapshot (db_backup.copy_database)
+- the complete db_backup.backup_database (snapshot, verify, gzip)
+
+Usage:
+    python3 bench_backup.py [--history 500000] [--interval 0.005] [--timeout 60]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+
+# Add scripts directory to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from db_access import connect
+from db_backup import copy_database, backup_database, BACKUP_STEP_PAGES, BACKUP_STEP_PAUSE
+from bench_dashboard_stats import populate
+
+CONFIG_INSERT = """
+    INSERT INTO deployment_history
+    (hostname, mac_address, serial_number, ip_address, product_type,
+     venue_code, image_version, deployment_status, started_at)
+    VALUES ('KXP2-V001-999', 'aa:bb:cc:00:00:01', '10000000abcdef01', '192.168.151.100', 'KXP2',
+            'V001', 'kxp2_master.img', 'started', CURRENT_TIMESTAMP)
+"""
+
+
+def with_writer(db_path: str, interval: float, task) -> tuple:
+    """
+    Run task while a writer inserts a deployment every interval seconds.
+
+    Returns:
+        tuple: (task result, seconds task took, sorted insert latencies in ms)
+    """
+    stop = threading.Event()
+    latencies = []
+
+    def writer():
+        conn = connect(db_path)
+        while not stop.is_set():
+            started = time.perf_counter()
+            with conn:
+                conn.execute(CONFIG_INSERT)
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(interval)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    started = time.perf_counter()
+    try:
+        result = task()
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        thread.join()
+    return result, elapsed, sorted(latencies)
+
+
+def report(label: str, elapsed: float, latencies: list, note: str = '') -> None:
+    """Print the task time and writer latency percentiles."""
+    if not latencies:
+        latencies = [0.0]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {label:<34} {elapsed:7.2f} s   insert p50 {latencies[len(latencies) // 2]:6.2f} ms, "
+          f"p99 {p99:7.2f} ms, max {latencies[-1]:7.2f} ms  {note}")
+
+
+def unheld_stepped_copy(db_path: str, dest: str, timeout: float) -> str:
+    """Stepped backup without a held snapshot; gives up after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    restarts = [0]
+    last = [None]
+
+    def progress(status, remaining, total):
+        if last[0] is not None and remaining > last[0]:
+            restarts[0] += 1
+        last[0] = remaining
+        if time.monotonic() > deadline:
+            raise RuntimeError('timeout')
+        time.sleep(BACKUP_STEP_PAUSE)
+
+    source = connect(db_path)
+    target = sqlite3.connect(dest)
+    try:
+        source.backup(target, pages=BACKUP_STEP_PAGES, progress=progress)
+        return f"({restarts[0]} restarts)"
+    except RuntimeError:
+        return f"(gave up after {timeout:g} s, {restarts[0]} restarts)"
+    finally:
+        target.close()
+        source.close()
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark online backups against a live writer')
+    parser.add_argument('--history', type=int, default=500000, help='deployment_history rows')
+    parser.add_argument('--interval', type=float, default=0.005, help='Seconds between writer inserts')
+    parser.add_argument('--timeout', type=float, default=60, help='Give up on the unheld stepped copy after')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(temp_dir, 'deployment.db')
+    backup_dir = os.path.join(temp_dir, 'backups')
+
+    def copy_path(name):
+        path = os.path.join(temp_dir, name)
+        if os.path.exists(path):
+            os.unlink(path)
+        return path
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=1000)
+        print(f"Database size: {os.path.getsize(db_path) / 1e6:.0f} MB")
+
+        print(f"\nWriter inserting every {args.interval * 1000:g} ms:")
+        _, elapsed, latencies = with_writer(db_path, args.interval, lambda: time.sleep(3))
+        report("no backup", elapsed, latencies)
+
+        def one_step():
+            source = connect(db_path)
+            target = sqlite3.connect(copy_path('one_step.db'))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+
+        _, elapsed, latencies = with_writer(db_path, args.interval, one_step)
+        report("one step", elapsed, latencies)
+
+        note, elapsed, latencies = with_writer(
+            db_path, args.interval, lambda: unheld_stepped_copy(db_path, copy_path('unheld.db'), args.timeout))
+        report("steps, no held snapshot", elapsed, latencies, note)
+
+        _, elapsed, latencies = with_writer(
+            db_path, args.interval, lambda: copy_database(db_path, copy_path('stepped.db')))
+        report("steps within one snapshot", elapsed, latencies)
+
+        result, elapsed, latencies = with_writer(
+            db_path, args.interval, lambda: backup_database(db_path, backup_dir))
+        report("backup_database (verify + gzip)", elapsed, latencies,
+               f"({result['database_bytes'] / 1e6:.0f} MB -> {result['size_bytes'] / 1e6:.0f} MB)")
+    finally:
+        for root, dirs, files in os.walk(temp_dir, topdown=False):
+            for name in files:
+                os.unlink(os.path.join(root, name))
+            for name in dirs:
+                os.rmdir(os.path.join(root, name))
+        os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
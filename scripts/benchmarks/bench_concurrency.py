@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Reader/Writer Concurrency
+
+Runs a deployment-server style writer (one status update per commit)
+alongside web-interface style readers (dashboard statistics) against the
+same database file, first with ad hoc connections in the default rollback
+journal mode, then through the shared db_access layer (WAL, busy_timeout,
+synchronous=NORMAL, pooled connections).
+
+Reports writes and reads per second, the slowest write, and lock errors.
+
+Usage:
+    python3 bench_concurrency.py [--history 200000] [--readers 4] [--seconds 5]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+
+# Add scripts directory to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from db_access import get_connection, release_connections
+from bench_dashboard_stats import populate, LEGACY_QUERIES
+
+WRITE_SQL = """
+    INSERT INTO deployment_history
+    (hostname, mac_address, product_type, venue_code, deployment_status, started_at)
+    VALUES ('KXP2-V001-001', 'aa:bb:cc:00:00:01', 'KXP2', 'V001', 'started', CURRENT_TIMESTAMP)
+"""
+
+
+def legacy_connection(db_path: str) -> sqlite3.Connection:
+    """Open a connection the way components did before db_access."""
+    return sqlite3.connect(db_path)
+
+
+def shared_connection(db_path: str) -> sqlite3.Connection:
+    """Get the thread's pooled connection."""
+    return get_connection(db_path)
+
+
+def run(db_path: str, get_conn, readers: int, seconds: float) -> dict:
+    """
+    Run one writer and several readers for a fixed time.
+
+    Args:
+        db_path: Database file
+        get_conn: Function returning a connection for the calling thread
+        readers: Number of reader threads
+        seconds: Duration
+
+    Returns:
+        dict: writes, reads, lock_errors and max_write_ms
+    """
+    stop = threading.Event()
+    lock = threading.Lock()
+    totals = {'writes': 0, 'reads': 0, 'lock_errors': 0, 'max_write_ms': 0.0}
+
+    def count(key, value=1):
+        with lock:
+            totals[key] += value
+
+    def writer():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn = get_conn(db_path)
+                with conn:
+                    conn.execute(WRITE_SQL)
+                conn.close()
+                count('writes')
+            except sqlite3.OperationalError:
+                count('lock_errors')
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                totals['max_write_ms'] = max(totals['max_write_ms'], elapsed_ms)
+        release_connections()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                conn = get_conn(db_path)
+                for query in LEGACY_QUERIES:
+                    conn.execute(query).fetchall()
+                conn.close()
+                count('reads')
+            except sqlite3.OperationalError:
+                count('lock_errors')
+        release_connections()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return totals
+
+
+def report(label: str, totals: dict, seconds: float) -> None:
+    """Print one result line."""
+    print(f"  {label:<28} {totals['writes'] / seconds:8.1f} writes/s {totals['reads'] / seconds:7.1f} reads/s"
+          f" {totals['max_write_ms']:8.1f} ms slowest write {totals['lock_errors']:5d} lock errors")
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark reader/writer concurrency')
+    parser.add_argument('--history', type=int, default=200000, help='deployment_history rows')
+    parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(temp_dir, 'deployment.db')
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=10000)
+
+        print(f"\nOne writer, {args.readers} readers, {args.seconds}s each:")
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+        report("ad hoc, rollback journal", run(db_path, legacy_connection, args.readers, args.seconds), args.seconds)
+
+        # Switches the file back to WAL
+        report("db_access (WAL, pooled)", run(db_path, shared_connection, args.readers, args.seconds), args.seconds)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.unlink(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Dashboard Statistics
+
+Compares the original nine-query get_dashboard_stats against the grouped
+aggregate version, and measures CPU per background tick when several
+clients request stats within one cache lifetime.
+
+Usage:
+    python3 bench_dashboard_stats.py [--history 1000000] [--pool 50000] [--iterations 20]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+
+# Add scripts and web directories to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'web'))
+
+from hostname_manager import HostnameManager
+from synthetic_fleet import generate_fleet
+from app import get_dashboard_stats, StatsCache
+
+
+LEGACY_QUERIES = [
+    "SELECT COUNT(*) FROM venues",
+    "SELECT COUNT(*) FROM hostname_pool",
+    "SELECT COUNT(*) FROM hostname_pool WHERE status = 'available' AND product_type = 'KXP2'",
+    "SELECT COUNT(*) FROM hostname_pool WHERE status = 'available' AND product_type = 'RXP2'",
+    "SELECT COUNT(*) FROM hostname_pool WHERE status = 'assigned' AND product_type = 'KXP2'",
+    "SELECT COUNT(*) FROM hostname_pool WHERE status = 'assigned' AND product_type = 'RXP2'",
+    "SELECT COUNT(*) FROM deployment_history WHERE started_at >= datetime('now', '-1 day')",
+    """SELECT COUNT(*) FROM deployment_history
+       WHERE started_at >= datetime('now', '-1 day') AND deployment_status = 'completed'""",
+    """SELECT hostname, deployment_status, started_at, completed_at
+       FROM deployment_history ORDER BY started_at DESC LIMIT 10""",
+]
+
+
+def populate(db_path: str, history: int, pool: int, venues: int = 20) -> None:
+    """
+    Fill a fresh database with the synthetic fleet shared by all benchmarks.
+
+    History spans the last 365 days (see synthetic_fleet.py), so the 24
+    hour window holds roughly 1/365th of the rows.
+
+    Args:
+        db_path: Path to database file
+        history: deployment_history rows to create
+        pool: hostname_pool rows to create
+        venues: Number of venues
+    """
+    generate_fleet(db_path, venues=venues, pool=pool, history=history)
+
+
+def legacy_dashboard_stats(db_path: str) -> list:
+    """Run the original nine queries (connection left to the garbage collector)."""
+    conn = sqlite3.connect(db_path)
+    return [conn.execute(query).fetchall() for query in LEGACY_QUERIES]
+
+
+def measure(label: str, iterations: int, func) -> tuple:
+    """Run func iterations times and print mean wall and CPU time in milliseconds."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        func()
+    wall_ms = (time.perf_counter() - wall_start) * 1000 / iterations
+    cpu_ms = (time.process_time() - cpu_start) * 1000 / iterations
+    print(f"  {label:<40} {wall_ms:8.3f} ms wall {cpu_ms:8.3f} ms cpu")
+    return wall_ms, cpu_ms
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark dashboard statistics queries')
+    parser.add_argument('--history', type=int, default=1000000, help='deployment_history rows')
+    parser.add_argument('--pool', type=int, default=50000, help='hostname_pool rows')
+    parser.add_argument('--iterations', type=int, default=20, help='Iterations per measurement')
+    parser.add_argument('--clients', type=int, default=10,
+                        help='Stats requests per background tick (connected dashboards)')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        print(f"\nPopulating {args.history} history rows and {args.pool} pool rows...")
+        populate(db_path, args.history, args.pool)
+        manager = HostnameManager(db_path)
+
+        print(f"\nSingle dashboard load ({args.iterations} iterations):")
+        legacy, _ = measure("legacy nine queries", args.iterations,
+                            lambda: legacy_dashboard_stats(db_path))
+        current, _ = measure("grouped aggregates", args.iterations,
+                             lambda: get_dashboard_stats(manager))
+        print(f"  speedup: {legacy / current:.1f}x\n")
+
+        print(f"Background tick with {args.clients} stats requests:")
+
+        def legacy_tick():
+            for _ in range(args.clients):
+                legacy_dashboard_stats(db_path)
+
+        def cached_tick():
+            cache = StatsCache(ttl=2.0)
+            for _ in range(args.clients):
+                cache.get(lambda: get_dashboard_stats(manager))
+
+        _, legacy_cpu = measure("legacy, uncached", args.iterations, legacy_tick)
+        _, cached_cpu = measure("grouped, StatsCache", args.iterations, cached_tick)
+        print(f"  CPU per tick reduced {legacy_cpu / cached_cpu:.1f}x")
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
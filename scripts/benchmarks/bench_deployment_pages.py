@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Deployment History Pages
+
+Compares LIMIT/OFFSET paging of deployment_history against keyset (cursor)
+paging at shallow and deep pages, with and without filters, plus the cost
+of the page count.
+
+Usage:
+    python3 bench_deployment_pages.py [--history 1000000] [--page 500] [--iterations 20]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import argparse
+
+# Add scripts and web directories to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'web'))
+
+from hostname_manager import HostnameManager
+from app import get_deployment_page, count_deployments, deployment_filters, DEPLOYMENT_COLUMNS
+from bench_dashboard_stats import populate, measure
+
+PAGE_SIZE = 20
+
+
+def offset_page(db_path: str, page: int, venue_code: str = None) -> list:
+    """Fetch a page the original way: ORDER BY started_at DESC LIMIT ? OFFSET ?"""
+    conditions, params = deployment_filters(venue_code)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"""
+        SELECT {DEPLOYMENT_COLUMNS} FROM deployment_history {where}
+        ORDER BY started_at DESC LIMIT ? OFFSET ?
+    """, params + [PAGE_SIZE, (page - 1) * PAGE_SIZE]).fetchall()
+    conn.close()
+    return rows
+
+
+def cursor_before_page(manager: HostnameManager, page: int, venue_code: str = None) -> str:
+    """Walk cursors to find the one leading to a page (setup, not measured)."""
+    cursor = None
+    for _ in range(page - 1):
+        cursor = get_deployment_page(manager, venue_code=venue_code, before=cursor,
+                                     limit=PAGE_SIZE)['next_cursor']
+    return cursor
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark deployment history paging')
+    parser.add_argument('--history', type=int, default=1000000, help='deployment_history rows')
+    parser.add_argument('--page', type=int, default=500, help='Deep page number to measure')
+    parser.add_argument('--iterations', type=int, default=20, help='Iterations per measurement')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=0)
+        manager = HostnameManager(db_path)
+
+        for venue_code in (None, 'V001'):
+            label = f"venue {venue_code}" if venue_code else "no filter"
+            deep_cursor = cursor_before_page(manager, args.page, venue_code)
+
+            print(f"\n{label} ({args.iterations} iterations):")
+            measure("offset, page 1", args.iterations, lambda: offset_page(db_path, 1, venue_code))
+            offset_deep, _ = measure(f"offset, page {args.page}", args.iterations,
+                                     lambda: offset_page(db_path, args.page, venue_code))
+            measure("keyset, page 1", args.iterations,
+                    lambda: get_deployment_page(manager, venue_code=venue_code, limit=PAGE_SIZE))
+            keyset_deep, _ = measure(f"keyset, page {args.page}", args.iterations,
+                                     lambda: get_deployment_page(manager, venue_code=venue_code,
+                                                                 before=deep_cursor, limit=PAGE_SIZE))
+            print(f"  page {args.page} speedup: {offset_deep / keyset_deep:.1f}x")
+
+            def count_all():
+                conditions, params = deployment_filters(venue_code)
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                conn = sqlite3.connect(db_path)
+                conn.execute(f"SELECT COUNT(*) FROM deployment_history {where}", params).fetchone()
+                conn.close()
+
+            measure("COUNT(*) over history", args.iterations, count_all)
+            measure("deployment_history_counts", args.iterations,
+                    lambda: count_deployments(manager, venue_code))
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
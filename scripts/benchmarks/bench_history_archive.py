@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Deployment History Archival
+
+Measures hot-path queries against a year of deployment history (the
+deployment server's "latest open deployment of this hostname" lookup
+behind every status update, the dashboard's 24 hour counts and the first
+history page), archives everything older than the retention period, and
+measures them again. Also reports archival throughput and the longest wait of a
+status writer running alongside the archiver.
+
+Usage:
+    python3 bench_history_archive.py [--history 500000] [--retention 30] [--iterations 200]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+
+# Add scripts directory to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from history_archive import archive_history, archive_status
+from bench_dashboard_stats import populate, measure
+
+# The row receive_status updates (deployment_server.py)
+STATUS_LOOKUP = """
+    SELECT id FROM deployment_history
+    WHERE hostname = ? AND deployment_status NOT IN ('success', 'failed')
+    ORDER BY started_at DESC
+    LIMIT 1
+"""
+
+DASHBOARD_COUNTS = """
+    SELECT COUNT(*), COALESCE(SUM(CASE WHEN deployment_status = 'success' THEN 1 END), 0)
+    FROM deployment_history
+    WHERE started_at >= datetime('now', '-1 day')
+"""
+
+FIRST_PAGE = """
+    SELECT id, hostname, deployment_status, started_at
+    FROM deployment_history
+    ORDER BY started_at DESC, id DESC
+    LIMIT 20
+"""
+
+
+def run_queries(db_path: str, iterations: int) -> None:
+    """Time each hot-path query."""
+    conn = sqlite3.connect(db_path)
+    # Worst case: no open deployment for the hostname (e.g. a repeated
+    # final report), so the whole hot table is walked
+    measure("status update lookup (no open row)", iterations,
+            lambda: conn.execute(STATUS_LOOKUP, ('KXP2-V001-998',)).fetchall())
+    measure("dashboard 24 h counts", iterations, lambda: conn.execute(DASHBOARD_COUNTS).fetchall())
+    measure("first history page", iterations, lambda: conn.execute(FIRST_PAGE).fetchall())
+    conn.close()
+
+
+def archive_with_writer(db_path: str, retention: float) -> None:
+    """Archive while a writer inserts deployments; report the slowest write."""
+    stop = threading.Event()
+    waits = []
+
+    def writer():
+        conn = sqlite3.connect(db_path, timeout=30)
+        while not stop.is_set():
+            started = time.perf_counter()
+            with conn:
+                conn.execute("""
+                    INSERT INTO deployment_history (hostname, product_type, venue_code, deployment_status, started_at)
+                    VALUES ('KXP2-V001-999', 'KXP2', 'V001', 'started', CURRENT_TIMESTAMP)
+                """)
+            waits.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    started = time.perf_counter()
+    moved = archive_history(db_path, older_than_days=retention)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    thread.join()
+
+    print(f"  archived {moved} rows in {elapsed:.1f}s ({moved / max(elapsed, 1e-9):.0f} rows/s)")
+    print(f"  concurrent writer: {len(waits)} writes, slowest {max(waits, default=0):.1f} ms")
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark deployment history archival')
+    parser.add_argument('--history', type=int, default=500000, help='deployment_history rows (spread over a year)')
+    parser.add_argument('--retention', type=float, default=30, help='Days kept in the hot table')
+    parser.add_argument('--iterations', type=int, default=200, help='Iterations per query')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(temp_dir, 'deployment.db')
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=1000)
+
+        print(f"\nAll history in the hot table ({args.iterations} iterations):")
+        run_queries(db_path, args.iterations)
+
+        print(f"\nArchiving deployments older than {args.retention:g} days:")
+        archive_with_writer(db_path, args.retention)
+        status = archive_status(db_path, args.retention)
+        print(f"  hot {status['hot_rows']} rows, archived {status['archived_rows']} rows")
+
+        print(f"\nAfter archival ({args.iterations} iterations):")
+        run_queries(db_path, args.iterations)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.unlink(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Kart Numbers Listing
+
+Compares loading the whole hostname pool (the original /kart-numbers view)
+against one keyset page plus its total, at growing pool sizes. Reports
+time and peak Python memory per request.
+
+Usage:
+    python3 bench_kart_numbers.py [--pools 10000 100000 500000] [--iterations 10]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import argparse
+import tracemalloc
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hostname_manager import HostnameManager
+from bench_dashboard_stats import populate, measure
+
+PAGE_SIZE = 100
+
+
+def full_listing(db_path: str) -> list:
+    """Load every pool row the original way."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT id, product_type, venue_code, identifier, status, mac_address, assigned_date
+        FROM hostname_pool
+        ORDER BY venue_code, product_type, identifier
+    """).fetchall()
+    conn.close()
+    return [{'hostname': f"{r[1]}-{r[2]}-{r[3]}", 'status': r[4]} for r in rows]
+
+
+def paged_listing(manager: HostnameManager, after: str = None, **filters) -> dict:
+    """Load one page and the matching total, as the view now does."""
+    page = manager.list_pool_page(after=after, limit=PAGE_SIZE, **filters)
+    page['total'] = manager.count_pool_entries(**filters)
+    return page
+
+
+def peak_memory(func) -> float:
+    """Return peak traced allocation of one call in KiB."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark kart number listings')
+    parser.add_argument('--pools', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help='hostname_pool sizes to measure')
+    parser.add_argument('--iterations', type=int, default=10, help='Iterations per measurement')
+    args = parser.parse_args()
+
+    for pool in args.pools:
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        try:
+            populate(db_path, 0, pool)
+            manager = HostnameManager(db_path)
+            deep_cursor = manager.list_pool_page(limit=pool // 2)['next_cursor']
+
+            print(f"\npool {pool} ({args.iterations} iterations):")
+            measure("full listing", args.iterations, lambda: full_listing(db_path))
+            measure("page 1", args.iterations, lambda: paged_listing(manager))
+            measure("page at middle", args.iterations, lambda: paged_listing(manager, deep_cursor))
+            measure("status filter", args.iterations, lambda: paged_listing(manager, status='retired'))
+            measure("prefix search", args.iterations, lambda: paged_listing(manager, prefix='12'))
+            print(f"  peak memory: full {peak_memory(lambda: full_listing(db_path)):.0f} KiB, "
+                  f"page {peak_memory(lambda: paged_listing(manager)):.0f} KiB")
+        finally:
+            os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Query Profiler
+
+Measures what profiling every statement costs, by running the same work
+on a plain sqlite3.Connection, on a ProfiledConnection with the profiler
+disabled and with it enabled:
+
+- 1000 primary key lookups (execute + fetchone)
+- iterating 10000 history rows
+- one dashboard statistics load (get_dashboard_stats)
+
+Then runs a mixed dashboard / history paging / hostname allocation
+workload and prints the profiler's top statements, as `db_admin.py
+queries` shows them for the live services.
+
+Usage:
+    python3 bench_query_profiler.py [--history 200000] [--pool 20000] [--iterations 20]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import argparse
+
+# Add scripts and web directories to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'web'))
+
+from db_access import connect, release_connections, close_connections
+from hostname_manager import HostnameManager
+from query_profiler import profiler, top_statements
+from app import get_dashboard_stats, get_deployment_page
+from bench_dashboard_stats import populate, measure
+
+
+def overhead(db_path: str, manager: HostnameManager, history: int, iterations: int) -> None:
+    """Time the same work unprofiled, with profiling disabled and enabled."""
+    plain = connect(db_path, factory=sqlite3.Connection)
+    profiled = connect(db_path)
+
+    def lookups(conn):
+        for n in range(1000):
+            conn.execute("SELECT * FROM deployment_history WHERE id = ?", (n * 97 % history + 1,)).fetchone()
+
+    def iterate(conn):
+        for _ in conn.execute("SELECT id, hostname, started_at FROM deployment_history LIMIT 10000"):
+            pass
+
+    try:
+        for label, work in (("1000 primary key lookups", lookups), ("iterate 10000 rows", iterate)):
+            print(f"\n{label} ({iterations} iterations):")
+            # Warm the page cache and statement caches first
+            work(plain)
+            work(profiled)
+            base, _ = measure("sqlite3.Connection", iterations, lambda: work(plain))
+            profiler.enabled = False
+            measure("ProfiledConnection, disabled", iterations, lambda: work(profiled))
+            profiler.enabled = True
+            timed, _ = measure("ProfiledConnection, enabled", iterations, lambda: work(profiled))
+            print(f"  overhead: {(timed / base - 1) * 100:+.0f}%")
+
+        print(f"\nDashboard statistics ({iterations} iterations):")
+        get_dashboard_stats(manager)
+        profiler.enabled = False
+        base, _ = measure("profiler disabled", iterations, lambda: get_dashboard_stats(manager))
+        profiler.enabled = True
+        timed, _ = measure("profiler enabled", iterations, lambda: get_dashboard_stats(manager))
+        print(f"  overhead: {(timed / base - 1) * 100:+.0f}%")
+    finally:
+        plain.close()
+        profiled.close()
+
+
+def workload(manager: HostnameManager, iterations: int) -> None:
+    """Dashboard loads, history paging and hostname allocations."""
+    for _ in range(iterations):
+        get_dashboard_stats(manager)
+        for venue in (None, 'V003'):
+            cursor = None
+            for _ in range(10):
+                cursor = get_deployment_page(manager, venue_code=venue, before=cursor)['next_cursor']
+        for n in range(10):
+            hostname = manager.assign_hostname('KXP2', f"V{n:03d}", mac_address=f"dc:a6:32:00:00:{n:02x}")
+            if hostname:
+                manager.release_hostname(hostname)
+    release_connections()
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark query profiling overhead')
+    parser.add_argument('--history', type=int, default=200000, help='deployment_history rows')
+    parser.add_argument('--pool', type=int, default=20000, help='hostname_pool rows')
+    parser.add_argument('--iterations', type=int, default=20, help='Iterations per measurement')
+    parser.add_argument('--top', type=int, default=10, help='Statements listed after the workload')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        print(f"\nPopulating {args.history} history rows and {args.pool} pool rows...")
+        populate(db_path, args.history, args.pool)
+        manager = HostnameManager(db_path)
+
+        overhead(db_path, manager, args.history, args.iterations)
+
+        profiler.reset()
+        workload(manager, args.iterations)
+        print(f"\nTop {args.top} statements of the dashboard / history / allocation workload:")
+        for row in top_statements([profiler.snapshot('bench')], args.top):
+            scans = f"  FULL SCAN {','.join(row['full_scans'])}" if row['full_scans'] else ''
+            print(f"  {row['total_ms']:9.1f} ms  {row['calls']:5d} calls  p95 {row['p95_ms']:7.2f} ms  "
+                  f"{row['rows']:7d} rows  {row['statement'][:70]}{scans}")
+    finally:
+        close_connections(db_path)
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
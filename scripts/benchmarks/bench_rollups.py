@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Deployment Rollups
+
+Compares deployment metrics computed by scanning deployment_history with
+the same metrics read from the rollup tables:
+- the dashboard's deployments / completed in the last 24 hours
+- a per-day report with average durations over the last 90 days
+
+Also measures the write cost the rollup triggers add to a deployment's
+life (insert plus one status transition).
+
+Usage:
+    python3 bench_rollups.py [--history 1000000] [--iterations 50]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import argparse
+
+# Add scripts directory to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from deployment_rollups import recent_deployment_totals, rollup_report
+from bench_dashboard_stats import populate, measure
+
+HISTORY_24H = """
+    SELECT COUNT(*), COALESCE(SUM(CASE WHEN deployment_status = 'success' THEN 1 END), 0)
+    FROM deployment_history
+    WHERE started_at >= datetime('now', '-1 day')
+"""
+
+HISTORY_DAILY = """
+    SELECT date(started_at), COUNT(*),
+           AVG(strftime('%s', completed_at) - strftime('%s', started_at))
+    FROM deployment_history
+    WHERE started_at >= date('now', '-90 days')
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+
+def deployment_lifecycle(conn: sqlite3.Connection) -> None:
+    """Insert a deployment and complete it, one commit each."""
+    with conn:
+        row_id = conn.execute("""
+            INSERT INTO deployment_history (hostname, product_type, venue_code, deployment_status, started_at)
+            VALUES ('KXP2-V001-999', 'KXP2', 'V001', 'started', CURRENT_TIMESTAMP)
+        """).lastrowid
+    with conn:
+        conn.execute("""
+            UPDATE deployment_history SET deployment_status = 'success', completed_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (row_id,))
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark deployment rollups')
+    parser.add_argument('--history', type=int, default=1000000, help='deployment_history rows (spread over a year)')
+    parser.add_argument('--iterations', type=int, default=50, help='Iterations per measurement')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(temp_dir, 'deployment.db')
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=1000)
+        conn = sqlite3.connect(db_path)
+
+        print(f"\nLast 24 hours ({args.iterations} iterations):")
+        measure("history scan", args.iterations, lambda: conn.execute(HISTORY_24H).fetchall())
+        measure("hourly rollup", args.iterations, lambda: recent_deployment_totals(conn, 24))
+
+        print(f"\nDaily report, last 90 days ({args.iterations} iterations):")
+        measure("history GROUP BY", args.iterations, lambda: conn.execute(HISTORY_DAILY).fetchall())
+        measure("daily rollup", args.iterations,
+                lambda: rollup_report(conn, since=conn.execute("SELECT date('now', '-90 days')").fetchone()[0]))
+
+        print(f"\nDeployment insert + completion ({args.iterations} iterations):")
+        measure("with rollup triggers", args.iterations, lambda: deployment_lifecycle(conn))
+        for name in ('trg_rollup_insert', 'trg_rollup_update', 'trg_rollup_delete'):
+            conn.execute(f"DROP TRIGGER {name}")
+        measure("without rollup triggers", args.iterations, lambda: deployment_lifecycle(conn))
+        conn.close()
+    finally:
+        for name in os.listdir(temp_dir):
+            os.unlink(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Deployment Search
+
+Compares an ad-hoc LIKE scan of deployment_history against the
+deployment_search FTS5 index for serial, MAC, hostname and error lookups.
+
+Usage:
+    python3 bench_search.py [--history 1000000] [--iterations 20]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import argparse
+
+# Add scripts and web directories to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'web'))
+
+from hostname_manager import HostnameManager
+from app import search_deployments, DEPLOYMENT_COLUMNS
+from bench_dashboard_stats import populate, measure
+
+# Search text, as typed in the search box
+SEARCHES = ['10000000dead', 'dc:a6:32:00:1f', 'KXP2-V001-12', 'card write']
+
+
+def like_search(db_path: str, text: str) -> list:
+    """Search the way an ad-hoc query would: LIKE over every text column."""
+    pattern = f"%{text}%"
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"""
+        SELECT {DEPLOYMENT_COLUMNS} FROM deployment_history
+        WHERE hostname LIKE ? OR serial_number LIKE ? OR mac_address LIKE ? OR error_message LIKE ?
+        ORDER BY id DESC LIMIT 20
+    """, (pattern,) * 4).fetchall()
+    conn.close()
+    return rows
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark deployment search')
+    parser.add_argument('--history', type=int, default=1000000, help='deployment_history rows')
+    parser.add_argument('--iterations', type=int, default=20, help='Iterations per measurement')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=0)
+
+        # One needle deep in the history
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            UPDATE deployment_history
+            SET serial_number = '10000000deadbeef', error_message = 'SD card write failed'
+            WHERE id = ?
+        """, (args.history // 3,))
+        conn.commit()
+        conn.close()
+
+        manager = HostnameManager(db_path)
+        for text in SEARCHES:
+            print(f"\n'{text}' ({args.iterations} iterations):")
+            measure("LIKE scan", args.iterations, lambda: like_search(db_path, text))
+            measure("FTS5 prefix match", args.iterations, lambda: search_deployments(manager, text))
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Venue Listing and Statistics
+
+Compares the original pool-scanning aggregate queries against the
+trigger-maintained hostname_pool_counts table used by HostnameManager.
+
+Usage:
+    python3 bench_venue_stats.py [--rows 100000] [--venues 20] [--iterations 50]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hostname_manager import HostnameManager
+from synthetic_fleet import generate_fleet
+
+
+LEGACY_LIST_VENUES = """
+    SELECT
+        v.code,
+        COALESCE(SUM(CASE WHEN h.product_type = 'KXP2' AND h.status = 'available' THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN h.product_type = 'KXP2' AND h.status = 'assigned' THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN h.product_type = 'RXP2' AND h.status = 'available' THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN h.product_type = 'RXP2' AND h.status = 'assigned' THEN 1 ELSE 0 END), 0)
+    FROM venues v
+    LEFT JOIN hostname_pool h ON v.code = h.venue_code
+    GROUP BY v.code
+    ORDER BY v.code
+"""
+
+LEGACY_VENUE_STATS = """
+    SELECT
+        SUM(CASE WHEN status = 'available' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'assigned' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'retired' THEN 1 ELSE 0 END),
+        COUNT(*)
+    FROM hostname_pool
+    WHERE venue_code = ?
+"""
+
+
+def populate(db_path: str, rows: int, venues: int) -> list:
+    """
+    Fill a fresh database with the synthetic fleet's venues and hostname pool.
+
+    Args:
+        db_path: Path to database file
+        rows: Total hostname_pool rows to create
+        venues: Number of venues to spread rows across
+
+    Returns:
+        List of created venue codes
+    """
+    generate_fleet(db_path, venues=venues, pool=rows, history=0)
+    return [f"V{n:03d}" for n in range(venues)]
+
+
+def timed(label: str, iterations: int, func) -> float:
+    """Run func iterations times and print mean latency in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    mean_ms = (time.perf_counter() - start) * 1000 / iterations
+    print(f"  {label:<40} {mean_ms:8.3f} ms")
+    return mean_ms
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark venue listing and statistics queries')
+    parser.add_argument('--rows', type=int, default=100000, help='hostname_pool rows')
+    parser.add_argument('--venues', type=int, default=20, help='Number of venues')
+    parser.add_argument('--iterations', type=int, default=50, help='Iterations per query')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        codes = populate(db_path, args.rows, args.venues)
+        manager = HostnameManager(db_path)
+        conn = sqlite3.connect(db_path)
+
+        print(f"\n{args.rows} pool rows across {args.venues} venues ({args.iterations} iterations)\n")
+
+        print("list_venues:")
+        legacy = timed("legacy JOIN hostname_pool", args.iterations,
+                       lambda: conn.execute(LEGACY_LIST_VENUES).fetchall())
+        current = timed("hostname_pool_counts", args.iterations, manager.list_venues)
+        print(f"  speedup: {legacy / current:.1f}x\n")
+
+        print("get_venue_statistics:")
+        legacy = timed("legacy scan of hostname_pool", args.iterations,
+                       lambda: conn.execute(LEGACY_VENUE_STATS, (codes[0],)).fetchone())
+        current = timed("hostname_pool_counts", args.iterations,
+                        lambda: manager.get_venue_statistics(codes[0]))
+        print(f"  speedup: {legacy / current:.1f}x")
+
+        conn.close()
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WebSocket Room Fan-out
+
+Simulates operators watching individual venues during a rollout and
+compares messages, bytes and emit time when deployment updates are sent
+to every client versus only to subscribed venue rooms.
+
+Usage:
+    python3 bench_websocket_rooms.py [--clients 200] [--venues 20] [--events 500]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+# Add scripts and web directories to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'web'))
+
+from database_setup import initialize_database
+import app as web_app
+
+
+def run(db_path: str, clients: int, venues: int, events: int, use_rooms: bool) -> dict:
+    """
+    Connect clients, emit deployment updates and count what was delivered.
+
+    Args:
+        db_path: Initialized database path
+        clients: Number of connected operators
+        venues: Number of venues (clients are spread evenly across them)
+        events: Deployment updates to emit (spread evenly across venues)
+        use_rooms: Subscribe each client to its venue room
+
+    Returns:
+        dict with messages, bytes and emit_ms
+    """
+    flask_app = web_app.create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'benchmark',
+        'DATABASE_PATH': db_path,
+        'ITEMS_PER_PAGE': 20,
+        'MAX_ITEMS_PER_PAGE': 100
+    })
+    socketio = web_app.socketio
+    # Four-letter venue codes: AAXX, ABXX, ...
+    codes = [f"{chr(65 + i // 26)}{chr(65 + i % 26)}XX" for i in range(venues)]
+
+    test_clients = []
+    for n in range(clients):
+        client = socketio.test_client(flask_app, namespace='/')
+        if use_rooms:
+            client.emit('subscribe', {'venue': codes[n % venues]})
+        client.get_received()
+        test_clients.append(client)
+
+    start = time.perf_counter()
+    for n in range(events):
+        web_app.broadcast_deployment_update(socketio, {
+            'hostname': f"KXP2-{codes[n % venues]}-{n % 1000:03d}",
+            'status': 'downloading',
+            'mac_address': f"aa:bb:cc:dd:{n // 256 % 256:02x}:{n % 256:02x}",
+            'timestamp': '2025-10-23T10:00:00'
+        })
+    emit_ms = (time.perf_counter() - start) * 1000
+
+    messages = 0
+    size = 0
+    for client in test_clients:
+        for message in client.get_received():
+            messages += 1
+            size += len(json.dumps(message['args']))
+        client.disconnect()
+
+    return {'messages': messages, 'bytes': size, 'emit_ms': emit_ms}
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark WebSocket room fan-out')
+    parser.add_argument('--clients', type=int, default=200, help='Connected operators')
+    parser.add_argument('--venues', type=int, default=20, help='Venues being rolled out')
+    parser.add_argument('--events', type=int, default=500, help='Deployment updates to emit')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        initialize_database(db_path)
+        print(f"\n{args.clients} clients, {args.venues} venues, {args.events} deployment updates\n")
+
+        broadcast = run(db_path, args.clients, args.venues, args.events, use_rooms=False)
+        rooms = run(db_path, args.clients, args.venues, args.events, use_rooms=True)
+
+        print(f"  {'':<20} {'messages':>10} {'bytes':>12} {'emit ms':>10}")
+        for label, result in (('broadcast to all', broadcast), ('venue rooms', rooms)):
+            print(f"  {label:<20} {result['messages']:>10} {result['bytes']:>12} {result['emit_ms']:>10.1f}")
+        print(f"\n  bandwidth reduced {broadcast['bytes'] / max(rooms['bytes'], 1):.1f}x, "
+              f"emit time reduced {broadcast['emit_ms'] / max(rooms['emit_ms'], 0.001):.1f}x")
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
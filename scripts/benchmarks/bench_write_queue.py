@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Group-Commit Status Writes
+
+Simulates installers posting status reports to the deployment server from
+many request threads, each report being one deployment_history UPDATE by
+primary key plus a daily log line:
+
+- one transaction and one log open/append per report, as /api/status did
+  (synchronous=NORMAL, and synchronous=FULL for durable commits)
+- reports handed to WriteQueue, which group-commits them with
+  synchronous=FULL
+
+Reports throughput, the time a request thread spends on a report, and for
+the queue the number of commits and the time from enqueue to commit (the
+window of acknowledged reports a crash could lose), both flat out and at a
+steady fleet-like rate.
+
+Usage:
+    python3 bench_write_queue.py [--history 200000] [--reports 20000] [--threads 16] [--rate 500]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import threading
+
+# Add scripts directory to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from db_access import get_connection, release_connections
+from write_queue import WriteQueue
+from bench_dashboard_stats import populate
+
+STATUS_SQL = """
+    UPDATE deployment_history SET deployment_status = ?
+    WHERE id = ? AND deployment_status NOT IN ('success', 'failed')
+"""
+
+PHASES = ('downloading', 'verifying', 'customizing', 'installing')
+
+
+def run(threads: int, reports: int, history: int, report, rate: float = 0) -> dict:
+    """
+    Post reports from several threads.
+
+    Args:
+        threads: Request threads
+        reports: Total reports
+        history: deployment_history rows (ids to update)
+        report: Function (phase, deployment_id, log_line) handling one report
+        rate: Reports per second across all threads (0 posts as fast as possible)
+
+    Returns:
+        dict: elapsed seconds, mean and max handler time in ms
+    """
+    handler_ms = []
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        times = []
+        for n in range(reports // threads):
+            if rate:
+                time.sleep(max(0.0, start + n * threads / rate - time.perf_counter()))
+            phase = PHASES[n % len(PHASES)]
+            started = time.perf_counter()
+            report(phase, rng.randint(1, history), f"{time.time()},10.0.0.{seed},KXP2-V001-{n:03d},{phase}\n")
+            times.append((time.perf_counter() - started) * 1000)
+        release_connections()
+        with lock:
+            handler_ms.extend(times)
+
+    started = start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return {
+        'elapsed': time.perf_counter() - started,
+        'mean_ms': sum(handler_ms) / max(len(handler_ms), 1),
+        'max_ms': max(handler_ms, default=0.0),
+        'reports': len(handler_ms),
+    }
+
+
+def print_result(label: str, result: dict) -> None:
+    """Print throughput and handler time."""
+    print(f"  {label:<34} {result['reports'] / result['elapsed']:9.0f} reports/s   "
+          f"handler mean {result['mean_ms']:6.3f} ms, max {result['max_ms']:7.1f} ms")
+
+
+def run_queued(db_path: str, log_path: str, args, reports: int = 0, rate: float = 0) -> None:
+    """Post reports through a WriteQueue; print throughput, commits and enqueue-to-commit times."""
+    writer = WriteQueue(commit_interval=args.commit_interval)
+    writer.start()
+    waits = []
+
+    def queued(phase, deployment_id, line):
+        enqueued = time.perf_counter()
+        writer.execute(db_path, STATUS_SQL, (phase, deployment_id),
+                       on_commit=lambda: waits.append((time.perf_counter() - enqueued) * 1000))
+        writer.append_log(log_path, line)
+
+    started = time.perf_counter()
+    result = run(args.threads, reports or args.reports, args.history, queued, rate)
+    writer.flush(timeout=None)
+    result['elapsed'] = time.perf_counter() - started
+    writer.stop()
+
+    stats = writer.stats()
+    waits.sort()
+    print_result("group commit (FULL)", result)
+    print(f"    {stats['writes']} writes in {stats['commits']} commits (largest batch {stats['largest_batch']} items); "
+          f"enqueue-to-commit p50 {waits[len(waits) // 2]:.1f} ms, p99 {waits[int(len(waits) * 0.99)]:.1f} ms, "
+          f"max {waits[-1]:.1f} ms (commit interval {args.commit_interval * 1000:.0f} ms)")
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Benchmark group-commit status writes')
+    parser.add_argument('--history', type=int, default=200000, help='deployment_history rows')
+    parser.add_argument('--reports', type=int, default=20000, help='Status reports to post')
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent request threads')
+    parser.add_argument('--rate', type=float, default=500, help='Reports per second for the paced run')
+    parser.add_argument('--commit-interval', type=float, default=0.05, help='WriteQueue commit interval (s)')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(temp_dir, 'deployment.db')
+    log_path = os.path.join(temp_dir, 'deployment_20251023.log')
+
+    def per_report(synchronous):
+        def report(phase, deployment_id, line):
+            conn = get_connection(db_path)
+            conn.execute(f"PRAGMA synchronous = {synchronous}")
+            with conn:
+                conn.execute(STATUS_SQL, (phase, deployment_id))
+            with open(log_path, 'a') as f:
+                f.write(line)
+        return report
+
+    try:
+        print(f"\nPopulating {args.history} history rows...")
+        populate(db_path, args.history, pool=1000)
+
+        print(f"\n{args.reports} reports from {args.threads} threads:")
+        print_result("commit per report (NORMAL)", run(args.threads, args.reports, args.history,
+                                                       per_report('NORMAL')))
+        print_result("commit per report (FULL)", run(args.threads, args.reports, args.history,
+                                                     per_report('FULL')))
+
+        run_queued(db_path, log_path, args)
+
+        paced = min(args.reports, int(args.rate * 10))
+        print(f"\n{paced} reports from {args.threads} threads at {args.rate:g} reports/s:")
+        run_queued(db_path, log_path, args, paced, args.rate)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.unlink(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Change Events for RPi5 Network Deployment System
+
+Lightweight local pub/sub between the deployment server (port 5001) and
+the web interface (port 5000). Writers publish small JSON datagrams on a
+Unix domain socket; the web interface listens and pushes updates to
+connected browsers only when something actually changed.
+
+Publishing is fire-and-forget: if nobody is listening (web interface
+stopped, socket missing) the event is dropped and the writer carries on.
+
+Event format:
+    {"type": "deployment" | "batch" | "pool" | "progress", ...event fields}
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import json
+import socket
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default socket location (overridable for tests and non-standard installs)
+EVENT_SOCKET_PATH = os.environ.get('RPI_EVENT_SOCKET', '/opt/rpi-deployment/run/events.sock')
+
+# Largest datagram accepted by the listener
+MAX_EVENT_SIZE = 65536
+
+
+def publish(event_type: str, socket_path: Optional[str] = None, **fields) -> bool:
+    """
+    Publish a change event to the local listener.
+
+    Args:
+        event_type: Event type ('deployment', 'batch' or 'pool')
+        socket_path: Listener socket path (defaults to EVENT_SOCKET_PATH)
+        **fields: JSON-serializable event fields
+
+    Returns:
+        True if the event was delivered to a listener, False otherwise
+    """
+    payload = json.dumps({'type': event_type, **fields}, default=str).encode()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        sock.setblocking(False)
+        sock.sendto(payload, socket_path or EVENT_SOCKET_PATH)
+        return True
+    except OSError as e:
+        # No listener, or its receive buffer is full: the event is only a hint
+        logger.debug(f"Change event '{event_type}' not delivered: {e}")
+        return False
+    finally:
+        sock.close()
+
+
+class ChangeListener:
+    """
+    Receive change events on a Unix datagram socket.
+
+    A background thread blocks on the socket and hands events to a callback.
+    Events arriving within `coalesce` seconds of each other are delivered
+    together, so a burst of writes results in a single callback.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[List[dict]], None],
+        socket_path: Optional[str] = None,
+        coalesce: float = 0.05
+    ):
+        """
+        Args:
+            callback: Called with a list of event dicts
+            socket_path: Socket path to bind (defaults to EVENT_SOCKET_PATH)
+            coalesce: Quiet period in seconds that ends a burst
+        """
+        self.callback = callback
+        self.socket_path = socket_path or EVENT_SOCKET_PATH
+        self.coalesce = coalesce
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Bind the socket and start the listener thread."""
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+
+        # A stale socket file from a previous run prevents bind()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.socket_path)
+        # Wake up periodically only to notice stop(); no work is done then
+        self._sock.settimeout(1.0)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Listening for change events on {self.socket_path}")
+
+    def stop(self) -> None:
+        """Stop the listener thread and remove the socket."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _receive(self, timeout: Optional[float]) -> Optional[dict]:
+        """
+        Receive one event.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            Event dict, or None on timeout or malformed datagram
+        """
+        self._sock.settimeout(timeout)
+        try:
+            data = self._sock.recv(MAX_EVENT_SIZE)
+        except socket.timeout:
+            return None
+
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.warning("Ignoring malformed change event")
+            return None
+        return event if isinstance(event, dict) else None
+
+    def _run(self) -> None:
+        """Listener loop: block for an event, then drain the burst."""
+        while not self._stop.is_set():
+            try:
+                event = self._receive(1.0)
+                if event is None:
+                    continue
+
+                events = [event]
+                while True:
+                    event = self._receive(self.coalesce)
+                    if event is None:
+                        break
+                    events.append(event)
+
+                self.callback(events)
+            except OSError:
+                # Socket closed by stop()
+                break
+            except Exception as e:
+                # A failing callback must not kill the listener
+                logger.error(f"Error handling change events: {e}")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Streaming Data Export for Raspberry Pi Deployment System
+
+Exports deployment_history, hostname_pool and deployment_batches as CSV or
+NDJSON (one JSON object per line), optionally gzip-compressed on the fly.
+
+Memory use is constant regardless of table size:
+- Rows are read in primary key order, EXPORT_BATCH_ROWS at a time, each
+  batch continuing after the last id of the previous one (keyset). Every
+  batch is a short read, so a slow consumer never holds a lock that would
+  block the deployment server's writes.
+- Output is produced chunk by chunk from each batch and handed to the
+  caller (HTTP response, file) before the next batch is read.
+
+Datasets:
+- deployments: filter by venue, product, status; date range on started_at
+- pool: filter by venue, product, status; date range on assigned_date
+- batches: filter by venue, product, status; date range on created_at
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import io
+import re
+import csv
+import json
+import zlib
+from typing import Iterator, List, Optional, Any
+
+from date_filters import check_date
+from db_access import connect
+
+# Rows read per query (and per output chunk)
+EXPORT_BATCH_ROWS = 1000
+
+# Supported output formats -> MIME type
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Dataset -> table, exported columns, status column, date range column, valid statuses
+EXPORT_DATASETS = {
+    'deployments': {
+        'table': 'deployment_history',
+        'columns': ['id', 'hostname', 'mac_address', 'serial_number', 'ip_address', 'product_type',
+                    'venue_code', 'image_version', 'deployment_status', 'started_at', 'completed_at',
+                    'error_message'],
+        'status_column': 'deployment_status',
+        'date_column': 'started_at',
+        'statuses': None
+    },
+    'pool': {
+        'table': 'hostname_pool',
+        'columns': ['id', 'product_type', 'venue_code', 'identifier', 'status', 'mac_address',
+                    'serial_number', 'assigned_date', 'notes', 'created_at'],
+        'status_column': 'status',
+        'date_column': 'assigned_date',
+        'statuses': ['available', 'assigned', 'retired']
+    },
+    'batches': {
+        'table': 'deployment_batches',
+        'columns': ['id', 'venue_code', 'product_type', 'total_count', 'remaining_count', 'priority',
+                    'status', 'created_at', 'started_at', 'completed_at'],
+        'status_column': 'status',
+        'date_column': 'created_at',
+        'statuses': ['pending', 'active', 'paused', 'completed', 'cancelled']
+    }
+}
+
+def export_filter(
+    dataset: str,
+    venue_code: Optional[str] = None,
+    product_type: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> tuple:
+    """
+    Build the WHERE clause fragment for an export.
+
+    Filter columns are written as `+column` so SQLite does not pick a
+    filter index and sort: exports always walk the primary key, which
+    keeps every batch a bounded range scan.
+
+    Args:
+        dataset: 'deployments', 'pool' or 'batches'
+        venue_code: Restrict to one venue
+        product_type: Restrict to 'KXP2' or 'RXP2'
+        status: Restrict to one status
+        since: Include rows dated at or after this ('YYYY-MM-DD[ HH:MM[:SS]]')
+        until: Include rows dated before this
+
+    Returns:
+        Tuple of (sql fragment starting with ' AND', params list)
+
+    Raises:
+        ValueError: If the dataset or a filter value is invalid
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Must be one of: {', '.join(EXPORT_DATASETS)}")
+    spec = EXPORT_DATASETS[dataset]
+
+    clauses = ''
+    params: List[Any] = []
+
+    if venue_code:
+        if not re.match(r'^[A-Z]{4}$', venue_code):
+            raise ValueError(f"Invalid venue code '{venue_code}'")
+        clauses += " AND +venue_code = ?"
+        params.append(venue_code)
+
+    if product_type:
+        if product_type not in ('KXP2', 'RXP2'):
+            raise ValueError(f"Invalid product_type '{product_type}'. Must be 'KXP2' or 'RXP2'")
+        clauses += " AND +product_type = ?"
+        params.append(product_type)
+
+    if status:
+        if spec['statuses'] and status not in spec['statuses']:
+            raise ValueError(f"Invalid status '{status}'. Must be one of: {', '.join(spec['statuses'])}")
+        clauses += f" AND +{spec['status_column']} = ?"
+        params.append(status)
+
+    for value, operator in ((since, '>='), (until, '<')):
+        if value:
+            clauses += f" AND +{spec['date_column']} {operator} ?"
+            params.append(check_date(value))
+
+    return clauses, params
+
+
+def iter_rows(db_path: str, dataset: str, batch_rows: int = EXPORT_BATCH_ROWS, **filters) -> Iterator[List[tuple]]:
+    """
+    Read an export dataset in batches of rows.
+
+    Args:
+        db_path: Path to SQLite database file
+        dataset: 'deployments', 'pool' or 'batches'
+        batch_rows: Rows per batch
+        **filters: See export_filter
+
+    Yields:
+        Lists of up to batch_rows row tuples, in export column order
+
+    Raises:
+        ValueError: If the dataset or a filter value is invalid (raised
+            before any database access)
+    """
+    clauses, params = export_filter(dataset, **filters)
+    spec = EXPORT_DATASETS[dataset]
+    query = f"""
+        SELECT {', '.join(spec['columns'])}
+        FROM {spec['table']}
+        WHERE id > ?{clauses}
+        ORDER BY id
+        LIMIT ?
+    """
+
+    def batches():
+        # Own connection: the generator outlives the request that created it
+        conn = connect(db_path)
+        try:
+            last_id = 0
+            while True:
+                rows = conn.execute(query, [last_id] + params + [batch_rows]).fetchall()
+                if not rows:
+                    return
+                yield rows
+                if len(rows) < batch_rows:
+                    return
+                last_id = rows[-1][0]
+        finally:
+            conn.close()
+
+    return batches()
+
+
+def iter_csv(batches: Iterator[List[tuple]], columns: List[str]) -> Iterator[str]:
+    """
+    Format row batches as CSV, one chunk per batch (header first).
+
+    Args:
+        batches: Row batches from iter_rows
+        columns: Column names for the header
+
+    Yields:
+        CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def iter_ndjson(batches: Iterator[List[tuple]], columns: List[str]) -> Iterator[str]:
+    """
+    Format row batches as newline-delimited JSON, one chunk per batch.
+
+    Args:
+        batches: Row batches from iter_rows
+        columns: Column names (object keys)
+
+    Yields:
+        NDJSON text chunks
+    """
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip a stream of byte chunks incrementally.
+
+    Args:
+        chunks: Uncompressed byte chunks
+        level: zlib compression level
+
+    Yields:
+        Compressed chunks forming one gzip member
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    db_path: str,
+    dataset: str,
+    fmt: str = 'csv',
+    compress: bool = False,
+    **filters
+) -> Iterator[bytes]:
+    """
+    Stream an export as bytes.
+
+    Arguments are validated immediately, so errors surface before any
+    output (or HTTP headers) is produced.
+
+    Args:
+        db_path: Path to SQLite database file
+        dataset: 'deployments', 'pool' or 'batches'
+        fmt: 'csv' or 'ndjson'
+        compress: Gzip the output
+        **filters: venue_code, product_type, status, since, until
+
+    Returns:
+        Iterator of output byte chunks
+
+    Raises:
+        ValueError: If the dataset, format or a filter value is invalid
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    batches = iter_rows(db_path, dataset, **filters)
+    columns = EXPORT_DATASETS[dataset]['columns']
+    text = iter_csv(batches, columns) if fmt == 'csv' else iter_ndjson(batches, columns)
+    chunks = (chunk.encode('utf-8') for chunk in text)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(dataset: str, fmt: str, compress: bool = False) -> str:
+    """
+    Build a download filename for an export.
+
+    Args:
+        dataset: Export dataset
+        fmt: 'csv' or 'ndjson'
+        compress: Whether the output is gzipped
+
+    Returns:
+        Filename such as 'deployments.csv.gz'
+    """
+    return f"{dataset}.{fmt}{'.gz' if compress else ''}"
@@ -8,6 +8,15 @@ Creates SQLite database with schema for:
 - deployment_history: Record of all deployments
 - master_images: Available OS images for deployment
 - deployment_batches: Batch deployment management with priority queue
+- hostname_pool_counts: Trigger-maintained per-venue/product/status counters
+- deployment_history_counts: Trigger-maintained deployment counters for pagination
+- deployment_search, hostname_search: Trigger-maintained FTS5 search indexes
+- batch_queue_state: Version counter for in-memory batch scheduler invalidation
+- deployment_history_archive, deployment_archive_counts: Archived (cold)
+  deployments and their counters; deployment_history_all unions both
+- deployment_rollups_hourly, deployment_rollups_daily: Trigger-maintained
+  deployment counts and durations per time bucket/venue/product/status
+- schema_version: Applied migrations (see migrations.py)
 
 Schema enforces data integrity through:
 - CHECK constraints on product types and status values
@@ -23,6 +32,9 @@ import logging
 import os
 from typing import Optional
 
+from db_access import connect
+from migrations import MIGRATIONS, migrate, pending_migrations
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,13 +42,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Deployment rollup granularity -> (table, bucket of a row's started_at), as
+# built by migrations.deployment_rollups; changing it needs a new migration
+ROLLUP_TABLES = {
+    'hour': ('deployment_rollups_hourly', "strftime('%Y-%m-%d %H:00:00', {row}.started_at)"),
+    'day': ('deployment_rollups_daily', "date({row}.started_at)"),
+}
+
 
 def initialize_database(db_path: str = "/opt/rpi-deployment/database/deployment.db") -> bool:
     """
     Initialize SQLite database with required schema.
 
     Creates all tables, indexes, and constraints needed for the hostname
-    management and deployment tracking system.
+    management and deployment tracking system, or upgrades an existing
+    database, by applying pending migrations (see migrations.py).
 
     Args:
         db_path: Path to SQLite database file
@@ -54,127 +74,11 @@ def initialize_database(db_path: str = "/opt/rpi-deployment/database/deployment.
             os.makedirs(db_dir, mode=0o755)
             logger.info(f"Created database directory: {db_dir}")
 
-        # Connect to database (creates file if doesn't exist)
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Enable foreign key constraints
-        cursor.execute("PRAGMA foreign_keys = ON")
-
-        # Create hostname_pool table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS hostname_pool (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
-                venue_code TEXT NOT NULL CHECK(length(venue_code) = 4),
-                identifier TEXT NOT NULL,
-                status TEXT NOT NULL CHECK(status IN ('available', 'assigned', 'retired')),
-                mac_address TEXT,
-                serial_number TEXT,
-                assigned_date TIMESTAMP,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(product_type, venue_code, identifier)
-            )
-        """)
-        logger.info("Created hostname_pool table")
-
-        # Create venues table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS venues (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                code TEXT NOT NULL UNIQUE CHECK(length(code) = 4),
-                name TEXT NOT NULL,
-                location TEXT,
-                contact_email TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        logger.info("Created venues table")
-
-        # Create deployment_history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS deployment_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                hostname TEXT NOT NULL,
-                mac_address TEXT,
-                serial_number TEXT,
-                ip_address TEXT,
-                product_type TEXT,
-                venue_code TEXT,
-                image_version TEXT,
-                deployment_status TEXT,
-                started_at TIMESTAMP,
-                completed_at TIMESTAMP,
-                error_message TEXT
-            )
-        """)
-        logger.info("Created deployment_history table")
-
-        # Create master_images table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS master_images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT NOT NULL UNIQUE,
-                product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
-                version TEXT NOT NULL,
-                size_bytes INTEGER,
-                checksum TEXT,
-                description TEXT,
-                is_active BOOLEAN DEFAULT 0,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        logger.info("Created master_images table")
-
-        # Create deployment_batches table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS deployment_batches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                venue_code TEXT NOT NULL,
-                product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
-                total_count INTEGER NOT NULL,
-                remaining_count INTEGER NOT NULL,
-                priority INTEGER DEFAULT 0,
-                status TEXT NOT NULL CHECK(status IN ('pending', 'active', 'paused', 'completed', 'cancelled')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                started_at TIMESTAMP,
-                completed_at TIMESTAMP,
-                FOREIGN KEY (venue_code) REFERENCES venues(code)
-            )
-        """)
-        logger.info("Created deployment_batches table")
-
-        # Create indexes for performance
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_hostname_status
-            ON hostname_pool(status)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_hostname_venue
-            ON hostname_pool(venue_code)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_deployment_date
-            ON deployment_history(started_at)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_batch_status
-            ON deployment_batches(status, priority)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_batch_venue
-            ON deployment_batches(venue_code)
-        """)
-        logger.info("Created indexes")
-
-        # Commit changes
-        conn.commit()
-        conn.close()
+        # Apply every pending migration (creates the file if it doesn't
+        # exist and switches it to WAL)
+        applied = migrate(db_path)
+        if applied:
+            logger.info(f"Applied schema migrations {applied}")
 
         logger.info(f"Database initialized successfully at {db_path}")
         return True
@@ -187,6 +91,111 @@ def initialize_database(db_path: str = "/opt/rpi-deployment/database/deployment.
         raise
 
 
+def rebuild_pool_counts(cursor: sqlite3.Cursor) -> None:
+    """
+    Recompute hostname_pool_counts from hostname_pool.
+
+    Repairs the counters if hostname_pool was ever modified with the
+    triggers absent (e.g. a bulk load).
+
+    Args:
+        cursor: Cursor on an open database connection
+    """
+    cursor.execute("DELETE FROM hostname_pool_counts")
+    cursor.execute("""
+        INSERT INTO hostname_pool_counts (venue_code, product_type, status, count)
+        SELECT venue_code, product_type, status, COUNT(*)
+        FROM hostname_pool
+        GROUP BY venue_code, product_type, status
+    """)
+
+
+def rebuild_deployment_counts(cursor: sqlite3.Cursor) -> None:
+    """
+    Recompute deployment_history_counts from deployment_history.
+
+    Args:
+        cursor: Cursor on an open database connection
+    """
+    cursor.execute("DELETE FROM deployment_history_counts")
+    cursor.execute("""
+        INSERT INTO deployment_history_counts (venue_code, product_type, deployment_status, count)
+        SELECT COALESCE(venue_code, ''), COALESCE(product_type, ''), COALESCE(deployment_status, ''), COUNT(*)
+        FROM deployment_history
+        GROUP BY 1, 2, 3
+    """)
+
+
+def rebuild_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    Rebuild deployment_search and hostname_search from their source tables.
+
+    Args:
+        cursor: Cursor on an open database connection
+    """
+    cursor.execute("INSERT INTO deployment_search (deployment_search) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO hostname_search (hostname_search) VALUES ('delete-all')")
+    cursor.execute("""
+        INSERT INTO hostname_search (rowid, hostname, serial_number, mac_address, notes)
+        SELECT id, product_type || '-' || venue_code || '-' || identifier,
+               serial_number, mac_address, notes
+        FROM hostname_pool
+    """)
+
+
+def rebuild_archive_counts(cursor: sqlite3.Cursor) -> None:
+    """
+    Recompute deployment_archive_counts from deployment_history_archive.
+
+    Args:
+        cursor: Cursor on an open database connection
+    """
+    cursor.execute("DELETE FROM deployment_archive_counts")
+    cursor.execute("""
+        INSERT INTO deployment_archive_counts (venue_code, product_type, deployment_status, count)
+        SELECT COALESCE(venue_code, ''), COALESCE(product_type, ''), COALESCE(deployment_status, ''), COUNT(*)
+        FROM deployment_history_archive
+        GROUP BY 1, 2, 3
+    """)
+
+
+def rebuild_deployment_rollups(cursor: sqlite3.Cursor) -> None:
+    """
+    Recompute the deployment rollups from deployment_history and its archive.
+
+    Only the hourly rollups read the history; coarser ones add up hourly
+    rows (a bucket's started_at is the start of its hour).
+
+    Args:
+        cursor: Cursor on an open database connection
+    """
+    duration = "(strftime('%s', completed_at) - strftime('%s', started_at))"
+    hourly, hour_bucket = ROLLUP_TABLES['hour']
+    sources = {
+        hourly: (hour_bucket.format(row='deployment_history_all'), "deployment_history_all",
+                 f"COUNT(*), COALESCE(SUM({duration}), 0), COUNT({duration})")
+    }
+    for table, bucket in ROLLUP_TABLES.values():
+        if table != hourly:
+            sources[table] = (
+                bucket.format(row='hours'),
+                f"(SELECT bucket AS started_at, * FROM {hourly}) AS hours",
+                "SUM(count), SUM(duration_sum), SUM(duration_count)"
+            )
+
+    for table, (bucket, source, totals) in sources.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"""
+            INSERT INTO {table} (bucket, venue_code, product_type, deployment_status,
+                                 count, duration_sum, duration_count)
+            SELECT COALESCE({bucket}, ''),
+                   COALESCE(venue_code, ''), COALESCE(product_type, ''), COALESCE(deployment_status, ''),
+                   {totals}
+            FROM {source}
+            GROUP BY 1, 2, 3, 4
+        """)
+
+
 def reset_database(db_path: str = "/opt/rpi-deployment/database/deployment.db") -> bool:
     """
     Reset database by dropping all tables and recreating schema.
@@ -202,15 +211,26 @@ def reset_database(db_path: str = "/opt/rpi-deployment/database/deployment.db")
     try:
         if os.path.exists(db_path):
             logger.warning(f"Resetting database at {db_path}")
-            conn = sqlite3.connect(db_path)
+            conn = connect(db_path)
             cursor = conn.cursor()
 
             # Drop all tables
+            cursor.execute("DROP TABLE IF EXISTS hostname_pool_counts")
+            cursor.execute("DROP TABLE IF EXISTS deployment_history_counts")
+            cursor.execute("DROP TABLE IF EXISTS deployment_search")
+            cursor.execute("DROP TABLE IF EXISTS hostname_search")
+            cursor.execute("DROP TABLE IF EXISTS batch_queue_state")
+            cursor.execute("DROP TABLE IF EXISTS deployment_rollups_hourly")
+            cursor.execute("DROP TABLE IF EXISTS deployment_rollups_daily")
+            cursor.execute("DROP VIEW IF EXISTS deployment_history_all")
+            cursor.execute("DROP TABLE IF EXISTS deployment_archive_counts")
+            cursor.execute("DROP TABLE IF EXISTS deployment_history_archive")
             cursor.execute("DROP TABLE IF EXISTS deployment_batches")
             cursor.execute("DROP TABLE IF EXISTS hostname_pool")
             cursor.execute("DROP TABLE IF EXISTS venues")
             cursor.execute("DROP TABLE IF EXISTS deployment_history")
             cursor.execute("DROP TABLE IF EXISTS master_images")
+            cursor.execute("DROP TABLE IF EXISTS schema_version")
 
             conn.commit()
             conn.close()
@@ -235,11 +255,15 @@ def verify_schema(db_path: str = "/opt/rpi-deployment/database/deployment.db") -
         True if schema is valid, False otherwise
     """
     try:
-        conn = sqlite3.connect(db_path)
+        conn = connect(db_path)
         cursor = conn.cursor()
 
         # Check all required tables exist
-        required_tables = ['hostname_pool', 'venues', 'deployment_history', 'master_images', 'deployment_batches']
+        required_tables = ['hostname_pool', 'venues', 'deployment_history', 'master_images', 'deployment_batches',
+                           'hostname_pool_counts', 'deployment_history_counts', 'batch_queue_state',
+                           'deployment_search', 'hostname_search', 'schema_version',
+                           'deployment_history_archive', 'deployment_archive_counts',
+                           'deployment_rollups_hourly', 'deployment_rollups_daily']
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
         existing_tables = [row[0] for row in cursor.fetchall()]
 
@@ -249,7 +273,11 @@ def verify_schema(db_path: str = "/opt/rpi-deployment/database/deployment.db") -
                 return False
 
         # Check indexes exist
-        required_indexes = ['idx_hostname_status', 'idx_hostname_venue', 'idx_deployment_date', 'idx_batch_status', 'idx_batch_venue']
+        required_indexes = ['idx_hostname_status', 'idx_hostname_venue', 'idx_deployment_date', 'idx_batch_status', 'idx_batch_venue',
+                            'idx_hostname_lease', 'idx_hostname_next_available',
+                            'idx_archive_started', 'idx_archive_hostname'] + [
+                                name for _, _, step in MIGRATIONS if not callable(step)
+                                for name, _, _ in step]
         cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
         existing_indexes = [row[0] for row in cursor.fetchall()]
 
@@ -258,6 +286,32 @@ def verify_schema(db_path: str = "/opt/rpi-deployment/database/deployment.db") -
                 logger.error(f"Missing required index: {index}")
                 return False
 
+        # Check counter, search and version maintenance triggers exist
+        required_triggers = ['trg_pool_counts_insert', 'trg_pool_counts_delete', 'trg_pool_counts_update',
+                             'trg_deployment_counts_insert', 'trg_deployment_counts_delete',
+                             'trg_deployment_counts_update',
+                             'trg_deployment_search_insert', 'trg_deployment_search_delete',
+                             'trg_deployment_search_update',
+                             'trg_hostname_search_insert', 'trg_hostname_search_delete',
+                             'trg_hostname_search_update',
+                             'trg_batch_queue_insert', 'trg_batch_queue_update', 'trg_batch_queue_delete',
+                             'trg_archive_counts_insert', 'trg_archive_counts_delete',
+                             'trg_rollup_insert', 'trg_rollup_delete', 'trg_rollup_update',
+                             'trg_rollup_archive_insert', 'trg_rollup_archive_delete']
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger'")
+        existing_triggers = [row[0] for row in cursor.fetchall()]
+
+        for trigger in required_triggers:
+            if trigger not in existing_triggers:
+                logger.error(f"Missing required trigger: {trigger}")
+                return False
+
+        # Check every migration has been applied
+        pending = pending_migrations(conn)
+        if pending:
+            logger.error(f"Pending schema migrations: {', '.join(name for _, name in pending)}")
+            return False
+
         conn.close()
         logger.info("Schema verification passed")
         return True
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Date Filter Validation for Raspberry Pi Deployment System
+
+Timestamps are stored as 'YYYY-MM-DD HH:MM:SS' text (like SQLite's
+CURRENT_TIMESTAMP) and date filters are compared against them as text,
+so a filter value in any other format silently selects the wrong rows.
+Bulk pool operations, exports and deployment reports all validate their
+date filters here.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import re
+
+# Accepted filter values: a day, or a day and time to the minute or second
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2})?)?$')
+
+DATE_FORMATS = 'YYYY-MM-DD, YYYY-MM-DD HH:MM or YYYY-MM-DD HH:MM:SS'
+
+
+def check_date(value: str, name: str = 'date') -> str:
+    """
+    Validate a date filter value.
+
+    Args:
+        value: Filter value
+        name: What the value is, for the error message
+
+    Returns:
+        The value, unchanged
+
+    Raises:
+        ValueError: If the value is not in one of DATE_FORMATS
+    """
+    if not DATE_PATTERN.match(value):
+        raise ValueError(f"Invalid {name} '{value}'. Use {DATE_FORMATS}")
+    return value
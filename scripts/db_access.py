@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite Access Layer for Raspberry Pi Deployment System
+
+Every component (deployment server, web interface, hostname manager,
+db_admin) opens the deployment database through this module, so all
+connections get the same settings:
+
+- journal_mode=WAL: readers never block the writer and the writer never
+  blocks readers, so the web dashboard and the deployment server can use
+  the same file concurrently
+- busy_timeout: a writer waits for another writer instead of failing with
+  "database is locked"
+- synchronous=NORMAL: safe with WAL (a power cut can lose the last commits,
+  never corrupt the database) and avoids an fsync per commit
+- mmap_size / cache_size / temp_store: keep hot pages in memory
+- A larger prepared statement cache per connection
+
+Connections are reused rather than opened per call:
+- get_connection() returns the calling thread's connection for a database,
+  opening one (or taking an idle one) on first use
+- release_connections() hands the thread's connections back to an idle
+  pool; the web and deployment servers call it at the end of each request
+  so short-lived request threads share a few warm connections
+- close() on a pooled connection is a no-op, so existing
+  `with closing(conn)` callers keep working
+
+connect() opens a standalone connection with the same settings, for work
+that must not share the thread's connection (streaming exports, schema
+setup, maintenance).
+
+Both kinds of connection report every statement to the process's query
+profiler (query_profiler.profiler): latency, rows and the query plan of
+each statement shape, with slow statements logged.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import logging
+import sqlite3
+import threading
+import weakref
+from typing import Dict, List, Optional, Any
+
+from query_profiler import ProfiledConnection
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds a connection waits for a lock before raising "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+# Memory-mapped I/O size (bytes)
+MMAP_SIZE = 64 * 1024 * 1024
+
+# Page cache per connection (negative: KiB)
+CACHE_SIZE_KIB = 8192
+
+# Prepared statements cached per connection
+STATEMENT_CACHE_SIZE = 256
+
+# Idle connections kept per database when threads release them
+DEFAULT_MAX_IDLE = 8
+
+# Settings applied to every new connection
+CONNECTION_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', BUSY_TIMEOUT_MS),
+    ('mmap_size', MMAP_SIZE),
+    ('cache_size', -CACHE_SIZE_KIB),
+    ('temp_store', 'MEMORY'),
+)
+
+
+class PooledConnection(ProfiledConnection):
+    """
+    Connection owned by a ConnectionPool.
+
+    close() is a no-op: the pool decides when the connection really closes.
+    Transactions work as usual (`with conn:` commits or rolls back).
+    """
+
+    def close(self) -> None:
+        """Leave the connection open for reuse by the pool."""
+
+    def _close(self) -> None:
+        """Really close the connection."""
+        self._closed = True
+        sqlite3.Connection.close(self)
+
+
+def _file_id(db_path: str) -> Optional[tuple]:
+    """Identify the file at a path, so a replaced database is noticed."""
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    Apply the shared PRAGMA settings to a connection.
+
+    Args:
+        conn: Open connection (no transaction in progress)
+
+    Returns:
+        The same connection
+    """
+    for name, value in CONNECTION_PRAGMAS:
+        try:
+            conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.OperationalError as e:
+            # e.g. WAL is unavailable on a read-only directory
+            logger.warning(f"Could not set PRAGMA {name}={value}: {e}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def connect(db_path: str, factory: type = ProfiledConnection, **kwargs) -> sqlite3.Connection:
+    """
+    Open a new connection with the shared settings.
+
+    The caller owns the connection and must close it.
+
+    Args:
+        db_path: Path to SQLite database file
+        factory: Connection class (profiled by default)
+        **kwargs: Extra sqlite3.connect arguments
+
+    Returns:
+        Configured sqlite3.Connection (rows are sqlite3.Row)
+    """
+    kwargs.setdefault('timeout', BUSY_TIMEOUT_MS / 1000)
+    kwargs.setdefault('cached_statements', STATEMENT_CACHE_SIZE)
+    return configure(sqlite3.connect(db_path, factory=factory, **kwargs))
+
+
+class ConnectionPool:
+    """
+    Thread-bound SQLite connections with an idle pool.
+
+    A connection is used by one thread at a time: it is bound to the thread
+    that took it until that thread calls release().
+    """
+
+    def __init__(self, max_idle: int = DEFAULT_MAX_IDLE):
+        """
+        Args:
+            max_idle: Idle connections kept per database
+        """
+        self.max_idle = max_idle
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[PooledConnection]] = {}
+        self._live = weakref.WeakSet()
+        self._metrics = {'opened': 0, 'reused': 0, 'recycled': 0, 'released': 0, 'closed': 0, 'stale': 0}
+
+    def _bound(self) -> Dict[str, PooledConnection]:
+        """Connections bound to the calling thread, by database path."""
+        bound = getattr(self._local, 'connections', None)
+        if bound is None:
+            bound = self._local.connections = {}
+        return bound
+
+    def _usable(self, conn: PooledConnection, file_id: Optional[tuple]) -> bool:
+        """Whether a pooled connection is open and still on the same file."""
+        return not conn._closed and conn._file_id == file_id
+
+    def _discard(self, conn: PooledConnection, stale: bool = False) -> None:
+        """Close a connection that can no longer be used."""
+        closing_now = not conn._closed
+        if closing_now:
+            conn._close()
+        with self._lock:
+            if closing_now:
+                self._metrics['closed'] += 1
+            if stale:
+                self._metrics['stale'] += 1
+
+    def _sweep(self, bound: Dict[str, PooledConnection]) -> None:
+        """Close connections whose database file was deleted or replaced."""
+        for path, conn in list(bound.items()):
+            if not self._usable(conn, _file_id(path)):
+                del bound[path]
+                self._discard(conn, stale=not conn._closed)
+
+        with self._lock:
+            for path, idle in list(self._idle.items()):
+                file_id = _file_id(path)
+                stale = [conn for conn in idle if not self._usable(conn, file_id)]
+                for conn in stale:
+                    idle.remove(conn)
+                    if not conn._closed:
+                        conn._close()
+                        self._metrics['closed'] += 1
+                    self._metrics['stale'] += 1
+                if not idle:
+                    del self._idle[path]
+
+    def get(self, db_path: str) -> PooledConnection:
+        """
+        Get the calling thread's connection to a database.
+
+        Args:
+            db_path: Path to SQLite database file
+
+        Returns:
+            Configured connection (rows are sqlite3.Row)
+        """
+        db_path = str(db_path)
+        bound = self._bound()
+        file_id = _file_id(db_path)
+
+        conn = bound.get(db_path)
+        if conn is not None:
+            if self._usable(conn, file_id):
+                with self._lock:
+                    self._metrics['reused'] += 1
+                return conn
+            # Closed by close_all() or the file was deleted/replaced
+            del bound[db_path]
+            self._discard(conn, stale=not conn._closed)
+
+        with self._lock:
+            idle = self._idle.get(db_path, [])
+            while idle:
+                candidate = idle.pop()
+                if self._usable(candidate, file_id):
+                    self._metrics['recycled'] += 1
+                    bound[db_path] = candidate
+                    return candidate
+                if not candidate._closed:
+                    candidate._close()
+                    self._metrics['closed'] += 1
+                self._metrics['stale'] += 1
+
+        self._sweep(bound)
+        conn = connect(db_path, factory=PooledConnection, check_same_thread=False)
+        conn._closed = False
+        conn._db_path = db_path
+        # Read after connecting: the connection creates a missing file
+        conn._file_id = _file_id(db_path)
+        bound[db_path] = conn
+        with self._lock:
+            self._live.add(conn)
+            self._metrics['opened'] += 1
+        return conn
+
+    def release(self) -> None:
+        """
+        Return the calling thread's connections to the idle pool.
+
+        Any transaction left open is rolled back first.
+        """
+        bound = self._bound()
+        while bound:
+            db_path, conn = bound.popitem()
+            if conn._closed:
+                continue
+            if conn.in_transaction:
+                logger.warning(f"Rolling back transaction left open on {db_path}")
+                conn.rollback()
+            with self._lock:
+                idle = self._idle.setdefault(db_path, [])
+                if len(idle) < self.max_idle:
+                    idle.append(conn)
+                    self._metrics['released'] += 1
+                    continue
+            self._discard(conn)
+
+    def close_all(self, db_path: Optional[str] = None) -> None:
+        """
+        Close pooled connections, e.g. before a database file is replaced.
+
+        Connections bound to other threads are closed too; those threads
+        open a fresh connection on their next get().
+
+        Args:
+            db_path: Only close connections to this database (default: all)
+        """
+        db_path = str(db_path) if db_path is not None else None
+        with self._lock:
+            for path in list(self._idle):
+                if db_path is None or path == db_path:
+                    del self._idle[path]
+            doomed = [conn for conn in self._live
+                      if not conn._closed and (db_path is None or conn._db_path == db_path)]
+
+        for conn in doomed:
+            try:
+                conn._close()
+            except sqlite3.ProgrammingError:
+                pass
+            with self._lock:
+                self._metrics['closed'] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get connection counters.
+
+        Returns:
+            dict: opened, reused (same thread), recycled (from the idle
+            pool), released, closed and stale counts, plus the number of
+            open and idle connections
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['open'] = sum(1 for conn in self._live if not conn._closed)
+            metrics['idle'] = sum(len(idle) for idle in self._idle.values())
+        return metrics
+
+
+# Process-wide pool used by every component
+_pool = ConnectionPool()
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Get the calling thread's shared connection to a database.
+
+    Use `with conn:` for transactions. Do not keep the connection past the
+    current request or task (see release_connections).
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        Configured connection (rows are sqlite3.Row)
+    """
+    return _pool.get(db_path)
+
+
+def release_connections() -> None:
+    """Return the calling thread's connections to the idle pool."""
+    _pool.release()
+
+
+def close_connections(db_path: Optional[str] = None) -> None:
+    """
+    Close pooled connections (all, or those to one database).
+
+    Args:
+        db_path: Database whose connections to close (default: all)
+    """
+    _pool.close_all(db_path)
+
+
+def connection_metrics() -> Dict[str, Any]:
+    """
+    Get process-wide connection pool counters.
+
+    Returns:
+        dict: See ConnectionPool.metrics
+    """
+    return _pool.metrics()
@@ -6,7 +6,13 @@ Provides command-line tools for managing the deployment database:
 - View all venues
 - View hostname pool status
 - View deployment history
-- Export reports
+- Bulk release/retire hostname pool entries
+- Export tables as CSV/NDJSON (streamed, optionally gzipped)
+- Archive old deployment history (batched, safe while deployments run)
+- Deployment reports per hour/day from the rollup tables
+- Online backups (compressed, verified) and restore
+- Slowest/most expensive queries recorded by the running services
+- Statements that scan a large table, with the index to add
 - Database health checks
 
 Author: Raspberry Pi Deployment System
@@ -19,6 +25,18 @@ import sys
 from typing import List, Dict
 from tabulate import tabulate
 
+from hostname_manager import HostnameManager
+from db_access import get_connection
+from data_export import stream_export, EXPORT_DATASETS, EXPORT_FORMATS
+from history_archive import archive_history, archive_status, DEFAULT_RETENTION_DAYS, ARCHIVE_BATCH_ROWS
+from deployment_rollups import rollup_report, rebuild_rollups, ROLLUP_DIMENSIONS
+from db_backup import (
+    backup_database, list_backups, prune_backups, verify_backup, restore_backup,
+    DEFAULT_BACKUP_DIR, DEFAULT_BACKUP_KEEP
+)
+from query_profiler import load_profiles, top_statements, recent_slow, DEFAULT_PROFILE_DIR, ORDER_KEYS
+from index_advisor import find_full_scans
+
 
 class DatabaseAdmin:
     """Database administration utilities"""
@@ -33,10 +51,8 @@ class DatabaseAdmin:
         self.db_path = db_path
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get the shared database connection (row factory, WAL, busy timeout)"""
+        return get_connection(self.db_path)
 
     def list_venues(self) -> List[Dict]:
         """
@@ -53,11 +69,11 @@ class DatabaseAdmin:
                     v.name,
                     v.location,
                     v.contact_email,
-                    COUNT(hp.id) as total_hostnames,
-                    SUM(CASE WHEN hp.status = 'available' THEN 1 ELSE 0 END) as available,
-                    SUM(CASE WHEN hp.status = 'assigned' THEN 1 ELSE 0 END) as assigned
+                    COALESCE(SUM(c.count), 0) as total_hostnames,
+                    COALESCE(SUM(CASE WHEN c.status = 'available' THEN c.count END), 0) as available,
+                    COALESCE(SUM(CASE WHEN c.status = 'assigned' THEN c.count END), 0) as assigned
                 FROM venues v
-                LEFT JOIN hostname_pool hp ON v.code = hp.venue_code
+                LEFT JOIN hostname_pool_counts c ON v.code = c.venue_code
                 GROUP BY v.code
                 ORDER BY v.code
             """)
@@ -95,27 +111,29 @@ class DatabaseAdmin:
             query += " AND product_type = ?"
             params.append(product_type.upper())
 
-        query += " ORDER BY venue_code, product_type, identifier"
+        query += " ORDER BY venue_code, product_type, sort_key, identifier"
 
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
-    def list_deployments(self, limit: int = 50) -> List[Dict]:
+    def list_deployments(self, limit: int = 50, include_archive: bool = False) -> List[Dict]:
         """
         List recent deployments.
 
         Args:
             limit: Maximum number of records to return
+            include_archive: Also list archived deployments
 
         Returns:
             List of deployment dictionaries
         """
+        table = 'deployment_history_all' if include_archive else 'deployment_history'
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM deployment_history
+            cursor.execute(f"""
+                SELECT * FROM {table}
                 ORDER BY started_at DESC
                 LIMIT ?
             """, (limit,))
@@ -190,10 +208,78 @@ def main():
     # List deployments
     deploy_parser = subparsers.add_parser('deployments', help='List recent deployments')
     deploy_parser.add_argument('--limit', type=int, default=50, help='Number of records to show')
+    deploy_parser.add_argument('--archive', action='store_true', help='Include archived deployments')
 
     # System statistics
     subparsers.add_parser('stats', help='Show system statistics')
 
+    # Bulk release / retire
+    for name, verb in (('release', 'Release'), ('retire', 'Retire')):
+        bulk_parser = subparsers.add_parser(name, help=f'{verb} hostname pool entries in bulk')
+        bulk_parser.add_argument('hostnames', nargs='*', help='Full hostnames (e.g. KXP2-CORO-001)')
+        bulk_parser.add_argument('--venue', help='Filter by venue code')
+        bulk_parser.add_argument('--product', choices=['KXP2', 'RXP2'], help='Filter by product type')
+        bulk_parser.add_argument('--status', choices=['available', 'assigned', 'retired'], help='Filter by status')
+        bulk_parser.add_argument('--assigned-before', help='Filter by assigned date (YYYY-MM-DD)')
+
+    # Streaming export
+    export_parser = subparsers.add_parser('export', help='Export a table as CSV or NDJSON')
+    export_parser.add_argument('dataset', choices=list(EXPORT_DATASETS), help='Data to export')
+    export_parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help='Output format')
+    export_parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+    export_parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    export_parser.add_argument('--venue', help='Filter by venue code')
+    export_parser.add_argument('--product', choices=['KXP2', 'RXP2'], help='Filter by product type')
+    export_parser.add_argument('--status', help='Filter by status')
+    export_parser.add_argument('--since', help='Include rows dated on or after (YYYY-MM-DD)')
+    export_parser.add_argument('--until', help='Include rows dated before (YYYY-MM-DD)')
+
+    # Archive old deployment history
+    archive_parser = subparsers.add_parser('archive', help='Move old finished deployments to the archive table')
+    archive_parser.add_argument('--older-than', type=float, default=DEFAULT_RETENTION_DAYS,
+                                help='Archive deployments started more than this many days ago')
+    archive_parser.add_argument('--batch-rows', type=int, default=ARCHIVE_BATCH_ROWS,
+                                help='Rows moved per transaction')
+    archive_parser.add_argument('--status', action='store_true',
+                                help='Show hot/archived row counts without archiving')
+
+    # Deployment rollup report
+    report_parser = subparsers.add_parser('report', help='Deployment counts and durations per hour or day')
+    report_parser.add_argument('--since', help='First day/hour to include (YYYY-MM-DD[ HH:MM])')
+    report_parser.add_argument('--until', help='Exclude from this day/hour on (YYYY-MM-DD[ HH:MM])')
+    report_parser.add_argument('--granularity', choices=['day', 'hour'], default='day', help='Bucket size')
+    report_parser.add_argument('--by', default='', help=f"Break down by any of: {','.join(ROLLUP_DIMENSIONS)}")
+    report_parser.add_argument('--venue', help='Filter by venue code')
+    report_parser.add_argument('--product', choices=['KXP2', 'RXP2'], help='Filter by product type')
+    report_parser.add_argument('--status', help='Filter by deployment status')
+    report_parser.add_argument('--rebuild', action='store_true', help='Recompute the rollups from history first')
+
+    # Online backup and restore
+    backup_parser = subparsers.add_parser('backup', help='Back up the database while services run')
+    backup_parser.add_argument('--dest', default=DEFAULT_BACKUP_DIR, help='Backup directory')
+    backup_parser.add_argument('--keep', type=int, default=DEFAULT_BACKUP_KEEP,
+                               help='Scheduled backups kept after this one (0 keeps all)')
+    backup_parser.add_argument('--no-compress', action='store_true', help='Write an uncompressed .db file')
+    backup_parser.add_argument('--list', action='store_true', help='List backups instead of taking one')
+    backup_parser.add_argument('--verify', metavar='FILE', help='Check a backup file instead of taking one')
+
+    restore_parser = subparsers.add_parser('restore', help='Replace the database with a backup (stop services first)')
+    restore_parser.add_argument('backup_file', help='Backup file (.db or .db.gz)')
+    restore_parser.add_argument('--dest', default=DEFAULT_BACKUP_DIR, help='Where the pre-restore backup goes')
+    restore_parser.add_argument('--no-safety-backup', action='store_true',
+                                help='Do not back up the current database first')
+    restore_parser.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+
+    # Query profile of the running services
+    queries_parser = subparsers.add_parser('queries', help='Most expensive queries recorded by the services')
+    queries_parser.add_argument('--top', type=int, default=20, help='Number of statements to show')
+    queries_parser.add_argument('--order', choices=ORDER_KEYS, default='total_ms', help='Rank statements by')
+    queries_parser.add_argument('--dir', default=DEFAULT_PROFILE_DIR, help='Directory of query profile snapshots')
+    queries_parser.add_argument('--plans', action='store_true', help='Print the query plan of each statement')
+    queries_parser.add_argument('--slow', action='store_true', help='List recent slow statements instead')
+    queries_parser.add_argument('--check', action='store_true',
+                                help='List statements that scan a large table and suggest indexes (exit 1 if any)')
+
     args = parser.parse_args()
 
     if not args.command:
@@ -240,7 +326,7 @@ def main():
                 print("No hostname pool entries found.")
 
         elif args.command == 'deployments':
-            deployments = admin.list_deployments(limit=args.limit)
+            deployments = admin.list_deployments(limit=args.limit, include_archive=args.archive)
             if deployments:
                 display_data = [
                     {
@@ -272,6 +358,156 @@ def main():
             print(f"  Successful: {stats['deployments']['successful']}")
             print(f"  Failed:     {stats['deployments']['failed']}")
 
+        elif args.command in ('release', 'retire'):
+            manager = HostnameManager(args.db_path)
+            bulk = manager.bulk_release_hostnames if args.command == 'release' else manager.bulk_retire_hostnames
+            count = bulk(
+                hostnames=args.hostnames,
+                venue_code=args.venue,
+                product_type=args.product,
+                status=args.status,
+                assigned_before=args.assigned_before
+            )
+            print(f"{args.command.capitalize()}d {count} hostname pool entries.")
+
+        elif args.command == 'archive':
+            if not args.status:
+                count = archive_history(args.db_path, args.older_than, args.batch_rows)
+                print(f"Archived {count} deployments.")
+            status = archive_status(args.db_path, args.older_than)
+            print(f"\nHot:      {status['hot_rows']} deployments (oldest {status['oldest_hot'] or '-'})")
+            print(f"Archived: {status['archived_rows']} deployments (oldest {status['oldest_archived'] or '-'})")
+            print(f"Due:      {status['due_rows']} finished deployments older than {args.older_than:g} days")
+
+        elif args.command == 'report':
+            if args.rebuild:
+                rows = rebuild_rollups(args.db_path)
+                print(f"Rebuilt deployment rollups ({rows} hourly rows).")
+            report = rollup_report(
+                admin._get_connection(),
+                since=args.since,
+                until=args.until,
+                granularity=args.granularity,
+                group_by=[name.strip() for name in args.by.split(',') if name.strip()],
+                venue_code=args.venue.upper() if args.venue else None,
+                product_type=args.product,
+                status=args.status
+            )
+            if report:
+                print(f"\nDeployments per {args.granularity}:")
+                print(tabulate(report, headers='keys', tablefmt='grid'))
+            else:
+                print("No deployments in range.")
+
+        elif args.command == 'backup':
+            if args.list:
+                backups = list_backups(args.dest)
+                if backups:
+                    print(f"\nBackups in {args.dest}:")
+                    print(tabulate(
+                        [{'name': b['name'], 'size_bytes': b['size_bytes'], 'created': b['created']} for b in backups],
+                        headers='keys',
+                        tablefmt='grid'
+                    ))
+                else:
+                    print("No backups found.")
+            elif args.verify:
+                if not verify_backup(args.verify):
+                    print(f"Backup {args.verify} failed verification.", file=sys.stderr)
+                    sys.exit(1)
+                print(f"Backup {args.verify} is intact and has the current schema.")
+            else:
+                result = backup_database(args.db_path, args.dest, compress=not args.no_compress)
+                print(f"Backed up to {result['path']} ({result['size_bytes']} bytes, "
+                      f"{result['database_bytes']} uncompressed) in {result['seconds']}s.")
+                if args.keep:
+                    removed = prune_backups(args.dest, args.keep)
+                    if removed:
+                        print(f"Pruned {len(removed)} old backups.")
+
+        elif args.command == 'restore':
+            if not args.yes:
+                print(f"This replaces {args.db_path} with {args.backup_file}.")
+                print("Stop the rpi-deployment and rpi-web services first.")
+                if input("Continue? [y/N] ").strip().lower() != 'y':
+                    print("Restore cancelled.")
+                    sys.exit(1)
+            result = restore_backup(args.backup_file, args.db_path, args.dest,
+                                    safety_backup=not args.no_safety_backup)
+            if result['safety_backup']:
+                print(f"Previous database saved to {result['safety_backup']}.")
+            print(f"Restored {args.db_path} from {result['restored_from']}.")
+
+        elif args.command == 'queries':
+            snapshots = load_profiles(args.dir)
+            if not snapshots:
+                print(f"No query profiles in {args.dir} (services write them every minute).")
+            elif args.slow:
+                slow = recent_slow(snapshots, args.top)
+                if slow:
+                    print("\nRecent slow statements:")
+                    print(tabulate(slow, headers='keys', tablefmt='grid', maxcolwidths=[None, None, None, None, 80]))
+                else:
+                    print("No slow statements recorded.")
+            elif args.check:
+                problems = find_full_scans(snapshots, args.db_path)
+                if not problems:
+                    print("No statement scans a large table.")
+                else:
+                    print(f"\nStatements scanning a large table ({len(problems)}):")
+                    for n, problem in enumerate(problems, 1):
+                        print(f"\n{n}. [{problem['component']}, {problem['calls']} calls] {problem['statement']}")
+                        for line in problem['plan']:
+                            print(f"   {line}")
+                        print(f"   Suggested: {problem['suggestion'] or '(no filter on ' + problem['table'] + ')'}")
+                    sys.exit(1)
+            else:
+                for snapshot in snapshots:
+                    print(f"{snapshot['component']}: since {snapshot['since'][:19]}, updated {snapshot['updated']}")
+                statements = top_statements(snapshots, args.top, args.order)
+                print(f"\nTop {len(statements)} statements by {args.order}:")
+                print(tabulate(
+                    [
+                        {
+                            'Service': row['component'],
+                            'Statement': row['statement'],
+                            'Calls': row['calls'],
+                            'Total ms': row['total_ms'],
+                            'Mean ms': row['mean_ms'],
+                            'p95 ms': row['p95_ms'],
+                            'Max ms': row['max_ms'],
+                            'Rows': row['rows'],
+                            'Full scan': ', '.join(row['full_scans']) or '-'
+                        }
+                        for row in statements
+                    ],
+                    headers='keys',
+                    tablefmt='grid',
+                    maxcolwidths=[None, 60]
+                ))
+                if args.plans:
+                    for n, row in enumerate(statements, 1):
+                        print(f"\n{n}. {row['statement']}")
+                        for line in row['plan'] or ['(no plan captured)']:
+                            print(f"   {line}")
+
+        elif args.command == 'export':
+            chunks = stream_export(
+                args.db_path, args.dataset, args.format, args.gzip,
+                venue_code=args.venue.upper() if args.venue else None,
+                product_type=args.product,
+                status=args.status,
+                since=args.since,
+                until=args.until
+            )
+            output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+            try:
+                for chunk in chunks:
+                    output.write(chunk)
+            finally:
+                if args.output:
+                    output.close()
+
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
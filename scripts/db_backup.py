@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Online Backups for Raspberry Pi Deployment System
+
+Copying deployment.db while the deployment server and web interface write
+it can capture a torn file (and misses whatever is still in the -wal
+file). Backups here use the SQLite online backup API instead:
+
+- The copy reads one snapshot of the database: a read transaction is held
+  on the source for the whole backup. With WAL, writers carry on
+  committing to the WAL meanwhile, and the backup never restarts (without
+  the snapshot, any commit by another connection restarts the copy, and a
+  busy server can keep it from ever finishing)
+- Pages are copied in steps of `step_pages` with a short pause between
+  steps, so the copy does not saturate the disk under /api/config
+- The copy is checked (PRAGMA quick_check and verify_schema) before it is
+  kept, then gzip-compressed into the backup directory as
+  deployment-YYYYMMDD-HHMMSS.db.gz; a backup file only appears once
+  complete
+- Old backups are pruned to the newest `keep`; labelled backups (e.g. the
+  pre-restore safety copy) are kept until removed by hand
+
+Restoring (db_admin.py restore) checks the backup, takes a safety backup of
+the current database, replaces the file and applies any schema migrations
+newer than the backup. Stop the deployment server and web interface first:
+they keep the old file open.
+
+Scheduled backups run inside the web interface (BackupScheduler) or from
+cron via db_admin.
+
+Usage:
+    python3 db_admin.py backup [--dest DIR] [--keep N] [--no-compress]
+    python3 db_admin.py backup --list | --verify FILE
+    python3 db_admin.py restore FILE [--yes]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import gzip
+import time
+import shutil
+import logging
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from db_access import connect, close_connections
+from database_setup import initialize_database, verify_schema
+
+logger = logging.getLogger(__name__)
+
+# Default backup directory
+DEFAULT_BACKUP_DIR = "/opt/rpi-deployment/database/backups"
+
+# Pages copied per backup step (4 MiB with 4 KiB pages)
+BACKUP_STEP_PAGES = 1024
+
+# Pause between backup steps, leaving disk bandwidth to the services (seconds)
+BACKUP_STEP_PAUSE = 0.01
+
+# gzip level for backups (9 is several times slower for a few percent)
+BACKUP_COMPRESS_LEVEL = 6
+
+# Seconds between scheduled backups
+DEFAULT_BACKUP_INTERVAL = 86400.0
+
+# Scheduled backups kept
+DEFAULT_BACKUP_KEEP = 7
+
+BACKUP_PREFIX = "deployment-"
+BACKUP_SUFFIXES = (".db.gz", ".db")
+
+
+def copy_database(
+    db_path: str,
+    dest_path: str,
+    step_pages: int = BACKUP_STEP_PAGES,
+    pause: float = BACKUP_STEP_PAUSE,
+    stop: Optional[threading.Event] = None
+) -> int:
+    """
+    Copy a consistent snapshot of a live database with the online backup API.
+
+    Args:
+        db_path: Database to copy
+        dest_path: New database file to write
+        step_pages: Pages copied per step
+        pause: Seconds to sleep between steps
+        stop: Event that abandons the copy when set
+
+    Returns:
+        Number of pages copied
+
+    Raises:
+        RuntimeError: If stop was set before the copy finished
+    """
+    pages = [0]
+
+    def progress(status, remaining, total):
+        pages[0] = total
+        if stop is not None and stop.is_set():
+            # Propagates out of Connection.backup(), abandoning the copy
+            raise RuntimeError("Backup cancelled")
+        if remaining and pause:
+            time.sleep(pause)
+
+    source = connect(db_path, isolation_level=None)
+    dest = sqlite3.connect(dest_path)
+    try:
+        # One snapshot for every step: commits by other connections go to
+        # the WAL and neither wait for the copy nor restart it
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        try:
+            source.backup(dest, pages=step_pages, progress=progress)
+        finally:
+            source.execute("COMMIT")
+        # A backup file stands alone, without a -wal file next to it
+        dest.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        dest.close()
+        source.close()
+    return pages[0]
+
+
+def check_database(db_path: str, require_schema: bool = True) -> None:
+    """
+    Check a database file is intact (and has the current schema).
+
+    Args:
+        db_path: Database file to check
+        require_schema: Also require verify_schema to pass
+
+    Raises:
+        RuntimeError: If the file is damaged or the schema check fails
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        result = [row[0] for row in conn.execute("PRAGMA quick_check")]
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    except sqlite3.DatabaseError as e:
+        raise RuntimeError(f"{db_path} is not a readable database: {e}")
+    finally:
+        conn.close()
+
+    if result != ['ok']:
+        raise RuntimeError(f"{db_path} failed integrity check: {'; '.join(result[:5])}")
+    if 'deployment_history' not in tables:
+        raise RuntimeError(f"{db_path} is not a deployment database")
+    if require_schema:
+        try:
+            if not verify_schema(db_path):
+                raise RuntimeError(f"{db_path} failed schema verification")
+        finally:
+            # verify_schema opens the file in WAL mode; keep it standalone
+            conn = sqlite3.connect(db_path)
+            conn.execute("PRAGMA journal_mode = DELETE")
+            conn.close()
+
+
+def _extract(backup_path: str, dest_path: str) -> None:
+    """Copy a backup to dest_path, decompressing it if gzipped."""
+    opener = gzip.open if backup_path.endswith('.gz') else open
+    with opener(backup_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def backup_database(
+    db_path: str,
+    backup_dir: str = DEFAULT_BACKUP_DIR,
+    compress: bool = True,
+    verify: bool = True,
+    label: Optional[str] = None,
+    step_pages: int = BACKUP_STEP_PAGES,
+    pause: float = BACKUP_STEP_PAUSE,
+    stop: Optional[threading.Event] = None
+) -> Dict[str, Any]:
+    """
+    Take a backup of a live database.
+
+    Args:
+        db_path: Database to back up
+        backup_dir: Directory for backup files (created if missing)
+        compress: gzip the backup
+        verify: Check integrity and schema before keeping the backup
+        label: Optional name suffix (labelled backups are never pruned)
+        step_pages: Pages copied per step
+        pause: Seconds to sleep between steps
+        stop: Event that abandons the backup when set
+
+    Returns:
+        dict: path, size_bytes, database_bytes, pages, seconds
+
+    Raises:
+        RuntimeError: If the copy is cancelled or fails verification
+        ValueError: If the database does not exist
+    """
+    if not os.path.exists(db_path):
+        raise ValueError(f"Database not found: {db_path}")
+    os.makedirs(backup_dir, exist_ok=True)
+
+    started = time.monotonic()
+    name = f"{BACKUP_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    if label:
+        name += f"-{label}"
+    suffix = BACKUP_SUFFIXES[0] if compress else BACKUP_SUFFIXES[1]
+    path = os.path.join(backup_dir, name + suffix)
+    n = 1
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(backup_dir, f"{name}.{n}{suffix}")
+
+    # Work on temporary files in the backup directory; the final name only
+    # appears once the backup is complete and checked
+    fd, snapshot = tempfile.mkstemp(prefix='.snapshot-', suffix='.db', dir=backup_dir)
+    os.close(fd)
+    try:
+        pages = copy_database(db_path, snapshot, step_pages, pause, stop)
+        if verify:
+            check_database(snapshot)
+        database_bytes = os.path.getsize(snapshot)
+
+        if compress:
+            fd, packed = tempfile.mkstemp(prefix='.snapshot-', suffix='.gz', dir=backup_dir)
+            os.close(fd)
+            try:
+                with open(snapshot, 'rb') as src, gzip.open(packed, 'wb', compresslevel=BACKUP_COMPRESS_LEVEL) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.replace(packed, path)
+            except BaseException:
+                os.unlink(packed)
+                raise
+        else:
+            os.replace(snapshot, path)
+    finally:
+        if os.path.exists(snapshot):
+            os.unlink(snapshot)
+
+    result = {
+        'path': path,
+        'size_bytes': os.path.getsize(path),
+        'database_bytes': database_bytes,
+        'pages': pages,
+        'seconds': round(time.monotonic() - started, 2),
+    }
+    logger.info(f"Backed up {db_path} to {path} ({result['size_bytes']} bytes) in {result['seconds']}s")
+    return result
+
+
+def list_backups(backup_dir: str = DEFAULT_BACKUP_DIR) -> List[Dict[str, Any]]:
+    """
+    List backup files, newest first.
+
+    Args:
+        backup_dir: Backup directory
+
+    Returns:
+        list: dicts with name, path, size_bytes, created (ISO time), labelled
+    """
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        if not name.startswith(BACKUP_PREFIX) or not name.endswith(BACKUP_SUFFIXES):
+            continue
+        path = os.path.join(backup_dir, name)
+        stat = os.stat(path)
+        stem = name[len(BACKUP_PREFIX):].split('.')[0]
+        backups.append({
+            'name': name,
+            'path': path,
+            'size_bytes': stat.st_size,
+            'created': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds'),
+            'labelled': stem.count('-') > 1,
+            '_mtime': stat.st_mtime,
+        })
+    backups.sort(key=lambda b: (b['_mtime'], b['name']), reverse=True)
+    for backup in backups:
+        del backup['_mtime']
+    return backups
+
+
+def prune_backups(backup_dir: str = DEFAULT_BACKUP_DIR, keep: int = DEFAULT_BACKUP_KEEP) -> List[str]:
+    """
+    Delete all but the newest unlabelled backups.
+
+    Args:
+        backup_dir: Backup directory
+        keep: Unlabelled backups to keep
+
+    Returns:
+        list: Paths deleted
+
+    Raises:
+        ValueError: If keep is less than 1
+    """
+    if keep < 1:
+        raise ValueError("keep must be at least 1")
+    removed = []
+    for backup in [b for b in list_backups(backup_dir) if not b['labelled']][keep:]:
+        os.unlink(backup['path'])
+        removed.append(backup['path'])
+    if removed:
+        logger.info(f"Pruned {len(removed)} old backups from {backup_dir}")
+    return removed
+
+
+def verify_backup(backup_path: str) -> bool:
+    """
+    Check a backup file can be restored: decompress it to a temporary file
+    and run the integrity and schema checks.
+
+    Args:
+        backup_path: Backup file (.db or .db.gz)
+
+    Returns:
+        True if the backup is intact and has the current schema, False otherwise
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        restored = os.path.join(temp_dir, 'deployment.db')
+        _extract(backup_path, restored)
+        check_database(restored)
+        return True
+    except (OSError, EOFError, RuntimeError) as e:
+        logger.error(f"Backup {backup_path} failed verification: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def restore_backup(
+    backup_path: str,
+    db_path: str,
+    backup_dir: str = DEFAULT_BACKUP_DIR,
+    safety_backup: bool = True
+) -> Dict[str, Any]:
+    """
+    Replace a database with a backup.
+
+    The services using the database must be stopped first. The backup is
+    checked before anything is touched; the current database is backed up
+    (label 'pre-restore') unless safety_backup is False; schema migrations
+    newer than the backup are applied after the restore.
+
+    Args:
+        backup_path: Backup file (.db or .db.gz)
+        db_path: Database to replace
+        backup_dir: Where the safety backup goes
+        safety_backup: Back up the current database first
+
+    Returns:
+        dict: restored_from, safety_backup (path or None)
+
+    Raises:
+        ValueError: If the backup file does not exist
+        RuntimeError: If the backup is damaged or not a deployment database
+    """
+    if not os.path.exists(backup_path):
+        raise ValueError(f"Backup not found: {backup_path}")
+
+    # Unpack next to the database, so the final replace is a rename
+    staging = f"{db_path}.restore"
+    try:
+        _extract(backup_path, staging)
+        # An older backup may predate schema changes; migrations fix that below
+        check_database(staging, require_schema=False)
+    except (OSError, EOFError) as e:
+        os.unlink(staging)
+        raise RuntimeError(f"Cannot read backup {backup_path}: {e}")
+    except BaseException:
+        os.unlink(staging)
+        raise
+
+    safety = None
+    if safety_backup and os.path.exists(db_path):
+        safety = backup_database(db_path, backup_dir, verify=False, label='pre-restore')['path']
+
+    # Fold this process's WAL into the old file and drop it, so no stale
+    # WAL frames are applied to the restored file
+    close_connections(db_path)
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+    os.replace(staging, db_path)
+
+    if not initialize_database(db_path):
+        raise RuntimeError(f"Restored {backup_path} but could not bring its schema up to date")
+    logger.info(f"Restored {db_path} from {backup_path}")
+    return {'restored_from': backup_path, 'safety_backup': safety}
+
+
+class BackupScheduler:
+    """Take backups on a schedule in a background thread."""
+
+    def __init__(self, db_path: str, backup_dir: str = DEFAULT_BACKUP_DIR,
+                 interval: float = DEFAULT_BACKUP_INTERVAL, keep: int = DEFAULT_BACKUP_KEEP):
+        """
+        Args:
+            db_path: Database to back up
+            backup_dir: Backup directory
+            interval: Seconds between backups
+            keep: Scheduled backups kept
+        """
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.keep = keep
+        self.last_run: Optional[str] = None
+        self.last_backup: Optional[Dict[str, Any]] = None
+
+        self._thread = None
+        self._stop = threading.Event()
+
+    def seconds_until_due(self) -> float:
+        """Seconds until the next backup is due (0 if due now), from the newest backup's age."""
+        newest = [b for b in list_backups(self.backup_dir) if not b['labelled']][:1]
+        if not newest:
+            return 0.0
+        age = time.time() - os.path.getmtime(newest[0]['path'])
+        return max(0.0, self.interval - age)
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Take a backup and prune old ones.
+
+        Returns:
+            The backup_database result
+        """
+        self.last_backup = backup_database(self.db_path, self.backup_dir, stop=self._stop)
+        prune_backups(self.backup_dir, self.keep)
+        self.last_run = datetime.now().isoformat()
+        return self.last_backup
+
+    def start(self) -> None:
+        """Start the background backup thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Backing up {self.db_path} to {self.backup_dir} every {self.interval}s (keeping {self.keep})")
+
+    def stop(self) -> None:
+        """Stop the background backup thread (abandoning a backup in progress)."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Backup loop; a restart does not take an extra backup if the last one is recent."""
+        while not self._stop.is_set():
+            try:
+                if self.seconds_until_due() <= 0:
+                    self.run_once()
+                wait = self.seconds_until_due()
+            except Exception as e:
+                # Retried at the next interval
+                logger.error(f"Scheduled backup failed: {e}")
+                wait = self.interval
+            self._stop.wait(max(wait, 1.0))
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Deployment Rollup Reports for Raspberry Pi Deployment System
+
+deployment_rollups_hourly and deployment_rollups_daily hold, per time
+bucket (hour/day of started_at), venue, product and status, the number of
+deployments and the sum and count of durations of completed ones. Triggers
+on deployment_history and its archive keep them current (see
+migrations.deployment_rollups), so:
+
+- the dashboard's "last 24 hours" counts read at most 25 hourly buckets
+  instead of scanning deployment_history
+- reports over any range read one row per bucket and group, however many
+  deployments the range holds, and include archived deployments
+
+Counts are by the status a deployment has now: a deployment moves from
+'started' through the install phases to its final status.
+
+rebuild_rollups() recomputes both tables from the history, e.g. after
+rows were changed with the triggers absent.
+
+Usage:
+    python3 db_admin.py report [--since DATE] [--until DATE] [--granularity hour|day] [--by venue,status]
+    python3 db_admin.py report --rebuild
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import time
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from db_access import connect
+from date_filters import check_date
+from database_setup import ROLLUP_TABLES, rebuild_deployment_rollups
+
+logger = logging.getLogger(__name__)
+
+# Report grouping name -> rollup column
+ROLLUP_DIMENSIONS = {
+    'venue': 'venue_code',
+    'product': 'product_type',
+    'status': 'deployment_status',
+}
+
+
+def rollup_bucket(value: str, granularity: str) -> str:
+    """
+    Get the bucket containing a date or timestamp.
+
+    Args:
+        value: 'YYYY-MM-DD[ HH:MM[:SS]]'
+        granularity: 'hour' or 'day'
+
+    Returns:
+        Bucket key as stored in the rollup table
+    """
+    if granularity == 'day':
+        return value[:10]
+    return f"{value[:13]}:00:00" if len(value) > 10 else f"{value} 00:00:00"
+
+
+def recent_deployment_totals(conn: sqlite3.Connection, hours: int = 24) -> Tuple[int, int]:
+    """
+    Count deployments started in the last hours, from the hourly rollup.
+
+    The window is rounded down to the start of an hour, so it covers
+    between `hours` and `hours + 1` hours.
+
+    Args:
+        conn: Open database connection
+        hours: Window length
+
+    Returns:
+        tuple: (deployments, deployments with status 'success')
+    """
+    table, _ = ROLLUP_TABLES['hour']
+    return tuple(conn.execute(f"""
+        SELECT COALESCE(SUM(count), 0),
+               COALESCE(SUM(CASE WHEN deployment_status = 'success' THEN count END), 0)
+        FROM {table}
+        WHERE bucket >= strftime('%Y-%m-%d %H:00:00', 'now', ?)
+    """, (f"-{int(hours)} hours",)).fetchone())
+
+
+def rollup_report(
+    conn: sqlite3.Connection,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    granularity: str = 'day',
+    group_by: Sequence[str] = (),
+    venue_code: Optional[str] = None,
+    product_type: Optional[str] = None,
+    status: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Report deployment counts and durations per time bucket.
+
+    Reads a range of the rollup table's primary key; the cost depends on
+    the number of buckets and groups, not on the number of deployments.
+
+    Args:
+        conn: Open database connection
+        since: First bucket to include (the one containing this date)
+        until: Exclude buckets from this date on
+        granularity: 'hour' or 'day'
+        group_by: Any of 'venue', 'product', 'status' to break each bucket down by
+        venue_code: Restrict to one venue
+        product_type: Restrict to one product
+        status: Restrict to one deployment status
+
+    Returns:
+        list: One dict per bucket (and group), oldest first, with 'bucket',
+        the grouped columns, 'deployments', 'completed' (rows with a
+        completion time) and 'avg_duration_seconds' (None if none completed)
+
+    Raises:
+        ValueError: If the granularity, a grouping or a date is invalid
+    """
+    if granularity not in ROLLUP_TABLES:
+        raise ValueError(f"Invalid granularity '{granularity}'. Must be one of: {', '.join(ROLLUP_TABLES)}")
+    for name in group_by:
+        if name not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Invalid grouping '{name}'. Must be any of: {', '.join(ROLLUP_DIMENSIONS)}")
+
+    conditions = []
+    params: List[Any] = []
+    for value, operator in ((since, '>='), (until, '<')):
+        if value:
+            check_date(value)
+            conditions.append(f"bucket {operator} ?")
+            params.append(rollup_bucket(value, granularity) if operator == '>=' else value)
+    for column, value in (('venue_code', venue_code), ('product_type', product_type),
+                          ('deployment_status', status)):
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+
+    columns = ['bucket'] + [ROLLUP_DIMENSIONS[name] for name in group_by]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    table, _ = ROLLUP_TABLES[granularity]
+    rows = conn.execute(f"""
+        SELECT {', '.join(columns)}, SUM(count), SUM(duration_count), SUM(duration_sum)
+        FROM {table}
+        {where}
+        GROUP BY {', '.join(columns)}
+        HAVING SUM(count) != 0
+        ORDER BY {', '.join(columns)}
+    """, params).fetchall()
+
+    report = []
+    for row in rows:
+        entry = dict(zip(columns, row))
+        deployments, completed, duration_sum = row[len(columns):]
+        entry['deployments'] = deployments
+        entry['completed'] = completed
+        entry['avg_duration_seconds'] = round(duration_sum / completed, 1) if completed else None
+        report.append(entry)
+    return report
+
+
+def rebuild_rollups(db_path: str) -> int:
+    """
+    Recompute the rollup tables from deployment history and the archive.
+
+    Runs in one transaction: readers see the old rollups until it commits.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        Number of hourly rollup rows written
+    """
+    started = time.monotonic()
+    conn = connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rebuild_deployment_rollups(conn.cursor())
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        rows = conn.execute(f"SELECT COUNT(*) FROM {ROLLUP_TABLES['hour'][0]}").fetchone()[0]
+    finally:
+        conn.close()
+
+    logger.info(f"Rebuilt deployment rollups ({rows} hourly rows) in {(time.monotonic() - started) * 1000:.0f} ms")
+    return rows
@@ -11,11 +11,15 @@ Key Features:
 - Deployment history tracking in SQLite database
 - Status reporting from clients
 - Batch deployment support
+- Hostname leases released automatically for failed or abandoned installs
+- Live install progress kept in memory and streamed to the web interface
+- Status reports queued and group-committed by one writer thread
 - Health check endpoint
 
 API Endpoints:
 - POST /api/config - Provide deployment configuration with hostname assignment
 - POST /api/status - Receive installation status reports from clients
+- POST /api/progress - Receive lightweight write progress from clients (memory only)
 - GET /images/<filename> - Serve master image files
 - GET /health - Health check endpoint
 
@@ -28,7 +32,8 @@ import sys
 import json
 import hashlib
 import logging
-import sqlite3
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 from flask import Flask, jsonify, send_file, request
@@ -37,6 +42,11 @@ from typing import Optional, Dict, Any
 # Add scripts directory to path
 sys.path.insert(0, '/opt/rpi-deployment/scripts')
 from hostname_manager import HostnameManager
+import change_events
+from install_progress import InstallTracker
+from db_access import get_connection, release_connections
+from write_queue import WriteQueue
+from query_profiler import QueryProfileWriter, profile_path
 
 # Initialize Flask application
 app = Flask('deployment_server')
@@ -46,10 +56,42 @@ DEPLOYMENT_IP = "192.168.151.1"  # Deployment network
 IMAGE_DIR = Path("/opt/rpi-deployment/images")
 LOG_DIR = Path("/opt/rpi-deployment/logs")
 DB_PATH = Path("/opt/rpi-deployment/database/deployment.db")
+HOSTNAME_LEASE_SECONDS = 3600  # Reservation window for an in-flight install
+LEASE_SWEEP_INTERVAL = 60  # Seconds between expired lease sweeps
+PROGRESS_PUSH_INTERVAL = 0.5  # Minimum seconds between progress pushes
+PROGRESS_PRUNE_INTERVAL = 15  # Seconds between finished/stale install prunes
+PROGRESS_EVENT_CHUNK = 100  # Installs per progress event (datagram size)
+STATUS_COMMIT_INTERVAL = 0.05  # Longest a status report waits for its group commit
+
+# The deployment_history record a status report updates: by the
+# deployment_id /api/config returned, or for installers that do not send it
+# the hostname's newest unfinished deployment (idx_deployment_hostname_started).
+# Finished deployments are never reopened.
+STATUS_BY_ID = """
+    id = ? AND hostname = ? AND deployment_status NOT IN ('success', 'failed')
+"""
+STATUS_BY_HOSTNAME = """
+    id = (
+        SELECT id FROM deployment_history
+        WHERE hostname = ? AND deployment_status NOT IN ('success', 'failed')
+        ORDER BY started_at DESC, id DESC
+        LIMIT 1
+    )
+"""
 
 # Initialize hostname manager
 hostname_mgr = HostnameManager(str(DB_PATH))
 
+# In-flight installs (progress never touches the database)
+install_tracker = InstallTracker()
+
+# Status history updates and daily log lines; started in __main__, until
+# then (tests) writes are made by the request thread
+status_writer = WriteQueue(commit_interval=STATUS_COMMIT_INTERVAL)
+
+# Statement latency profile for db_admin.py queries and the web /system page
+query_profile_writer = QueryProfileWriter(profile_path(str(LOG_DIR), 'deployment_server'), 'deployment_server')
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -62,6 +104,12 @@ logging.basicConfig(
 logger = logging.getLogger("DeploymentServer")
 
 
+@app.teardown_appcontext
+def release_db_connections(exception=None):
+    """Return the request thread's database connections to the shared pool."""
+    release_connections()
+
+
 def calculate_checksum(file_path: str) -> str:
     """
     Calculate SHA256 checksum of file.
@@ -89,7 +137,7 @@ def get_active_image(product_type: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary with filename, checksum, size or None if no active image
     """
-    with sqlite3.connect(str(DB_PATH)) as conn:
+    with get_connection(str(DB_PATH)) as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT filename, checksum, size_bytes
@@ -131,7 +179,9 @@ def get_config():
         'image_size': Size in bytes,
         'image_checksum': 'SHA256 checksum',
         'version': 'API version',
-        'timestamp': 'ISO timestamp'
+        'timestamp': 'ISO timestamp',
+        'deployment_id': ID of this deployment's history record, to be sent
+                         back with every status report
     }
 
     Returns:
@@ -144,8 +194,12 @@ def get_config():
         serial_number = data.get('serial_number')
         mac_address = data.get('mac_address')
 
-        # Check for active batch first
-        active_batch = hostname_mgr.get_active_batch()
+        # Check for active batch first (routed by the device's product/venue
+        # so batches for different products or venues can run concurrently)
+        active_batch = hostname_mgr.get_active_batch(
+            venue_code=venue_code,
+            product_type=data.get('product_type')
+        )
         hostname = None
 
         if active_batch:
@@ -154,7 +208,8 @@ def get_config():
                 hostname = hostname_mgr.assign_from_batch(
                     active_batch['id'],
                     mac_address or 'unknown',
-                    serial_number or 'unknown'
+                    serial_number or 'unknown',
+                    lease_seconds=HOSTNAME_LEASE_SECONDS
                 )
                 venue_code = active_batch['venue_code']
                 product_type = active_batch['product_type']
@@ -169,7 +224,8 @@ def get_config():
                 product_type,
                 venue_code,
                 mac_address,
-                serial_number
+                serial_number,
+                lease_seconds=HOSTNAME_LEASE_SECONDS
             )
 
         # Fallback hostname if assignment failed
@@ -207,7 +263,7 @@ def get_config():
         logger.info(f"Config requested from {request.remote_addr} - Assigned: {hostname}")
 
         # Record deployment start
-        with sqlite3.connect(str(DB_PATH)) as conn:
+        with get_connection(str(DB_PATH)) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO deployment_history
@@ -216,6 +272,23 @@ def get_config():
                 VALUES (?, ?, ?, ?, ?, ?, ?, 'started', CURRENT_TIMESTAMP)
             ''', (hostname, mac_address, serial_number, request.remote_addr,
                   product_type, venue_code, image_info['filename']))
+            config['deployment_id'] = cursor.lastrowid
+
+        # Whatever the tracker holds for this hostname is a previous install
+        install_tracker.reset(hostname)
+
+        # Tell the web interface (no-op when it is not listening)
+        change_events.publish(
+            'deployment',
+            hostname=hostname,
+            status='started',
+            mac_address=mac_address,
+            product_type=product_type,
+            venue_code=venue_code,
+            timestamp=config['timestamp']
+        )
+        if active_batch:
+            change_events.publish('batch', batch_id=active_batch['id'])
 
         return jsonify(config)
 
@@ -233,6 +306,7 @@ def receive_status():
     {
         'status': 'starting' | 'downloading' | 'verifying' | 'customizing' | 'success' | 'failed',
         'hostname': 'Assigned hostname',
+        'deployment_id': 'deployment_id from /api/config (optional)',
         'serial': 'Pi serial number',
         'mac_address': 'MAC address',
         'message': 'Optional status message',
@@ -246,52 +320,89 @@ def receive_status():
         'hostname': 'Hostname'
     }
 
+    Installers that send the deployment_id update that history record by
+    primary key; without one, the hostname's newest unfinished deployment
+    is updated.
+
     Returns:
-        JSON acknowledgment or error (500 on error)
+        JSON acknowledgment or error (400 on invalid deployment_id, 500 on error)
     """
     try:
         data = request.json or {}
         client_ip = request.remote_addr
         status = data.get('status')
         hostname = data.get('hostname', 'unknown')
+        deployment_id = data.get('deployment_id')
         serial = data.get('serial', 'unknown')
         mac_address = data.get('mac_address')
         error_message = data.get('error_message')
 
+        if deployment_id is not None:
+            try:
+                deployment_id = int(deployment_id)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'deployment_id must be an integer'}), 400
+
         logger.info(f"Status from {client_ip} ({hostname}): {status}")
 
-        # Update deployment history
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            cursor = conn.cursor()
+        # Only phase transitions reach the database; a repeated report of
+        # the same deployment's current phase just refreshes the in-memory entry
+        if not status or install_tracker.is_transition(hostname, status, deployment_id):
+            # Settle the hostname lease: confirm on success, return to the pool
+            # on failure, otherwise keep it alive while the install progresses
+            lease = []
+            if status:
+                action = {'success': 'confirm', 'failed': 'cancel'}.get(status, 'extend')
+                lease = hostname_mgr.lease_statements(hostname, action, HOSTNAME_LEASE_SECONDS)
+
+            if deployment_id is not None:
+                # The hostname check keeps a stale or mistyped ID from
+                # touching another device's record
+                target, params = STATUS_BY_ID, (deployment_id, hostname)
+            else:
+                target, params = STATUS_BY_HOSTNAME, (hostname,)
 
             if status in ['success', 'failed']:
                 # Update deployment completion
-                cursor.execute('''
+                sql = f'''
                     UPDATE deployment_history
                     SET deployment_status = ?,
                         completed_at = CURRENT_TIMESTAMP,
                         error_message = ?
-                    WHERE hostname = ?
-                    AND deployment_status != 'success'
-                    AND deployment_status != 'failed'
-                    ORDER BY started_at DESC
-                    LIMIT 1
-                ''', (status, error_message, hostname))
+                    WHERE {target}
+                '''
+                params = (status, error_message) + params
             else:
                 # Update deployment progress
-                cursor.execute('''
+                sql = f'''
                     UPDATE deployment_history
                     SET deployment_status = ?
-                    WHERE hostname = ?
-                    AND deployment_status NOT IN ('success', 'failed')
-                    ORDER BY started_at DESC
-                    LIMIT 1
-                ''', (status, hostname))
+                    WHERE {target}
+                '''
+                params = (status,) + params
+
+            # Settle the lease and update deployment history in the next group
+            # commit, in one transaction so neither survives a crash without
+            # the other; the web interface is told once the update is visible
+            event = dict(
+                hostname=hostname,
+                status=status,
+                mac_address=mac_address,
+                error_message=error_message,
+                timestamp=datetime.now().isoformat()
+            )
+            status_writer.execute_all(str(DB_PATH), [*lease, (sql, params)],
+                                      on_commit=lambda: change_events.publish('deployment', **event))
+
+        # Recorded once queued (when the writer is not running, once
+        # persisted, so a report that failed to save is retried)
+        if status:
+            install_tracker.set_phase(hostname, status, deployment_id=deployment_id,
+                                      error_message=error_message)
 
-        # Log to daily file
+        # Log to daily file (appended with the group commit)
         status_log = LOG_DIR / f"deployment_{datetime.now().strftime('%Y%m%d')}.log"
-        with open(status_log, 'a') as f:
-            f.write(f"{datetime.now().isoformat()},{client_ip},{hostname},{serial},{status}\n")
+        status_writer.append_log(status_log, f"{datetime.now().isoformat()},{client_ip},{hostname},{serial},{status}\n")
 
         return jsonify({'received': True, 'hostname': hostname})
 
@@ -300,6 +411,140 @@ def receive_status():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/progress', methods=['POST'])
+def receive_progress():
+    """
+    Receive image write progress from clients.
+
+    Called every few seconds while an image is written, so it only updates
+    the in-memory install tracker; nothing is written to the database.
+
+    Request JSON:
+    {
+        'hostname': 'Assigned hostname',
+        'bytes_written': Bytes written to the SD card so far,
+        'total_bytes': Total image size in bytes
+    }
+
+    Response JSON:
+    {
+        'received': true,
+        'eta_seconds': Estimated seconds remaining (or null)
+    }
+
+    Returns:
+        JSON acknowledgment or error (400 on invalid request)
+    """
+    data = request.get_json(silent=True) or {}
+    hostname = data.get('hostname')
+
+    try:
+        bytes_written = int(data.get('bytes_written'))
+        total_bytes = int(data['total_bytes']) if data.get('total_bytes') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'bytes_written must be an integer'}), 400
+
+    if not hostname or bytes_written < 0:
+        return jsonify({'error': 'hostname and bytes_written are required'}), 400
+
+    entry = install_tracker.update_progress(hostname, bytes_written, total_bytes)
+    return jsonify({'received': True, 'eta_seconds': entry['eta_seconds']})
+
+
+def publish_install_progress(updated: list, removed: list) -> None:
+    """
+    Publish install progress changes to the web interface.
+
+    Large fleets are split across several events so each fits in a datagram.
+
+    Args:
+        updated: Install entries changed since the last publish
+        removed: Hostnames no longer tracked
+    """
+    installs = [
+        {
+            'hostname': entry['hostname'],
+            'phase': entry['phase'],
+            'bytes_written': entry['bytes_written'],
+            'total_bytes': entry['total_bytes'],
+            'throughput': round(entry['throughput']) if entry['throughput'] else None,
+            'eta_seconds': round(entry['eta_seconds']) if entry['eta_seconds'] is not None else None,
+            'error_message': entry.get('error_message'),
+            'updated_at': entry['updated_at']
+        }
+        for entry in updated
+    ]
+
+    for offset in range(0, max(len(installs), 1), PROGRESS_EVENT_CHUNK):
+        change_events.publish(
+            'progress',
+            installs=installs[offset:offset + PROGRESS_EVENT_CHUNK],
+            removed=removed if offset == 0 else []
+        )
+
+
+def start_progress_publisher(interval: float = PROGRESS_PUSH_INTERVAL) -> threading.Thread:
+    """
+    Start background thread that streams install progress to the web interface.
+
+    The thread sleeps until the tracker changes, sends only the entries that
+    changed, then waits `interval` seconds, so any number of installers
+    posting progress results in at most one push per interval.
+
+    Args:
+        interval: Minimum seconds between pushes
+
+    Returns:
+        The started daemon thread
+    """
+    def publisher():
+        """Publish progress deltas forever."""
+        version = 0
+        last_prune = time.monotonic()
+        while True:
+            try:
+                install_tracker.wait_for_change(version, timeout=PROGRESS_PRUNE_INTERVAL)
+                if time.monotonic() - last_prune >= PROGRESS_PRUNE_INTERVAL:
+                    install_tracker.prune()
+                    last_prune = time.monotonic()
+
+                version, updated, removed = install_tracker.changes_since(version)
+                if updated or removed:
+                    publish_install_progress(updated, removed)
+            except Exception as e:
+                logger.error(f"Error publishing install progress: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=publisher, name='progress-publisher', daemon=True)
+    thread.start()
+    return thread
+
+
+def start_lease_sweeper(interval: int = LEASE_SWEEP_INTERVAL) -> threading.Thread:
+    """
+    Start background thread that returns expired hostname leases to the pool.
+
+    Args:
+        interval: Seconds between sweeps
+
+    Returns:
+        The started daemon thread
+    """
+    def sweeper():
+        """Sweep expired leases forever."""
+        while True:
+            time.sleep(interval)
+            try:
+                if hostname_mgr.sweep_expired_leases():
+                    change_events.publish('pool', reason='lease_expired')
+            except Exception as e:
+                logger.error(f"Error sweeping hostname leases: {e}")
+
+    thread = threading.Thread(target=sweeper, name='lease-sweeper', daemon=True)
+    thread.start()
+    return thread
+
+
 @app.route('/images/<filename>', methods=['GET'])
 def download_image(filename: str):
     """
@@ -338,11 +583,12 @@ def health_check():
     Health check endpoint.
 
     Returns:
-        JSON with status and timestamp
+        JSON with status, timestamp and write queue counters
     """
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'write_queue': status_writer.stats()
     })
 
 
@@ -352,14 +598,24 @@ if __name__ == '__main__':
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    # Initialize database if needed
-    if not DB_PATH.exists():
-        from database_setup import initialize_database
-        initialize_database(str(DB_PATH))
-        logger.info("Database initialized")
+    # Initialize database, or bring an existing one up to the current schema
+    # (applies any schema migrations not yet recorded in schema_version)
+    from database_setup import initialize_database
+    initialize_database(str(DB_PATH))
+    logger.info("Database initialized")
+
+    start_lease_sweeper()
+    start_progress_publisher()
+    status_writer.start()
+    query_profile_writer.start()
 
     logger.info("Starting deployment server on deployment network")
     logger.info(f"Deployment API: http://{DEPLOYMENT_IP}:5001")
 
-    # Start server (on deployment network port)
-    app.run(host='0.0.0.0', port=5001, debug=False)
+    # Start server (on deployment network port); commit queued status
+    # reports before exiting
+    try:
+        app.run(host='0.0.0.0', port=5001, debug=False)
+    finally:
+        status_writer.stop()
+        query_profile_writer.stop()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Deployment History Archival for Raspberry Pi Deployment System
+
+deployment_history only ever grows. Every status update, history page and
+dashboard query works against it, so finished deployments older than the
+retention period are moved to deployment_history_archive (same database
+file), keeping the hot table, and the latency of everything that touches
+it, bounded by the deployment rate rather than by the age of the system.
+
+- Only finished deployments (success / failed / completed) are archived;
+  a deployment still in progress always stays in the hot table, so the
+  deployment server's status UPDATE never has to look in the archive
+- Rows move in small batches, each its own short transaction (copy, then
+  delete by id), so the deployment server waits at most one batch for the
+  write lock (busy_timeout) and readers are never blocked (WAL)
+- Ids are preserved, so (started_at, id) pagination cursors and links keep
+  working across the hot table and the archive
+- Reads that want old deployments ask for them: get_deployment_page /
+  count_deployments(include_archive=True) in the web interface, `db_admin
+  deployments --archive`, or the deployment_history_all view
+- Full-text search (deployment_search) covers the hot table only
+
+Archival runs on a schedule inside the web interface (HistoryArchiver) or
+from cron via db_admin.
+
+Usage:
+    python3 db_admin.py archive [--older-than DAYS] [--batch-rows N] [--status]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from db_access import connect
+
+logger = logging.getLogger(__name__)
+
+# Finished deployments older than this many days are archived
+DEFAULT_RETENTION_DAYS = 90
+
+# Rows moved per transaction
+ARCHIVE_BATCH_ROWS = 500
+
+# Pause between batches, letting waiting writers in (seconds)
+ARCHIVE_BATCH_PAUSE = 0.05
+
+# Seconds between scheduled archival runs
+DEFAULT_ARCHIVE_INTERVAL = 3600.0
+
+# Deployment statuses that will not change again
+FINISHED_STATUSES = ('success', 'failed', 'completed')
+
+ARCHIVE_COLUMNS = """
+    id, hostname, mac_address, serial_number, ip_address, product_type, venue_code,
+    image_version, deployment_status, started_at, completed_at, error_message
+"""
+
+
+def archive_cutoff(older_than_days: float) -> str:
+    """
+    Get the started_at timestamp before which finished rows are archived.
+
+    Args:
+        older_than_days: Retention period in days
+
+    Returns:
+        Timestamp 'YYYY-MM-DD HH:MM:SS' (UTC, like CURRENT_TIMESTAMP)
+
+    Raises:
+        ValueError: If the retention period is negative
+    """
+    if older_than_days < 0:
+        raise ValueError(f"Retention period must not be negative: {older_than_days}")
+    return (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def archive_batch(conn: sqlite3.Connection, cutoff: str, batch_rows: int = ARCHIVE_BATCH_ROWS) -> int:
+    """
+    Move one batch of finished deployments started before a cutoff.
+
+    The copy and the delete happen in one transaction, so a row is always
+    in exactly one of the two tables. The hot table's counter and search
+    triggers remove the row there; the archive's counter trigger adds it.
+
+    Args:
+        conn: Connection in autocommit mode (isolation_level=None)
+        cutoff: started_at timestamp (see archive_cutoff)
+        batch_rows: Maximum rows to move
+
+    Returns:
+        Number of rows moved (0 when nothing is left to archive)
+    """
+    statuses = ', '.join('?' for _ in FINISHED_STATUSES)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Seeks idx_deployment_status_started once per status
+        ids = [row[0] for row in conn.execute(f"""
+            SELECT id FROM deployment_history
+            WHERE deployment_status IN ({statuses}) AND started_at < ?
+            LIMIT ?
+        """, FINISHED_STATUSES + (cutoff, batch_rows))]
+
+        if ids:
+            placeholders = ', '.join('?' for _ in ids)
+            conn.execute(f"""
+                INSERT INTO deployment_history_archive ({ARCHIVE_COLUMNS})
+                SELECT {ARCHIVE_COLUMNS} FROM deployment_history WHERE id IN ({placeholders})
+            """, ids)
+            conn.execute(f"DELETE FROM deployment_history WHERE id IN ({placeholders})", ids)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return len(ids)
+
+
+def archive_history(db_path: str, older_than_days: float = DEFAULT_RETENTION_DAYS,
+                    batch_rows: int = ARCHIVE_BATCH_ROWS, max_batches: Optional[int] = None,
+                    pause: float = ARCHIVE_BATCH_PAUSE, stop: Optional[threading.Event] = None) -> int:
+    """
+    Archive finished deployments older than the retention period.
+
+    Args:
+        db_path: Path to SQLite database file
+        older_than_days: Retention period of the hot table in days
+        batch_rows: Rows moved per transaction
+        max_batches: Stop after this many batches (default: until done)
+        pause: Seconds to sleep between batches
+        stop: Event that ends the run after the current batch
+
+    Returns:
+        Number of rows archived
+
+    Raises:
+        ValueError: If the retention period or batch size is invalid
+    """
+    if batch_rows < 1:
+        raise ValueError(f"Batch size must be positive: {batch_rows}")
+    cutoff = archive_cutoff(older_than_days)
+
+    started = time.monotonic()
+    moved = 0
+    batches = 0
+    conn = connect(db_path, isolation_level=None)
+    try:
+        while max_batches is None or batches < max_batches:
+            count = archive_batch(conn, cutoff, batch_rows)
+            moved += count
+            batches += 1
+            if count < batch_rows or (stop is not None and stop.is_set()):
+                break
+            if pause:
+                time.sleep(pause)
+    finally:
+        conn.close()
+
+    if moved:
+        logger.info(f"Archived {moved} deployments started before {cutoff} "
+                    f"in {batches} batches ({(time.monotonic() - started) * 1000:.0f} ms)")
+    return moved
+
+
+def archive_status(db_path: str, older_than_days: float = DEFAULT_RETENTION_DAYS) -> Dict[str, Any]:
+    """
+    Get hot and archived row counts.
+
+    Args:
+        db_path: Path to SQLite database file
+        older_than_days: Retention period used to count rows due for archival
+
+    Returns:
+        dict: hot_rows, archived_rows, due_rows (finished rows older than
+        the retention period), oldest_hot and oldest_archived (started_at)
+    """
+    statuses = ', '.join('?' for _ in FINISHED_STATUSES)
+    conn = connect(db_path)
+    try:
+        return {
+            'hot_rows': conn.execute(
+                "SELECT COALESCE(SUM(count), 0) FROM deployment_history_counts"
+            ).fetchone()[0],
+            'archived_rows': conn.execute(
+                "SELECT COALESCE(SUM(count), 0) FROM deployment_archive_counts"
+            ).fetchone()[0],
+            'due_rows': conn.execute(
+                f"SELECT COUNT(*) FROM deployment_history "
+                f"WHERE deployment_status IN ({statuses}) AND started_at < ?",
+                FINISHED_STATUSES + (archive_cutoff(older_than_days),)
+            ).fetchone()[0],
+            'oldest_hot': conn.execute("SELECT MIN(started_at) FROM deployment_history").fetchone()[0],
+            'oldest_archived': conn.execute(
+                "SELECT MIN(started_at) FROM deployment_history_archive"
+            ).fetchone()[0]
+        }
+    finally:
+        conn.close()
+
+
+class HistoryArchiver:
+    """Archive old deployment history on a schedule in a background thread."""
+
+    def __init__(self, db_path: str, older_than_days: float = DEFAULT_RETENTION_DAYS,
+                 interval: float = DEFAULT_ARCHIVE_INTERVAL, batch_rows: int = ARCHIVE_BATCH_ROWS):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            older_than_days: Retention period of the hot table in days
+            interval: Seconds between archival runs
+            batch_rows: Rows moved per transaction
+        """
+        self.db_path = db_path
+        self.older_than_days = older_than_days
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self.last_run: Optional[str] = None
+        self.last_archived = 0
+
+        self._thread = None
+        self._stop = threading.Event()
+
+    def run_once(self) -> int:
+        """
+        Archive everything currently due.
+
+        Returns:
+            Number of rows archived
+        """
+        self.last_archived = archive_history(self.db_path, self.older_than_days, self.batch_rows,
+                                             stop=self._stop)
+        self.last_run = datetime.now().isoformat()
+        return self.last_archived
+
+    def start(self) -> None:
+        """Start the background archival thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Archiving deployments older than {self.older_than_days} days every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop the background archival thread (after the current batch)."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Archival loop."""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                # Retried at the next interval
+                logger.error(f"Deployment history archival failed: {e}")
+            self._stop.wait(self.interval)
@@ -24,6 +24,10 @@ import re
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
+from batch_scheduler import BatchScheduler
+from date_filters import check_date
+from db_access import get_connection
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +35,68 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Lease settlement, matched on (product_type, venue_code, identifier);
+# only pending leases are touched, never confirmed assignments
+LEASE_SQL = {
+    'confirm': """
+        UPDATE hostname_pool
+        SET lease_expires_at = NULL,
+            lease_batch_id = NULL
+        WHERE product_type = ?
+          AND venue_code = ?
+          AND identifier = ?
+          AND status = 'assigned'
+          AND lease_expires_at IS NOT NULL
+    """,
+    'extend': """
+        UPDATE hostname_pool
+        SET lease_expires_at = datetime('now', ?)
+        WHERE product_type = ?
+          AND venue_code = ?
+          AND identifier = ?
+          AND status = 'assigned'
+          AND lease_expires_at IS NOT NULL
+    """,
+    'cancel': """
+        UPDATE hostname_pool
+        SET status = 'available',
+            mac_address = NULL,
+            serial_number = NULL,
+            assigned_date = NULL,
+            lease_expires_at = NULL,
+            lease_batch_id = NULL
+        WHERE product_type = ?
+          AND venue_code = ?
+          AND identifier = ?
+          AND status = 'assigned'
+          AND lease_expires_at IS NOT NULL
+    """,
+}
+
+# Give the batch slots of pending leases being cancelled, expired, released
+# or retired back to their batches (run before the leases are cleared); a
+# batch completed by those assignments becomes active again, a cancelled one
+# stays cancelled. {leases} selects the hostname_pool rows.
+# Selects one hostname's pending lease for RETURN_BATCH_SLOTS_SQL
+PENDING_LEASE = "product_type = ? AND venue_code = ? AND identifier = ? AND lease_expires_at IS NOT NULL"
+
+RETURN_BATCH_SLOTS_SQL = """
+    UPDATE deployment_batches
+    SET remaining_count = remaining_count + returned.slots,
+        status = CASE status WHEN 'completed' THEN 'active' ELSE status END,
+        completed_at = CASE status WHEN 'completed' THEN NULL ELSE completed_at END
+    FROM (
+        SELECT lease_batch_id AS batch_id, COUNT(*) AS slots
+        FROM hostname_pool
+        WHERE {leases}
+          AND status = 'assigned'
+          AND lease_batch_id IS NOT NULL
+        GROUP BY lease_batch_id
+    ) AS returned
+    WHERE deployment_batches.id = returned.batch_id
+      AND deployment_batches.status IN ('active', 'paused', 'completed')
+"""
+
 
 class HostnameManager:
     """
@@ -47,6 +113,18 @@ class HostnameManager:
     VALID_PRODUCT_TYPES = ['KXP2', 'RXP2']
     VALID_STATUSES = ['available', 'assigned', 'retired']
 
+    # Default reservation window for in-flight installs (seconds)
+    DEFAULT_LEASE_SECONDS = 3600
+
+    # Pool listing order: venue, product, numeric kart number, identifier.
+    # Identifiers without a numeric sort_key (RXP2 serials) sort first within
+    # their product. Must match the idx_hostname_*listing expression indexes.
+    LISTING_KEY = "venue_code, product_type, IFNULL(sort_key, -1), identifier"
+
+    # Pool listing page size limits
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
     def __init__(self, db_path: str = "/opt/rpi-deployment/database/deployment.db"):
         """
         Initialize hostname manager.
@@ -55,18 +133,17 @@ class HostnameManager:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
+        self.batch_scheduler = BatchScheduler()
         logger.info(f"HostnameManager initialized with database: {db_path}")
 
     def _get_connection(self) -> sqlite3.Connection:
         """
-        Get database connection with row factory.
+        Get this thread's shared database connection (see db_access).
 
         Returns:
-            sqlite3.Connection object
+            sqlite3.Connection object with row factory
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return get_connection(self.db_path)
 
     def _validate_venue_code(self, code: str) -> str:
         """
@@ -114,6 +191,30 @@ class HostnameManager:
             )
         return product_type
 
+    def _publish_batch(self, conn: sqlite3.Connection, batch_id: int) -> Dict[str, Any]:
+        """
+        Commit a batch mutation and apply it to the in-memory scheduler.
+
+        Reads the updated row and the batch_queue_state version inside the
+        mutating transaction so the scheduler can tell whether any other
+        process changed batches in the meantime.
+
+        Args:
+            conn: Connection holding the uncommitted batch mutation
+            batch_id: ID of the mutated batch
+
+        Returns:
+            The batch row after the mutation, as a dict
+        """
+        cursor = conn.execute("SELECT * FROM deployment_batches WHERE id = ?", (batch_id,))
+        columns = [col[0] for col in cursor.description]
+        batch = dict(zip(columns, cursor.fetchone()))
+        version = BatchScheduler.read_version(conn)
+        conn.commit()
+
+        self.batch_scheduler.apply(batch, version)
+        return batch
+
     def create_venue(
         self,
         code: str,
@@ -221,17 +322,19 @@ class HostnameManager:
             cursor = conn.cursor()
 
             for number in numbers:
-                # Format with leading zeros (minimum 3 digits)
-                formatted = f"{int(number):03d}"
+                # Format with leading zeros (minimum 3 digits); sort_key keeps
+                # the numeric value so '1000' orders after '999'
+                sort_key = int(number)
+                formatted = f"{sort_key:03d}"
 
                 try:
                     cursor.execute(
                         """
                         INSERT INTO hostname_pool
-                        (product_type, venue_code, identifier, status)
-                        VALUES (?, ?, ?, ?)
+                        (product_type, venue_code, identifier, sort_key, status)
+                        VALUES (?, ?, ?, ?, ?)
                         """,
-                        (product_type, venue_code, formatted, 'available')
+                        (product_type, venue_code, formatted, sort_key, 'available')
                     )
                     imported += 1
 
@@ -251,7 +354,9 @@ class HostnameManager:
         product_type: str,
         venue_code: str,
         mac_address: Optional[str] = None,
-        serial_number: Optional[str] = None
+        serial_number: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+        batch_id: Optional[int] = None
     ) -> Optional[str]:
         """
         Assign a hostname based on product type and venue.
@@ -259,11 +364,19 @@ class HostnameManager:
         KXP2: Assigns next available kart number from pre-loaded pool
         RXP2: Creates new entry using last 8 chars of serial number
 
+        When lease_seconds is given, a KXP2 assignment is a reservation: it
+        returns to the pool unless confirm_hostname() is called before the
+        lease expires (see sweep_expired_leases). RXP2 hostnames are derived
+        from the serial number and never deplete a pool, so they are not leased.
+
         Args:
             product_type: 'KXP2' or 'RXP2'
             venue_code: 4-character venue code
             mac_address: Optional MAC address to record
             serial_number: Optional serial number (required for RXP2)
+            lease_seconds: Optional reservation TTL for KXP2 assignments
+            batch_id: Batch a leased KXP2 assignment is counted against; if
+                the lease is cancelled or expires, the slot is given back
 
         Returns:
             Assigned hostname (e.g., "KXP2-CORO-001") or None if unavailable
@@ -275,7 +388,7 @@ class HostnameManager:
         venue_code = self._validate_venue_code(venue_code)
 
         if product_type == 'KXP2':
-            return self._assign_kxp2_hostname(venue_code, mac_address, serial_number)
+            return self._assign_kxp2_hostname(venue_code, mac_address, serial_number, lease_seconds, batch_id)
         else:  # RXP2
             return self._assign_rxp2_hostname(venue_code, mac_address, serial_number)
 
@@ -283,30 +396,76 @@ class HostnameManager:
         self,
         venue_code: str,
         mac_address: Optional[str],
-        serial_number: Optional[str]
+        serial_number: Optional[str],
+        lease_seconds: Optional[int] = None,
+        batch_id: Optional[int] = None
     ) -> Optional[str]:
         """
         Assign KXP2 hostname from pre-loaded pool.
 
+        If the pool looks exhausted, expired leases are swept first so that
+        names held by failed installs are reused before giving up.
+
         Args:
             venue_code: Venue code
             mac_address: MAC address to record
             serial_number: Serial number to record
+            lease_seconds: Optional reservation TTL (None = permanent assignment)
+            batch_id: Batch the lease is counted against (see assign_hostname)
 
         Returns:
             Assigned hostname or None if pool exhausted
         """
+        hostname = self._take_kxp2_hostname(venue_code, mac_address, serial_number, lease_seconds, batch_id)
+
+        if hostname is None and self.sweep_expired_leases() > 0:
+            hostname = self._take_kxp2_hostname(venue_code, mac_address, serial_number, lease_seconds, batch_id)
+
+        if hostname is None:
+            logger.warning(f"No available KXP2 hostnames for venue {venue_code}")
+            return None
+
+        if lease_seconds is not None:
+            logger.info(f"Reserved KXP2 hostname: {hostname} (lease {lease_seconds}s)")
+        else:
+            logger.info(f"Assigned KXP2 hostname: {hostname}")
+        return hostname
+
+    def _take_kxp2_hostname(
+        self,
+        venue_code: str,
+        mac_address: Optional[str],
+        serial_number: Optional[str],
+        lease_seconds: Optional[int],
+        batch_id: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Mark the next available KXP2 pool entry as assigned.
+
+        Args:
+            venue_code: Venue code
+            mac_address: MAC address to record
+            serial_number: Serial number to record
+            lease_seconds: Optional reservation TTL
+            batch_id: Batch the lease is counted against (ignored without a lease)
+
+        Returns:
+            Hostname or None if no entry is available
+        """
+        lease_modifier = f"+{int(lease_seconds)} seconds" if lease_seconds is not None else None
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
-            # Find next available hostname (order by identifier for sequential assignment)
+            # Find next available hostname in numeric kart order
+            # (seek on idx_hostname_next_available)
             cursor.execute(
                 """
                 SELECT id, identifier FROM hostname_pool
                 WHERE product_type = 'KXP2'
                   AND venue_code = ?
                   AND status = 'available'
-                ORDER BY identifier
+                ORDER BY sort_key
                 LIMIT 1
                 """,
                 (venue_code,)
@@ -315,29 +474,30 @@ class HostnameManager:
             row = cursor.fetchone()
 
             if not row:
-                logger.warning(f"No available KXP2 hostnames for venue {venue_code}")
                 return None
 
             pool_id = row['id']
             identifier = row['identifier']
             hostname = f"KXP2-{venue_code}-{identifier}"
 
-            # Update pool entry
+            # Update pool entry (lease_expires_at stays NULL without a lease)
             cursor.execute(
                 """
                 UPDATE hostname_pool
                 SET status = 'assigned',
                     mac_address = ?,
                     serial_number = ?,
-                    assigned_date = CURRENT_TIMESTAMP
+                    assigned_date = CURRENT_TIMESTAMP,
+                    lease_expires_at = datetime('now', ?),
+                    lease_batch_id = ?
                 WHERE id = ?
                 """,
-                (mac_address, serial_number, pool_id)
+                (mac_address, serial_number, lease_modifier,
+                 batch_id if lease_modifier else None, pool_id)
             )
 
             conn.commit()
 
-        logger.info(f"Assigned KXP2 hostname: {hostname}")
         return hostname
 
     def _assign_rxp2_hostname(
@@ -409,6 +569,7 @@ class HostnameManager:
         Release hostname back to available pool.
 
         Clears MAC address, serial number, and changes status to 'available'.
+        A pending lease taken from a batch gives its slot back to the batch.
 
         Args:
             hostname: Full hostname to release (e.g., "KXP2-CORO-001")
@@ -417,9 +578,8 @@ class HostnameManager:
             True if released, False if hostname not found
         """
         # Parse hostname
-        parts = hostname.split('-')
-        if len(parts) != 3:
-            logger.error(f"Invalid hostname format: {hostname}")
+        parts = self._parse_hostname(hostname)
+        if not parts:
             return False
 
         product_type, venue_code, identifier = parts
@@ -427,13 +587,16 @@ class HostnameManager:
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
+            cursor.execute(RETURN_BATCH_SLOTS_SQL.format(leases=PENDING_LEASE), parts)
             cursor.execute(
                 """
                 UPDATE hostname_pool
                 SET status = 'available',
                     mac_address = NULL,
                     serial_number = NULL,
-                    assigned_date = NULL
+                    assigned_date = NULL,
+                    lease_expires_at = NULL,
+                    lease_batch_id = NULL
                 WHERE product_type = ?
                   AND venue_code = ?
                   AND identifier = ?
@@ -451,6 +614,608 @@ class HostnameManager:
             logger.warning(f"Hostname not found: {hostname}")
             return False
 
+    # Maximum hostnames per row-value IN (...) chunk (3 bound parameters each,
+    # kept under SQLite's historical 999 parameter limit)
+    BULK_CHUNK_SIZE = 300
+
+    def _pool_filter(
+        self,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        assigned_before: Optional[str] = None
+    ) -> tuple:
+        """
+        Build a WHERE clause fragment for bulk pool operations.
+
+        Args:
+            venue_code: Restrict to one venue
+            product_type: Restrict to 'KXP2' or 'RXP2'
+            status: Restrict to one status
+            assigned_before: Restrict to entries assigned before this
+                date/timestamp ('YYYY-MM-DD[ HH:MM[:SS]]')
+
+        Returns:
+            Tuple of (sql fragment starting with ' AND', params list)
+
+        Raises:
+            ValueError: If a filter value is invalid
+        """
+        clauses = ''
+        params = []
+
+        if venue_code:
+            clauses += " AND venue_code = ?"
+            params.append(self._validate_venue_code(venue_code))
+
+        if product_type:
+            clauses += " AND product_type = ?"
+            params.append(self._validate_product_type(product_type))
+
+        if status:
+            if status not in self.VALID_STATUSES:
+                raise ValueError(
+                    f"Invalid status '{status}'. Must be one of: {', '.join(self.VALID_STATUSES)}"
+                )
+            clauses += " AND status = ?"
+            params.append(status)
+
+        if assigned_before:
+            clauses += " AND assigned_date < ?"
+            params.append(check_date(assigned_before, 'assigned_before date'))
+
+        return clauses, params
+
+    def _bulk_update_pool(
+        self,
+        set_clause: str,
+        skip_status: str,
+        hostnames: Optional[List[str]] = None,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        assigned_before: Optional[str] = None
+    ) -> int:
+        """
+        Apply one UPDATE to every pool entry matching the selection.
+
+        Hostname lists are matched with row-value IN (...) chunks; all chunks
+        run in a single transaction. Pending leases in the selection give
+        their batch slots back first (the update must end the lease).
+
+        Args:
+            set_clause: SQL SET clause to apply
+            skip_status: Status already in the target state (not counted)
+            hostnames: Explicit list of full hostnames
+            venue_code, product_type, status, assigned_before: Filters
+
+        Returns:
+            Number of pool entries changed
+
+        Raises:
+            ValueError: If no selection is given, a filter is invalid or a
+                hostname is malformed (nothing is changed)
+        """
+        if not hostnames and not any((venue_code, product_type, status, assigned_before)):
+            raise ValueError("Bulk operations require hostnames or at least one filter")
+
+        clauses, params = self._pool_filter(venue_code, product_type, status, assigned_before)
+        keys = [self._parse_hostname(h) for h in hostnames or []]
+        invalid = [h for h, parts in zip(hostnames or [], keys) if not parts]
+        if invalid:
+            raise ValueError(f"Invalid hostnames: {', '.join(map(str, invalid))}")
+        base_where = f"status != ?{clauses}"
+        base_params = [skip_status] + params
+
+        selections = []
+        if hostnames:
+            for start in range(0, len(keys), self.BULK_CHUNK_SIZE):
+                chunk = keys[start:start + self.BULK_CHUNK_SIZE]
+                placeholders = ', '.join(['(?, ?, ?)'] * len(chunk))
+                selections.append((
+                    f"{base_where} AND (product_type, venue_code, identifier) IN (VALUES {placeholders})",
+                    base_params + [value for key in chunk for value in key]
+                ))
+        else:
+            selections.append((base_where, base_params))
+
+        changed = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+
+            for where, where_params in selections:
+                cursor.execute(
+                    RETURN_BATCH_SLOTS_SQL.format(leases=f"{where} AND lease_expires_at IS NOT NULL"),
+                    where_params
+                )
+                cursor.execute(f"UPDATE hostname_pool SET {set_clause} WHERE {where}", where_params)
+                changed += cursor.rowcount
+
+            conn.commit()
+
+        return changed
+
+    def bulk_release_hostnames(
+        self,
+        hostnames: Optional[List[str]] = None,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        assigned_before: Optional[str] = None
+    ) -> int:
+        """
+        Release many hostnames back to the available pool in one transaction.
+
+        Selects entries by explicit hostname list and/or filters (all given
+        criteria must match). Entries already available are not counted.
+        Pending leases taken from a batch give their slots back.
+
+        Args:
+            hostnames: Full hostnames to release (e.g., ["KXP2-CORO-001"])
+            venue_code: Only entries for this venue
+            product_type: Only 'KXP2' or 'RXP2' entries
+            status: Only entries with this status ('assigned' or 'retired')
+            assigned_before: Only entries assigned before this date
+
+        Returns:
+            Number of hostnames released
+
+        Raises:
+            ValueError: If no selection is given, a filter is invalid or a
+                hostname is malformed (nothing is released)
+        """
+        released = self._bulk_update_pool(
+            """status = 'available',
+               mac_address = NULL,
+               serial_number = NULL,
+               assigned_date = NULL,
+               lease_expires_at = NULL,
+               lease_batch_id = NULL""",
+            'available',
+            hostnames, venue_code, product_type, status, assigned_before
+        )
+        logger.info(f"Bulk released {released} hostnames")
+        return released
+
+    def bulk_retire_hostnames(
+        self,
+        hostnames: Optional[List[str]] = None,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        assigned_before: Optional[str] = None
+    ) -> int:
+        """
+        Retire many hostnames in one transaction.
+
+        Retired entries keep their MAC/serial history but are never assigned
+        again. Selection and batch slots work as in bulk_release_hostnames.
+
+        Args:
+            hostnames: Full hostnames to retire
+            venue_code: Only entries for this venue
+            product_type: Only 'KXP2' or 'RXP2' entries
+            status: Only entries with this status ('available' or 'assigned')
+            assigned_before: Only entries assigned before this date
+
+        Returns:
+            Number of hostnames retired
+
+        Raises:
+            ValueError: If no selection is given, a filter is invalid or a
+                hostname is malformed (nothing is retired)
+        """
+        retired = self._bulk_update_pool(
+            "status = 'retired', lease_expires_at = NULL, lease_batch_id = NULL",
+            'retired',
+            hostnames, venue_code, product_type, status, assigned_before
+        )
+        logger.info(f"Bulk retired {retired} hostnames")
+        return retired
+
+    def _parse_hostname(self, hostname: str, quiet: bool = False) -> Optional[tuple]:
+        """
+        Split a hostname into (product_type, venue_code, identifier).
+
+        Args:
+            hostname: Full hostname (e.g., "KXP2-CORO-001")
+            quiet: Don't log an invalid format (callers that expect non-pool names)
+
+        Returns:
+            Tuple of parts, or None if the format is invalid
+        """
+        parts = hostname.split('-') if hostname else []
+        if len(parts) != 3:
+            if not quiet:
+                logger.error(f"Invalid hostname format: {hostname}")
+            return None
+        return tuple(parts)
+
+    def lease_statements(
+        self,
+        hostname: str,
+        action: str,
+        lease_seconds: Optional[int] = None
+    ) -> List[tuple]:
+        """
+        Build the statements that settle a hostname lease, without running them.
+
+        Lets the deployment server commit lease settlement in the same
+        transaction as the status report that caused it (see write_queue).
+
+        Args:
+            hostname: Full hostname with a pending lease
+            action: 'confirm', 'extend' or 'cancel'
+            lease_seconds: New TTL from now for 'extend' (defaults to DEFAULT_LEASE_SECONDS)
+
+        Returns:
+            List of (sql, params) to execute in order, the hostname_pool
+            update last; empty if the hostname is not a pool hostname
+            (e.g. the 'unknown' fallback), which is not logged
+
+        Raises:
+            ValueError: If action is unknown
+        """
+        if action not in LEASE_SQL:
+            raise ValueError(f"Invalid lease action '{action}'. Must be one of: {', '.join(LEASE_SQL)}")
+
+        parts = self._parse_hostname(hostname, quiet=True)
+        if not parts:
+            return []
+
+        params = parts
+        if action == 'extend':
+            if lease_seconds is None:
+                lease_seconds = self.DEFAULT_LEASE_SECONDS
+            params = (f"+{int(lease_seconds)} seconds",) + parts
+
+        statements = [(LEASE_SQL[action], params)]
+        if action == 'cancel':
+            statements.insert(0, (RETURN_BATCH_SLOTS_SQL.format(leases=PENDING_LEASE), parts))
+        return statements
+
+    def _settle_lease(self, hostname: str, action: str, lease_seconds: Optional[int] = None) -> bool:
+        """
+        Run lease_statements() and commit.
+
+        Returns:
+            True if a pending lease was changed, False otherwise
+        """
+        statements = self.lease_statements(hostname, action, lease_seconds)
+        if not statements:
+            return False
+
+        with self._get_connection() as conn:
+            for sql, params in statements:
+                settled = conn.execute(sql, params).rowcount > 0
+            conn.commit()
+        return settled
+
+    def confirm_hostname(self, hostname: str) -> bool:
+        """
+        Confirm a leased hostname, making the assignment permanent.
+
+        Args:
+            hostname: Full hostname returned by a leased assignment
+
+        Returns:
+            True if a pending lease was confirmed, False otherwise
+        """
+        confirmed = self._settle_lease(hostname, 'confirm')
+        if confirmed:
+            logger.info(f"Confirmed hostname lease: {hostname}")
+        return confirmed
+
+    def extend_lease(self, hostname: str, lease_seconds: Optional[int] = None) -> bool:
+        """
+        Push back the expiry of a pending lease (install still progressing).
+
+        Args:
+            hostname: Full hostname with a pending lease
+            lease_seconds: New TTL from now (defaults to DEFAULT_LEASE_SECONDS)
+
+        Returns:
+            True if a pending lease was extended, False otherwise
+        """
+        return self._settle_lease(hostname, 'extend', lease_seconds)
+
+    def cancel_lease(self, hostname: str) -> bool:
+        """
+        Return a leased hostname to the pool (install failed).
+
+        Confirmed (permanent) assignments are left untouched. A lease taken
+        from a batch gives its slot back to the batch.
+
+        Args:
+            hostname: Full hostname with a pending lease
+
+        Returns:
+            True if the lease was cancelled, False otherwise
+        """
+        cancelled = self._settle_lease(hostname, 'cancel')
+        if cancelled:
+            logger.info(f"Cancelled hostname lease: {hostname}")
+        return cancelled
+
+    def sweep_expired_leases(self) -> int:
+        """
+        Return every hostname whose lease has expired to the pool.
+
+        Leases taken from a batch give their slots back to the batch. Uses
+        the partial idx_hostname_lease index, so the cost depends on the
+        number of open leases, not on the size of the pool or its history.
+
+        Returns:
+            Number of hostnames released
+        """
+        expired = "lease_expires_at IS NOT NULL AND lease_expires_at <= ?"
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # One cutoff for both statements, so they select the same leases
+            now = cursor.execute("SELECT datetime('now')").fetchone()[0]
+            cursor.execute(RETURN_BATCH_SLOTS_SQL.format(leases=expired), (now,))
+            cursor.execute(
+                f"""
+                UPDATE hostname_pool
+                SET status = 'available',
+                    mac_address = NULL,
+                    serial_number = NULL,
+                    assigned_date = NULL,
+                    lease_expires_at = NULL,
+                    lease_batch_id = NULL
+                WHERE {expired}
+                """,
+                (now,)
+            )
+            released = cursor.rowcount
+            conn.commit()
+
+        if released:
+            logger.info(f"Released {released} hostnames with expired leases")
+        return released
+
+    @staticmethod
+    def encode_pool_cursor(entry: Dict[str, Any]) -> str:
+        """
+        Build the pagination cursor for a pool listing entry.
+
+        Args:
+            entry: Entry returned by list_pool_page
+
+        Returns:
+            Cursor string 'VENUE|PRODUCT|sort_key|identifier'
+        """
+        return f"{entry['venue_code']}|{entry['product_type']}|{entry['listing_key']}|{entry['kart_number']}"
+
+    @staticmethod
+    def _parse_pool_cursor(cursor: str) -> tuple:
+        """
+        Parse a cursor produced by encode_pool_cursor.
+
+        Args:
+            cursor: Cursor string
+
+        Returns:
+            Tuple of (venue_code, product_type, listing_key, identifier)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        parts = cursor.split('|')
+        if len(parts) != 4 or not re.match(r'^-?\d+$', parts[2]):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return parts[0], parts[1], int(parts[2]), parts[3]
+
+    @staticmethod
+    def _pool_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        """
+        Convert a pool listing row into an entry dictionary.
+
+        Args:
+            row: Row with id, product_type, venue_code, identifier, status,
+                mac_address, assigned_date and listing_key
+
+        Returns:
+            Entry with the hostname built from its parts
+        """
+        return {
+            'id': row['id'],
+            'hostname': f"{row['product_type']}-{row['venue_code']}-{row['identifier']}",
+            'venue_code': row['venue_code'],
+            'product_type': row['product_type'],
+            'kart_number': row['identifier'],
+            'status': row['status'],
+            'mac_address': row['mac_address'],
+            'assigned_date': row['assigned_date'],
+            'listing_key': row['listing_key']
+        }
+
+    def _listing_filter(
+        self,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> tuple:
+        """
+        Build a WHERE clause fragment for pool listings.
+
+        Args:
+            venue_code, product_type, status: Filters (see _pool_filter)
+            prefix: Identifier prefix (kart number or serial), letters and digits
+
+        Returns:
+            Tuple of (sql fragment starting with ' AND', params list)
+
+        Raises:
+            ValueError: If a filter value is invalid
+        """
+        clauses, params = self._pool_filter(venue_code, product_type, status)
+
+        if prefix:
+            prefix = prefix.strip().upper()
+            if not re.match(r'^[A-Z0-9]+$', prefix):
+                raise ValueError("Search prefix may only contain letters and digits")
+            # GLOB with a literal prefix becomes a range on idx_hostname_identifier
+            clauses += " AND identifier GLOB ?"
+            params.append(prefix + '*')
+
+        return clauses, params
+
+    def list_pool_page(
+        self,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        prefix: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Get one page of the hostname pool in listing order.
+
+        Pages continue from a cursor (keyset pagination), so each page reads
+        only `limit` index entries regardless of pool size or page depth.
+
+        Args:
+            venue_code: Restrict to one venue
+            product_type: Restrict to 'KXP2' or 'RXP2'
+            status: Restrict to one status
+            prefix: Restrict to identifiers starting with this prefix
+            after: Cursor of the last entry of the previous page
+            limit: Page size (capped at MAX_PAGE_SIZE)
+
+        Returns:
+            Dictionary with:
+            - kart_numbers: List of entries (id, hostname, venue_code,
+              product_type, kart_number, status, mac_address, assigned_date)
+            - next_cursor: Cursor for the following page, or None
+
+        Raises:
+            ValueError: If a filter or the cursor is invalid
+        """
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+        clauses, params = self._listing_filter(venue_code, product_type, status, prefix)
+
+        if after:
+            clauses += f" AND ({self.LISTING_KEY}) > (?, ?, ?, ?)"
+            params.extend(self._parse_pool_cursor(after))
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT id, product_type, venue_code, identifier, status, mac_address,
+                       assigned_date, IFNULL(sort_key, -1) AS listing_key
+                FROM hostname_pool
+                WHERE 1 = 1{clauses}
+                ORDER BY {self.LISTING_KEY}
+                LIMIT ?
+                """,
+                params + [limit + 1]
+            )
+            rows = cursor.fetchall()
+
+        entries = [self._pool_entry(row) for row in rows[:limit]]
+
+        return {
+            'kart_numbers': entries,
+            'next_cursor': self.encode_pool_cursor(entries[-1]) if len(rows) > limit else None
+        }
+
+    def count_pool_entries(
+        self,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> int:
+        """
+        Count pool entries matching listing filters.
+
+        Without a prefix the count is summed from hostname_pool_counts (a few
+        rows per venue); with a prefix only the matching index range is read.
+
+        Args:
+            venue_code, product_type, status, prefix: Filters (see list_pool_page)
+
+        Returns:
+            Number of matching entries
+
+        Raises:
+            ValueError: If a filter value is invalid
+        """
+        clauses, params = self._listing_filter(venue_code, product_type, status, prefix)
+        table = 'hostname_pool' if prefix else 'hostname_pool_counts'
+        column = 'COUNT(*)' if prefix else 'COALESCE(SUM(count), 0)'
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {column} FROM {table} WHERE 1 = 1{clauses}", params)
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def search_expression(text: str) -> str:
+        """
+        Turn free text into an FTS5 query matching every term by prefix.
+
+        Each whitespace-separated term becomes a quoted prefix phrase, so
+        'kxp2-coro-01 aa:bb' matches hostnames starting KXP2-CORO-01... on
+        devices whose MAC starts aa:bb. FTS5 operators in the input are
+        treated as plain text.
+
+        Args:
+            text: Search box input
+
+        Returns:
+            FTS5 MATCH expression
+
+        Raises:
+            ValueError: If the text contains nothing searchable
+        """
+        terms = [term for term in text.split() if re.search(r'\w', term)]
+        if not terms:
+            raise ValueError("Search text must contain letters or digits")
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search_pool(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search of the hostname pool.
+
+        Matches hostname, serial number, MAC address and notes by prefix
+        through the hostname_search FTS5 index.
+
+        Args:
+            text: Search text (see search_expression)
+            limit: Maximum number of results (capped at MAX_PAGE_SIZE)
+
+        Returns:
+            Matching entries (same fields as list_pool_page), by hostname
+
+        Raises:
+            ValueError: If the text contains nothing searchable
+        """
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT p.id, p.product_type, p.venue_code, p.identifier, p.status,
+                       p.mac_address, p.assigned_date, IFNULL(p.sort_key, -1) AS listing_key
+                FROM hostname_search s
+                JOIN hostname_pool p ON p.id = s.rowid
+                WHERE hostname_search MATCH ?
+                ORDER BY p.venue_code, p.product_type, IFNULL(p.sort_key, -1), p.identifier
+                LIMIT ?
+                """,
+                (self.search_expression(text), limit)
+            )
+            rows = cursor.fetchall()
+
+        return [self._pool_entry(row) for row in rows]
+
     def list_venues(self) -> List[Dict[str, Any]]:
         """
         Get list of all venues with hostname statistics.
@@ -470,6 +1235,8 @@ class HostnameManager:
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
+            # Counts come from the trigger-maintained hostname_pool_counts
+            # table (at most 6 rows per venue) rather than a pool scan
             cursor.execute("""
                 SELECT
                     v.code,
@@ -477,12 +1244,12 @@ class HostnameManager:
                     v.location,
                     v.contact_email,
                     v.created_at,
-                    COALESCE(SUM(CASE WHEN h.product_type = 'KXP2' AND h.status = 'available' THEN 1 ELSE 0 END), 0) as kxp2_available,
-                    COALESCE(SUM(CASE WHEN h.product_type = 'KXP2' AND h.status = 'assigned' THEN 1 ELSE 0 END), 0) as kxp2_assigned,
-                    COALESCE(SUM(CASE WHEN h.product_type = 'RXP2' AND h.status = 'available' THEN 1 ELSE 0 END), 0) as rxp2_available,
-                    COALESCE(SUM(CASE WHEN h.product_type = 'RXP2' AND h.status = 'assigned' THEN 1 ELSE 0 END), 0) as rxp2_assigned
+                    COALESCE(SUM(CASE WHEN c.product_type = 'KXP2' AND c.status = 'available' THEN c.count END), 0) as kxp2_available,
+                    COALESCE(SUM(CASE WHEN c.product_type = 'KXP2' AND c.status = 'assigned' THEN c.count END), 0) as kxp2_assigned,
+                    COALESCE(SUM(CASE WHEN c.product_type = 'RXP2' AND c.status = 'available' THEN c.count END), 0) as rxp2_available,
+                    COALESCE(SUM(CASE WHEN c.product_type = 'RXP2' AND c.status = 'assigned' THEN c.count END), 0) as rxp2_assigned
                 FROM venues v
-                LEFT JOIN hostname_pool h ON v.code = h.venue_code
+                LEFT JOIN hostname_pool_counts c ON v.code = c.venue_code
                 GROUP BY v.code, v.name, v.location, v.contact_email, v.created_at
                 ORDER BY v.code
             """)
@@ -526,11 +1293,11 @@ class HostnameManager:
             cursor.execute(
                 """
                 SELECT
-                    SUM(CASE WHEN status = 'available' THEN 1 ELSE 0 END) as available,
-                    SUM(CASE WHEN status = 'assigned' THEN 1 ELSE 0 END) as assigned,
-                    SUM(CASE WHEN status = 'retired' THEN 1 ELSE 0 END) as retired,
-                    COUNT(*) as total
-                FROM hostname_pool
+                    SUM(CASE WHEN status = 'available' THEN count ELSE 0 END) as available,
+                    SUM(CASE WHEN status = 'assigned' THEN count ELSE 0 END) as assigned,
+                    SUM(CASE WHEN status = 'retired' THEN count ELSE 0 END) as retired,
+                    COALESCE(SUM(count), 0) as total
+                FROM hostname_pool_counts
                 WHERE venue_code = ?
                 """,
                 (venue_code,)
@@ -595,8 +1362,7 @@ class HostnameManager:
         if total_count <= 0:
             raise ValueError(f"total_count must be > 0, got {total_count}")
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Verify venue exists
@@ -608,8 +1374,8 @@ class HostnameManager:
             if product_type == 'KXP2':
                 cursor.execute(
                     """
-                    SELECT COUNT(*) as available
-                    FROM hostname_pool
+                    SELECT COALESCE(SUM(count), 0) as available
+                    FROM hostname_pool_counts
                     WHERE venue_code = ? AND product_type = ? AND status = 'available'
                     """,
                     (venue_code, product_type)
@@ -631,43 +1397,44 @@ class HostnameManager:
             )
 
             batch_id = cursor.lastrowid
+            self._publish_batch(conn, batch_id)
             logger.info(
                 f"Created deployment batch {batch_id}: {product_type} for {venue_code}, "
                 f"count={total_count}, priority={priority}"
             )
             return batch_id
 
-    def get_active_batch(self) -> Optional[dict]:
+    def get_active_batch(
+        self,
+        venue_code: Optional[str] = None,
+        product_type: Optional[str] = None
+    ) -> Optional[dict]:
         """
-        Get the highest priority active batch.
+        Get the highest priority active batch for a device.
+
+        Served from the in-memory BatchScheduler; the database is only read
+        when another process has changed a batch's status, priority or
+        remaining count.
+
+        Args:
+            venue_code: Venue reported by the device (optional)
+            product_type: Product type reported by the device (optional)
 
         Returns:
-            Batch dict with highest priority, or None if no active batches
+            Batch dict with highest priority on the best matching route,
+            or None if no active batch matches
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                SELECT *
-                FROM deployment_batches
-                WHERE status = 'active'
-                ORDER BY priority DESC, id ASC
-                LIMIT 1
-                """
-            )
+        with self._get_connection() as conn:
+            self.batch_scheduler.sync(conn)
 
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+        return self.batch_scheduler.next_batch(venue_code, product_type)
 
     def assign_from_batch(
         self,
         batch_id: int,
         mac_address: str,
-        serial_number: str
+        serial_number: str,
+        lease_seconds: Optional[int] = None
     ) -> str:
         """
         Assign a hostname from a deployment batch.
@@ -675,10 +1442,16 @@ class HostnameManager:
         For KXP2: Assigns next available hostname from pool
         For RXP2: Creates dynamic hostname using serial number
 
+        A leased KXP2 assignment holds its batch slot until the lease is
+        confirmed; if it is cancelled or expires the slot is given back
+        (re-activating a completed batch). RXP2 hostnames are not leased,
+        so RXP2 batches count assignments, failed installs included.
+
         Args:
             batch_id: ID of batch to assign from
             mac_address: Device MAC address
             serial_number: Device serial number
+            lease_seconds: Optional reservation TTL (see assign_hostname)
 
         Returns:
             Assigned hostname
@@ -686,8 +1459,7 @@ class HostnameManager:
         Raises:
             ValueError: If batch not found, not active, or no available hostnames
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Get batch details
@@ -713,7 +1485,9 @@ class HostnameManager:
                     product_type=product_type,
                     venue_code=venue_code,
                     mac_address=mac_address,
-                    serial_number=serial_number
+                    serial_number=serial_number,
+                    lease_seconds=lease_seconds,
+                    batch_id=batch_id
                 )
             else:  # RXP2
                 # Create dynamic hostname
@@ -724,29 +1498,23 @@ class HostnameManager:
                     serial_number=serial_number
                 )
 
-            # Decrement remaining count
-            new_remaining = batch['remaining_count'] - 1
-
-            # Mark batch as completed if no more remaining
-            if new_remaining == 0:
-                cursor.execute(
-                    """
-                    UPDATE deployment_batches
-                    SET remaining_count = ?, status = 'completed', completed_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                    """,
-                    (new_remaining, batch_id)
-                )
+            # Decrement remaining count, marking the batch completed at zero.
+            # Relative to the stored count: a cancelled or expired lease may
+            # have given a slot back since the batch was read.
+            cursor.execute(
+                """
+                UPDATE deployment_batches
+                SET remaining_count = remaining_count - 1,
+                    status = CASE WHEN remaining_count <= 1 THEN 'completed' ELSE status END,
+                    completed_at = CASE WHEN remaining_count <= 1 THEN CURRENT_TIMESTAMP ELSE completed_at END
+                WHERE id = ?
+                """,
+                (batch_id,)
+            )
+            batch = self._publish_batch(conn, batch_id)
+            new_remaining = batch['remaining_count']
+            if batch['status'] == 'completed':
                 logger.info(f"Batch {batch_id} completed")
-            else:
-                cursor.execute(
-                    """
-                    UPDATE deployment_batches
-                    SET remaining_count = ?
-                    WHERE id = ?
-                    """,
-                    (new_remaining, batch_id)
-                )
 
             logger.info(
                 f"Assigned hostname {hostname} from batch {batch_id} "
@@ -764,8 +1532,7 @@ class HostnameManager:
         Raises:
             ValueError: If batch not found or already completed/cancelled
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Get batch
@@ -796,6 +1563,7 @@ class HostnameManager:
                 """,
                 (batch_id,)
             )
+            self._publish_batch(conn, batch_id)
 
             logger.info(f"Started batch {batch_id}")
 
@@ -809,8 +1577,7 @@ class HostnameManager:
         Raises:
             ValueError: If batch not found or not active
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Get batch
@@ -834,6 +1601,7 @@ class HostnameManager:
                 "UPDATE deployment_batches SET status = 'paused' WHERE id = ?",
                 (batch_id,)
             )
+            self._publish_batch(conn, batch_id)
 
             logger.info(f"Paused batch {batch_id}")
 
@@ -848,7 +1616,7 @@ class HostnameManager:
         Raises:
             ValueError: If batch not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Verify batch exists
@@ -861,6 +1629,7 @@ class HostnameManager:
                 "UPDATE deployment_batches SET priority = ? WHERE id = ?",
                 (priority, batch_id)
             )
+            self._publish_batch(conn, batch_id)
 
             logger.info(f"Updated batch {batch_id} priority to {priority}")
 
@@ -879,8 +1648,7 @@ class HostnameManager:
         Returns:
             List of batch dicts ordered by priority (highest first)
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Build query with optional filters
@@ -912,8 +1680,7 @@ class HostnameManager:
         Returns:
             Batch dict or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._get_connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("SELECT * FROM deployment_batches WHERE id = ?", (batch_id,))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Index Advisor for Raspberry Pi Deployment System
+
+Reads the query plans captured by the query profiler and reports every
+statement that scans a large table without an index, with a suggested
+index built from the statement's filters and ordering.
+
+Only the tables that grow with the fleet and its history count (see
+HOT_TABLES): venues, master images, batches, the counter tables and the
+daily rollups stay small enough that scanning them is cheaper than
+keeping another index up to date.
+
+Used by tests/test_query_plans.py, which runs the statements of
+hostname_manager, deployment_server and the web interface against a
+populated database and fails on any full scan, and by
+`db_admin.py queries --check` on the profiles of the running services.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import re
+from typing import Dict, List, Optional, Any
+
+from db_access import connect
+from query_profiler import full_scans
+
+# Tables whose size grows with the pool and the deployment history
+HOT_TABLES = ('hostname_pool', 'deployment_history', 'deployment_history_archive', 'deployment_rollups_hourly')
+
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_CLAUSE_END = re.compile(r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|HAVING|RETURNING)\b", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\s+(.*?)(?:\bLIMIT\b|$)", re.IGNORECASE)
+
+# Words that can follow a table name but are not an alias
+_KEYWORDS = {
+    'where', 'join', 'left', 'inner', 'cross', 'on', 'using', 'group', 'order', 'limit', 'set',
+    'values', 'select', 'union', 'having', 'natural', 'indexed', 'not', 'returning', 'default',
+}
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """
+    Map the names a statement uses for its tables to the tables.
+
+    Args:
+        sql: Statement
+
+    Returns:
+        dict: Alias or table name -> table name
+    """
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def scanned_tables(sql: str, plan: Optional[List[str]]) -> List[str]:
+    """
+    Tables a statement reads in full without an index.
+
+    Args:
+        sql: Statement
+        plan: Its query plan lines
+
+    Returns:
+        Table names (aliases resolved)
+    """
+    aliases = table_aliases(sql)
+    return [aliases.get(name, name) for name in full_scans(plan)]
+
+
+def suggest_index(sql: str, table: str, columns: List[str]) -> Optional[str]:
+    """
+    Suggest an index that lets a statement seek into a table.
+
+    Equality filters on the table's columns come first, then the first
+    range filter, or the ORDER BY columns when there is none.
+
+    Args:
+        sql: Statement scanning the table
+        table: Table scanned
+        columns: The table's column names
+
+    Returns:
+        CREATE INDEX statement, or None if the statement filters on none
+        of the table's columns
+    """
+    where = re.split(r"\bWHERE\b", sql, maxsplit=1, flags=re.IGNORECASE)
+    terms = _CLAUSE_END.split(where[1])[0] if len(where) > 1 else ''
+
+    found = []
+    for column in columns:
+        name = rf"(?:\b\w+\.)?\b{re.escape(column)}\b"
+        equal = re.search(rf"{name}\s*(?:(?<![!<>])=|\bIN\b|\bIS\b(?!\s+NOT))", terms, re.IGNORECASE)
+        ranged = re.search(rf"{name}\s*(?:<|>|\bBETWEEN\b|\bLIKE\b|\bGLOB\b)", terms, re.IGNORECASE)
+        if equal:
+            found.append((equal.start(), 'equal', column))
+        elif ranged:
+            found.append((ranged.start(), 'range', column))
+    found.sort()
+
+    index_columns = [column for _, kind, column in found if kind == 'equal']
+    ranges = [column for _, kind, column in found if kind == 'range']
+    if ranges:
+        index_columns.append(ranges[0])
+    else:
+        order = _ORDER_BY.search(sql)
+        if order:
+            for term in order.group(1).split(','):
+                column = term.strip().split()[0].split('.')[-1] if term.strip() else ''
+                if column in columns and column not in index_columns:
+                    index_columns.append(column)
+
+    if not index_columns:
+        return None
+    return (f"CREATE INDEX idx_{table}_{'_'.join(index_columns)} "
+            f"ON {table}({', '.join(index_columns)})")
+
+
+def find_full_scans(snapshots: List[Dict[str, Any]], db_path: str,
+                    hot_tables: tuple = HOT_TABLES) -> List[Dict[str, Any]]:
+    """
+    Statements in profile snapshots that scan a hot table.
+
+    Args:
+        snapshots: Snapshots from QueryProfiler.snapshot() or load_profiles()
+        db_path: Database the statements run against (for column names)
+        hot_tables: Tables that must not be scanned
+
+    Returns:
+        List of dicts: component, statement, calls, table, plan, suggestion
+    """
+    conn = connect(db_path)
+    try:
+        table_columns = {
+            table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            for table in hot_tables
+        }
+    finally:
+        conn.close()
+
+    problems = []
+    for snapshot in snapshots:
+        for shape, stats in snapshot['statements'].items():
+            for table in scanned_tables(shape, stats['plan']):
+                if table not in hot_tables:
+                    continue
+                problems.append({
+                    'component': snapshot['component'],
+                    'statement': shape,
+                    'calls': stats['calls'],
+                    'table': table,
+                    'plan': stats['plan'],
+                    'suggestion': suggest_index(shape, table, table_columns[table]),
+                })
+    return problems
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Install Progress Tracker for Raspberry Pi Deployment System
+
+Keeps the live state of in-flight installs in memory on the deployment
+server: phase, bytes written, throughput and ETA per device. Installers
+post progress every few seconds while writing the image; none of that
+touches SQLite. Only phase changes (reported through /api/status) are
+persisted to deployment_history.
+
+Installs are keyed by hostname, but a hostname can be shared (the
+'unknown' fallback) or reused (a reinstall). Phase reports carry the
+deployment_id from /api/config where the installer sends one, and a
+report for a different deployment starts a fresh entry; /api/config
+resets the hostname's entry when it records a new deployment.
+
+Change tracking:
+- Every update bumps a global version counter and stamps the entry with it
+- changes_since(version) returns the entries updated (and hostnames
+  removed) after a given version, so a publisher only sends deltas
+- wait_for_change() lets the publisher sleep until something happens
+
+Lifecycle:
+- Entries in a final phase ('success', 'failed') linger briefly so the
+  dashboard can show the outcome, then are pruned
+- Entries that stop reporting (device lost power) are pruned as stale
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import time
+import threading
+from typing import Optional, Dict, List, Tuple, Any
+
+# Phases that end an install
+FINAL_PHASES = ('success', 'failed')
+
+# Seconds a finished install stays visible
+FINISHED_LINGER_SECONDS = 60
+
+# Seconds without any report before an in-flight install is dropped
+STALE_SECONDS = 600
+
+# Weight of the newest sample in the throughput moving average
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class InstallTracker:
+    """
+    Thread-safe in-memory table of in-flight installs keyed by hostname.
+    """
+
+    def __init__(self):
+        """Initialize an empty tracker."""
+        self._cond = threading.Condition()
+        self._installs: Dict[str, Dict[str, Any]] = {}
+        # Hostname -> (version, removed_at) for pruned entries
+        self._removed: Dict[str, Tuple[int, float]] = {}
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Current change counter."""
+        with self._cond:
+            return self._version
+
+    def _touch(self, entry: Dict[str, Any]) -> None:
+        """Stamp an entry with a new version and wake waiters (lock held)."""
+        self._version += 1
+        entry['version'] = self._version
+        self._removed.pop(entry['hostname'], None)
+        self._cond.notify_all()
+
+    def _entry(self, hostname: str, now: float) -> Dict[str, Any]:
+        """Return the entry for a hostname, creating it if needed (lock held)."""
+        entry = self._installs.get(hostname)
+        if entry is None:
+            entry = {
+                'hostname': hostname,
+                'deployment_id': None,
+                'phase': None,
+                'bytes_written': 0,
+                'total_bytes': None,
+                'throughput': None,
+                'eta_seconds': None,
+                'started_at': now,
+                'updated_at': now,
+                'sampled_at': None,
+                'version': 0
+            }
+            self._installs[hostname] = entry
+        return entry
+
+    @staticmethod
+    def _is_new_install(entry: Optional[Dict[str, Any]], deployment_id: Optional[int]) -> bool:
+        """Whether a phase report belongs to a different install than the entry."""
+        return (entry is None or entry['phase'] in FINAL_PHASES or
+                (deployment_id is not None and entry['deployment_id'] not in (None, deployment_id)))
+
+    def is_transition(self, hostname: str, phase: str, deployment_id: Optional[int] = None) -> bool:
+        """
+        Check whether a phase report would change the install's phase.
+
+        Args:
+            hostname: Device hostname
+            phase: Reported phase
+            deployment_id: Deployment the report belongs to, if known
+
+        Returns:
+            True for a new install (including another deployment of the
+            same hostname) or a different phase
+        """
+        with self._cond:
+            entry = self._installs.get(hostname)
+            return self._is_new_install(entry, deployment_id) or entry['phase'] != phase
+
+    def set_phase(
+        self,
+        hostname: str,
+        phase: str,
+        now: Optional[float] = None,
+        deployment_id: Optional[int] = None,
+        **fields
+    ) -> bool:
+        """
+        Record a phase report for an install.
+
+        Args:
+            hostname: Device hostname
+            phase: Reported phase ('starting', 'downloading', ... 'success', 'failed')
+            now: Report time (defaults to time.time())
+            deployment_id: Deployment the report belongs to, if known
+            **fields: Extra display fields (e.g. venue_code, error_message)
+
+        Returns:
+            True if this is a phase transition (new install or different
+            phase), False for a repeated report of the current phase
+        """
+        now = time.time() if now is None else now
+        with self._cond:
+            entry = self._installs.get(hostname)
+            if self._is_new_install(entry, deployment_id):
+                # A new install for this hostname starts from a clean slate
+                self._installs.pop(hostname, None)
+                entry = self._entry(hostname, now)
+            elif entry['phase'] == phase:
+                entry['updated_at'] = now
+                return False
+
+            if deployment_id is not None:
+                entry['deployment_id'] = deployment_id
+            entry['phase'] = phase
+            entry['updated_at'] = now
+            entry.update({key: value for key, value in fields.items() if value is not None})
+            if phase == 'success' and entry['total_bytes']:
+                entry['bytes_written'] = entry['total_bytes']
+            if phase in FINAL_PHASES:
+                entry['throughput'] = None
+                entry['eta_seconds'] = None
+            self._touch(entry)
+            return True
+
+    def update_progress(
+        self,
+        hostname: str,
+        bytes_written: int,
+        total_bytes: Optional[int] = None,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Record bytes written for an install and recompute throughput and ETA.
+
+        Args:
+            hostname: Device hostname
+            bytes_written: Bytes written to the SD card so far
+            total_bytes: Total image size, if known
+            now: Report time (defaults to time.time())
+
+        Returns:
+            Copy of the updated entry
+        """
+        now = time.time() if now is None else now
+        with self._cond:
+            entry = self._entry(hostname, now)
+            if entry['phase'] is None:
+                # Progress from an install we never saw start (server restart)
+                entry['phase'] = 'downloading'
+
+            # Rate between consecutive progress samples (phase reports don't count)
+            if entry['sampled_at'] is not None:
+                elapsed = now - entry['sampled_at']
+                written = bytes_written - entry['bytes_written']
+            else:
+                elapsed = written = 0
+            if elapsed > 0 and written >= 0:
+                rate = written / elapsed
+                previous = entry['throughput']
+                entry['throughput'] = rate if previous is None else (
+                    THROUGHPUT_SMOOTHING * rate + (1 - THROUGHPUT_SMOOTHING) * previous
+                )
+
+            entry['bytes_written'] = bytes_written
+            if total_bytes:
+                entry['total_bytes'] = total_bytes
+            entry['updated_at'] = now
+            entry['sampled_at'] = now
+
+            if entry['throughput'] and entry['total_bytes']:
+                remaining = max(entry['total_bytes'] - bytes_written, 0)
+                entry['eta_seconds'] = remaining / entry['throughput']
+
+            self._touch(entry)
+            return dict(entry)
+
+    def reset(self, hostname: str, now: Optional[float] = None) -> bool:
+        """
+        Forget a hostname's install (a new deployment of it is starting).
+
+        Args:
+            hostname: Device hostname
+            now: Current time (defaults to time.time())
+
+        Returns:
+            True if an entry was removed
+        """
+        now = time.time() if now is None else now
+        with self._cond:
+            if self._installs.pop(hostname, None) is None:
+                return False
+            self._version += 1
+            self._removed[hostname] = (self._version, now)
+            self._cond.notify_all()
+            return True
+
+    def get(self, hostname: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of one install entry, or None."""
+        with self._cond:
+            entry = self._installs.get(hostname)
+            return dict(entry) if entry else None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return copies of all tracked installs, ordered by hostname."""
+        with self._cond:
+            return [dict(self._installs[h]) for h in sorted(self._installs)]
+
+    def changes_since(self, version: int) -> Tuple[int, List[Dict[str, Any]], List[str]]:
+        """
+        Return installs updated and hostnames removed after a version.
+
+        Args:
+            version: Version returned by a previous call (0 for everything)
+
+        Returns:
+            Tuple of (current version, updated entries, removed hostnames)
+        """
+        with self._cond:
+            updated = [dict(e) for e in self._installs.values() if e['version'] > version]
+            removed = [h for h, (v, _) in self._removed.items() if v > version]
+            return self._version, updated, removed
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the tracker moves past a version.
+
+        Args:
+            version: Last version seen by the caller
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if there are changes after `version`
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._version > version, timeout)
+
+    def prune(self, now: Optional[float] = None) -> List[str]:
+        """
+        Drop finished installs after their linger period and stale installs.
+
+        Args:
+            now: Current time (defaults to time.time())
+
+        Returns:
+            Hostnames removed
+        """
+        now = time.time() if now is None else now
+        removed = []
+        with self._cond:
+            for hostname, entry in list(self._installs.items()):
+                age = now - entry['updated_at']
+                finished = entry['phase'] in FINAL_PHASES
+                if (finished and age > FINISHED_LINGER_SECONDS) or age > STALE_SECONDS:
+                    del self._installs[hostname]
+                    removed.append(hostname)
+
+            if removed:
+                self._version += 1
+                for hostname in removed:
+                    self._removed[hostname] = (self._version, now)
+                self._cond.notify_all()
+
+            # Tombstones only need to outlive one publisher cycle
+            for hostname, (_, removed_at) in list(self._removed.items()):
+                if now - removed_at > STALE_SECONDS:
+                    del self._removed[hostname]
+
+        return removed
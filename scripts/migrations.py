@@ -0,0 +1,1034 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema Migrations for Raspberry Pi Deployment System
+
+The database schema is built and upgraded by numbered migrations, applied
+in order and recorded in the schema_version table. initialize_database()
+runs every migration not yet recorded there, so a new database and one created by any
+earlier release end up with the same schema.
+
+Rules for adding a migration:
+- Append it to MIGRATIONS with the next version number; never edit or
+  renumber a migration that has shipped
+- A migration carries its own DDL and backfills (index migrations their
+  own index lists) rather than calling schema code that lives on, so a
+  shipped migration does the same thing on every database; changing a
+  table, trigger or index later is a new migration
+- Statements must be idempotent (IF NOT EXISTS, add_column_if_missing):
+  databases created before schema_version existed replay every migration
+- Indexes on large tables go in an index migration (a list of
+  (name, table, columns)), which builds each index in its own short
+  transaction; with WAL, readers carry on while an index builds and
+  writers wait at most one index build (busy_timeout)
+- Add a test in tests/test_migrations.py that applies the migration to a
+  populated database
+
+Usage:
+    python3 migrations.py [--db-path PATH] [--status] [--target VERSION]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import time
+import sqlite3
+import logging
+from typing import Callable, List, Optional, Sequence, Set, Tuple, Union, Any, Dict
+
+from db_access import connect
+
+logger = logging.getLogger(__name__)
+
+# (index name, table, indexed columns or expressions)
+IndexSpec = Tuple[str, str, str]
+
+# A migration step: a function run in one transaction, or indexes built online
+MigrationStep = Union[Callable[[sqlite3.Cursor], None], Sequence[IndexSpec]]
+
+
+def add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, declaration: str) -> bool:
+    """
+    Add a column to an existing table if it is not already present.
+
+    CREATE TABLE IF NOT EXISTS does not alter existing tables, so columns
+    added after the initial release are applied through this helper.
+
+    Args:
+        cursor: Cursor on an open database connection
+        table: Table name
+        column: Column name
+        declaration: Column type and constraints (e.g. 'TIMESTAMP')
+
+    Returns:
+        True if the column was added, False if it already existed
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column in [row[1] for row in cursor.fetchall()]:
+        return False
+
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    logger.info(f"Added column {table}.{column}")
+    return True
+
+
+def initial_schema(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the original tables and their indexes.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    # Create hostname_pool table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS hostname_pool (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
+            venue_code TEXT NOT NULL CHECK(length(venue_code) = 4),
+            identifier TEXT NOT NULL,
+            status TEXT NOT NULL CHECK(status IN ('available', 'assigned', 'retired')),
+            mac_address TEXT,
+            serial_number TEXT,
+            assigned_date TIMESTAMP,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(product_type, venue_code, identifier)
+        )
+    """)
+
+    # Create venues table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS venues (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            code TEXT NOT NULL UNIQUE CHECK(length(code) = 4),
+            name TEXT NOT NULL,
+            location TEXT,
+            contact_email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Create deployment_history table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deployment_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hostname TEXT NOT NULL,
+            mac_address TEXT,
+            serial_number TEXT,
+            ip_address TEXT,
+            product_type TEXT,
+            venue_code TEXT,
+            image_version TEXT,
+            deployment_status TEXT,
+            started_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            error_message TEXT
+        )
+    """)
+
+    # Create master_images table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS master_images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL UNIQUE,
+            product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
+            version TEXT NOT NULL,
+            size_bytes INTEGER,
+            checksum TEXT,
+            description TEXT,
+            is_active BOOLEAN DEFAULT 0,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Create deployment_batches table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deployment_batches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            venue_code TEXT NOT NULL,
+            product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
+            total_count INTEGER NOT NULL,
+            remaining_count INTEGER NOT NULL,
+            priority INTEGER DEFAULT 0,
+            status TEXT NOT NULL CHECK(status IN ('pending', 'active', 'paused', 'completed', 'cancelled')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            FOREIGN KEY (venue_code) REFERENCES venues(code)
+        )
+    """)
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_hostname_status ON hostname_pool(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_hostname_venue ON hostname_pool(venue_code)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deployment_date ON deployment_history(started_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_batch_status ON deployment_batches(status, priority)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_batch_venue ON deployment_batches(venue_code)")
+
+
+def hostname_leases(cursor: sqlite3.Cursor) -> None:
+    """
+    Add hostname leases: pending reservations expire back to the pool.
+
+    The partial index keeps the sweeper proportional to open leases only.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    add_column_if_missing(cursor, 'hostname_pool', 'lease_expires_at', 'TIMESTAMP')
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_hostname_lease
+        ON hostname_pool(lease_expires_at)
+        WHERE lease_expires_at IS NOT NULL
+    """)
+
+
+def kart_number_sort_key(cursor: sqlite3.Cursor) -> None:
+    """
+    Add hostname_pool.sort_key, the numeric value of a kart number.
+
+    Kart numbers are stored as zero-padded TEXT, which sorts wrongly once
+    widths differ ('1000' < '999'). The partial index makes "lowest
+    available kart number at a venue" a single index seek.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    add_column_if_missing(cursor, 'hostname_pool', 'sort_key', 'INTEGER')
+    # Only purely numeric identifiers (KXP2 kart numbers) get a sort key;
+    # RXP2 identifiers are serial number suffixes and are never ordered
+    cursor.execute("""
+        UPDATE hostname_pool
+        SET sort_key = CAST(identifier AS INTEGER)
+        WHERE sort_key IS NULL
+          AND identifier != ''
+          AND identifier NOT GLOB '*[^0-9]*'
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_hostname_next_available
+        ON hostname_pool(venue_code, product_type, sort_key)
+        WHERE status = 'available'
+    """)
+
+
+def pool_counters(cursor: sqlite3.Cursor) -> None:
+    """
+    Add trigger-maintained hostname_pool_counts, built from the existing pool.
+
+    Every INSERT, DELETE and status/venue/product change on hostname_pool
+    adjusts the matching (venue_code, product_type, status) counter, so venue
+    listings and statistics read O(venues) rows instead of scanning the pool.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS hostname_pool_counts (
+            venue_code TEXT NOT NULL,
+            product_type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (venue_code, product_type, status)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_pool_counts_insert
+        AFTER INSERT ON hostname_pool
+        BEGIN
+            INSERT INTO hostname_pool_counts (venue_code, product_type, status, count)
+            VALUES (NEW.venue_code, NEW.product_type, NEW.status, 1)
+            ON CONFLICT(venue_code, product_type, status) DO UPDATE SET count = count + 1;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_pool_counts_delete
+        AFTER DELETE ON hostname_pool
+        BEGIN
+            UPDATE hostname_pool_counts
+            SET count = count - 1
+            WHERE venue_code = OLD.venue_code
+              AND product_type = OLD.product_type
+              AND status = OLD.status;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_pool_counts_update
+        AFTER UPDATE OF venue_code, product_type, status ON hostname_pool
+        WHEN OLD.status IS NOT NEW.status
+          OR OLD.venue_code IS NOT NEW.venue_code
+          OR OLD.product_type IS NOT NEW.product_type
+        BEGIN
+            UPDATE hostname_pool_counts
+            SET count = count - 1
+            WHERE venue_code = OLD.venue_code
+              AND product_type = OLD.product_type
+              AND status = OLD.status;
+            INSERT INTO hostname_pool_counts (venue_code, product_type, status, count)
+            VALUES (NEW.venue_code, NEW.product_type, NEW.status, 1)
+            ON CONFLICT(venue_code, product_type, status) DO UPDATE SET count = count + 1;
+        END
+    """)
+
+    cursor.execute("DELETE FROM hostname_pool_counts")
+    cursor.execute("""
+        INSERT INTO hostname_pool_counts (venue_code, product_type, status, count)
+        SELECT venue_code, product_type, status, COUNT(*)
+        FROM hostname_pool
+        GROUP BY venue_code, product_type, status
+    """)
+
+
+def deployment_counters(cursor: sqlite3.Cursor) -> None:
+    """
+    Add trigger-maintained deployment_history_counts, built from existing history.
+
+    Counters are kept per (venue_code, product_type, deployment_status), so
+    the total for any deployment history filter is a SUM over a handful of
+    rows instead of a COUNT(*) over the whole history. NULL columns are
+    stored as '' since they form the primary key.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'deployment_history_counts'"
+    )
+    created = cursor.fetchone() is None
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deployment_history_counts (
+            venue_code TEXT NOT NULL,
+            product_type TEXT NOT NULL,
+            deployment_status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (venue_code, product_type, deployment_status)
+        ) WITHOUT ROWID
+    """)
+
+    increment = """
+            INSERT INTO deployment_history_counts (venue_code, product_type, deployment_status, count)
+            VALUES (COALESCE(NEW.venue_code, ''), COALESCE(NEW.product_type, ''),
+                    COALESCE(NEW.deployment_status, ''), 1)
+            ON CONFLICT(venue_code, product_type, deployment_status) DO UPDATE SET count = count + 1;
+    """
+    decrement = """
+            UPDATE deployment_history_counts
+            SET count = count - 1
+            WHERE venue_code = COALESCE(OLD.venue_code, '')
+              AND product_type = COALESCE(OLD.product_type, '')
+              AND deployment_status = COALESCE(OLD.deployment_status, '');
+    """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deployment_counts_insert
+        AFTER INSERT ON deployment_history
+        BEGIN
+            {increment}
+        END
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deployment_counts_delete
+        AFTER DELETE ON deployment_history
+        BEGIN
+            {decrement}
+        END
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deployment_counts_update
+        AFTER UPDATE OF venue_code, product_type, deployment_status ON deployment_history
+        WHEN OLD.deployment_status IS NOT NEW.deployment_status
+          OR OLD.venue_code IS NOT NEW.venue_code
+          OR OLD.product_type IS NOT NEW.product_type
+        BEGIN
+            {decrement}
+            {increment}
+        END
+    """)
+
+    if created:
+        cursor.execute("""
+            INSERT INTO deployment_history_counts (venue_code, product_type, deployment_status, count)
+            SELECT COALESCE(venue_code, ''), COALESCE(product_type, ''), COALESCE(deployment_status, ''), COUNT(*)
+            FROM deployment_history
+            GROUP BY 1, 2, 3
+        """)
+
+
+def search_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Add the FTS5 deployment and hostname search indexes, built from existing rows.
+
+    - deployment_search indexes deployment_history (hostname, serial_number,
+      mac_address, error_message) as an external-content table, so the text
+      is stored once and rows are found by rowid = deployment_history.id.
+    - hostname_search indexes hostname_pool as a contentless table, since
+      the full hostname is derived (product-venue-identifier) rather than
+      stored; rowid = hostname_pool.id.
+
+    The unicode61 tokenizer splits on punctuation, so hostnames and MAC
+    addresses are searched as phrases ("KXP2 CORO 001", "aa bb cc").
+    Prefix indexes on 2 and 3 characters keep short prefix queries cheap.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'deployment_search'"
+    )
+    created = cursor.fetchone() is None
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS deployment_search USING fts5(
+            hostname, serial_number, mac_address, error_message,
+            content='deployment_history', content_rowid='id', prefix='2 3'
+        )
+    """)
+
+    deployment_insert = """
+            INSERT INTO deployment_search (rowid, hostname, serial_number, mac_address, error_message)
+            VALUES (NEW.id, NEW.hostname, NEW.serial_number, NEW.mac_address, NEW.error_message);
+    """
+    deployment_delete = """
+            INSERT INTO deployment_search (deployment_search, rowid, hostname, serial_number, mac_address, error_message)
+            VALUES ('delete', OLD.id, OLD.hostname, OLD.serial_number, OLD.mac_address, OLD.error_message);
+    """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deployment_search_insert
+        AFTER INSERT ON deployment_history
+        BEGIN
+            {deployment_insert}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deployment_search_delete
+        AFTER DELETE ON deployment_history
+        BEGIN
+            {deployment_delete}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_deployment_search_update
+        AFTER UPDATE OF hostname, serial_number, mac_address, error_message ON deployment_history
+        WHEN OLD.hostname IS NOT NEW.hostname
+          OR OLD.serial_number IS NOT NEW.serial_number
+          OR OLD.mac_address IS NOT NEW.mac_address
+          OR OLD.error_message IS NOT NEW.error_message
+        BEGIN
+            {deployment_delete}
+            {deployment_insert}
+        END
+    """)
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS hostname_search USING fts5(
+            hostname, serial_number, mac_address, notes,
+            content='', prefix='2 3'
+        )
+    """)
+
+    pool_insert = """
+            INSERT INTO hostname_search (rowid, hostname, serial_number, mac_address, notes)
+            VALUES (NEW.id, NEW.product_type || '-' || NEW.venue_code || '-' || NEW.identifier,
+                    NEW.serial_number, NEW.mac_address, NEW.notes);
+    """
+    # Contentless tables need the exact previously indexed values to delete
+    pool_delete = """
+            INSERT INTO hostname_search (hostname_search, rowid, hostname, serial_number, mac_address, notes)
+            VALUES ('delete', OLD.id, OLD.product_type || '-' || OLD.venue_code || '-' || OLD.identifier,
+                    OLD.serial_number, OLD.mac_address, OLD.notes);
+    """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_hostname_search_insert
+        AFTER INSERT ON hostname_pool
+        BEGIN
+            {pool_insert}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_hostname_search_delete
+        AFTER DELETE ON hostname_pool
+        BEGIN
+            {pool_delete}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_hostname_search_update
+        AFTER UPDATE OF product_type, venue_code, identifier, serial_number, mac_address, notes ON hostname_pool
+        WHEN OLD.product_type IS NOT NEW.product_type
+          OR OLD.venue_code IS NOT NEW.venue_code
+          OR OLD.identifier IS NOT NEW.identifier
+          OR OLD.serial_number IS NOT NEW.serial_number
+          OR OLD.mac_address IS NOT NEW.mac_address
+          OR OLD.notes IS NOT NEW.notes
+        BEGIN
+            {pool_delete}
+            {pool_insert}
+        END
+    """)
+
+    if created:
+        cursor.execute("INSERT INTO deployment_search (deployment_search) VALUES ('rebuild')")
+        cursor.execute("""
+            INSERT INTO hostname_search (rowid, hostname, serial_number, mac_address, notes)
+            SELECT id, product_type || '-' || venue_code || '-' || identifier,
+                   serial_number, mac_address, notes
+            FROM hostname_pool
+        """)
+
+
+def batch_queue_state(cursor: sqlite3.Cursor) -> None:
+    """
+    Add the batch_queue_state version counter and its triggers.
+
+    The version is bumped whenever a batch is created, deleted, or has its
+    status or priority changed, letting each process's BatchScheduler
+    detect changes made by other processes with a single primary key
+    lookup (remaining count changes were added by batch_remaining_version).
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS batch_queue_state (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO batch_queue_state (id, version) VALUES (1, 0)")
+
+    for name, event in (
+        ('trg_batch_queue_insert', 'AFTER INSERT ON deployment_batches'),
+        ('trg_batch_queue_update', 'AFTER UPDATE OF status, priority ON deployment_batches'),
+        ('trg_batch_queue_delete', 'AFTER DELETE ON deployment_batches'),
+    ):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            {event}
+            BEGIN
+                UPDATE batch_queue_state SET version = version + 1 WHERE id = 1;
+            END
+        """)
+
+
+def deployment_archive(cursor: sqlite3.Cursor) -> None:
+    """
+    Add the deployment history archive (see history_archive.py).
+
+    - deployment_history_archive holds finished deployments moved out of
+      deployment_history; ids are kept (AUTOINCREMENT never reuses them),
+      so (started_at, id) cursors work across both tables
+    - deployment_archive_counts is maintained by triggers, like
+      deployment_history_counts, so totals including the archive stay cheap
+    - deployment_history_all is the union of both tables for ad hoc reads
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deployment_history_archive (
+            id INTEGER PRIMARY KEY,
+            hostname TEXT NOT NULL,
+            mac_address TEXT,
+            serial_number TEXT,
+            ip_address TEXT,
+            product_type TEXT,
+            venue_code TEXT,
+            image_version TEXT,
+            deployment_status TEXT,
+            started_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            error_message TEXT,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_archive_started ON deployment_history_archive(started_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_archive_hostname ON deployment_history_archive(hostname)"
+    )
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deployment_archive_counts (
+            venue_code TEXT NOT NULL,
+            product_type TEXT NOT NULL,
+            deployment_status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (venue_code, product_type, deployment_status)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_archive_counts_insert
+        AFTER INSERT ON deployment_history_archive
+        BEGIN
+            INSERT INTO deployment_archive_counts (venue_code, product_type, deployment_status, count)
+            VALUES (COALESCE(NEW.venue_code, ''), COALESCE(NEW.product_type, ''),
+                    COALESCE(NEW.deployment_status, ''), 1)
+            ON CONFLICT(venue_code, product_type, deployment_status) DO UPDATE SET count = count + 1;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_archive_counts_delete
+        AFTER DELETE ON deployment_history_archive
+        BEGIN
+            UPDATE deployment_archive_counts
+            SET count = count - 1
+            WHERE venue_code = COALESCE(OLD.venue_code, '')
+              AND product_type = COALESCE(OLD.product_type, '')
+              AND deployment_status = COALESCE(OLD.deployment_status, '');
+        END
+    """)
+
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS deployment_history_all AS
+        SELECT id, hostname, mac_address, serial_number, ip_address, product_type, venue_code,
+               image_version, deployment_status, started_at, completed_at, error_message
+        FROM deployment_history
+        UNION ALL
+        SELECT id, hostname, mac_address, serial_number, ip_address, product_type, venue_code,
+               image_version, deployment_status, started_at, completed_at, error_message
+        FROM deployment_history_archive
+    """)
+
+
+# Rollup granularity -> (table, bucket of a row's started_at) as released
+# with deployment_rollups
+ROLLUPS = {
+    'hour': ('deployment_rollups_hourly', "strftime('%Y-%m-%d %H:00:00', {row}.started_at)"),
+    'day': ('deployment_rollups_daily', "date({row}.started_at)"),
+}
+
+
+def deployment_rollups(cursor: sqlite3.Cursor) -> None:
+    """
+    Add trigger-maintained deployment rollups, built from existing history.
+
+    One row per (time bucket, venue, product, status) holds the number of
+    deployments started in that bucket, and the sum and count of durations
+    of those that have completed, so counts and average durations over any
+    range are a SUM over a few rows per bucket.
+
+    Every change to deployment_history (a status transition moves a
+    deployment from one status row to another) and to
+    deployment_history_archive adjusts the rollups. Archiving a row removes
+    it from one table and adds it to the other, so rollups always cover the
+    whole history. NULL columns are stored as '' since they form the key.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    for table, _ in ROLLUPS.values():
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TEXT NOT NULL,
+                venue_code TEXT NOT NULL,
+                product_type TEXT NOT NULL,
+                deployment_status TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                duration_sum REAL NOT NULL DEFAULT 0,
+                duration_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, venue_code, product_type, deployment_status)
+            ) WITHOUT ROWID
+        """)
+
+    def adjust(row: str, sign: int) -> str:
+        """Statements adding (sign 1) or removing (sign -1) a row from every rollup."""
+        duration = f"(strftime('%s', {row}.completed_at) - strftime('%s', {row}.started_at))"
+        return ''.join(f"""
+            INSERT INTO {table} (bucket, venue_code, product_type, deployment_status,
+                                 count, duration_sum, duration_count)
+            VALUES (COALESCE({bucket.format(row=row)}, ''), COALESCE({row}.venue_code, ''),
+                    COALESCE({row}.product_type, ''), COALESCE({row}.deployment_status, ''),
+                    {sign}, {sign} * COALESCE({duration}, 0), CASE WHEN {duration} IS NULL THEN 0 ELSE {sign} END)
+            ON CONFLICT(bucket, venue_code, product_type, deployment_status) DO UPDATE SET
+                count = count + excluded.count,
+                duration_sum = duration_sum + excluded.duration_sum,
+                duration_count = duration_count + excluded.duration_count;
+        """ for table, bucket in ROLLUPS.values())
+
+    for source, prefix in (('deployment_history', 'trg_rollup'), ('deployment_history_archive', 'trg_rollup_archive')):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_insert
+            AFTER INSERT ON {source}
+            BEGIN
+                {adjust('NEW', 1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {prefix}_delete
+            AFTER DELETE ON {source}
+            BEGIN
+                {adjust('OLD', -1)}
+            END
+        """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_update
+        AFTER UPDATE OF venue_code, product_type, deployment_status, started_at, completed_at
+        ON deployment_history
+        WHEN OLD.deployment_status IS NOT NEW.deployment_status
+          OR OLD.venue_code IS NOT NEW.venue_code
+          OR OLD.product_type IS NOT NEW.product_type
+          OR OLD.started_at IS NOT NEW.started_at
+          OR OLD.completed_at IS NOT NEW.completed_at
+        BEGIN
+            {adjust('OLD', -1)}
+            {adjust('NEW', 1)}
+        END
+    """)
+
+    # Only the hourly rollups read the history; daily ones add up hourly
+    # rows (a bucket's started_at is the start of its hour)
+    duration = "(strftime('%s', completed_at) - strftime('%s', started_at))"
+    hourly, hour_bucket = ROLLUPS['hour']
+    daily, day_bucket = ROLLUPS['day']
+    for table, bucket, source, totals in (
+        (hourly, hour_bucket.format(row='deployment_history_all'), "deployment_history_all",
+         f"COUNT(*), COALESCE(SUM({duration}), 0), COUNT({duration})"),
+        (daily, day_bucket.format(row='hours'), f"(SELECT bucket AS started_at, * FROM {hourly}) AS hours",
+         "SUM(count), SUM(duration_sum), SUM(duration_count)"),
+    ):
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"""
+            INSERT INTO {table} (bucket, venue_code, product_type, deployment_status,
+                                 count, duration_sum, duration_count)
+            SELECT COALESCE({bucket}, ''),
+                   COALESCE(venue_code, ''), COALESCE(product_type, ''), COALESCE(deployment_status, ''),
+                   {totals}
+            FROM {source}
+            GROUP BY 1, 2, 3, 4
+        """)
+
+
+def batch_remaining_version(cursor: sqlite3.Cursor) -> None:
+    """
+    Bump batch_queue_state.version on remaining_count changes too.
+
+    Other processes' schedulers otherwise keep serving a batch's remaining
+    count from before the deployment server assigned from it.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    cursor.execute("DROP TRIGGER IF EXISTS trg_batch_queue_update")
+    cursor.execute("""
+        CREATE TRIGGER trg_batch_queue_update
+        AFTER UPDATE OF status, priority, remaining_count ON deployment_batches
+        BEGIN
+            UPDATE batch_queue_state SET version = version + 1 WHERE id = 1;
+        END
+    """)
+
+
+def lease_batch_slots(cursor: sqlite3.Cursor) -> None:
+    """
+    Add hostname_pool.lease_batch_id, the batch a pending lease was assigned from.
+
+    A cancelled or expired lease gives its slot back to that batch.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+    """
+    add_column_if_missing(cursor, 'hostname_pool', 'lease_batch_id', 'INTEGER')
+
+
+# Index migrations, as released. Later index changes go in new migrations.
+
+# Pool listings: expression indexes in HostnameManager.LISTING_KEY order
+# (unfiltered, by venue, by product, by status) and an identifier index
+# turning prefix searches into range seeks
+HOSTNAME_LISTING_INDEXES = [
+    ('idx_hostname_listing', 'hostname_pool', 'venue_code, product_type, IFNULL(sort_key, -1), identifier'),
+    ('idx_hostname_product_listing', 'hostname_pool', 'product_type, venue_code, IFNULL(sort_key, -1), identifier'),
+    ('idx_hostname_status_listing', 'hostname_pool',
+     'status, venue_code, product_type, IFNULL(sort_key, -1), identifier'),
+    ('idx_hostname_identifier', 'hostname_pool', 'identifier'),
+]
+
+# Deployment history is paged newest-first by (started_at, id), alone or
+# filtered by venue, product and/or status; product + status and all three
+# filters use the status indexes and check the product on the few rows per page
+DEPLOYMENT_HISTORY_INDEXES = [
+    ('idx_deployment_venue_started', 'deployment_history', 'venue_code, started_at'),
+    ('idx_deployment_product_started', 'deployment_history', 'product_type, started_at'),
+    ('idx_deployment_status_started', 'deployment_history', 'deployment_status, started_at'),
+    ('idx_deployment_venue_product_started', 'deployment_history', 'venue_code, product_type, started_at'),
+    ('idx_deployment_venue_status_started', 'deployment_history', 'venue_code, deployment_status, started_at'),
+]
+
+# Status reports without a deployment_id find the hostname's newest open
+# deployment
+DEPLOYMENT_HOSTNAME_INDEXES = [
+    ('idx_deployment_hostname_started', 'deployment_history', 'hostname, started_at'),
+]
+
+# Statements the query plan check (tests/test_query_plans.py) found
+# scanning: releasing hostnames assigned before a date, and hourly reports
+# for one venue without a date range
+QUERY_PLAN_INDEXES = [
+    ('idx_hostname_assigned', 'hostname_pool', 'assigned_date'),
+    ('idx_rollup_hourly_venue', 'deployment_rollups_hourly', 'venue_code, bucket'),
+]
+
+# Every schema change, in order. Append only.
+MIGRATIONS: List[Tuple[int, str, MigrationStep]] = [
+    (1, 'initial_schema', initial_schema),
+    (2, 'hostname_leases', hostname_leases),
+    (3, 'kart_number_sort_key', kart_number_sort_key),
+    (4, 'hostname_listing_indexes', HOSTNAME_LISTING_INDEXES),
+    (5, 'deployment_history_indexes', DEPLOYMENT_HISTORY_INDEXES),
+    (6, 'pool_counters', pool_counters),
+    (7, 'deployment_counters', deployment_counters),
+    (8, 'search_indexes', search_indexes),
+    (9, 'batch_queue_state', batch_queue_state),
+    (10, 'deployment_archive', deployment_archive),
+    (11, 'deployment_rollups', deployment_rollups),
+    (12, 'deployment_hostname_index', DEPLOYMENT_HOSTNAME_INDEXES),
+    (13, 'query_plan_indexes', QUERY_PLAN_INDEXES),
+    (14, 'batch_remaining_version', batch_remaining_version),
+    (15, 'lease_batch_slots', lease_batch_slots),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def ensure_version_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the schema_version table if missing.
+
+    Args:
+        conn: Open database connection
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            duration_ms REAL
+        )
+    """)
+
+
+def applied_versions(conn: sqlite3.Connection) -> Set[int]:
+    """
+    Get the versions of all applied migrations.
+
+    Args:
+        conn: Open database connection
+
+    Returns:
+        Set of version numbers (empty if schema_version does not exist yet)
+    """
+    try:
+        return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+    except sqlite3.OperationalError:
+        return set()
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """
+    Get the highest applied migration version.
+
+    Args:
+        conn: Open database connection
+
+    Returns:
+        Version number, or 0 if no migration has been recorded
+    """
+    return max(applied_versions(conn), default=0)
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[Tuple[int, str]]:
+    """
+    List migrations not yet applied.
+
+    Args:
+        conn: Open database connection
+
+    Returns:
+        (version, name) of each pending migration, in order
+    """
+    applied = applied_versions(conn)
+    return [(number, name) for number, name, _ in MIGRATIONS if number not in applied]
+
+
+def _applied(conn: sqlite3.Connection, version: int) -> bool:
+    """Whether a migration is already recorded (another process may have run it)."""
+    return conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone() is not None
+
+
+def _record(conn: sqlite3.Connection, version: int, name: str, started: float) -> None:
+    """Record a migration as applied."""
+    conn.execute(
+        "INSERT OR IGNORE INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)",
+        (version, name, round((time.monotonic() - started) * 1000, 1))
+    )
+
+
+def build_indexes_online(conn: sqlite3.Connection, indexes: Sequence[IndexSpec]) -> int:
+    """
+    Create indexes one short transaction at a time.
+
+    An interrupted run leaves the finished indexes in place and resumes
+    with the rest (CREATE INDEX IF NOT EXISTS).
+
+    Args:
+        conn: Connection in autocommit mode (isolation_level=None)
+        indexes: (name, table, columns) to create
+
+    Returns:
+        Number of indexes created
+    """
+    created = 0
+    for name, table, columns in indexes:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+        ).fetchone()
+        if exists:
+            continue
+        started = time.monotonic()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        created += 1
+        logger.info(f"Built index {name} in {(time.monotonic() - started) * 1000:.0f} ms")
+    return created
+
+
+def _apply(conn: sqlite3.Connection, version: int, name: str, step: MigrationStep) -> bool:
+    """
+    Apply one migration and record it.
+
+    Returns:
+        True if applied, False if another process had already applied it
+    """
+    started = time.monotonic()
+
+    if callable(step):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if _applied(conn, version):
+                conn.execute("ROLLBACK")
+                return False
+            step(conn.cursor())
+            _record(conn, version, name, started)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    else:
+        build_indexes_online(conn, step)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _record(conn, version, name, started)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    logger.info(f"Applied migration {version} ({name}) in {(time.monotonic() - started) * 1000:.0f} ms")
+    return True
+
+
+def migrate(db_path: str, target: Optional[int] = None) -> List[int]:
+    """
+    Apply every migration not yet recorded in schema_version, in order.
+
+    Args:
+        db_path: Path to SQLite database file (created if missing)
+        target: Highest version to apply (default: latest)
+
+    Returns:
+        Versions applied by this call
+
+    Raises:
+        RuntimeError: If the database is newer than this code
+        sqlite3.Error: If a migration fails (it is rolled back; earlier
+            migrations stay applied)
+    """
+    target = LATEST_VERSION if target is None else target
+
+    # Autocommit mode: transactions are explicit, one per migration. Not
+    # profiled: backfills read whole tables on purpose and would show up as
+    # full scans in the services' query profiles
+    conn = connect(db_path, factory=sqlite3.Connection, isolation_level=None)
+    try:
+        ensure_version_table(conn)
+        done = applied_versions(conn)
+        if max(done, default=0) > LATEST_VERSION:
+            raise RuntimeError(
+                f"Database schema version {max(done)} is newer than this release supports ({LATEST_VERSION})"
+            )
+
+        applied = []
+        for number, name, step in MIGRATIONS:
+            if number in done or number > target:
+                continue
+            if _apply(conn, number, name, step):
+                applied.append(number)
+        return applied
+    finally:
+        conn.close()
+
+
+def migration_status(db_path: str) -> List[Dict[str, Any]]:
+    """
+    List every known migration and whether it is applied.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        list: One dict per migration with version, name, applied_at and
+        duration_ms (None when pending)
+    """
+    conn = connect(db_path)
+    try:
+        ensure_version_table(conn)
+        applied = {
+            row['version']: row for row in
+            conn.execute("SELECT version, applied_at, duration_ms FROM schema_version")
+        }
+    finally:
+        conn.close()
+
+    return [
+        {
+            'version': number,
+            'name': name,
+            'applied_at': applied[number]['applied_at'] if number in applied else None,
+            'duration_ms': applied[number]['duration_ms'] if number in applied else None
+        }
+        for number, name, _ in MIGRATIONS
+    ]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Apply database schema migrations')
+    parser.add_argument(
+        '--db-path',
+        default='/opt/rpi-deployment/database/deployment.db',
+        help='Path to database file'
+    )
+    parser.add_argument('--status', action='store_true', help='List migrations and exit')
+    parser.add_argument('--target', type=int, help='Migrate up to this version only')
+    args = parser.parse_args()
+
+    if args.status:
+        for migration in migration_status(args.db_path):
+            state = f"applied {migration['applied_at']}" if migration['applied_at'] else 'pending'
+            print(f"{migration['version']:4d}  {migration['name']:<32} {state}")
+    else:
+        applied = migrate(args.db_path, args.target)
+        print(f"Applied {len(applied)} migration(s): {', '.join(map(str, applied)) or 'none pending'}")
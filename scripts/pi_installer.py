@@ -14,6 +14,7 @@ Features:
 - Downloads master image via HTTP streaming
 - Writes image directly to SD card
 - Reports status to server at each phase
+- Streams write progress (bytes written) to server every few seconds
 - Creates firstrun.sh script for hostname customization
 - Verifies installation (partial checksum for speed)
 - Reboots into newly installed system
@@ -34,6 +35,9 @@ import requests
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+# Seconds between progress reports while writing the image
+PROGRESS_REPORT_INTERVAL = 2.0
+
 
 class PiInstaller:
     """
@@ -76,6 +80,7 @@ class PiInstaller:
         self.no_reboot = no_reboot
         self.skip_customize = skip_customize
         self.hostname = None
+        self.deployment_id = None
         self.config = None
         self.setup_logging()
 
@@ -108,6 +113,7 @@ class PiInstaller:
                 'status': status,
                 'message': message,
                 'hostname': self.hostname,
+                'deployment_id': self.deployment_id,
                 'serial': serial,
                 'mac_address': mac,
                 'error_message': error_message,
@@ -118,6 +124,30 @@ class PiInstaller:
         except Exception as e:
             self.logger.warning(f"Failed to report status: {e}")
 
+    def report_progress(self, bytes_written: int, total_bytes: int):
+        """
+        Report image write progress to server.
+
+        Sent every few seconds during the write, so it is kept small and
+        short-lived: a slow or unreachable server never stalls the write.
+
+        Args:
+            bytes_written: Bytes written to the SD card so far
+            total_bytes: Total image size in bytes
+        """
+        try:
+            requests.post(
+                f"{self.server_url}/api/progress",
+                json={
+                    'hostname': self.hostname,
+                    'bytes_written': bytes_written,
+                    'total_bytes': total_bytes
+                },
+                timeout=1
+            )
+        except Exception as e:
+            self.logger.debug(f"Failed to report progress: {e}")
+
     def get_serial_number(self) -> str:
         """
         Get Raspberry Pi serial number from /proc/cpuinfo.
@@ -213,6 +243,8 @@ class PiInstaller:
 
             # Store assigned hostname
             self.hostname = config.get('hostname', 'unknown')
+            # Echoed on status reports so the server updates this deployment's record
+            self.deployment_id = config.get('deployment_id')
             self.config = config
 
             self.logger.info(f"Config received: v{config['version']}")
@@ -241,8 +273,9 @@ class PiInstaller:
                 response = requests.get(image_url, stream=True, timeout=30)
                 response.raise_for_status()
 
-                total_size = int(response.headers.get('content-length', 0))
+                total_size = int(response.headers.get('content-length', 0)) or expected_size
                 downloaded = 0
+                last_report = time.monotonic()
 
                 self.logger.info(f"Image size: {total_size / (1024**3):.2f} GB")
 
@@ -257,10 +290,15 @@ class PiInstaller:
                             progress = (downloaded / total_size) * 100
                             self.logger.info(f"Progress: {progress:.1f}%")
 
+                        if time.monotonic() - last_report >= PROGRESS_REPORT_INTERVAL:
+                            self.report_progress(downloaded, total_size)
+                            last_report = time.monotonic()
+
                 # Sync to ensure all data is written
                 device.flush()
                 os.fsync(device.fileno())
 
+            self.report_progress(downloaded, total_size)
             self.logger.info("Image write completed")
 
         except Exception as e:
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Query Profiler for Raspberry Pi Deployment System
+
+Records how long every statement run through the shared access layer
+(db_access) takes, so slow dashboard, history and allocation queries can
+be found on a live system:
+
+- Statements are grouped by shape: literals become ?, IN lists of
+  placeholders collapse and whitespace is normalised, so the same query
+  built with different values is counted once
+- Per shape: calls, total/max time, a latency histogram and rows returned
+  (or changed, for INSERT/UPDATE/DELETE)
+- The first time a shape is seen its EXPLAIN QUERY PLAN is captured, and
+  tables read by a full scan are flagged
+- Statements slower than a threshold are logged and kept in a short
+  recent list
+
+Time is the time spent inside SQLite (execute plus every fetch), not the
+time the caller spends between fetches, so a streamed export is not
+charged for writing its output.
+
+Each process has one profiler (`profiler`). Services write its snapshot to
+a JSON file in the log directory every minute (QueryProfileWriter), which
+is what `db_admin.py queries` and the web /system page read for processes
+other than their own.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import re
+import json
+import time
+import bisect
+import logging
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Statements at least this slow (ms) are logged
+DEFAULT_SLOW_QUERY_MS = 100.0
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket holds the rest
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Distinct statement shapes tracked; later shapes are counted under OTHER_STATEMENT
+MAX_STATEMENTS = 500
+
+# Slow statements kept for display
+SLOW_LOG_SIZE = 50
+
+# Raw SQL strings whose shape is remembered (reset when full)
+SHAPE_CACHE_SIZE = 2000
+
+# Rows read ahead per timed fetch when a profiled cursor is iterated
+ITERATE_ROWS = 256
+
+# Default directory and interval for profile snapshots
+DEFAULT_PROFILE_DIR = '/opt/rpi-deployment/logs'
+DEFAULT_PROFILE_INTERVAL = 60.0
+
+PROFILE_PREFIX = 'query_profile_'
+
+OTHER_STATEMENT = '(other statements)'
+
+# Statements whose plan is captured
+PLANNED_KEYWORDS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+ORDER_KEYS = ('total_ms', 'mean_ms', 'max_ms', 'calls', 'rows')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def normalize_statement(sql: str) -> str:
+    """
+    Reduce a statement to its shape.
+
+    Args:
+        sql: SQL text as executed
+
+    Returns:
+        Statement with literals replaced by ?, placeholder lists collapsed
+        to '?, ...' and whitespace collapsed
+    """
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('?, ...', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def full_scans(plan: Optional[List[str]]) -> List[str]:
+    """
+    Tables a query plan reads in full without an index.
+
+    Args:
+        plan: Plan lines as captured by the profiler
+
+    Returns:
+        Table names (or aliases) scanned without an index
+    """
+    tables = []
+    for line in plan or []:
+        match = _FULL_SCAN.match(line.strip())
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: Any = ()) -> List[str]:
+    """
+    Get the query plan of a statement.
+
+    Args:
+        conn: Connection to plan on
+        sql: Statement
+        params: Parameters the statement is run with
+
+    Returns:
+        Plan lines, indented two spaces per level
+    """
+    rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+class QueryProfiler:
+    """Per-shape statement statistics for one process."""
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_QUERY_MS, max_statements: int = MAX_STATEMENTS):
+        """
+        Args:
+            slow_ms: Statements at least this slow (ms) are logged (0 logs none)
+            max_statements: Distinct shapes tracked
+        """
+        self.enabled = os.environ.get('RPI_QUERY_PROFILE', '1') != '0'
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._shapes: Dict[str, str] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded statements."""
+        with self._lock:
+            self._stats: Dict[str, list] = {}
+            self._slow = deque(maxlen=SLOW_LOG_SIZE)
+            self._since = datetime.now().isoformat()
+
+    def shape(self, sql: str) -> str:
+        """Shape of a statement (cached per SQL string)."""
+        shape = self._shapes.get(sql)
+        if shape is None:
+            if len(self._shapes) >= SHAPE_CACHE_SIZE:
+                self._shapes = {}
+            shape = self._shapes[sql] = normalize_statement(sql)
+        return shape
+
+    def is_new(self, shape: str) -> bool:
+        """Whether a shape has not been recorded yet."""
+        return shape not in self._stats and len(self._stats) < self.max_statements
+
+    def record(self, shape: str, seconds: float, rows: int, plan: Optional[List[str]] = None) -> None:
+        """
+        Record one execution of a statement.
+
+        Args:
+            shape: Statement shape (see shape())
+            seconds: Time spent in SQLite
+            rows: Rows returned or changed
+            plan: Query plan, for the first execution of a shape
+        """
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    shape = OTHER_STATEMENT
+                    stats = self._stats.get(shape)
+                if stats is None:
+                    # calls, total ms, max ms, rows, histogram, plan
+                    stats = self._stats[shape] = [0, 0.0, 0.0, 0, [0] * (len(HISTOGRAM_BOUNDS_MS) + 1), plan]
+            stats[0] += 1
+            stats[1] += ms
+            stats[3] += rows
+            if ms > stats[2]:
+                stats[2] = ms
+            stats[4][bisect.bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+        if self.slow_ms and ms >= self.slow_ms:
+            with self._lock:
+                self._slow.append({
+                    'at': datetime.now().isoformat(timespec='seconds'),
+                    'ms': round(ms, 2), 'rows': rows, 'statement': shape
+                })
+            logger.warning(f"Slow query ({ms:.1f} ms, {rows} rows): {shape}")
+
+    def snapshot(self, component: str = '') -> Dict[str, Any]:
+        """
+        Copy of all statistics, JSON-serialisable.
+
+        Args:
+            component: Name of the process (e.g. 'web')
+
+        Returns:
+            dict: 'component', 'pid', 'since', 'updated', 'slow_ms',
+            'statements' (shape -> statistics) and 'slow' (recent slow
+            statements, oldest first)
+        """
+        with self._lock:
+            statements = {
+                shape: {
+                    'calls': calls, 'total_ms': total_ms, 'max_ms': max_ms, 'rows': rows,
+                    'histogram': list(histogram), 'plan': plan, 'full_scans': full_scans(plan)
+                }
+                for shape, (calls, total_ms, max_ms, rows, histogram, plan) in self._stats.items()
+            }
+            slow = list(self._slow)
+        return {
+            'component': component,
+            'pid': os.getpid(),
+            'since': self._since,
+            'updated': datetime.now().isoformat(timespec='seconds'),
+            'slow_ms': self.slow_ms,
+            'statements': statements,
+            'slow': slow,
+        }
+
+    def save(self, path: str, component: str) -> None:
+        """
+        Write a snapshot to a JSON file (atomically).
+
+        Args:
+            path: Destination file
+            component: Name of the process
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.snapshot(component), f)
+        os.replace(temp_path, path)
+
+
+def percentile_ms(stats: Dict[str, Any], fraction: float) -> float:
+    """
+    Estimate a latency percentile from a shape's histogram.
+
+    Args:
+        stats: Statistics of one statement shape
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        Upper bound of the bucket holding the percentile (at most max_ms)
+    """
+    wanted = stats['calls'] * fraction
+    seen = 0
+    for bound, count in zip(HISTOGRAM_BOUNDS_MS, stats['histogram']):
+        seen += count
+        if seen >= wanted:
+            return min(bound, stats['max_ms'])
+    return stats['max_ms']
+
+
+def top_statements(snapshots: List[Dict[str, Any]], limit: int = 10,
+                   order_by: str = 'total_ms') -> List[Dict[str, Any]]:
+    """
+    The most expensive statements across profile snapshots.
+
+    Args:
+        snapshots: Snapshots from QueryProfiler.snapshot() or load_profiles()
+        limit: Statements returned
+        order_by: One of ORDER_KEYS
+
+    Returns:
+        List of dicts: component, statement, calls, total_ms, mean_ms,
+        p50_ms, p95_ms, max_ms, rows, plan, full_scans
+
+    Raises:
+        ValueError: If order_by is unknown
+    """
+    if order_by not in ORDER_KEYS:
+        raise ValueError(f"Unknown order {order_by!r}; use one of {', '.join(ORDER_KEYS)}")
+
+    rows = []
+    for snapshot in snapshots:
+        for shape, stats in snapshot['statements'].items():
+            rows.append({
+                'component': snapshot['component'],
+                'statement': shape,
+                'calls': stats['calls'],
+                'total_ms': round(stats['total_ms'], 2),
+                'mean_ms': round(stats['total_ms'] / stats['calls'], 3),
+                'p50_ms': round(percentile_ms(stats, 0.5), 2),
+                'p95_ms': round(percentile_ms(stats, 0.95), 2),
+                'max_ms': round(stats['max_ms'], 2),
+                'rows': stats['rows'],
+                'plan': stats['plan'],
+                'full_scans': stats['full_scans'],
+            })
+    rows.sort(key=lambda row: row[order_by], reverse=True)
+    return rows[:limit]
+
+
+def recent_slow(snapshots: List[Dict[str, Any]], limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Most recent slow statements across profile snapshots, newest first.
+
+    Args:
+        snapshots: Profile snapshots
+        limit: Entries returned
+
+    Returns:
+        List of dicts: component, at, ms, rows, statement
+    """
+    entries = [
+        {'component': snapshot['component'], **entry}
+        for snapshot in snapshots
+        for entry in snapshot['slow']
+    ]
+    entries.sort(key=lambda entry: entry['at'], reverse=True)
+    return entries[:limit]
+
+
+def profile_path(profile_dir: str, component: str) -> str:
+    """File a component's profile snapshot is written to."""
+    return os.path.join(profile_dir, f"{PROFILE_PREFIX}{component}.json")
+
+
+def load_profiles(profile_dir: str, exclude: str = '') -> List[Dict[str, Any]]:
+    """
+    Read the profile snapshots written by services.
+
+    Args:
+        profile_dir: Directory holding query_profile_<component>.json files
+        exclude: Component to skip (the caller's own, read live instead)
+
+    Returns:
+        List of snapshots; unreadable files are skipped
+    """
+    try:
+        names = sorted(os.listdir(profile_dir))
+    except OSError:
+        return []
+
+    snapshots = []
+    for name in names:
+        if not (name.startswith(PROFILE_PREFIX) and name.endswith('.json')):
+            continue
+        if name == f"{PROFILE_PREFIX}{exclude}.json":
+            continue
+        try:
+            with open(os.path.join(profile_dir, name)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping query profile {name}: {e}")
+    return snapshots
+
+
+# The process-wide profiler used by ProfiledConnection
+profiler = QueryProfiler()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Cursor that reports each statement to the profiler.
+
+    A statement is recorded when its results are exhausted, when the
+    cursor runs another statement or is closed, or when the cursor is
+    garbage collected (`conn.execute(...).fetchone()`). A `for` loop over
+    the cursor reads ITERATE_ROWS rows ahead, so timing costs one call per
+    chunk rather than per row.
+    """
+
+    _profile_shape = None
+    _profile_seconds = 0.0
+    _profile_rows = 0
+    _profile_plan = None
+
+    def _start(self, sql: str, params: Any, seconds: float, plan: bool) -> None:
+        """Begin recording a statement that has just been executed."""
+        shape = profiler.shape(sql)
+        query_plan = None
+        if plan and profiler.is_new(shape) and shape.split(' ', 1)[0].upper() in PLANNED_KEYWORDS:
+            try:
+                query_plan = explain(self.connection, sql, params)
+            except sqlite3.Error:
+                pass
+        if self.description is None:
+            # Nothing to fetch: INSERT/UPDATE/DELETE, DDL, PRAGMA setters
+            profiler.record(shape, seconds, max(self.rowcount, 0), query_plan)
+        else:
+            self._profile_shape = shape
+            self._profile_seconds = seconds
+            self._profile_rows = 0
+            self._profile_plan = query_plan
+
+    def _finish(self) -> None:
+        """Record the current statement, if any."""
+        if self._profile_shape is not None:
+            shape, self._profile_shape = self._profile_shape, None
+            profiler.record(shape, self._profile_seconds, self._profile_rows, self._profile_plan)
+
+    def execute(self, sql, parameters=()):
+        """Execute a statement (timed)."""
+        if self._profile_shape is not None:
+            self._finish()
+        started = time.perf_counter()
+        sqlite3.Cursor.execute(self, sql, parameters)
+        self._start(sql, parameters, time.perf_counter() - started, plan=True)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        """Execute a statement once per parameter set (timed as one)."""
+        if self._profile_shape is not None:
+            self._finish()
+        started = time.perf_counter()
+        sqlite3.Cursor.executemany(self, sql, seq_of_parameters)
+        self._start(sql, (), time.perf_counter() - started, plan=False)
+        return self
+
+    def fetchone(self):
+        """Fetch the next row (timed)."""
+        if self._profile_shape is None:
+            return sqlite3.Cursor.fetchone(self)
+        started = time.perf_counter()
+        row = sqlite3.Cursor.fetchone(self)
+        self._profile_seconds += time.perf_counter() - started
+        if row is None:
+            self._finish()
+        else:
+            self._profile_rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        """Fetch up to size rows (timed)."""
+        size = self.arraysize if size is None else size
+        if self._profile_shape is None:
+            return sqlite3.Cursor.fetchmany(self, size)
+        started = time.perf_counter()
+        rows = sqlite3.Cursor.fetchmany(self, size)
+        self._profile_seconds += time.perf_counter() - started
+        self._profile_rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        """Fetch the remaining rows (timed)."""
+        if self._profile_shape is None:
+            return sqlite3.Cursor.fetchall(self)
+        started = time.perf_counter()
+        rows = sqlite3.Cursor.fetchall(self)
+        self._profile_seconds += time.perf_counter() - started
+        self._profile_rows += len(rows)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        """Iterate over the rows, timing one fetch per ITERATE_ROWS rows."""
+        if self._profile_shape is None:
+            return self
+        return self._iterate()
+
+    def _iterate(self):
+        """Rows of the current statement, read ahead in timed chunks."""
+        while True:
+            rows = self.fetchmany(ITERATE_ROWS)
+            yield from rows
+            if len(rows) < ITERATE_ROWS:
+                return
+
+    def __next__(self):
+        """Fetch the next row (timed)."""
+        if self._profile_shape is None:
+            return sqlite3.Cursor.__next__(self)
+        started = time.perf_counter()
+        try:
+            row = sqlite3.Cursor.__next__(self)
+        except StopIteration:
+            self._profile_seconds += time.perf_counter() - started
+            self._finish()
+            raise
+        self._profile_seconds += time.perf_counter() - started
+        self._profile_rows += 1
+        return row
+
+    def close(self) -> None:
+        """Record the current statement and close the cursor."""
+        self._finish()
+        sqlite3.Cursor.close(self)
+
+    def __del__(self):
+        """Record a statement whose cursor was dropped before its last row."""
+        if self._profile_shape is not None:
+            try:
+                self._finish()
+            except Exception:
+                pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """
+    Connection whose statements are recorded by the profiler.
+
+    While the profiler is disabled it hands out plain cursors, so the only
+    cost left is one method call per statement.
+    """
+
+    def cursor(self, factory=None):
+        """Open a cursor (profiled unless the profiler is disabled)."""
+        if factory is None:
+            factory = ProfiledCursor if profiler.enabled else sqlite3.Cursor
+        return sqlite3.Connection.cursor(self, factory)
+
+    def execute(self, sql, parameters=()):
+        """Execute a statement on a new cursor."""
+        if not profiler.enabled:
+            return sqlite3.Connection.execute(self, sql, parameters)
+        return sqlite3.Connection.cursor(self, ProfiledCursor).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        """Execute a statement per parameter set on a new cursor."""
+        if not profiler.enabled:
+            return sqlite3.Connection.executemany(self, sql, seq_of_parameters)
+        return sqlite3.Connection.cursor(self, ProfiledCursor).executemany(sql, seq_of_parameters)
+
+
+class QueryProfileWriter:
+    """Write the process's profile snapshot to a file on a schedule."""
+
+    def __init__(self, path: str, component: str, interval: float = DEFAULT_PROFILE_INTERVAL):
+        """
+        Args:
+            path: Snapshot file (see profile_path())
+            component: Name of the process
+            interval: Seconds between writes
+        """
+        self.path = path
+        self.component = component
+        self.interval = interval
+
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Writing query profile to {self.path} every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop the writer thread, writing a final snapshot."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Writer loop."""
+        while True:
+            stopping = self._stop.wait(self.interval)
+            try:
+                profiler.save(self.path, self.component)
+            except OSError as e:
+                logger.error(f"Could not write query profile {self.path}: {e}")
+            if stopping:
+                return
@@ -105,8 +105,8 @@ UPDATE master_images
 SET version = '$VERSION',
     checksum = '$IMAGE_CHECKSUM',
     size_bytes = $IMAGE_SIZE,
-    created_at = CURRENT_TIMESTAMP,
-    notes = 'Updated via register_master_image.sh'
+    uploaded_at = CURRENT_TIMESTAMP,
+    description = 'Updated via register_master_image.sh'
 WHERE filename = '$IMAGE_FILENAME';
 EOF
     log_info "Image updated successfully!"
@@ -119,7 +119,7 @@ else
     log_info "Inserting new entry..."
     sqlite3 "$DB_PATH" <<EOF
 INSERT INTO master_images
-(product_type, version, filename, checksum, size_bytes, is_active, created_at, notes)
+(product_type, version, filename, checksum, size_bytes, is_active, uploaded_at, description)
 VALUES (
     '$PRODUCT_TYPE',
     '$VERSION',
@@ -77,14 +77,16 @@ echo ""
 # Step 5: Register in database
 echo "Step 5: Registering in database..."
 sqlite3 /opt/rpi-deployment/database/deployment.db << EOF
-INSERT OR REPLACE INTO master_images (product_type, version, image_path, checksum, size_bytes, created_at, is_active)
+UPDATE master_images SET is_active = 0 WHERE product_type = 'KXP2';
+INSERT OR REPLACE INTO master_images (filename, product_type, version, checksum, size_bytes, description, uploaded_at, is_active)
 VALUES (
+    'kxp2_golden_master.img',
     'KXP2',
     '1.0',
-    '/opt/rpi-deployment/images/kxp2_golden_master.img',
     '$CHECKSUM',
     $(stat -c%s "$IMAGE_DIR/kxp2_golden_master.img"),
-    datetime('now'),
+    'Shrunk golden master, registered by shrink_golden_image.sh',
+    CURRENT_TIMESTAMP,
     1
 );
 EOF
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Synthetic Fleet Generator for Raspberry Pi Deployment System
+
+Builds a realistic, fully consistent deployment database of any size, the
+baseline dataset for the benchmarks (scripts/benchmarks) and the query plan
+check (tests/test_query_plans.py):
+
+- venues V000, V001, ... of decreasing size (the first venues are the
+  busiest, as in a real estate of tracks)
+- a hostname pool per venue: numeric KXP2 kart numbers and RXP2 entries
+  named after their serial number, mostly assigned, some available or
+  retired
+- deployment history spread over the last DAYS days, following the
+  workshop day (HOUR_WEIGHTS), ids increasing with started_at as in
+  production; outcomes follow OUTCOMES (mostly success, a few failure
+  kinds, some deployments that never reported back), and deployments that
+  started in the last IN_FLIGHT_SECONDS are still in progress
+- optionally the oldest deployments already in deployment_history_archive
+- deployment batches in every state, and master images per product with
+  the newest one active
+
+The same seed (and end time) always produces the same database. History
+rows are generated inside SQLite from a hashed row number rather than in
+Python, and the pool and history tables are loaded with their triggers and
+secondary indexes dropped, then indexed, counted (counters, search
+indexes, rollups) and re-armed in one pass: a million deployments take
+well under a minute instead of the hours row-by-row inserts through the
+triggers would, and most of that is building the indexes.
+
+Usage:
+    python3 synthetic_fleet.py DB_PATH [--venues 20] [--pool 10000] [--history 1000000]
+                               [--archive 0] [--days 365] [--batches N] [--seed 42]
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import sys
+import time
+import bisect
+import random
+import hashlib
+import logging
+import sqlite3
+import argparse
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from db_access import connect
+from database_setup import (
+    initialize_database, rebuild_pool_counts, rebuild_deployment_counts, rebuild_archive_counts,
+    rebuild_search_index, rebuild_deployment_rollups
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 42
+
+# Tables loaded with their triggers and secondary indexes dropped
+BULK_TABLES = ('hostname_pool', 'deployment_history', 'deployment_history_archive')
+
+# FTS5 in-memory term buffer while the search indexes are rebuilt (the
+# default, restored afterwards, is 1 MiB): fewer, larger segment flushes
+SEARCH_REBUILD_HASH_SIZE = 64 * 1024 * 1024
+SEARCH_HASH_SIZE = 1024 * 1024
+
+# Share of deployments started in each UTC hour of the day
+HOUR_WEIGHTS = (
+    0, 0, 0, 0, 0, 0, 1, 3,         # 00-07
+    8, 10, 10, 9, 6, 9, 10, 10,     # 08-15
+    8, 6, 4, 2, 1, 1, 0, 0,         # 16-23
+)
+
+# Finished deployments, per thousand:
+# (status, per mille, shortest seconds, spread seconds, error message).
+# 'started' rows without a duration never reported back (power pulled
+# mid-install); they are never archived, so they come last.
+OUTCOMES = (
+    ('success', 935, 420, 480, None),
+    ('failed', 20, 60, 600, 'Checksum mismatch after image write'),
+    ('failed', 20, 30, 300, 'SD card write failed'),
+    ('failed', 10, 5, 60, 'Network timeout downloading image'),
+    ('failed', 10, 120, 300, 'Customization script exited with status 1'),
+    ('started', 5, None, None, None),
+)
+
+# Statuses of deployments started in the last IN_FLIGHT_SECONDS
+IN_PROGRESS_STATUSES = ('started', 'downloading', 'verifying', 'customizing')
+IN_FLIGHT_SECONDS = 900
+
+BATCH_STATES = ('pending', 'active', 'paused', 'completed', 'cancelled')
+
+# Pool composition: share of RXP2 entries, and of KXP2 kart numbers
+# that are assigned / available (the rest are retired)
+RXP2_SHARE = 0.2
+ASSIGNED_SHARE = 0.7
+AVAILABLE_SHARE = 0.25
+
+# Karts per venue deployments are spread over when the pool is left empty
+DEVICES_PER_VENUE = 50
+
+# Master image versions per product, released evenly over the history
+IMAGE_VERSIONS = 8
+
+MAX_VENUES = 1000
+
+# 32-bit multipliers for the per-row hash streams (device, outcome, timing)
+_HASH_MULTIPLIERS = (2246822519, 3266489917, 668265263)
+
+
+def _row_random(stream: int, salt: int) -> str:
+    """
+    SQL expression for a pseudo-random integer in [0, 2**32) of row n.
+
+    Two multiply-shift rounds of a seeded row number: cheap enough for
+    millions of rows, and n never needs to leave SQLite.
+    """
+    return (f"(((((n + {salt}) * 2654435761) % 4294967296) >> 5) * {_HASH_MULTIPLIERS[stream]} + {salt})"
+            f" % 4294967296")
+
+
+def _allocate(total: int, weights: List[float]) -> List[int]:
+    """Split total into integers proportional to weights (cumulative rounding)."""
+    allocation = []
+    weight_sum = sum(weights)
+    done = 0.0
+    assigned = 0
+    for weight in weights:
+        done += weight
+        upto = round(total * done / weight_sum) if weight_sum else 0
+        allocation.append(upto - assigned)
+        assigned = upto
+    return allocation
+
+
+def _hours(end: int, days: int, deployments: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Deployments per clock hour of the window ending at end.
+
+    Returns:
+        (first row number, start epoch, seconds, rows) of every hour
+        that has deployments, in order
+    """
+    pieces = []
+    at = end - days * 86400
+    while at < end:
+        hour_end = min((at // 3600 + 1) * 3600, end)
+        pieces.append((at, hour_end - at))
+        at = hour_end
+
+    rows = _allocate(deployments, [HOUR_WEIGHTS[start // 3600 % 24] * seconds for start, seconds in pieces])
+    hours = []
+    first = 0
+    for (start, seconds), count in zip(pieces, rows):
+        if count:
+            hours.append((first, start, seconds, count))
+            first += count
+    return hours
+
+
+def _devices(rng: random.Random, codes: List[str], weights: List[float], count: int,
+             start: int, end: int) -> List[tuple]:
+    """
+    Pool entries per venue, in proportion to the venue weights.
+
+    Returns:
+        (product_type, venue_code, identifier, sort_key, status, mac_address,
+        serial_number, assigned_date) tuples
+    """
+    devices = []
+    for code, venue_count in zip(codes, _allocate(count, weights)):
+        rxp2 = round(venue_count * RXP2_SHARE)
+        identifiers = set()
+        for k in range(venue_count):
+            serial = f"10000000{rng.getrandbits(32):08x}"
+            mac = f"dc:a6:32:{len(devices) >> 16 & 255:02x}:{len(devices) >> 8 & 255:02x}:{len(devices) & 255:02x}"
+            assigned = datetime.fromtimestamp(rng.randrange(start, end), timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            if k < venue_count - rxp2:
+                # Kart numbers 001, 002, ...
+                share = rng.random()
+                status = ('assigned' if share < ASSIGNED_SHARE
+                          else 'available' if share < ASSIGNED_SHARE + AVAILABLE_SHARE else 'retired')
+                identifier, sort_key, product = f"{k + 1:03d}", k + 1, 'KXP2'
+            else:
+                # RXP2 entries are created on assignment from the serial number
+                status = 'assigned' if rng.random() < 0.9 else 'retired'
+                identifier, sort_key, product = serial[-8:].upper(), None, 'RXP2'
+                if identifier in identifiers:
+                    continue
+                identifiers.add(identifier)
+            devices.append((product, code, identifier, sort_key, status, mac, serial, assigned))
+    return devices
+
+
+def _bulk_load(conn: sqlite3.Connection, load) -> None:
+    """
+    Run load with the BULK_TABLES triggers and secondary indexes dropped.
+
+    Afterwards recreates the indexes, recomputes everything the triggers
+    maintain, and recreates the triggers, all in load's transaction.
+    """
+    names = ', '.join('?' for _ in BULK_TABLES)
+    saved = conn.execute(f"""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name IN ({names}) AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    """, BULK_TABLES).fetchall()
+    for kind, name, _ in saved:
+        conn.execute(f"DROP {kind.upper()} {name}")
+
+    load()
+
+    for kind, _, sql in saved:
+        if kind == 'index':
+            conn.execute(sql)
+    cursor = conn.cursor()
+    rebuild_pool_counts(cursor)
+    rebuild_deployment_counts(cursor)
+    rebuild_archive_counts(cursor)
+    for table in ('deployment_search', 'hostname_search'):
+        conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('hashsize', ?)", (SEARCH_REBUILD_HASH_SIZE,))
+    rebuild_search_index(cursor)
+    for table in ('deployment_search', 'hostname_search'):
+        conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('hashsize', ?)", (SEARCH_HASH_SIZE,))
+    rebuild_deployment_rollups(cursor)
+    for kind, _, sql in saved:
+        if kind == 'trigger':
+            conn.execute(sql)
+
+
+def _timestamp(epoch: Optional[int]) -> Optional[str]:
+    """Format a UTC epoch the way SQLite's CURRENT_TIMESTAMP does."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if epoch else None
+
+
+def _insert_history(conn: sqlite3.Connection, table: str, first: int, stop: int, total: int,
+                    hours: List[Tuple[int, int, int, int]], salts: List[int], outcome_slots: int,
+                    in_flight: int, archived_at: Optional[str] = None) -> None:
+    """
+    Insert deployments first..stop-1 (of total) into table, id = row number + 1.
+
+    Row numbers come from joining each hour (fleet_hours) to the first
+    row_count counters (fleet_counter), hour by hour, so rows arrive in id
+    and started_at order; within an hour deployments are evenly spaced
+    with some jitter. archived_at, if given, fills the archive's
+    archived_at column.
+    """
+    if stop <= first:
+        return
+    archived = ", archived_at" if archived_at else ""
+    firsts = [hour[0] for hour in hours]
+    device, outcome, timing = (_row_random(stream, salt) for stream, salt in enumerate(salts))
+    conn.execute(f"""
+        INSERT INTO {table}
+        (id, hostname, mac_address, serial_number, ip_address, product_type, venue_code,
+         image_version, deployment_status, started_at, completed_at, error_message{archived})
+        WITH seq AS (
+            SELECT h.first_n + c.k AS n, c.k AS k, h.start_at, h.seconds, h.row_count
+            FROM fleet_hours h CROSS JOIN fleet_counter c
+            WHERE h.i BETWEEN :first_hour AND :last_hour AND c.k < h.row_count
+        ),
+        deployment AS (
+            SELECT n, {device} AS device, {outcome} AS outcome, {timing} AS timing,
+                   start_at + (k * seconds + {timing} % seconds) / row_count AS at
+            FROM seq
+            WHERE n >= :first AND n < :stop
+        )
+        SELECT deployment.n + 1, d.hostname, d.mac_address, d.serial_number,
+               '192.168.151.' || (100 + (timing >> 16) % 150), d.product_type, d.venue_code,
+               lower(d.product_type) || '_master_v1.' || (deployment.n * :versions / :total) || '.img',
+               o.status, datetime(at, 'unixepoch'),
+               CASE WHEN o.spread IS NOT NULL
+                    THEN datetime(at + o.shortest + (timing >> 8) % o.spread, 'unixepoch') END,
+               o.error_message{', :archived_at' if archived_at else ''}
+        FROM deployment
+        JOIN fleet_devices d ON d.n = device % :devices
+        JOIN fleet_outcomes o ON o.slot = CASE WHEN at >= :in_flight
+                                               THEN 1000 + outcome % {len(IN_PROGRESS_STATUSES)}
+                                               ELSE outcome % :outcome_slots END
+    """, {
+        'first': first, 'stop': stop, 'total': total, 'archived_at': archived_at,
+        'first_hour': bisect.bisect_right(firsts, first) - 1,
+        'last_hour': bisect.bisect_right(firsts, stop - 1) - 1,
+        'versions': IMAGE_VERSIONS, 'in_flight': in_flight, 'outcome_slots': outcome_slots,
+        'devices': conn.execute("SELECT COUNT(*) FROM fleet_devices").fetchone()[0],
+    })
+
+
+def generate_fleet(db_path: str, venues: int = 20, pool: int = 10000, history: int = 100000,
+                   archive: int = 0, days: int = 365, batches: Optional[int] = None,
+                   seed: int = DEFAULT_SEED, end: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Fill a new database with a synthetic fleet.
+
+    Args:
+        db_path: Database to create (or an initialized but empty one)
+        venues: Number of venues (V000, V001, ...)
+        pool: hostname_pool rows (0 leaves the pool empty; deployments then
+            use DEVICES_PER_VENUE karts per venue)
+        history: deployment_history rows
+        archive: Older rows in deployment_history_archive (before the history)
+        days: Days the history and archive span, ending at end
+        batches: Deployment batches, cycling through BATCH_STATES (default:
+            one per venue, at least one per state)
+        seed: Random seed; the same seed and end give the same database
+        end: When the newest deployment may have started (default: now, UTC)
+
+    Returns:
+        dict: Rows created per table and the seconds taken
+
+    Raises:
+        ValueError: If an argument is out of range or the database already
+            holds venues, pool entries, deployments or batches
+    """
+    if not 1 <= venues <= MAX_VENUES:
+        raise ValueError(f"venues must be between 1 and {MAX_VENUES}: {venues}")
+    if min(pool, history, archive) < 0 or days < 1:
+        raise ValueError("pool, history and archive must not be negative and days must be at least 1")
+    batches = max(venues, len(BATCH_STATES)) if batches is None else batches
+
+    started = time.monotonic()
+    initialize_database(db_path)
+    end = end or datetime.now(timezone.utc)
+    end_at = int((end if end.tzinfo else end.replace(tzinfo=timezone.utc)).timestamp())
+    start_at = end_at - days * 86400
+    # Nothing takes the wall clock, so the same seed and end give the same database
+    created = _timestamp(start_at)
+
+    rng = random.Random(seed)
+    codes = [f"V{n:03d}" for n in range(venues)]
+    weights = [1 / (n + 1) ** 0.5 for n in range(venues)]
+    entries = _devices(rng, codes, weights, pool or venues * DEVICES_PER_VENUE, start_at, end_at)
+    salts = [rng.getrandbits(30) for _ in _HASH_MULTIPLIERS]
+    total = archive + history
+    hours = _hours(end_at, days, total)
+
+    outcome_slots = []
+    for status, per_mille, shortest, spread, error_message in OUTCOMES:
+        outcome_slots += [(status, shortest, spread, error_message)] * per_mille
+    finished_slots = sum(o[1] for o in OUTCOMES if o[3] is not None)
+    outcome_slots = [(slot,) + outcome for slot, outcome in enumerate(outcome_slots)]
+    outcome_slots += [(1000 + n, status, None, None, None) for n, status in enumerate(IN_PROGRESS_STATUSES)]
+
+    conn = connect(db_path, factory=sqlite3.Connection, isolation_level=None)
+    try:
+        for table in ('venues', 'hostname_pool', 'deployment_history', 'deployment_history_archive',
+                      'deployment_batches'):
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                raise ValueError(f"{db_path} already holds {table} rows; generate into a new database")
+
+        # Nothing to protect in a new database: no WAL copy, no fsync
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("CREATE TEMP TABLE fleet_hours (i INTEGER PRIMARY KEY, first_n, start_at, seconds, row_count)")
+        conn.execute("CREATE TEMP TABLE fleet_counter (k INTEGER PRIMARY KEY)")
+        conn.execute("""
+            CREATE TEMP TABLE fleet_devices (
+                n INTEGER PRIMARY KEY, hostname, mac_address, serial_number, product_type, venue_code
+            )
+        """)
+        conn.execute("""
+            CREATE TEMP TABLE fleet_outcomes (slot INTEGER PRIMARY KEY, status, shortest, spread, error_message)
+        """)
+        conn.executemany("INSERT INTO fleet_hours VALUES (?, ?, ?, ?, ?)",
+                         [(i,) + hour for i, hour in enumerate(hours)])
+        conn.executemany("INSERT INTO fleet_counter VALUES (?)",
+                         ((k,) for k in range(max((hour[3] for hour in hours), default=0))))
+        conn.executemany("INSERT INTO fleet_devices VALUES (?, ?, ?, ?, ?, ?)", [
+            (n, f"{product}-{code}-{identifier}", mac, serial, product, code)
+            for n, (product, code, identifier, _, _, mac, serial, _) in enumerate(entries)
+        ])
+        conn.executemany("INSERT INTO fleet_outcomes VALUES (?, ?, ?, ?, ?)", outcome_slots)
+
+        def load():
+            conn.executemany("INSERT INTO venues (code, name, created_at) VALUES (?, ?, ?)",
+                             [(code, f"Venue {code}", created) for code in codes])
+            if pool:
+                conn.executemany("""
+                    INSERT INTO hostname_pool
+                    (product_type, venue_code, identifier, sort_key, status, mac_address, serial_number,
+                     assigned_date, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    entry[:5] + ((entry[5], entry[6], entry[7]) if entry[4] == 'assigned' else (None, None, None))
+                    + (created,)
+                    for entry in entries
+                ])
+            # Archived deployments are all finished, never in flight
+            _insert_history(conn, 'deployment_history_archive', 0, archive, total, hours, salts,
+                            finished_slots, end_at + 1, _timestamp(end_at))
+            _insert_history(conn, 'deployment_history', archive, total, total, hours, salts,
+                            len(outcome_slots) - len(IN_PROGRESS_STATUSES), end_at - IN_FLIGHT_SECONDS)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _bulk_load(conn, load)
+            conn.executemany("""
+                INSERT INTO master_images
+                (filename, product_type, version, size_bytes, checksum, is_active, uploaded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (f"{product.lower()}_master_v1.{n}.img", product, f"1.{n}", 3900000000 + n * 25000000,
+                 hashlib.sha256(f"{product}-1.{n}".encode()).hexdigest(), int(n == IMAGE_VERSIONS - 1),
+                 _timestamp(start_at + (end_at - start_at) * n // IMAGE_VERSIONS))
+                for product in ('KXP2', 'RXP2') for n in range(IMAGE_VERSIONS)
+            ])
+            conn.executemany("""
+                INSERT INTO deployment_batches
+                (venue_code, product_type, total_count, remaining_count, priority, status,
+                 created_at, started_at, completed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [_batch(rng, n, codes, start_at, end_at) for n in range(batches)])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+
+    result = {
+        'venues': venues,
+        'pool': len(entries) if pool else 0,
+        'history': history,
+        'archive': archive,
+        'batches': batches,
+        'seconds': round(time.monotonic() - started, 1),
+    }
+    logger.info(f"Generated synthetic fleet in {db_path}: {result}")
+    return result
+
+
+def _batch(rng: random.Random, n: int, codes: List[str], start: int, end: int) -> tuple:
+    """One deployment_batches row, in state BATCH_STATES[n % len(BATCH_STATES)]."""
+    status = BATCH_STATES[n % len(BATCH_STATES)]
+    total = rng.randint(5, 50)
+    created = rng.randrange(start, end)
+    remaining = {'pending': total, 'completed': 0}.get(status, rng.randint(1, total))
+    started = created + rng.randrange(3600) if status != 'pending' else None
+    completed = started + total * 600 if status == 'completed' else None
+    return (codes[n % len(codes)], 'RXP2' if n % 7 == 6 else 'KXP2', total, remaining, rng.randint(0, 10),
+            status, _timestamp(created), _timestamp(started), _timestamp(completed))
+
+
+def main():
+    """Command-line interface"""
+    parser = argparse.ArgumentParser(description='Generate a synthetic fleet database for benchmarking')
+    parser.add_argument('db_path', help='Database file to create')
+    parser.add_argument('--venues', type=int, default=20, help='Number of venues')
+    parser.add_argument('--pool', type=int, default=10000, help='hostname_pool rows')
+    parser.add_argument('--history', type=int, default=1000000, help='deployment_history rows')
+    parser.add_argument('--archive', type=int, default=0, help='deployment_history_archive rows')
+    parser.add_argument('--days', type=int, default=365, help='Days of history')
+    parser.add_argument('--batches', type=int, help='Deployment batches (default: one per venue)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Random seed')
+    args = parser.parse_args()
+
+    try:
+        result = generate_fleet(args.db_path, args.venues, args.pool, args.history, args.archive,
+                                args.days, args.batches, args.seed)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Generated {result['venues']} venues, {result['pool']} pool entries, "
+          f"{result['history']} deployments ({result['archive']} archived) and "
+          f"{result['batches']} batches in {result['seconds']}s.")
+
+
+if __name__ == '__main__':
+    main()
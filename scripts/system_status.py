@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+System Status Collector for Raspberry Pi Deployment System
+
+Collects service, disk, network and database health on a background
+schedule into a cache, so web requests and WebSocket events read the last
+result instantly instead of forking subprocesses on every call.
+
+Sources (one subprocess per collection at most):
+- Services: a single batched `systemctl show` for every monitored unit
+- Disk: os.statvfs() on the deployment directory
+- Network: /sys/class/net/<interface>/ (operstate, carrier, address, ...)
+- Database: a trivial query against the SQLite file
+
+Concurrent collections are coalesced: while one is running, other callers
+wait for its result rather than starting their own.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+
+from db_access import connect
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background collections
+DEFAULT_INTERVAL = 10.0
+
+# Directory whose filesystem is reported as disk usage
+DEFAULT_DISK_PATH = '/opt/rpi-deployment'
+
+# Kernel network interface directory
+SYS_CLASS_NET = '/sys/class/net'
+
+# Maximum seconds to wait for systemctl
+SYSTEMCTL_TIMEOUT = 5
+
+GB = 1024 ** 3
+
+
+def query_services(services: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the state of several systemd units with one systemctl call.
+
+    Args:
+        services: Unit names (e.g. ['dnsmasq', 'nginx'])
+
+    Returns:
+        Dictionary of service name -> {'running': bool, 'status': str,
+        'sub_state': str|None}. 'status' is the unit's ActiveState
+        ('active', 'inactive', 'failed', ...), as `systemctl is-active`
+        prints it, or 'unknown' if systemctl could not be queried.
+    """
+    unknown = {name: {'running': False, 'status': 'unknown', 'sub_state': None} for name in services}
+    if not services:
+        return unknown
+
+    try:
+        result = subprocess.run(
+            ['systemctl', 'show', '--property=LoadState,ActiveState,SubState', '--'] + list(services),
+            capture_output=True,
+            text=True,
+            timeout=SYSTEMCTL_TIMEOUT
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"systemctl show failed: {e}")
+        return unknown
+
+    if result.returncode != 0:
+        logger.debug(f"systemctl show exited {result.returncode}: {result.stderr.strip()}")
+        return unknown
+
+    # One block of KEY=value lines per unit, in argument order, separated by blank lines
+    blocks = [block for block in result.stdout.strip().split('\n\n') if block.strip()]
+    statuses = dict(unknown)
+    for name, block in zip(services, blocks):
+        properties = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+        active_state = properties.get('ActiveState') or 'unknown'
+        statuses[name] = {
+            'running': active_state == 'active',
+            'status': active_state,
+            'sub_state': properties.get('SubState')
+        }
+    return statuses
+
+
+def disk_usage(path: str = DEFAULT_DISK_PATH) -> Dict[str, Any]:
+    """
+    Get disk usage of the filesystem holding a path, as df reports it.
+
+    Args:
+        path: Any path on the filesystem
+
+    Returns:
+        dict: total_gb, used_gb, available_gb and percent_used (plus
+        'error' if the filesystem could not be read)
+    """
+    try:
+        stat = os.statvfs(path)
+    except OSError as e:
+        return {'total_gb': 0.0, 'used_gb': 0.0, 'available_gb': 0.0, 'percent_used': 0.0, 'error': str(e)}
+
+    total = stat.f_blocks * stat.f_frsize
+    used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+    available = stat.f_bavail * stat.f_frsize
+    # Like df: reserved blocks count as neither used nor available
+    usable = used + available
+
+    return {
+        'total_gb': round(total / GB, 2),
+        'used_gb': round(used / GB, 2),
+        'available_gb': round(available / GB, 2),
+        'percent_used': round(used * 100 / usable, 1) if usable else 0.0
+    }
+
+
+def _read_sys(path: str) -> Optional[str]:
+    """Read a sysfs attribute, returning None if it is absent or unreadable."""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        # e.g. 'carrier' and 'speed' raise EINVAL while the link is down
+        return None
+
+
+def _read_int(path: str) -> Optional[int]:
+    """Read an integer sysfs attribute, or None."""
+    value = _read_sys(path)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def network_interfaces(names: Optional[List[str]] = None, sys_path: str = SYS_CLASS_NET) -> List[Dict[str, Any]]:
+    """
+    Get link state of network interfaces from sysfs.
+
+    Args:
+        names: Interfaces to report (defaults to all except loopback)
+        sys_path: sysfs network class directory
+
+    Returns:
+        list: One dict per interface with name, present, operstate, carrier,
+        mac_address, mtu, speed_mbps, rx_bytes and tx_bytes
+    """
+    if names is None:
+        try:
+            names = sorted(name for name in os.listdir(sys_path) if name != 'lo')
+        except OSError:
+            names = []
+
+    interfaces = []
+    for name in names:
+        base = os.path.join(sys_path, name)
+        present = os.path.isdir(base)
+        carrier = _read_int(os.path.join(base, 'carrier')) if present else None
+        speed = _read_int(os.path.join(base, 'speed')) if present else None
+        interfaces.append({
+            'name': name,
+            'present': present,
+            'operstate': (_read_sys(os.path.join(base, 'operstate')) if present else None) or 'missing',
+            'carrier': bool(carrier) if carrier is not None else False,
+            'mac_address': _read_sys(os.path.join(base, 'address')) if present else None,
+            'mtu': _read_int(os.path.join(base, 'mtu')) if present else None,
+            # -1 when the driver does not know (virtual NICs, link down)
+            'speed_mbps': speed if speed is not None and speed > 0 else None,
+            'rx_bytes': _read_int(os.path.join(base, 'statistics', 'rx_bytes')) if present else None,
+            'tx_bytes': _read_int(os.path.join(base, 'statistics', 'tx_bytes')) if present else None
+        })
+    return interfaces
+
+
+def database_status(db_path: str) -> Dict[str, Any]:
+    """
+    Check database connectivity and size.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        dict: 'accessible' (bool) and 'size_mb' (float), plus 'error' on failure
+    """
+    if not os.path.exists(db_path):
+        return {'accessible': False, 'size_mb': 0.0}
+
+    try:
+        conn = connect(db_path, timeout=1)
+        try:
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        finally:
+            conn.close()
+        return {'accessible': True, 'size_mb': round(os.path.getsize(db_path) / (1024 * 1024), 2)}
+    except (sqlite3.Error, OSError) as e:
+        return {'accessible': False, 'size_mb': 0.0, 'error': str(e)}
+
+
+class SystemStatusCollector:
+    """
+    Periodically collect system status into a thread-safe cache.
+
+    snapshot() never blocks on subprocesses once the first collection has
+    finished; the background thread keeps the cache fresh.
+    """
+
+    def __init__(
+        self,
+        services: List[str],
+        db_path: str,
+        interfaces: Optional[List[str]] = None,
+        disk_path: str = DEFAULT_DISK_PATH,
+        interval: float = DEFAULT_INTERVAL,
+        on_change: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Args:
+            services: systemd units to monitor
+            db_path: SQLite database to check
+            interfaces: Network interfaces to report (defaults to all but lo)
+            disk_path: Path whose filesystem usage is reported
+            interval: Seconds between background collections
+            on_change: Called with the new snapshot when a service, link,
+                database or disk state changes (not on every collection)
+        """
+        self.services = list(services)
+        self.db_path = db_path
+        self.interfaces = interfaces
+        self.disk_path = disk_path
+        self.interval = interval
+        self.on_change = on_change
+
+        self._lock = threading.Lock()
+        self._collecting = threading.Condition(self._lock)
+        self._in_progress = False
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._collections = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def collections(self) -> int:
+        """Number of collections performed so far."""
+        with self._lock:
+            return self._collections
+
+    @staticmethod
+    def _state(snapshot: Dict[str, Any]) -> tuple:
+        """Return the parts of a snapshot whose change is worth pushing."""
+        return (
+            tuple((name, s['status']) for name, s in sorted(snapshot['services'].items())),
+            tuple((i['name'], i['operstate'], i['carrier']) for i in snapshot['network']),
+            snapshot['database']['accessible'],
+            snapshot['disk']['percent_used']
+        )
+
+    def _gather(self) -> Dict[str, Any]:
+        """Read every source (no lock held)."""
+        started = time.monotonic()
+        snapshot = {
+            'services': query_services(self.services),
+            'disk': disk_usage(self.disk_path),
+            'network': network_interfaces(self.interfaces),
+            'database': database_status(self.db_path),
+            'timestamp': datetime.now().isoformat()
+        }
+        snapshot['collection_ms'] = round((time.monotonic() - started) * 1000, 1)
+        return snapshot
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Collect status now and update the cache.
+
+        If another collection is already running, wait for it and return
+        its result instead of starting a second one.
+
+        Returns:
+            The new snapshot
+        """
+        with self._lock:
+            if self._in_progress:
+                self._collecting.wait_for(lambda: not self._in_progress)
+                if self._snapshot is not None:
+                    return self._snapshot
+            self._in_progress = True
+            previous = self._snapshot
+
+        try:
+            snapshot = self._gather()
+        finally:
+            with self._lock:
+                self._in_progress = False
+                self._collecting.notify_all()
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._collections += 1
+
+        if self.on_change and previous is not None and self._state(previous) != self._state(snapshot):
+            try:
+                self.on_change(snapshot)
+            except Exception as e:
+                logger.error(f"Error handling system status change: {e}")
+
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the cached status, collecting once if nothing is cached yet.
+
+        Returns:
+            Status dict with services, disk, network, database and timestamp
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.collect()
+
+    def start(self) -> None:
+        """Start the background collection thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Collecting system status every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop the background collection thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=SYSTEMCTL_TIMEOUT + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Collection loop."""
+        while not self._stop.is_set():
+            try:
+                self.collect()
+            except Exception as e:
+                # A failing source must not stop future collections
+                logger.error(f"System status collection failed: {e}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for BatchScheduler
+
+Tests the in-memory priority queue used by HostnameManager.get_active_batch:
+routing by venue/product, in-process mutation updates, and detection of
+changes made by other connections.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import os
+import sys
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hostname_manager import HostnameManager
+from batch_scheduler import BatchScheduler
+from database_setup import initialize_database
+
+
+class TestBatchScheduler(unittest.TestCase):
+    """Test cases for batch scheduling and routing."""
+
+    def setUp(self):
+        """Create temporary database with venues and pools."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp()
+        initialize_database(self.test_db_path)
+        self.manager = HostnameManager(self.test_db_path)
+
+        self.manager.create_venue('CORO', 'Corona Test')
+        self.manager.create_venue('ARIA', 'Aria Test')
+        self.manager.bulk_import_kart_numbers('CORO', ['001', '002', '003'])
+        self.manager.bulk_import_kart_numbers('ARIA', ['101', '102', '103'])
+
+    def tearDown(self):
+        """Clean up temporary database."""
+        os.close(self.test_db_fd)
+        os.unlink(self.test_db_path)
+
+    def _start(self, venue_code, product_type, count=2, priority=0):
+        """Create and start a batch, returning its id."""
+        batch_id = self.manager.create_deployment_batch(venue_code, product_type, count, priority)
+        self.manager.start_batch(batch_id)
+        return batch_id
+
+    def test_concurrent_product_routing(self):
+        """Test KXP2 and RXP2 batches are routed by device product type."""
+        kxp2 = self._start('CORO', 'KXP2', priority=1)
+        rxp2 = self._start('ARIA', 'RXP2', priority=5)
+
+        self.assertEqual(self.manager.get_active_batch(product_type='KXP2')['id'], kxp2)
+        self.assertEqual(self.manager.get_active_batch(product_type='RXP2')['id'], rxp2)
+        # Without device information the global highest priority batch wins
+        self.assertEqual(self.manager.get_active_batch()['id'], rxp2)
+
+    def test_venue_routing_with_product_fallback(self):
+        """Test venue-specific batch preferred, falling back to product route."""
+        coro = self._start('CORO', 'KXP2', priority=0)
+        aria = self._start('ARIA', 'KXP2', priority=10)
+
+        self.assertEqual(self.manager.get_active_batch('CORO', 'KXP2')['id'], coro)
+        self.assertEqual(self.manager.get_active_batch('ARIA', 'KXP2')['id'], aria)
+        self.assertEqual(self.manager.get_active_batch('TEST', 'KXP2')['id'], aria)
+        self.assertIsNone(self.manager.get_active_batch('CORO', 'RXP2'))
+
+    def test_priority_tie_breaks_by_id(self):
+        """Test equal priorities are served oldest batch first."""
+        first = self._start('CORO', 'KXP2', count=1)
+        self._start('ARIA', 'KXP2', count=1)
+
+        self.assertEqual(self.manager.get_active_batch()['id'], first)
+
+    def test_in_process_mutations_update_queue(self):
+        """Test pause, priority and completion update the queue."""
+        low = self._start('CORO', 'KXP2', count=1, priority=1)
+        high = self._start('ARIA', 'KXP2', count=2, priority=2)
+        self.assertEqual(self.manager.get_active_batch()['id'], high)
+
+        self.manager.update_batch_priority(low, 3)
+        self.assertEqual(self.manager.get_active_batch()['id'], low)
+
+        self.manager.pause_batch(low)
+        self.assertEqual(self.manager.get_active_batch()['id'], high)
+
+        self.manager.start_batch(low)
+        self.manager.assign_from_batch(low, 'aa:bb:cc:dd:ee:ff', 'SERIAL01')
+        self.assertEqual(self.manager.get_active_batch()['id'], high)
+
+    def test_in_process_mutations_do_not_reload(self):
+        """Test in-process mutations are applied without a full reload."""
+        batch_id = self._start('CORO', 'KXP2')
+        self.manager.get_active_batch()
+
+        with patch.object(BatchScheduler, 'load') as mock_load:
+            self.manager.update_batch_priority(batch_id, 7)
+            self.assertEqual(self.manager.get_active_batch()['priority'], 7)
+            mock_load.assert_not_called()
+
+    def test_external_changes_detected(self):
+        """Test changes by another process are picked up via the version counter."""
+        batch_id = self._start('CORO', 'KXP2')
+        self.assertIsNotNone(self.manager.get_active_batch())
+
+        # Another process (e.g. web interface) pauses the batch
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute("UPDATE deployment_batches SET status = 'paused' WHERE id = ?", (batch_id,))
+        conn.commit()
+        conn.close()
+
+        self.assertIsNone(self.manager.get_active_batch())
+
+        # And a second manager sees batches started by the first
+        other = HostnameManager(self.test_db_path)
+        self.manager.start_batch(batch_id)
+        self.assertEqual(other.get_active_batch()['id'], batch_id)
+
+    def test_remaining_count_decrement_applied_in_process(self):
+        """Test assignments bump the queue version and update the queue without a reload."""
+        batch_id = self._start('CORO', 'KXP2', count=3)
+        self.manager.get_active_batch()
+
+        conn = sqlite3.connect(self.test_db_path)
+        before = BatchScheduler.read_version(conn)
+        with patch.object(BatchScheduler, 'load') as mock_load:
+            self.manager.assign_from_batch(batch_id, 'aa:bb:cc:dd:ee:ff', 'SERIAL01')
+            self.assertEqual(self.manager.get_active_batch()['remaining_count'], 2)
+            mock_load.assert_not_called()
+        self.assertEqual(BatchScheduler.read_version(conn), before + 1)
+        conn.close()
+
+    def test_remaining_count_seen_by_other_process(self):
+        """Test another manager (e.g. the web interface) sees assignments from the deployment server."""
+        batch_id = self._start('CORO', 'KXP2', count=3)
+        web = HostnameManager(self.test_db_path)
+        self.assertEqual(web.get_active_batch()['remaining_count'], 3)
+
+        self.manager.assign_from_batch(batch_id, 'aa:bb:cc:dd:ee:01', 'SERIAL01')
+        self.manager.assign_from_batch(batch_id, 'aa:bb:cc:dd:ee:02', 'SERIAL02')
+
+        self.assertEqual(web.get_active_batch()['remaining_count'], 1)
+        self.assertEqual(self.manager.get_active_batch()['remaining_count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
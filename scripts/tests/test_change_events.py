@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Change Events
+
+Tests the Unix socket pub/sub used to push deployment server changes to
+the web interface: delivery, burst coalescing and resilience.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import shutil
+import socket
+import threading
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from change_events import publish, ChangeListener
+
+
+class TestChangeEvents(unittest.TestCase):
+    """Test cases for publishing and receiving change events."""
+
+    def setUp(self):
+        """Create temporary socket directory and start a listener."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, 'run', 'events.sock')
+        self.batches = []
+        self.received = threading.Event()
+        self.listener = ChangeListener(self._collect, socket_path=self.socket_path, coalesce=0.1)
+
+    def tearDown(self):
+        """Stop listener and remove socket directory."""
+        self.listener.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def _collect(self, events):
+        """Listener callback recording each delivered burst."""
+        self.batches.append(events)
+        self.received.set()
+
+    def test_publish_without_listener(self):
+        """Test publishing with nobody listening is a silent no-op."""
+        self.assertFalse(publish('deployment', socket_path=self.socket_path, hostname='KXP2-CORO-001'))
+
+    def test_event_delivered(self):
+        """Test a published event reaches the listener callback."""
+        self.listener.start()
+
+        self.assertTrue(publish('deployment', socket_path=self.socket_path,
+                                hostname='KXP2-CORO-001', status='started'))
+        self.assertTrue(self.received.wait(2))
+
+        self.assertEqual(self.batches[0], [
+            {'type': 'deployment', 'hostname': 'KXP2-CORO-001', 'status': 'started'}
+        ])
+
+    def test_burst_coalesced(self):
+        """Test events published together are delivered in one callback."""
+        self.listener.start()
+
+        for n in range(5):
+            publish('batch', socket_path=self.socket_path, batch_id=n)
+        self.assertTrue(self.received.wait(2))
+        self.listener.stop()
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual([event['batch_id'] for event in self.batches[0]], list(range(5)))
+
+    def test_stale_socket_replaced(self):
+        """Test a leftover socket file from a previous run does not block start."""
+        os.makedirs(os.path.dirname(self.socket_path))
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        stale.bind(self.socket_path)
+        stale.close()
+
+        self.listener.start()
+        publish('pool', socket_path=self.socket_path)
+        self.assertTrue(self.received.wait(2))
+
+    def test_malformed_and_failing_callback_survive(self):
+        """Test bad datagrams and callback errors do not stop the listener."""
+        calls = []
+
+        def flaky(events):
+            calls.append(events)
+            if len(calls) == 1:
+                raise RuntimeError("callback failure")
+            self.received.set()
+
+        self.listener.callback = flaky
+        self.listener.start()
+
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sender.sendto(b'not json', self.socket_path)
+        sender.close()
+        publish('pool', socket_path=self.socket_path, n=1)
+        # Wait out the first burst before sending the second
+        threading.Event().wait(0.3)
+        publish('pool', socket_path=self.socket_path, n=2)
+
+        self.assertTrue(self.received.wait(2))
+        self.assertEqual(calls[-1], [{'type': 'pool', 'n': 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Streaming Data Export
+
+Tests keyset batching, filters and date ranges, CSV/NDJSON formatting
+and on-the-fly gzip compression.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import sqlite3
+import gzip
+import json
+import csv
+import io
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import initialize_database
+import data_export
+from data_export import iter_rows, stream_export, export_filter, export_filename
+
+
+class TestDataExport(unittest.TestCase):
+    """Test streaming exports against a populated database."""
+
+    def setUp(self):
+        """Create a database with deployments and pool entries."""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+        initialize_database(self.db_path)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("INSERT INTO venues (code, name) VALUES (?, ?)",
+                         [('CORO', 'Corona'), ('ARIA', 'Aria')])
+        conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, mac_address, serial_number, product_type, venue_code,
+             deployment_status, started_at, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (f"KXP2-{'CORO' if i % 2 else 'ARIA'}-{i:03d}", f"aa:bb:cc:00:00:{i:02x}", f"1000{i:04d}",
+             'KXP2', 'CORO' if i % 2 else 'ARIA', 'failed' if i % 5 == 0 else 'success',
+             f"2025-10-{10 + i // 10:02d} 12:00:00", 'Write failed, "disk" full' if i % 5 == 0 else None)
+            for i in range(1, 26)
+        ])
+        conn.executemany("""
+            INSERT INTO hostname_pool (product_type, venue_code, identifier, status)
+            VALUES ('KXP2', 'CORO', ?, ?)
+        """, [(f"{i:03d}", 'assigned' if i <= 3 else 'available') for i in range(1, 11)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Remove the database."""
+        os.unlink(self.db_path)
+
+    def _csv_rows(self, chunks):
+        """Parse streamed CSV bytes into a list of rows (header first)."""
+        return list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+
+    def test_batches_follow_primary_key(self):
+        """Test every row is read once across small batches."""
+        batches = list(iter_rows(self.db_path, 'deployments', batch_rows=4))
+        self.assertEqual([len(b) for b in batches], [4, 4, 4, 4, 4, 4, 1])
+        ids = [row[0] for batch in batches for row in batch]
+        self.assertEqual(ids, list(range(1, 26)))
+
+    def test_exact_multiple_of_batch_size(self):
+        """Test a final full batch is followed by a clean stop."""
+        batches = list(iter_rows(self.db_path, 'deployments', batch_rows=5))
+        self.assertEqual(sum(len(b) for b in batches), 25)
+
+    def test_csv_export(self):
+        """Test CSV output has a header and quotes embedded commas and quotes."""
+        rows = self._csv_rows(stream_export(self.db_path, 'deployments', 'csv'))
+        self.assertEqual(rows[0], data_export.EXPORT_DATASETS['deployments']['columns'])
+        self.assertEqual(len(rows), 26)
+        self.assertEqual(rows[5][-1], 'Write failed, "disk" full')
+
+    def test_ndjson_export(self):
+        """Test NDJSON output is one object per line with NULLs preserved."""
+        lines = b''.join(stream_export(self.db_path, 'pool', 'ndjson')).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 10)
+        first = json.loads(lines[0])
+        self.assertEqual(first['identifier'], '001')
+        self.assertEqual(first['status'], 'assigned')
+        self.assertIsNone(first['mac_address'])
+
+    def test_gzip_round_trip(self):
+        """Test gzipped output decompresses to the plain export."""
+        plain = b''.join(stream_export(self.db_path, 'deployments', 'csv'))
+        compressed = b''.join(stream_export(self.db_path, 'deployments', 'csv', compress=True))
+        self.assertEqual(gzip.decompress(compressed), plain)
+
+    def test_filters(self):
+        """Test venue and status filters."""
+        rows = self._csv_rows(stream_export(self.db_path, 'deployments', venue_code='CORO', status='failed'))
+        self.assertEqual([row[0] for row in rows[1:]], ['5', '15', '25'])
+
+        rows = self._csv_rows(stream_export(self.db_path, 'pool', status='assigned'))
+        self.assertEqual(len(rows) - 1, 3)
+
+    def test_date_range(self):
+        """Test since is inclusive and until exclusive."""
+        rows = self._csv_rows(stream_export(self.db_path, 'deployments', since='2025-10-11', until='2025-10-12'))
+        # started_at 2025-10-11 12:00:00 for ids 10-19
+        self.assertEqual([int(row[0]) for row in rows[1:]], list(range(10, 20)))
+
+    def test_empty_export_has_header(self):
+        """Test an export matching nothing still produces a CSV header."""
+        rows = self._csv_rows(stream_export(self.db_path, 'batches'))
+        self.assertEqual(len(rows), 1)
+
+    def test_invalid_arguments_raise_before_output(self):
+        """Test bad arguments raise immediately rather than mid-stream."""
+        with self.assertRaises(ValueError):
+            stream_export(self.db_path, 'venues')
+        with self.assertRaises(ValueError):
+            stream_export(self.db_path, 'deployments', 'xml')
+        with self.assertRaises(ValueError):
+            stream_export(self.db_path, 'pool', status='deleted')
+        with self.assertRaises(ValueError):
+            stream_export(self.db_path, 'deployments', since='yesterday')
+        with self.assertRaises(ValueError):
+            export_filter('deployments', venue_code="CORO' OR 1=1")
+
+    def test_export_uses_primary_key(self):
+        """Test filtered exports still walk the primary key."""
+        clauses, params = export_filter('deployments', venue_code='CORO', status='success')
+        conn = sqlite3.connect(self.db_path)
+        plan = ' '.join(row[3] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM deployment_history WHERE id > ?{clauses} ORDER BY id LIMIT ?",
+            [0] + params + [10]
+        ))
+        conn.close()
+        self.assertIn('INTEGER PRIMARY KEY', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_filename(self):
+        """Test download filenames."""
+        self.assertEqual(export_filename('deployments', 'csv'), 'deployments.csv')
+        self.assertEqual(export_filename('pool', 'ndjson', compress=True), 'pool.ndjson.gz')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Date Filter Validation
+
+Tests that the accepted date filter formats and the error message
+listing them agree.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_filters import check_date, DATE_FORMATS
+
+
+class TestCheckDate(unittest.TestCase):
+    """Test cases for check_date."""
+
+    def test_listed_formats_accepted(self):
+        """Test a value in every format named in the error message is accepted."""
+        examples = {
+            'YYYY-MM-DD': '2025-03-01',
+            'YYYY-MM-DD HH:MM': '2025-03-01 10:30',
+            'YYYY-MM-DD HH:MM:SS': '2025-03-01 10:30:15'
+        }
+        listed = DATE_FORMATS.replace(' or ', ', ').split(', ')
+
+        self.assertEqual(sorted(listed), sorted(examples))
+        for value in examples.values():
+            self.assertEqual(check_date(value), value)
+
+    def test_other_formats_rejected(self):
+        """Test formats that would compare wrongly as text are rejected."""
+        for value in ('03/01/2025', '2025-3-1', '2025-03-01T10:30', '2025-03-01 10', '2025-03-01 '):
+            with self.assertRaises(ValueError) as error:
+                check_date(value, 'since date')
+            self.assertIn(f"Invalid since date '{value}'", str(error.exception))
+            self.assertIn(DATE_FORMATS, str(error.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Shared SQLite Access Layer
+
+Tests connection settings (WAL, busy timeout, synchronous), thread-bound
+reuse, the idle pool, stale connection detection and reader/writer
+concurrency.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import threading
+import sqlite3
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_access
+from db_access import ConnectionPool, connect
+
+
+class TestConnectionSettings(unittest.TestCase):
+    """Test PRAGMAs applied to every connection."""
+
+    def setUp(self):
+        """Create a temporary database path."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+
+    def tearDown(self):
+        """Remove the database and its WAL files."""
+        for name in os.listdir(self.temp_dir):
+            os.unlink(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_pragmas(self):
+        """Test WAL, synchronous=NORMAL, busy timeout and cache settings."""
+        conn = connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], db_access.BUSY_TIMEOUT_MS)
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -db_access.CACHE_SIZE_KIB)
+            self.assertIsInstance(conn.execute("SELECT 1 AS one").fetchone(), sqlite3.Row)
+        finally:
+            conn.close()
+
+    def test_wal_is_persistent(self):
+        """Test a plain connection also sees WAL once a shared one set it."""
+        connect(self.db_path).close()
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        conn.close()
+
+    def test_reader_not_blocked_by_writer(self):
+        """Test a reader sees committed data while a write transaction is open."""
+        writer = connect(self.db_path)
+        writer.execute("CREATE TABLE t (x INTEGER)")
+        writer.execute("INSERT INTO t VALUES (1)")
+        writer.commit()
+
+        writer.execute("INSERT INTO t VALUES (2)")  # left uncommitted
+        reader = connect(self.db_path, timeout=0)
+        try:
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM t").fetchone()[0], 1)
+        finally:
+            reader.close()
+            writer.rollback()
+            writer.close()
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test thread-bound connections and the idle pool."""
+
+    def setUp(self):
+        """Create a database and a private pool."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+        self.pool = ConnectionPool(max_idle=2)
+
+    def tearDown(self):
+        """Close the pool and remove the database files."""
+        self.pool.close_all()
+        for name in os.listdir(self.temp_dir):
+            os.unlink(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def _in_thread(self, func):
+        """Run func in a new thread and return its result."""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_same_thread_reuses_connection(self):
+        """Test repeated gets in one thread return one connection."""
+        first = self.pool.get(self.db_path)
+        self.assertIs(self.pool.get(self.db_path), first)
+        self.assertEqual(self.pool.metrics()['opened'], 1)
+        self.assertEqual(self.pool.metrics()['reused'], 1)
+
+    def test_threads_get_separate_connections(self):
+        """Test a connection is never shared by two threads at once."""
+        mine = self.pool.get(self.db_path)
+        theirs = self._in_thread(lambda: self.pool.get(self.db_path))
+        self.assertIsNot(mine, theirs)
+
+    def test_close_is_a_noop(self):
+        """Test close() leaves a pooled connection usable."""
+        conn = self.pool.get(self.db_path)
+        conn.close()
+        self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_released_connection_is_recycled(self):
+        """Test a released connection is handed to the next thread."""
+        def request():
+            conn = self.pool.get(self.db_path)
+            self.pool.release()
+            return conn
+
+        first = self._in_thread(request)
+        second = self._in_thread(request)
+        self.assertIs(first, second)
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics['opened'], 1)
+        self.assertEqual(metrics['recycled'], 1)
+        self.assertEqual(metrics['idle'], 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        """Test work left uncommitted does not leak into the next user."""
+        conn = self.pool.get(self.db_path)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+        self.pool.release()
+
+        conn = self.pool.get(self.db_path)
+        self.assertFalse(conn.in_transaction)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_idle_pool_is_bounded(self):
+        """Test connections beyond max_idle are closed on release."""
+        barrier = threading.Barrier(4)
+
+        def request():
+            self.pool.get(self.db_path)
+            barrier.wait()
+            self.pool.release()
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics['opened'], 4)
+        self.assertEqual(metrics['idle'], 2)
+        self.assertEqual(metrics['closed'], 2)
+
+    def test_replaced_file_gets_new_connection(self):
+        """Test a connection to a deleted/replaced database is not reused."""
+        old = self.pool.get(self.db_path)
+        old.execute("CREATE TABLE old_schema (x INTEGER)")
+        old.commit()
+
+        for name in os.listdir(self.temp_dir):
+            os.unlink(os.path.join(self.temp_dir, name))
+        sqlite3.connect(self.db_path).execute("CREATE TABLE new_schema (x INTEGER)").connection.close()
+
+        new = self.pool.get(self.db_path)
+        self.assertIsNot(new, old)
+        tables = [row[0] for row in new.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        self.assertEqual(tables, ['new_schema'])
+        self.assertEqual(self.pool.metrics()['stale'], 1)
+
+    def test_close_all(self):
+        """Test close_all closes bound connections; the next get reconnects."""
+        conn = self.pool.get(self.db_path)
+        self.pool.close_all(self.db_path)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+        fresh = self.pool.get(self.db_path)
+        self.assertEqual(fresh.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_concurrent_writers_wait_instead_of_failing(self):
+        """Test writers in several threads all succeed (busy timeout)."""
+        conn = self.pool.get(self.db_path)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        errors = []
+
+        def write(n):
+            try:
+                for i in range(50):
+                    with self.pool.get(self.db_path) as c:
+                        c.execute("INSERT INTO t VALUES (?)", (n * 100 + i,))
+            except sqlite3.Error as e:
+                errors.append(e)
+            finally:
+                self.pool.release()
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Online Database Backups
+
+Tests consistent snapshots under concurrent writes, compression and
+verification, pruning, cancellation, and restore (including a backup
+taken before later schema migrations).
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import threading
+import sqlite3
+import shutil
+import gzip
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import initialize_database, verify_schema
+from db_access import connect, close_connections
+from migrations import initial_schema
+from db_backup import (
+    backup_database, copy_database, list_backups, prune_backups, verify_backup, restore_backup,
+    BackupScheduler
+)
+
+INSERT = """
+    INSERT INTO deployment_history (hostname, venue_code, product_type, deployment_status, started_at)
+    VALUES (?, 'CORO', 'KXP2', 'success', CURRENT_TIMESTAMP)
+"""
+
+
+class TestDatabaseBackup(unittest.TestCase):
+    """Test backup and restore of a deployment database."""
+
+    def setUp(self):
+        """Create a database with 500 deployments and an empty backup directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+        self.backup_dir = os.path.join(self.temp_dir, 'backups')
+        initialize_database(self.db_path)
+        conn = connect(self.db_path)
+        with conn:
+            conn.executemany(INSERT, [(f"KXP2-CORO-{n:03d}",) for n in range(500)])
+        conn.close()
+
+    def tearDown(self):
+        """Close pooled connections and remove the directory."""
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def _count(self, db_path, sql="SELECT COUNT(*) FROM deployment_history"):
+        """Run a single-value query on a fresh connection."""
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute(sql).fetchone()[0]
+        finally:
+            conn.close()
+
+    def _extracted(self, backup_path):
+        """Decompress a backup next to it and return the path."""
+        path = backup_path[:-3]
+        with gzip.open(backup_path, 'rb') as src, open(path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        return path
+
+    def test_compressed_backup(self):
+        """Test a backup is gzipped, verified and holds the data."""
+        result = backup_database(self.db_path, self.backup_dir)
+
+        self.assertTrue(result['path'].endswith('.db.gz'))
+        self.assertLess(result['size_bytes'], result['database_bytes'])
+        # Only the finished backup is left in the directory
+        self.assertEqual(os.listdir(self.backup_dir), [os.path.basename(result['path'])])
+        self.assertTrue(verify_backup(result['path']))
+        self.assertEqual(self._count(self._extracted(result['path'])), 500)
+
+    def test_uncompressed_backup_is_standalone(self):
+        """Test an uncompressed backup opens without a WAL file."""
+        result = backup_database(self.db_path, self.backup_dir, compress=False)
+
+        self.assertEqual(self._count(result['path'], "PRAGMA journal_mode"), 'delete')
+        self.assertEqual(self._count(result['path']), 500)
+
+    def test_snapshot_consistent_under_writes(self):
+        """Test a stepped copy taken while a writer commits is one consistent snapshot."""
+        stop = threading.Event()
+        writing = threading.Event()
+
+        def writer():
+            conn = connect(self.db_path, isolation_level=None)
+            n = 0
+            while not stop.is_set():
+                conn.execute(INSERT, (f"KXP2-CORO-W{n:04d}",))
+                writing.set()
+                n += 1
+            conn.close()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        writing.wait(5)
+        try:
+            snapshot = os.path.join(self.temp_dir, 'snapshot.db')
+            copy_database(self.db_path, snapshot, step_pages=2, pause=0.001)
+        finally:
+            stop.set()
+            thread.join()
+
+        # The trigger-maintained counters agree with the rows they count
+        self.assertEqual(
+            self._count(snapshot),
+            self._count(snapshot, "SELECT SUM(count) FROM deployment_history_counts")
+        )
+        self.assertGreater(self._count(self.db_path), self._count(snapshot))
+        self.assertEqual(self._count(snapshot, "PRAGMA quick_check"), 'ok')
+
+    def test_cancelled_backup_leaves_nothing(self):
+        """Test setting stop abandons the backup without leaving files."""
+        stop = threading.Event()
+        stop.set()
+        with self.assertRaises(RuntimeError):
+            backup_database(self.db_path, self.backup_dir, step_pages=1, stop=stop)
+        self.assertEqual(os.listdir(self.backup_dir), [])
+
+    def test_verify_rejects_damaged_backup(self):
+        """Test a truncated backup fails verification."""
+        path = backup_database(self.db_path, self.backup_dir)['path']
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) // 2)
+        self.assertFalse(verify_backup(path))
+
+    def test_prune_keeps_newest_and_labelled(self):
+        """Test pruning keeps the newest backups and every labelled one."""
+        os.makedirs(self.backup_dir)
+        names = [f"deployment-20251020-0000{n:02d}.db.gz" for n in range(4)]
+        names.append("deployment-20251019-000000-pre-restore.db.gz")
+        for age, name in enumerate(reversed(names)):
+            path = os.path.join(self.backup_dir, name)
+            open(path, 'wb').close()
+            os.utime(path, (1000 + age, 1000 + age))
+
+        removed = prune_backups(self.backup_dir, keep=2)
+
+        self.assertEqual(sorted(os.path.basename(p) for p in removed), names[2:4])
+        self.assertEqual([b['name'] for b in list_backups(self.backup_dir)], names[:2] + names[4:])
+
+    def test_restore(self):
+        """Test restore brings back the backed up data and keeps a safety copy."""
+        path = backup_database(self.db_path, self.backup_dir)['path']
+        conn = connect(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM deployment_history")
+        conn.close()
+
+        result = restore_backup(path, self.db_path, self.backup_dir)
+
+        self.assertEqual(self._count(self.db_path), 500)
+        self.assertTrue(verify_schema(self.db_path))
+        self.assertIn('pre-restore', result['safety_backup'])
+        self.assertEqual(self._count(self._extracted(result['safety_backup'])), 0)
+        self.assertFalse(os.path.exists(self.db_path + '.restore'))
+
+    def test_restore_damaged_backup_leaves_database(self):
+        """Test a damaged backup is refused before the database is touched."""
+        path = os.path.join(self.temp_dir, 'deployment-20251020-000000.db')
+        with open(path, 'wb') as f:
+            f.write(b'not a database' * 100)
+
+        with self.assertRaises(RuntimeError):
+            restore_backup(path, self.db_path, self.backup_dir)
+        self.assertEqual(self._count(self.db_path), 500)
+        self.assertFalse(os.path.exists(self.backup_dir))
+
+    def test_restore_migrates_older_backup(self):
+        """Test a backup taken before later migrations is brought up to date."""
+        old = os.path.join(self.temp_dir, 'deployment-20240101-000000.db')
+        conn = sqlite3.connect(old)
+        initial_schema(conn.cursor())
+        conn.execute("INSERT INTO deployment_history (hostname, deployment_status) VALUES ('KXP2-CORO-001', 'success')")
+        conn.commit()
+        conn.close()
+
+        restore_backup(old, self.db_path, self.backup_dir, safety_backup=False)
+
+        self.assertTrue(verify_schema(self.db_path))
+        self.assertEqual(self._count(self.db_path), 1)
+
+    def test_scheduler_due(self):
+        """Test the scheduler is due with no backups and waits an interval after one."""
+        scheduler = BackupScheduler(self.db_path, self.backup_dir, interval=3600, keep=2)
+        self.assertEqual(scheduler.seconds_until_due(), 0)
+        scheduler.run_once()
+        self.assertGreater(scheduler.seconds_until_due(), 3500)
+        self.assertEqual(len(list_backups(self.backup_dir)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
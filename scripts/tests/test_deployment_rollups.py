@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Deployment Rollups
+
+Tests trigger maintenance on inserts, status transitions, deletes and
+archival, rebuilding from history, and the report queries.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import sqlite3
+import shutil
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import initialize_database, verify_schema
+from history_archive import archive_batch
+from deployment_rollups import rollup_report, recent_deployment_totals, rebuild_rollups, rollup_bucket
+
+
+class TestDeploymentRollups(unittest.TestCase):
+    """Test rollups over a few days of deployments at two venues."""
+
+    def setUp(self):
+        """Create 48 deployments over two days, every other one completed after 10 minutes."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+        initialize_database(self.db_path)
+
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self.conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, product_type, venue_code, deployment_status, started_at, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (f"KXP2-{'CORO' if n % 2 else 'ARIA'}-{n:03d}", 'KXP2' if n % 3 else 'RXP2',
+             'CORO' if n % 2 else 'ARIA', 'success' if n % 2 else 'started',
+             f"2025-10-{1 + n // 24:02d} {n % 24:02d}:05:00",
+             f"2025-10-{1 + n // 24:02d} {n % 24:02d}:15:00" if n % 2 else None)
+            for n in range(48)
+        ])
+
+    def tearDown(self):
+        """Close the connection and remove the database directory."""
+        self.conn.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _rollups(self, table='deployment_rollups_hourly'):
+        """Non-empty rollup rows, sorted."""
+        return self.conn.execute(
+            f"SELECT * FROM {table} WHERE count != 0 OR duration_count != 0 ORDER BY 1, 2, 3, 4"
+        ).fetchall()
+
+    def _rebuilt(self, table='deployment_rollups_hourly'):
+        """Rollup rows recomputed from scratch."""
+        rebuild_rollups(self.db_path)
+        return self._rollups(table)
+
+    def test_schema(self):
+        """Test the rollup tables and triggers are part of the schema."""
+        self.assertTrue(verify_schema(self.db_path))
+
+    def test_daily_report(self):
+        """Test counts and average durations per day."""
+        report = rollup_report(self.conn, granularity='day')
+        self.assertEqual([(r['bucket'], r['deployments'], r['completed'], r['avg_duration_seconds'])
+                          for r in report],
+                         [('2025-10-01', 24, 12, 600.0), ('2025-10-02', 24, 12, 600.0)])
+
+    def test_grouped_hourly_range(self):
+        """Test since/until select hourly buckets and group_by breaks them down."""
+        report = rollup_report(self.conn, since='2025-10-02 22:30', until='2025-10-03',
+                               granularity='hour', group_by=['venue', 'status'])
+        self.assertEqual([(r['bucket'], r['venue_code'], r['deployment_status'], r['deployments'])
+                          for r in report],
+                         [('2025-10-02 22:00:00', 'ARIA', 'started', 1),
+                          ('2025-10-02 23:00:00', 'CORO', 'success', 1)])
+
+    def test_filters(self):
+        """Test venue, product and status filters."""
+        report = rollup_report(self.conn, venue_code='CORO', product_type='RXP2', status='success')
+        self.assertEqual(sum(r['deployments'] for r in report), 8)
+
+    def test_status_transition_moves_count(self):
+        """Test a status update moves the deployment between status rows."""
+        self.conn.execute("""
+            UPDATE deployment_history SET deployment_status = 'failed', completed_at = '2025-10-01 00:35:00'
+            WHERE hostname = 'KXP2-ARIA-000'
+        """)
+        report = rollup_report(self.conn, until='2025-10-02', group_by=['status'])
+        self.assertEqual({r['deployment_status']: r['deployments'] for r in report},
+                         {'failed': 1, 'started': 11, 'success': 12})
+        failed = [r for r in report if r['deployment_status'] == 'failed'][0]
+        self.assertEqual(failed['avg_duration_seconds'], 1800.0)
+        self.assertEqual(self._rollups(), self._rebuilt())
+
+    def test_delete_removes_count(self):
+        """Test deleting a deployment removes it from the rollups."""
+        self.conn.execute("DELETE FROM deployment_history WHERE venue_code = 'ARIA'")
+        self.assertEqual(sum(r['deployments'] for r in rollup_report(self.conn)), 24)
+        self.assertEqual(self._rollups('deployment_rollups_daily'), self._rebuilt('deployment_rollups_daily'))
+
+    def test_archival_keeps_counts(self):
+        """Test archived deployments stay in the rollups."""
+        before = rollup_report(self.conn, granularity='hour', group_by=['venue', 'product', 'status'])
+        self.assertEqual(archive_batch(self.conn, '2025-10-02', batch_rows=100), 12)
+        self.assertEqual(rollup_report(self.conn, granularity='hour', group_by=['venue', 'product', 'status']),
+                         before)
+        self.assertEqual(self._rollups(), self._rebuilt())
+
+    def test_rebuild_repairs_drift(self):
+        """Test a rebuild restores rollups after changes made without triggers."""
+        expected = self._rollups()
+        self.conn.execute("DELETE FROM deployment_rollups_hourly")
+        self.assertEqual(self._rebuilt(), expected)
+
+    def test_recent_totals(self):
+        """Test the dashboard's last 24 hours counts."""
+        self.conn.executemany("""
+            INSERT INTO deployment_history (hostname, venue_code, product_type, deployment_status, started_at)
+            VALUES ('KXP2-CORO-001', 'CORO', 'KXP2', ?, datetime('now', ?))
+        """, [('success', '-1 hours'), ('success', '-2 hours'), ('failed', '-3 hours'),
+              ('success', '-30 hours')])
+        self.assertEqual(recent_deployment_totals(self.conn, 24), (3, 2))
+
+    def test_recent_totals_count_reported_success(self):
+        """Test a success reported to /api/status is counted as successful."""
+        import deployment_server
+        from install_progress import InstallTracker
+
+        deployment_id = self.conn.execute("""
+            INSERT INTO deployment_history (hostname, venue_code, product_type, deployment_status, started_at)
+            VALUES ('KXP2-CORO-001', 'CORO', 'KXP2', 'started', datetime('now', '-1 hours'))
+        """).lastrowid
+
+        with patch('deployment_server.DB_PATH', Path(self.db_path)), \
+                patch('deployment_server.LOG_DIR', Path(self.temp_dir)), \
+                patch('deployment_server.install_tracker', InstallTracker()), \
+                patch('deployment_server.change_events'):
+            response = deployment_server.app.test_client().post('/api/status', json={
+                'status': 'success', 'hostname': 'KXP2-CORO-001', 'deployment_id': deployment_id
+            })
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(recent_deployment_totals(self.conn, 24), (1, 1))
+
+    def test_report_reads_rollup_key(self):
+        """Test a date range report seeks the rollup primary key."""
+        plan = ' '.join(row[3] for row in self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT SUM(count) FROM deployment_rollups_daily WHERE bucket >= ? AND bucket < ?",
+            ('2025-10-01', '2025-10-02')
+        ))
+        self.assertIn('SEARCH', plan)
+        self.assertIn('PRIMARY KEY', plan)
+
+    def test_invalid_arguments(self):
+        """Test bad granularity, grouping and dates are refused."""
+        with self.assertRaises(ValueError):
+            rollup_report(self.conn, granularity='week')
+        with self.assertRaises(ValueError):
+            rollup_report(self.conn, group_by=['hostname'])
+        with self.assertRaises(ValueError):
+            rollup_report(self.conn, since='last tuesday')
+
+    def test_bucket(self):
+        """Test dates map to the bucket containing them."""
+        self.assertEqual(rollup_bucket('2025-10-02 22:30', 'hour'), '2025-10-02 22:00:00')
+        self.assertEqual(rollup_bucket('2025-10-02', 'hour'), '2025-10-02 00:00:00')
+        self.assertEqual(rollup_bucket('2025-10-02 22:30:00', 'day'), '2025-10-02')
+
+
+if __name__ == '__main__':
+    unittest.main()
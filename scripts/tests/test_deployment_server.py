@@ -10,6 +10,7 @@ Tests all deployment server functionality:
 - Status reporting and logging
 - Configuration validation
 - Batch deployment integration
+- Live install progress (memory only, phase transitions persisted)
 
 Author: Raspberry Pi Deployment System (TDD)
 Date: 2025-10-23
@@ -321,6 +322,37 @@ class TestConfigEndpoint(unittest.TestCase):
             deployment = cursor.fetchone()
             self.assertIsNotNone(deployment)
 
+    @patch('deployment_server.hostname_mgr')
+    @patch('deployment_server.DB_PATH')
+    def test_config_endpoint_returns_deployment_id(self, mock_db_path, mock_hostname_mgr):
+        """Test config endpoint returns the ID of the deployment record it created"""
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        mock_hostname_mgr.get_active_batch.return_value = None
+        mock_hostname_mgr.assign_hostname.return_value = "KXP2-CORO-004"
+
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            conn.execute("""
+                INSERT INTO master_images
+                (filename, product_type, version, size_bytes, checksum, is_active)
+                VALUES ('kxp2_master.img', 'KXP2', '1.0', 4000000000, 'abc123', 1)
+            """)
+
+        response = self.client.post('/api/config', json={
+            'product_type': 'KXP2',
+            'venue_code': 'CORO',
+            'serial_number': '12345678',
+            'mac_address': 'aa:bb:cc:dd:ee:ff'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        deployment_id = response.get_json()['deployment_id']
+        with sqlite3.connect(str(self.test_db)) as conn:
+            row = conn.execute(
+                "SELECT hostname, deployment_status FROM deployment_history WHERE id = ?", (deployment_id,)
+            ).fetchone()
+        self.assertEqual(row, ('KXP2-CORO-004', 'started'))
+
 
 class TestStatusEndpoint(unittest.TestCase):
     """Test /api/status endpoint"""
@@ -435,6 +467,139 @@ class TestStatusEndpoint(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+    def _insert_deployments(self, hostname, count):
+        """Insert open deployments of one hostname, oldest first; return their IDs."""
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            return [conn.execute("""
+                INSERT INTO deployment_history (hostname, deployment_status, started_at)
+                VALUES (?, 'started', datetime('now', ?))
+            """, (hostname, f"-{count - n} minutes")).lastrowid for n in range(count)]
+
+    def _statuses(self, hostname):
+        """Deployment statuses of a hostname by record ID."""
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            return dict(conn.execute(
+                "SELECT id, deployment_status FROM deployment_history WHERE hostname = ?", (hostname,)
+            ))
+
+    @patch('deployment_server.DB_PATH')
+    @patch('deployment_server.LOG_DIR')
+    def test_status_updates_deployment_by_id(self, mock_log_dir, mock_db_path):
+        """Test a report with deployment_id updates that record, not the hostname's newest"""
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        mock_log_dir.__truediv__ = Mock(return_value=self.test_log_dir / "deployment_20251023.log")
+        first, second = self._insert_deployments('unknown', 2)
+
+        response = self.client.post('/api/status', json={
+            'status': 'failed',
+            'hostname': 'unknown',
+            'deployment_id': first,
+            'error_message': 'SD card write failed'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._statuses('unknown'), {first: 'failed', second: 'started'})
+
+    @patch('deployment_server.DB_PATH')
+    @patch('deployment_server.LOG_DIR')
+    def test_status_shared_hostname_updates_each_deployment(self, mock_log_dir, mock_db_path):
+        """Test devices sharing a fallback hostname each advance their own record"""
+        from install_progress import InstallTracker
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        mock_log_dir.__truediv__ = Mock(return_value=self.test_log_dir / "deployment_20251023.log")
+        first, second = self._insert_deployments('unknown', 2)
+
+        with patch('deployment_server.install_tracker', InstallTracker()), \
+                self.assertNoLogs('hostname_manager', level='ERROR'):
+            for status in ('downloading', 'success'):
+                for deployment_id in (first, second):
+                    response = self.client.post('/api/status', json={
+                        'status': status,
+                        'hostname': 'unknown',
+                        'deployment_id': deployment_id
+                    })
+                    self.assertEqual(response.status_code, 200)
+                if status == 'downloading':
+                    self.assertEqual(self._statuses('unknown'), {first: 'downloading', second: 'downloading'})
+
+        self.assertEqual(self._statuses('unknown'), {first: 'success', second: 'success'})
+
+    @patch('deployment_server.DB_PATH')
+    @patch('deployment_server.LOG_DIR')
+    def test_status_deployment_id_must_match_hostname(self, mock_log_dir, mock_db_path):
+        """Test a deployment_id belonging to another hostname updates nothing"""
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        mock_log_dir.__truediv__ = Mock(return_value=self.test_log_dir / "deployment_20251023.log")
+        other, = self._insert_deployments('KXP2-CORO-005', 1)
+
+        response = self.client.post('/api/status', json={
+            'status': 'verifying',
+            'hostname': 'KXP2-CORO-006',
+            'deployment_id': other
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._statuses('KXP2-CORO-005'), {other: 'started'})
+
+    @patch('deployment_server.DB_PATH')
+    @patch('deployment_server.LOG_DIR')
+    def test_status_without_id_updates_newest_open_deployment(self, mock_log_dir, mock_db_path):
+        """Test a report without deployment_id updates the hostname's newest open record"""
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        mock_log_dir.__truediv__ = Mock(return_value=self.test_log_dir / "deployment_20251023.log")
+        first, second = self._insert_deployments('KXP2-CORO-007', 2)
+
+        response = self.client.post('/api/status', json={
+            'status': 'customizing',
+            'hostname': 'KXP2-CORO-007'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._statuses('KXP2-CORO-007'), {first: 'started', second: 'customizing'})
+
+    @patch('deployment_server.DB_PATH')
+    @patch('deployment_server.LOG_DIR')
+    def test_status_queued_for_group_commit(self, mock_log_dir, mock_db_path):
+        """Test reports are acknowledged at once and committed by the writer thread"""
+        from write_queue import WriteQueue
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        status_log = self.test_log_dir / "deployment_20251023.log"
+        mock_log_dir.__truediv__ = Mock(return_value=status_log)
+        deployment_id, = self._insert_deployments('KXP2-CORO-009', 1)
+        writer = WriteQueue(commit_interval=0.05)
+        writer.start()
+
+        try:
+            with patch('deployment_server.status_writer', writer), \
+                 patch('deployment_server.change_events') as mock_events:
+                for status in ('downloading', 'success'):
+                    response = self.client.post('/api/status', json={
+                        'status': status,
+                        'hostname': 'KXP2-CORO-009',
+                        'deployment_id': deployment_id
+                    })
+                    self.assertEqual(response.status_code, 200)
+                self.assertTrue(writer.flush())
+                self.assertEqual(mock_events.publish.call_count, 2)
+        finally:
+            writer.stop()
+
+        self.assertEqual(self._statuses('KXP2-CORO-009'), {deployment_id: 'success'})
+        self.assertEqual(len(status_log.read_text().splitlines()), 2)
+        self.assertEqual(writer.stats()['writes'], 2)
+
+    def test_status_invalid_deployment_id(self):
+        """Test a non-numeric deployment_id is rejected"""
+        response = self.client.post('/api/status', json={
+            'status': 'downloading',
+            'hostname': 'KXP2-CORO-008',
+            'deployment_id': 'abc'
+        })
+
+        self.assertEqual(response.status_code, 400)
+
     @patch('deployment_server.LOG_DIR')
     def test_status_endpoint_creates_daily_log(self, mock_log_dir):
         """Test status endpoint writes to daily log file"""
@@ -572,6 +737,293 @@ class TestBatchIntegration(unittest.TestCase):
         self.assertEqual(batch['venue_code'], 'TEST')
 
 
+class TestHostnameLeaseSettlement(unittest.TestCase):
+    """Test /api/status confirms, cancels and extends hostname leases"""
+
+    def setUp(self):
+        """Set up test client, database and a hostname leased to an install"""
+        import sqlite3
+        from install_progress import InstallTracker
+        self.test_dir = tempfile.mkdtemp()
+        self.test_db = Path(self.test_dir) / "test.db"
+        self.test_log_dir = Path(self.test_dir) / "logs"
+        self.test_log_dir.mkdir(parents=True, exist_ok=True)
+        initialize_database(str(self.test_db))
+
+        self.manager = HostnameManager(str(self.test_db))
+        self.manager.create_venue('CORO', 'Corona Test')
+        self.manager.bulk_import_kart_numbers('CORO', ['001'])
+        self.hostname = self.manager.assign_hostname('KXP2', 'CORO', mac_address='dc:a6:32:00:00:01',
+                                                     lease_seconds=60)
+        with sqlite3.connect(str(self.test_db)) as conn:
+            conn.execute("""
+                INSERT INTO deployment_history (hostname, deployment_status, started_at)
+                VALUES (?, 'started', CURRENT_TIMESTAMP)
+            """, (self.hostname,))
+
+        self.patches = [
+            patch('deployment_server.hostname_mgr', self.manager),
+            patch('deployment_server.install_tracker', InstallTracker()),
+            patch('deployment_server.change_events'),
+        ]
+        for p in self.patches:
+            p.start()
+
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _post_status(self, status):
+        """Post a status report with DB and log paths redirected"""
+        with patch('deployment_server.DB_PATH') as mock_db_path, \
+                patch('deployment_server.LOG_DIR') as mock_log_dir:
+            mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+            mock_log_dir.__truediv__ = Mock(return_value=self.test_log_dir / "deployment_20251023.log")
+            return self.client.post('/api/status', json={
+                'status': status,
+                'hostname': self.hostname,
+                'serial': '12345678'
+            })
+
+    def _pool_entry(self):
+        """(status, lease_expires_at, deployment_status) of the leased hostname"""
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            return conn.execute("""
+                SELECT p.status, p.lease_expires_at, h.deployment_status
+                FROM hostname_pool p, deployment_history h
+                WHERE p.identifier = '001' AND h.hostname = ?
+            """, (self.hostname,)).fetchone()
+
+    def test_success_confirms_lease(self):
+        """Test success status confirms the reservation"""
+        self.assertEqual(self._post_status('success').status_code, 200)
+        self.assertEqual(self._pool_entry(), ('assigned', None, 'success'))
+
+    def test_failed_cancels_lease(self):
+        """Test failed status returns the reservation to the pool"""
+        self.assertEqual(self._post_status('failed').status_code, 200)
+        self.assertEqual(self._pool_entry(), ('available', None, 'failed'))
+
+    def test_progress_extends_lease(self):
+        """Test progress statuses keep the reservation alive"""
+        _, expires, _ = self._pool_entry()
+        self.assertEqual(self._post_status('downloading').status_code, 200)
+
+        status, extended, deployment_status = self._pool_entry()
+        self.assertEqual((status, deployment_status), ('assigned', 'downloading'))
+        self.assertGreater(extended, expires)
+
+    def test_lease_committed_with_status(self):
+        """Test a status update that fails leaves the lease unsettled too"""
+        with patch('deployment_server.STATUS_BY_HOSTNAME', 'no_such_column = ?'):
+            self.assertEqual(self._post_status('success').status_code, 500)
+
+        status, expires, deployment_status = self._pool_entry()
+        self.assertEqual((status, deployment_status), ('assigned', 'started'))
+        self.assertIsNotNone(expires)
+
+    def test_no_writes_on_request_thread(self):
+        """Test lease settlement is queued with the status update while the writer runs"""
+        import threading
+        from write_queue import WriteQueue
+        from query_profiler import profiler
+
+        writes = []
+        record = profiler.record
+
+        def record_thread(shape, *args, **kwargs):
+            if shape.split(' ', 1)[0].upper() in ('INSERT', 'UPDATE', 'DELETE', 'BEGIN', 'COMMIT'):
+                writes.append((threading.current_thread(), shape))
+            return record(shape, *args, **kwargs)
+
+        writer = WriteQueue(commit_interval=0.05)
+        writer.start()
+        try:
+            with patch('deployment_server.status_writer', writer), \
+                    patch.object(profiler, 'enabled', True), \
+                    patch.object(profiler, 'record', side_effect=record_thread):
+                for status in ('downloading', 'success'):
+                    self.assertEqual(self._post_status(status).status_code, 200)
+                self.assertTrue(writer.flush())
+        finally:
+            writer.stop()
+
+        self.assertEqual([shape for thread, shape in writes if thread is threading.current_thread()], [])
+        self.assertTrue(any('hostname_pool' in shape for _, shape in writes))
+        self.assertEqual(self._pool_entry(), ('assigned', None, 'success'))
+        self.assertEqual(writer.stats()['writes'], 2)
+
+
+class TestInstallProgress(unittest.TestCase):
+    """Test /api/progress and phase-transition persistence"""
+
+    def setUp(self):
+        """Set up test client, database and a fresh install tracker"""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_db = Path(self.test_dir) / "test.db"
+        self.test_log_dir = Path(self.test_dir) / "logs"
+        self.test_log_dir.mkdir(parents=True, exist_ok=True)
+        initialize_database(str(self.test_db))
+
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            conn.execute("""
+                INSERT INTO deployment_history (hostname, deployment_status, started_at)
+                VALUES ('KXP2-CORO-001', 'started', CURRENT_TIMESTAMP)
+            """)
+
+        from install_progress import InstallTracker
+        self.tracker_patch = patch('deployment_server.install_tracker', InstallTracker())
+        self.tracker = self.tracker_patch.start()
+
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.tracker_patch.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _post_status(self, status, **fields):
+        """Post a status report with DB and log paths redirected"""
+        with patch('deployment_server.DB_PATH') as mock_db_path, \
+                patch('deployment_server.LOG_DIR') as mock_log_dir, \
+                patch('deployment_server.hostname_mgr'):
+            mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+            mock_log_dir.__truediv__ = Mock(return_value=self.test_log_dir / "deployment_20251023.log")
+            return self.client.post('/api/status', json={
+                'status': status,
+                'hostname': 'KXP2-CORO-001',
+                'serial': '12345678',
+                **fields
+            })
+
+    def _statuses(self):
+        """Deployment statuses by record ID."""
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            return dict(conn.execute("SELECT id, deployment_status FROM deployment_history"))
+
+    @patch('deployment_server.DB_PATH')
+    def test_progress_updates_memory_only(self, mock_db_path):
+        """Test progress posts never open the database"""
+        mock_db_path.__str__ = Mock(side_effect=AssertionError("database accessed"))
+
+        response = self.client.post('/api/progress', json={
+            'hostname': 'KXP2-CORO-001',
+            'bytes_written': 512 * 1024 * 1024,
+            'total_bytes': 4 * 1024 ** 3
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['received'])
+        entry = self.tracker.get('KXP2-CORO-001')
+        self.assertEqual(entry['bytes_written'], 512 * 1024 * 1024)
+        self.assertEqual(entry['total_bytes'], 4 * 1024 ** 3)
+
+    def test_progress_requires_hostname_and_bytes(self):
+        """Test malformed progress posts are rejected"""
+        response = self.client.post('/api/progress', json={'bytes_written': 10})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/progress', json={'hostname': 'KXP2-CORO-001', 'bytes_written': 'lots'})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('deployment_server.change_events.publish')
+    def test_repeated_phase_not_persisted(self, mock_publish):
+        """Test only phase transitions update deployment_history"""
+        import sqlite3
+        self.assertEqual(self._post_status('downloading').status_code, 200)
+
+        with sqlite3.connect(str(self.test_db)) as conn:
+            conn.execute("UPDATE deployment_history SET deployment_status = 'marker'")
+
+        # Same phase again: memory only, the marker survives
+        self.assertEqual(self._post_status('downloading').status_code, 200)
+        with sqlite3.connect(str(self.test_db)) as conn:
+            status = conn.execute("SELECT deployment_status FROM deployment_history").fetchone()[0]
+        self.assertEqual(status, 'marker')
+        self.assertEqual(mock_publish.call_count, 1)
+
+        # New phase: persisted
+        self.assertEqual(self._post_status('verifying').status_code, 200)
+        with sqlite3.connect(str(self.test_db)) as conn:
+            status = conn.execute("SELECT deployment_status FROM deployment_history").fetchone()[0]
+        self.assertEqual(status, 'verifying')
+        self.assertEqual(self.tracker.get('KXP2-CORO-001')['phase'], 'verifying')
+
+    @patch('deployment_server.change_events.publish')
+    def test_shared_hostname_deployments_persisted(self, mock_publish):
+        """Test installs sharing a hostname each persist their phase by deployment_id"""
+        import sqlite3
+        with sqlite3.connect(str(self.test_db)) as conn:
+            first, second = [conn.execute("""
+                INSERT INTO deployment_history (hostname, deployment_status, started_at)
+                VALUES ('unknown', 'started', CURRENT_TIMESTAMP)
+            """).lastrowid for _ in range(2)]
+
+        for deployment_id in (first, second):
+            response = self._post_status('downloading', hostname='unknown', deployment_id=deployment_id)
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self._statuses()[first], 'downloading')
+        self.assertEqual(self._statuses()[second], 'downloading')
+
+    @patch('deployment_server.change_events.publish')
+    @patch('deployment_server.DB_PATH')
+    def test_reinstall_first_phase_persisted(self, mock_db_path, mock_publish):
+        """Test a new deployment's first phase is persisted even if the last install stopped there"""
+        import sqlite3
+        mock_db_path.__str__ = Mock(return_value=str(self.test_db))
+        with sqlite3.connect(str(self.test_db)) as conn:
+            conn.execute("""
+                INSERT INTO master_images
+                (filename, product_type, version, size_bytes, checksum, is_active)
+                VALUES ('kxp2_master.img', 'KXP2', '1.0', 4000000000, 'abc123', 1)
+            """)
+        self._post_status('downloading')
+
+        # The device lost power; the reinstall gets a new record
+        with patch('deployment_server.hostname_mgr') as mock_hostname_mgr:
+            mock_hostname_mgr.get_active_batch.return_value = None
+            mock_hostname_mgr.assign_hostname.return_value = 'KXP2-CORO-001'
+            response = self.client.post('/api/config', json={
+                'product_type': 'KXP2',
+                'venue_code': 'CORO',
+                'serial_number': '12345678'
+            })
+        deployment_id = response.get_json()['deployment_id']
+        self.assertEqual(self._statuses()[deployment_id], 'started')
+
+        self.assertEqual(self._post_status('downloading').status_code, 200)
+        self.assertEqual(self._statuses()[deployment_id], 'downloading')
+
+    @patch('deployment_server.change_events.publish')
+    def test_publish_install_progress_chunks(self, mock_publish):
+        """Test large progress deltas are split across several events"""
+        from deployment_server import publish_install_progress, PROGRESS_EVENT_CHUNK
+
+        for i in range(PROGRESS_EVENT_CHUNK + 5):
+            self.tracker.update_progress(f'KXP2-CORO-{i:03d}', 1024, 4096)
+        _, updated, _ = self.tracker.changes_since(0)
+
+        publish_install_progress(updated, ['KXP2-CORO-999'])
+
+        self.assertEqual(mock_publish.call_count, 2)
+        first, second = mock_publish.call_args_list
+        self.assertEqual(first[0][0], 'progress')
+        self.assertEqual(len(first[1]['installs']), PROGRESS_EVENT_CHUNK)
+        self.assertEqual(first[1]['removed'], ['KXP2-CORO-999'])
+        self.assertEqual(len(second[1]['installs']), 5)
+        self.assertEqual(second[1]['removed'], [])
+
+
 class TestErrorHandling(unittest.TestCase):
     """Test error handling in deployment server"""
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Deployment History Archival
+
+Tests which rows are archived, batching, counters, search and id
+preservation, and that a writer is not blocked for the whole run.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import threading
+import sqlite3
+import shutil
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import initialize_database, verify_schema
+from history_archive import archive_history, archive_batch, archive_status, archive_cutoff, HistoryArchiver
+
+
+class TestHistoryArchive(unittest.TestCase):
+    """Test archiving a database with old and recent deployments."""
+
+    def setUp(self):
+        """Create 100 old finished, 10 old in-progress and 20 recent deployments."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+        initialize_database(self.db_path)
+
+        rows = []
+        for n in range(100):
+            rows.append((f"KXP2-CORO-{n:03d}", f"10000000{n:08x}", 'CORO' if n % 2 else 'ARIA',
+                         'failed' if n % 10 == 0 else 'success', f"-{200 - n} days"))
+        for n in range(10):
+            rows.append((f"KXP2-CORO-{n:03d}", None, 'CORO', 'started', f"-{150 - n} days"))
+        for n in range(20):
+            rows.append((f"KXP2-CORO-{n:03d}", None, 'CORO', 'success', f"-{n} hours"))
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, serial_number, product_type, venue_code, deployment_status, started_at)
+            VALUES (?, ?, 'KXP2', ?, ?, datetime('now', ?))
+        """, rows)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Remove the database directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _query(self, sql, params=()):
+        """Run a query on a fresh connection."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_archives_only_old_finished_rows(self):
+        """Test recent and in-progress deployments stay in the hot table."""
+        self.assertEqual(archive_history(self.db_path, older_than_days=90, pause=0), 100)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM deployment_history")[0][0], 30)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM deployment_history_archive")[0][0], 100)
+        self.assertEqual(self._query(
+            "SELECT COUNT(*) FROM deployment_history WHERE deployment_status = 'started'"
+        )[0][0], 10)
+        self.assertTrue(verify_schema(self.db_path))
+
+    def test_rerun_is_a_noop(self):
+        """Test a second run moves nothing."""
+        archive_history(self.db_path, older_than_days=90, pause=0)
+        self.assertEqual(archive_history(self.db_path, older_than_days=90, pause=0), 0)
+
+    def test_small_batches(self):
+        """Test each batch moves at most batch_rows rows."""
+        self.assertEqual(archive_history(self.db_path, 90, batch_rows=30, max_batches=2, pause=0), 60)
+        self.assertEqual(archive_history(self.db_path, 90, batch_rows=30, pause=0), 40)
+
+    def test_ids_and_columns_preserved(self):
+        """Test archived rows keep their id and data."""
+        before = self._query("SELECT id, hostname, serial_number, deployment_status, started_at "
+                             "FROM deployment_history WHERE serial_number IS NOT NULL ORDER BY id")
+        archive_history(self.db_path, older_than_days=90, pause=0)
+        after = self._query("SELECT id, hostname, serial_number, deployment_status, started_at "
+                            "FROM deployment_history_archive ORDER BY id")
+        self.assertEqual(after, before)
+
+    def test_counters_follow_rows(self):
+        """Test hot and archive counters both match their tables."""
+        archive_history(self.db_path, older_than_days=90, pause=0)
+        for table, counts in (('deployment_history', 'deployment_history_counts'),
+                              ('deployment_history_archive', 'deployment_archive_counts')):
+            self.assertEqual(
+                self._query(f"SELECT deployment_status, SUM(count) FROM {counts} "
+                            f"WHERE count > 0 GROUP BY deployment_status ORDER BY 1"),
+                self._query(f"SELECT deployment_status, COUNT(*) FROM {table} GROUP BY 1 ORDER BY 1")
+            )
+
+    def test_archived_rows_leave_search_index(self):
+        """Test the hot search index no longer returns archived rows."""
+        archive_history(self.db_path, older_than_days=90, pause=0)
+        self.assertEqual(self._query(
+            "SELECT COUNT(*) FROM deployment_search WHERE deployment_search MATCH '\"1000000000000005\"'"
+        )[0][0], 0)
+
+    def test_union_view(self):
+        """Test deployment_history_all returns every deployment once."""
+        archive_history(self.db_path, older_than_days=90, pause=0)
+        self.assertEqual(self._query("SELECT COUNT(*), COUNT(DISTINCT id) FROM deployment_history_all")[0],
+                         (130, 130))
+
+    def test_new_ids_never_collide(self):
+        """Test ids of new deployments stay above archived ones."""
+        archive_history(self.db_path, older_than_days=0, pause=0)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM deployment_history")
+        new_id = conn.execute(
+            "INSERT INTO deployment_history (hostname, deployment_status) VALUES ('KXP2-CORO-001', 'started')"
+        ).lastrowid
+        conn.commit()
+        conn.close()
+        self.assertGreater(new_id, self._query("SELECT MAX(id) FROM deployment_history_archive")[0][0])
+
+    def test_status(self):
+        """Test hot, archived and due counts."""
+        status = archive_status(self.db_path, older_than_days=90)
+        self.assertEqual((status['hot_rows'], status['archived_rows'], status['due_rows']), (130, 0, 100))
+        self.assertIsNone(status['oldest_archived'])
+
+        archive_history(self.db_path, older_than_days=90, pause=0)
+        status = archive_status(self.db_path, older_than_days=90)
+        self.assertEqual((status['hot_rows'], status['archived_rows'], status['due_rows']), (30, 100, 0))
+
+    def test_batch_uses_status_index(self):
+        """Test selecting a batch seeks the status index instead of scanning."""
+        plan = ' '.join(row[3] for row in self._query(
+            "EXPLAIN QUERY PLAN SELECT id FROM deployment_history "
+            "WHERE deployment_status IN ('success', 'failed', 'completed') AND started_at < ? LIMIT 500",
+            (archive_cutoff(90),)
+        ))
+        self.assertIn('idx_deployment_status_started', plan)
+        self.assertNotIn('SCAN', plan)
+
+    def test_writer_proceeds_between_batches(self):
+        """Test a status write lands while a long archival run is in progress."""
+        started = threading.Event()
+        done = []
+
+        def writer():
+            started.wait()
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("INSERT INTO deployment_history (hostname, deployment_status) VALUES ('KXP2-CORO-999', 'started')")
+            conn.commit()
+            conn.close()
+            done.append(True)
+
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        thread = threading.Thread(target=writer)
+        thread.start()
+        archive_batch(conn, archive_cutoff(90), batch_rows=10)
+        started.set()
+        thread.join()
+        self.assertEqual(done, [True])
+        while archive_batch(conn, archive_cutoff(90), batch_rows=10):
+            pass
+        conn.close()
+        self.assertEqual(self._query("SELECT COUNT(*) FROM deployment_history_archive")[0][0], 100)
+
+    def test_invalid_arguments(self):
+        """Test negative retention and empty batches are refused."""
+        with self.assertRaises(ValueError):
+            archive_history(self.db_path, older_than_days=-1)
+        with self.assertRaises(ValueError):
+            archive_history(self.db_path, batch_rows=0)
+
+    def test_archiver_run_once(self):
+        """Test the scheduled archiver records its last run."""
+        archiver = HistoryArchiver(self.db_path, older_than_days=90)
+        self.assertEqual(archiver.run_once(), 100)
+        self.assertEqual(archiver.last_archived, 100)
+        self.assertIsNotNone(archiver.last_run)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -663,6 +663,829 @@ class TestVenueStatistics(unittest.TestCase):
         self.assertEqual(stats['total'], 0)
 
 
+class TestPoolCounters(unittest.TestCase):
+    """Test trigger-maintained hostname_pool_counts table"""
+
+    def setUp(self):
+        """Create temporary database and initialize manager"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        from hostname_manager import HostnameManager
+        self.manager = HostnameManager(self.db_path)
+
+        self.manager.create_venue(code='CORO', name='Corona')
+        self.manager.create_venue(code='ARIA', name='Aria')
+        self.manager.bulk_import_kart_numbers('CORO', ['001', '002', '003', '004', '005'])
+        self.manager.bulk_import_kart_numbers('ARIA', ['101', '102'])
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def _counters(self):
+        """Return counter table contents as {(venue, product, status): count}"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT venue_code, product_type, status, count FROM hostname_pool_counts WHERE count > 0"
+        )
+        result = {(row[0], row[1], row[2]): row[3] for row in cursor.fetchall()}
+        conn.close()
+        return result
+
+    def _recount(self):
+        """Return the same breakdown computed directly from hostname_pool"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT venue_code, product_type, status, COUNT(*)
+            FROM hostname_pool
+            GROUP BY venue_code, product_type, status
+        """)
+        result = {(row[0], row[1], row[2]): row[3] for row in cursor.fetchall()}
+        conn.close()
+        return result
+
+    def test_counters_track_import(self):
+        """Test bulk import increments available counters"""
+        self.assertEqual(self._counters()[('CORO', 'KXP2', 'available')], 5)
+        self.assertEqual(self._counters(), self._recount())
+
+    def test_counters_track_assign_and_release(self):
+        """Test assignment, RXP2 creation and release keep counters exact"""
+        self.manager.assign_hostname('KXP2', 'CORO')
+        self.manager.assign_hostname('KXP2', 'CORO')
+        self.manager.assign_hostname('RXP2', 'ARIA', serial_number='10000000ABCD1234')
+        self.manager.release_hostname('KXP2-CORO-001')
+
+        counters = self._counters()
+        self.assertEqual(counters[('CORO', 'KXP2', 'available')], 4)
+        self.assertEqual(counters[('CORO', 'KXP2', 'assigned')], 1)
+        self.assertEqual(counters[('ARIA', 'RXP2', 'assigned')], 1)
+        self.assertEqual(counters, self._recount())
+
+    def test_counters_track_direct_sql(self):
+        """Test counters follow updates and deletes made outside the manager"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE hostname_pool SET status = 'retired' WHERE identifier = '005'")
+        conn.execute("DELETE FROM hostname_pool WHERE identifier = '101'")
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self._counters(), self._recount())
+
+    def test_list_venues_uses_counters(self):
+        """Test list_venues reports counts matching the pool"""
+        self.manager.assign_hostname('KXP2', 'CORO')
+        venues = {v['code']: v for v in self.manager.list_venues()}
+
+        self.assertEqual(venues['CORO']['kxp2_available'], 4)
+        self.assertEqual(venues['CORO']['kxp2_assigned'], 1)
+        self.assertEqual(venues['ARIA']['kxp2_available'], 2)
+        self.assertEqual(venues['ARIA']['rxp2_assigned'], 0)
+
+    def test_initialize_backfills_counters(self):
+        """Test re-running initialize_database rebuilds counters from the pool"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM hostname_pool_counts")
+        # Re-run the counters migration, as on a database that predates it
+        conn.execute("DELETE FROM schema_version WHERE name = 'pool_counters'")
+        conn.commit()
+        conn.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        self.assertEqual(self._counters(), self._recount())
+
+
+class TestDeploymentCounters(unittest.TestCase):
+    """Test trigger-maintained deployment_history_counts table"""
+
+    def setUp(self):
+        """Create temporary database with a few deployments"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT INTO deployment_history (hostname, product_type, venue_code, deployment_status, started_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, [
+            ('KXP2-CORO-001', 'KXP2', 'CORO', 'started'),
+            ('KXP2-CORO-002', 'KXP2', 'CORO', 'started'),
+            ('RXP2-ARIA-10000000', 'RXP2', 'ARIA', 'started'),
+            ('unknown', None, None, 'failed')
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def _counters(self):
+        """Return counter table contents as {(venue, product, status): count}"""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("""
+            SELECT venue_code, product_type, deployment_status, count
+            FROM deployment_history_counts WHERE count > 0
+        """).fetchall()
+        conn.close()
+        return {(row[0], row[1], row[2]): row[3] for row in rows}
+
+    def _recount(self):
+        """Return the same breakdown computed directly from deployment_history"""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("""
+            SELECT COALESCE(venue_code, ''), COALESCE(product_type, ''), COALESCE(deployment_status, ''), COUNT(*)
+            FROM deployment_history
+            GROUP BY 1, 2, 3
+        """).fetchall()
+        conn.close()
+        return {(row[0], row[1], row[2]): row[3] for row in rows}
+
+    def test_counters_track_inserts(self):
+        """Test inserts (including NULL venue/product) are counted"""
+        counters = self._counters()
+        self.assertEqual(counters[('CORO', 'KXP2', 'started')], 2)
+        self.assertEqual(counters[('', '', 'failed')], 1)
+        self.assertEqual(counters, self._recount())
+
+    def test_counters_track_status_updates_and_deletes(self):
+        """Test phase changes move rows between counters"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE deployment_history SET deployment_status = 'success' WHERE hostname = 'KXP2-CORO-001'")
+        conn.execute("UPDATE deployment_history SET completed_at = CURRENT_TIMESTAMP")
+        conn.execute("DELETE FROM deployment_history WHERE venue_code = 'ARIA'")
+        conn.commit()
+        conn.close()
+
+        counters = self._counters()
+        self.assertEqual(counters[('CORO', 'KXP2', 'success')], 1)
+        self.assertEqual(counters[('CORO', 'KXP2', 'started')], 1)
+        self.assertEqual(counters, self._recount())
+
+    def test_counters_backfilled_on_upgrade(self):
+        """Test initialize_database backfills counters for existing history"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE deployment_history_counts")
+        # The database now predates the counters migration
+        conn.execute("DELETE FROM schema_version WHERE name = 'deployment_counters'")
+        conn.commit()
+        conn.close()
+
+        from database_setup import initialize_database, verify_schema
+        initialize_database(self.db_path)
+
+        self.assertEqual(self._counters(), self._recount())
+        self.assertTrue(verify_schema(self.db_path))
+
+
+class TestHostnameLeases(unittest.TestCase):
+    """Test time-limited hostname reservations"""
+
+    def setUp(self):
+        """Create temporary database and initialize manager"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        from hostname_manager import HostnameManager
+        self.manager = HostnameManager(self.db_path)
+
+        self.manager.create_venue(code='CORO', name='Corona')
+        self.manager.bulk_import_kart_numbers('CORO', ['001', '002'])
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def _row(self, identifier):
+        """Fetch (status, lease_expires_at) for a CORO pool entry"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT status, lease_expires_at FROM hostname_pool WHERE venue_code = 'CORO' AND identifier = ?",
+            (identifier,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return row
+
+    def _expire(self, identifier):
+        """Force a lease into the past"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE hostname_pool SET lease_expires_at = datetime('now', '-1 minute') WHERE identifier = ?",
+            (identifier,)
+        )
+        conn.commit()
+        conn.close()
+
+    def test_plain_assignment_has_no_lease(self):
+        """Test assignments without a TTL are permanent"""
+        self.manager.assign_hostname('KXP2', 'CORO')
+        status, lease = self._row('001')
+
+        self.assertEqual(status, 'assigned')
+        self.assertIsNone(lease)
+
+    def test_reserve_sets_lease(self):
+        """Test leased assignment records an expiry"""
+        hostname = self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        status, lease = self._row('001')
+
+        self.assertEqual(hostname, 'KXP2-CORO-001')
+        self.assertEqual(status, 'assigned')
+        self.assertIsNotNone(lease)
+
+    def test_confirm_makes_assignment_permanent(self):
+        """Test confirmed hostnames survive the sweeper"""
+        hostname = self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self.assertTrue(self.manager.confirm_hostname(hostname))
+        self.assertFalse(self.manager.confirm_hostname(hostname))
+
+        self.assertEqual(self.manager.sweep_expired_leases(), 0)
+        self.assertEqual(self._row('001'), ('assigned', None))
+
+    def test_cancel_returns_to_pool(self):
+        """Test failed installs release their reservation"""
+        hostname = self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self.assertTrue(self.manager.cancel_lease(hostname))
+
+        self.assertEqual(self._row('001'), ('available', None))
+
+    def test_cancel_ignores_confirmed(self):
+        """Test cancel_lease never releases a confirmed assignment"""
+        hostname = self.manager.assign_hostname('KXP2', 'CORO')
+        self.assertFalse(self.manager.cancel_lease(hostname))
+        self.assertEqual(self._row('001')[0], 'assigned')
+
+    def test_sweeper_releases_only_expired(self):
+        """Test sweeper returns expired leases and keeps live ones"""
+        self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self._expire('001')
+
+        self.assertEqual(self.manager.sweep_expired_leases(), 1)
+        self.assertEqual(self._row('001'), ('available', None))
+        self.assertEqual(self._row('002')[0], 'assigned')
+
+    def test_extend_lease_postpones_expiry(self):
+        """Test progress updates keep a lease alive"""
+        hostname = self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self._expire('001')
+
+        self.assertTrue(self.manager.extend_lease(hostname, 600))
+        self.assertEqual(self.manager.sweep_expired_leases(), 0)
+
+    def test_exhausted_pool_reclaims_expired_lease(self):
+        """Test assignment sweeps expired leases before reporting exhaustion"""
+        self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self.manager.assign_hostname('KXP2', 'CORO', lease_seconds=600)
+        self._expire('002')
+
+        self.assertEqual(self.manager.assign_hostname('KXP2', 'CORO'), 'KXP2-CORO-002')
+
+    def _batch(self, batch_id):
+        """Fetch (status, remaining_count) of a batch"""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT status, remaining_count FROM deployment_batches WHERE id = ?",
+                           (batch_id,)).fetchone()
+        conn.close()
+        return row
+
+    def test_cancelled_batch_lease_returns_slot(self):
+        """Test a failed install gives its slot back, reopening a completed batch"""
+        batch_id = self.manager.create_deployment_batch('CORO', 'KXP2', 2)
+        self.manager.start_batch(batch_id)
+        first = self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:01', 'SERIAL01', lease_seconds=600)
+        self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:02', 'SERIAL02', lease_seconds=600)
+        self.assertEqual(self._batch(batch_id), ('completed', 0))
+
+        self.assertTrue(self.manager.cancel_lease(first))
+
+        self.assertEqual(self._batch(batch_id), ('active', 1))
+        self.assertEqual(self.manager.get_active_batch('CORO', 'KXP2')['remaining_count'], 1)
+        self.assertEqual(self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:03', 'SERIAL03',
+                                                        lease_seconds=600), first)
+        self.assertEqual(self._batch(batch_id), ('completed', 0))
+
+    def test_expired_batch_leases_return_slots(self):
+        """Test the sweeper gives expired leases' slots back; confirmed ones keep theirs"""
+        batch_id = self.manager.create_deployment_batch('CORO', 'KXP2', 2)
+        self.manager.start_batch(batch_id)
+        first = self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:01', 'SERIAL01', lease_seconds=600)
+        self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:02', 'SERIAL02', lease_seconds=600)
+        self.manager.confirm_hostname(first)
+        self._expire('002')
+
+        self.assertEqual(self.manager.sweep_expired_leases(), 1)
+        self.assertEqual(self._batch(batch_id), ('active', 1))
+        self.assertEqual(self._row('001'), ('assigned', None))
+        self.assertEqual(self._row('002'), ('available', None))
+
+    def _lease_batch_ids(self):
+        """lease_batch_id of every pool entry"""
+        conn = sqlite3.connect(self.db_path)
+        ids = [row[0] for row in conn.execute("SELECT lease_batch_id FROM hostname_pool")]
+        conn.close()
+        return ids
+
+    def test_released_batch_lease_returns_slot(self):
+        """Test releasing a leased hostname gives its batch slot back"""
+        batch_id = self.manager.create_deployment_batch('CORO', 'KXP2', 2)
+        self.manager.start_batch(batch_id)
+        first = self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:01', 'SERIAL01', lease_seconds=600)
+        self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:02', 'SERIAL02', lease_seconds=600)
+
+        self.assertTrue(self.manager.release_hostname(first))
+
+        self.assertEqual(self._batch(batch_id), ('active', 1))
+        self.assertEqual(self._lease_batch_ids().count(None), 1)
+
+    def test_bulk_release_returns_pending_slots_only(self):
+        """Test bulk release gives back pending leases' slots, not confirmed ones"""
+        batch_id = self.manager.create_deployment_batch('CORO', 'KXP2', 2)
+        self.manager.start_batch(batch_id)
+        first = self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:01', 'SERIAL01', lease_seconds=600)
+        self.manager.assign_from_batch(batch_id, 'dc:a6:32:00:00:02', 'SERIAL02', lease_seconds=600)
+        self.manager.confirm_hostname(first)
+
+        self.assertEqual(self.manager.bulk_release_hostnames(venue_code='CORO'), 2)
+
+        self.assertEqual(self._batch(batch_id), ('active', 1))
+        self.assertEqual(self._lease_batch_ids(), [None, None])
+
+    def test_bulk_retire_returns_slots(self):
+        """Test retiring leased hostnames by name gives their batch slots back"""
+        batch_id = self.manager.create_deployment_batch('CORO', 'KXP2', 2)
+        self.manager.start_batch(batch_id)
+        hostnames = [
+            self.manager.assign_from_batch(batch_id, f'dc:a6:32:00:00:0{n}', f'SERIAL0{n}', lease_seconds=600)
+            for n in (1, 2)
+        ]
+
+        self.assertEqual(self.manager.bulk_retire_hostnames(hostnames), 2)
+
+        self.assertEqual(self._batch(batch_id), ('active', 2))
+        self.assertEqual(self._lease_batch_ids(), [None, None])
+
+    def test_sweeper_uses_lease_index(self):
+        """Test the sweeper query is an index search, not a table scan"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            EXPLAIN QUERY PLAN
+            UPDATE hostname_pool SET status = 'available'
+            WHERE lease_expires_at IS NOT NULL
+              AND lease_expires_at <= datetime('now')
+        """)
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+        conn.close()
+
+        self.assertIn('idx_hostname_lease', plan)
+
+
+class TestBulkPoolOperations(unittest.TestCase):
+    """Test bulk release and retire of pool entries"""
+
+    def setUp(self):
+        """Create temporary database with a partly assigned pool"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        from hostname_manager import HostnameManager
+        self.manager = HostnameManager(self.db_path)
+
+        self.manager.create_venue(code='CORO', name='Corona')
+        self.manager.create_venue(code='ARIA', name='Aria')
+        self.manager.bulk_import_kart_numbers('CORO', ['001', '002', '003', '004'])
+        self.manager.bulk_import_kart_numbers('ARIA', ['101', '102'])
+        for _ in range(3):
+            self.manager.assign_hostname('KXP2', 'CORO')
+        self.manager.assign_hostname('KXP2', 'ARIA')
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def test_bulk_release_by_filter(self):
+        """Test releasing all assigned hostnames at one venue"""
+        released = self.manager.bulk_release_hostnames(venue_code='CORO', status='assigned')
+
+        self.assertEqual(released, 3)
+        self.assertEqual(self.manager.get_venue_statistics('CORO')['available_hostnames'], 4)
+        # Other venues untouched
+        self.assertEqual(self.manager.get_venue_statistics('ARIA')['assigned_hostnames'], 1)
+
+    def test_bulk_release_clears_assignment_details(self):
+        """Test released entries lose MAC, serial and assignment date"""
+        self.manager.bulk_release_hostnames(hostnames=['KXP2-CORO-001'])
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT status, mac_address, serial_number, assigned_date
+            FROM hostname_pool WHERE venue_code = 'CORO' AND identifier = '001'
+        """)
+        row = cursor.fetchone()
+        conn.close()
+
+        self.assertEqual(row, ('available', None, None, None))
+
+    def test_bulk_retire_by_hostname_list(self):
+        """Test retiring an explicit list, ignoring names not in the pool"""
+        retired = self.manager.bulk_retire_hostnames(
+            hostnames=['KXP2-CORO-001', 'KXP2-ARIA-102', 'not-a-hostname']
+        )
+
+        self.assertEqual(retired, 2)
+        self.assertEqual(self.manager.get_venue_statistics('CORO')['retired_hostnames'], 1)
+        self.assertEqual(self.manager.get_venue_statistics('ARIA')['retired_hostnames'], 1)
+
+    def test_bulk_retire_skips_already_retired(self):
+        """Test already retired entries are not counted twice"""
+        self.manager.bulk_retire_hostnames(venue_code='ARIA')
+        self.assertEqual(self.manager.bulk_retire_hostnames(venue_code='ARIA'), 0)
+
+    def test_bulk_release_assigned_before(self):
+        """Test age filter only matches older assignments"""
+        self.assertEqual(self.manager.bulk_release_hostnames(assigned_before='2000-01-01'), 0)
+        self.assertEqual(self.manager.bulk_release_hostnames(assigned_before='2999-01-01'), 4)
+
+    def test_bulk_assigned_before_format_checked(self):
+        """Test dates that would compare wrongly as text are rejected"""
+        for value in ('03/01/2025', '2025-3-1', '2025-03-01T10:00'):
+            with self.assertRaises(ValueError):
+                self.manager.bulk_release_hostnames(assigned_before=value)
+        self.assertEqual(self.manager.get_venue_statistics('CORO')['assigned_hostnames'], 3)
+
+    def test_bulk_malformed_hostnames_rejected(self):
+        """Test malformed hostnames are reported and nothing is changed"""
+        with self.assertRaises(ValueError) as error:
+            self.manager.bulk_retire_hostnames(hostnames=['KXP2-CORO-001', 'KXP2CORO002', 'KXP2-CORO'])
+
+        self.assertIn('KXP2CORO002', str(error.exception))
+        self.assertIn('KXP2-CORO', str(error.exception))
+        self.assertEqual(self.manager.get_venue_statistics('CORO')['retired_hostnames'], 0)
+
+    def test_bulk_hostname_list_chunked(self):
+        """Test hostname lists larger than one chunk are fully applied"""
+        self.manager.BULK_CHUNK_SIZE = 2
+        retired = self.manager.bulk_retire_hostnames(
+            hostnames=[f'KXP2-CORO-{n:03d}' for n in range(1, 5)]
+        )
+        self.assertEqual(retired, 4)
+
+    def test_bulk_updates_pool_counters(self):
+        """Test bulk changes keep per-venue counters in sync"""
+        self.manager.bulk_retire_hostnames(venue_code='CORO', status='available')
+
+        venues = {v['code']: v for v in self.manager.list_venues()}
+        self.assertEqual(venues['CORO']['kxp2_available'], 0)
+        self.assertEqual(venues['CORO']['kxp2_assigned'], 3)
+
+    def test_bulk_requires_selection(self):
+        """Test bulk operations refuse to touch the whole pool"""
+        with self.assertRaises(ValueError):
+            self.manager.bulk_release_hostnames()
+        with self.assertRaises(ValueError):
+            self.manager.bulk_retire_hostnames(hostnames=[])
+
+    def test_bulk_invalid_status_filter(self):
+        """Test invalid status filter is rejected"""
+        with self.assertRaises(ValueError):
+            self.manager.bulk_release_hostnames(status='broken')
+
+
+class TestKartNumberOrdering(unittest.TestCase):
+    """Test numeric ordering of kart numbers via sort_key"""
+
+    def setUp(self):
+        """Create temporary database and initialize manager"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        from hostname_manager import HostnameManager
+        self.manager = HostnameManager(self.db_path)
+        self.manager.create_venue(code='CORO', name='Corona')
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def test_numeric_order_above_999(self):
+        """Test 4-digit kart numbers are assigned after 3-digit ones"""
+        self.manager.bulk_import_kart_numbers('CORO', ['1001', '999', '1000', '998'])
+
+        assigned = [self.manager.assign_hostname('KXP2', 'CORO') for _ in range(4)]
+
+        self.assertEqual(assigned, [
+            'KXP2-CORO-998', 'KXP2-CORO-999', 'KXP2-CORO-1000', 'KXP2-CORO-1001'
+        ])
+
+    def test_mixed_width_import(self):
+        """Test mixed-width imports order numerically"""
+        self.manager.bulk_import_kart_numbers('CORO', ['10', '2', '1200', '100'])
+
+        first = self.manager.assign_hostname('KXP2', 'CORO')
+        second = self.manager.assign_hostname('KXP2', 'CORO')
+
+        self.assertEqual(first, 'KXP2-CORO-002')
+        self.assertEqual(second, 'KXP2-CORO-010')
+
+    def test_released_number_reused_first(self):
+        """Test a released low number is picked before higher ones"""
+        self.manager.bulk_import_kart_numbers('CORO', ['999', '1000', '1001'])
+        self.manager.assign_hostname('KXP2', 'CORO')
+        self.manager.assign_hostname('KXP2', 'CORO')
+        self.manager.release_hostname('KXP2-CORO-999')
+
+        self.assertEqual(self.manager.assign_hostname('KXP2', 'CORO'), 'KXP2-CORO-999')
+
+    def test_sort_key_backfilled_on_upgrade(self):
+        """Test initialize_database backfills rows imported before sort_key existed"""
+        from database_setup import initialize_database
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            INSERT INTO hostname_pool (product_type, venue_code, identifier, status)
+            VALUES ('KXP2', 'CORO', '1000', 'available'),
+                   ('KXP2', 'CORO', '999', 'available'),
+                   ('RXP2', 'CORO', 'ABCD1234', 'assigned')
+        """)
+        # The database now predates the sort_key migration
+        conn.execute("DELETE FROM schema_version WHERE name = 'kart_number_sort_key'")
+        conn.commit()
+        conn.close()
+
+        initialize_database(self.db_path)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT identifier, sort_key FROM hostname_pool ORDER BY identifier")
+        rows = dict(cursor.fetchall())
+        conn.close()
+
+        self.assertEqual(rows, {'1000': 1000, '999': 999, 'ABCD1234': None})
+        self.assertEqual(self.manager.assign_hostname('KXP2', 'CORO'), 'KXP2-CORO-999')
+
+    def test_next_available_uses_index_seek(self):
+        """Test next-available lookup is an index seek without a sort step"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT id, identifier FROM hostname_pool
+            WHERE product_type = 'KXP2'
+              AND venue_code = 'CORO'
+              AND status = 'available'
+            ORDER BY sort_key
+            LIMIT 1
+        """)
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+        conn.close()
+
+        self.assertIn('idx_hostname_next_available', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TestPoolListing(unittest.TestCase):
+    """Test paginated, filtered pool listings"""
+
+    def setUp(self):
+        """Create temporary database with two venues"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        from hostname_manager import HostnameManager
+        self.manager = HostnameManager(self.db_path)
+        self.manager.create_venue(code='ARIA', name='Aria')
+        self.manager.create_venue(code='CORO', name='Corona')
+        self.manager.bulk_import_kart_numbers('CORO', ['1', '2', '10', '100', '1000', '120'])
+        self.manager.bulk_import_kart_numbers('ARIA', ['5', '12'])
+        self.manager.bulk_import_kart_numbers('CORO', ['10000000'], product_type='RXP2')
+        self.manager.assign_hostname('KXP2', 'CORO')
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def _walk(self, limit=2, **filters):
+        """Follow cursors through every page and return all hostnames"""
+        hostnames = []
+        after = None
+        while True:
+            page = self.manager.list_pool_page(after=after, limit=limit, **filters)
+            self.assertLessEqual(len(page['kart_numbers']), limit)
+            hostnames.extend(entry['hostname'] for entry in page['kart_numbers'])
+            after = page['next_cursor']
+            if not after:
+                return hostnames
+
+    def test_pages_follow_numeric_order(self):
+        """Test cursor pages cover the pool once, in venue/product/number order"""
+        self.assertEqual(self._walk(), [
+            'KXP2-ARIA-005', 'KXP2-ARIA-012',
+            'KXP2-CORO-001', 'KXP2-CORO-002', 'KXP2-CORO-010', 'KXP2-CORO-100',
+            'KXP2-CORO-120', 'KXP2-CORO-1000',
+            'RXP2-CORO-10000000'
+        ])
+
+    def test_last_page_has_no_cursor(self):
+        """Test an exactly full last page does not offer another page"""
+        page = self.manager.list_pool_page(venue_code='ARIA', limit=2)
+        self.assertEqual(len(page['kart_numbers']), 2)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_filters(self):
+        """Test product, status and venue filters"""
+        self.assertEqual(self._walk(product_type='RXP2'), ['RXP2-CORO-10000000'])
+        self.assertEqual(self._walk(status='assigned'), ['KXP2-CORO-001'])
+        self.assertEqual(len(self._walk(venue_code='CORO', product_type='KXP2', status='available')), 5)
+
+    def test_prefix_search(self):
+        """Test identifier prefix search"""
+        # Prefixes match the stored, zero-padded identifier
+        self.assertEqual(self._walk(prefix='10'), [
+            'KXP2-CORO-100', 'KXP2-CORO-1000', 'RXP2-CORO-10000000'
+        ])
+        self.assertEqual(self._walk(venue_code='ARIA', prefix='01'), ['KXP2-ARIA-012'])
+
+    def test_counts_match_listings(self):
+        """Test counts agree with the listings for each filter combination"""
+        for filters in ({}, {'venue_code': 'CORO'}, {'status': 'available'},
+                        {'product_type': 'KXP2', 'status': 'assigned'}, {'prefix': '1'}):
+            self.assertEqual(self.manager.count_pool_entries(**filters), len(self._walk(**filters)))
+
+    def test_invalid_input(self):
+        """Test invalid filters and cursors raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.manager.list_pool_page(status='broken')
+        with self.assertRaises(ValueError):
+            self.manager.list_pool_page(prefix="1' OR 1=1")
+        with self.assertRaises(ValueError):
+            self.manager.list_pool_page(after='not-a-cursor')
+
+    def test_listing_uses_index_without_sort(self):
+        """Test listing pages are index range scans without a sort step"""
+        from hostname_manager import HostnameManager
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for filters in ({}, {'venue_code': 'CORO'}, {'product_type': 'RXP2'}, {'status': 'retired'}):
+            clauses, params = self.manager._listing_filter(**filters)
+            cursor.execute(f"""
+                EXPLAIN QUERY PLAN
+                SELECT * FROM hostname_pool
+                WHERE 1 = 1{clauses} AND ({HostnameManager.LISTING_KEY}) > (?, ?, ?, ?)
+                ORDER BY {HostnameManager.LISTING_KEY}
+                LIMIT 101
+            """, params + ['CORO', 'KXP2', 10, '010'])
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+
+            self.assertIn('listing', plan, filters)
+            self.assertNotIn('TEMP B-TREE', plan, filters)
+        conn.close()
+
+
+class TestFullTextSearch(unittest.TestCase):
+    """Test trigger-maintained FTS5 search indexes"""
+
+    def setUp(self):
+        """Create temporary database with a small pool and history"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        from database_setup import initialize_database
+        initialize_database(self.db_path)
+
+        from hostname_manager import HostnameManager
+        self.manager = HostnameManager(self.db_path)
+        self.manager.create_venue(code='CORO', name='Corona')
+        self.manager.bulk_import_kart_numbers('CORO', ['1', '2', '12'])
+        self.manager.assign_hostname('KXP2', 'CORO', mac_address='b8:27:eb:12:34:56',
+                                     serial_number='10000000a1b2c3d4')
+
+    def tearDown(self):
+        """Clean up temporary database"""
+        if os.path.exists(self.db_path):
+            os.unlink(self.db_path)
+
+    def _search_pool(self, text):
+        """Return hostnames matching a pool search"""
+        return [entry['hostname'] for entry in self.manager.search_pool(text)]
+
+    def _search_history(self, text):
+        """Return deployment ids matching a history search"""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT rowid FROM deployment_search WHERE deployment_search MATCH ? ORDER BY rowid",
+            (self.manager.search_expression(text),)
+        ).fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+    def test_pool_search_by_prefix(self):
+        """Test hostname, MAC and serial prefixes find the pool entry"""
+        self.assertEqual(self._search_pool('KXP2-CORO-00'), ['KXP2-CORO-001', 'KXP2-CORO-002'])
+        self.assertEqual(self._search_pool('b8:27:eb:12'), ['KXP2-CORO-001'])
+        self.assertEqual(self._search_pool('10000000a1b2'), ['KXP2-CORO-001'])
+        self.assertEqual(self._search_pool('coro 01'), ['KXP2-CORO-012'])
+
+    def test_pool_index_follows_updates_and_deletes(self):
+        """Test release and delete remove stale search terms"""
+        self.manager.release_hostname('KXP2-CORO-001')
+        self.assertEqual(self._search_pool('b8:27:eb'), [])
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM hostname_pool WHERE identifier = '012'")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self._search_pool('KXP2-CORO-012'), [])
+
+    def test_history_index_follows_inserts_and_updates(self):
+        """Test deployment_history rows are indexed as they are written"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            INSERT INTO deployment_history (hostname, mac_address, serial_number, deployment_status)
+            VALUES ('KXP2-CORO-001', 'b8:27:eb:12:34:56', '10000000a1b2c3d4', 'started')
+        """)
+        conn.execute("""
+            UPDATE deployment_history
+            SET deployment_status = 'failed', error_message = 'SD card write failed: I/O error'
+        """)
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self._search_history('10000000a1'), [1])
+        self.assertEqual(self._search_history('card writ'), [1])
+        self.assertEqual(self._search_history('timeout'), [])
+
+    def test_index_backfilled_on_upgrade(self):
+        """Test initialize_database indexes rows written before search existed"""
+        from database_setup import initialize_database
+
+        conn = sqlite3.connect(self.db_path)
+        for name in ('deployment_search', 'hostname_search'):
+            conn.execute(f"DROP TABLE {name}")
+        for trigger in [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%search%'")]:
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.execute("INSERT INTO deployment_history (hostname, error_message) VALUES ('KXP2-CORO-002', 'checksum mismatch')")
+        # The database now predates the search migration
+        conn.execute("DELETE FROM schema_version WHERE name = 'search_indexes'")
+        conn.commit()
+        conn.close()
+
+        initialize_database(self.db_path)
+
+        self.assertEqual(self._search_history('checksum'), [1])
+        self.assertEqual(self._search_pool('b8:27'), ['KXP2-CORO-001'])
+
+    def test_search_expression_treats_input_as_text(self):
+        """Test FTS5 syntax in user input cannot change the query"""
+        from hostname_manager import HostnameManager
+
+        self.assertEqual(HostnameManager.search_expression('NOT "a*'), '"NOT"* """a*"*')
+        self.assertEqual(self._search_pool('OR coro'), [])
+        with self.assertRaises(ValueError):
+            HostnameManager.search_expression(' * - " ')
+
+
 class TestEdgeCases(unittest.TestCase):
     """Test edge cases and error handling"""
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Install Progress Tracker
+
+Tests the in-memory table of in-flight installs: phase transitions,
+throughput and ETA estimates, delta tracking and pruning.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import threading
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from install_progress import InstallTracker, FINISHED_LINGER_SECONDS, STALE_SECONDS
+
+MB = 1024 * 1024
+
+
+class TestInstallTracker(unittest.TestCase):
+    """Test cases for InstallTracker."""
+
+    def setUp(self):
+        """Create an empty tracker."""
+        self.tracker = InstallTracker()
+
+    def test_phase_transitions(self):
+        """Test only a change of phase counts as a transition."""
+        self.assertTrue(self.tracker.set_phase('KXP2-CORO-001', 'starting', now=100))
+        self.assertTrue(self.tracker.set_phase('KXP2-CORO-001', 'downloading', now=101))
+        self.assertFalse(self.tracker.is_transition('KXP2-CORO-001', 'downloading'))
+        self.assertFalse(self.tracker.set_phase('KXP2-CORO-001', 'downloading', now=102))
+        self.assertTrue(self.tracker.is_transition('KXP2-CORO-001', 'verifying'))
+
+    def test_final_phase_restarts_install(self):
+        """Test a report after success or failure starts a fresh install."""
+        self.tracker.set_phase('KXP2-CORO-001', 'downloading', now=100)
+        self.tracker.update_progress('KXP2-CORO-001', 100 * MB, 1000 * MB, now=100)
+        self.tracker.set_phase('KXP2-CORO-001', 'failed', now=110, error_message='SD card write failed')
+
+        entry = self.tracker.get('KXP2-CORO-001')
+        self.assertEqual(entry['phase'], 'failed')
+        self.assertEqual(entry['error_message'], 'SD card write failed')
+
+        # Duplicate final reports are still transitions (persisting them is idempotent)
+        self.assertTrue(self.tracker.is_transition('KXP2-CORO-001', 'failed'))
+        self.assertTrue(self.tracker.set_phase('KXP2-CORO-001', 'starting', now=200))
+        entry = self.tracker.get('KXP2-CORO-001')
+        self.assertEqual(entry['bytes_written'], 0)
+        self.assertEqual(entry['started_at'], 200)
+
+    def test_other_deployment_restarts_install(self):
+        """Test a report for another deployment of the hostname is a new install."""
+        self.tracker.set_phase('unknown', 'downloading', now=100, deployment_id=1)
+        self.tracker.update_progress('unknown', 100 * MB, 1000 * MB, now=101)
+
+        self.assertFalse(self.tracker.is_transition('unknown', 'downloading', 1))
+        self.assertTrue(self.tracker.is_transition('unknown', 'downloading', 2))
+        self.assertTrue(self.tracker.set_phase('unknown', 'downloading', now=102, deployment_id=2))
+        entry = self.tracker.get('unknown')
+        self.assertEqual(entry['deployment_id'], 2)
+        self.assertEqual(entry['bytes_written'], 0)
+
+        # Reports without an ID can't tell installs apart
+        self.assertFalse(self.tracker.is_transition('unknown', 'downloading'))
+
+    def test_reset_forgets_install(self):
+        """Test a reset hostname's next report is a transition and the entry is removed."""
+        self.tracker.set_phase('KXP2-CORO-001', 'downloading', now=100)
+        version = self.tracker.version
+
+        self.assertTrue(self.tracker.reset('KXP2-CORO-001', now=200))
+        self.assertFalse(self.tracker.reset('KXP2-CORO-001', now=200))
+        self.assertTrue(self.tracker.is_transition('KXP2-CORO-001', 'downloading'))
+        self.assertEqual(self.tracker.changes_since(version)[2], ['KXP2-CORO-001'])
+
+    def test_throughput_and_eta(self):
+        """Test throughput is measured between samples and drives the ETA."""
+        self.tracker.set_phase('KXP2-CORO-001', 'downloading', now=100)
+
+        entry = self.tracker.update_progress('KXP2-CORO-001', 0, 1000 * MB, now=100)
+        self.assertIsNone(entry['throughput'])
+        self.assertIsNone(entry['eta_seconds'])
+
+        entry = self.tracker.update_progress('KXP2-CORO-001', 100 * MB, now=110)
+        self.assertAlmostEqual(entry['throughput'], 10 * MB)
+        self.assertAlmostEqual(entry['eta_seconds'], 90)
+
+    def test_throughput_is_smoothed(self):
+        """Test a single slow sample does not collapse the estimate."""
+        self.tracker.update_progress('KXP2-CORO-001', 0, 1000 * MB, now=0)
+        self.tracker.update_progress('KXP2-CORO-001', 100 * MB, now=10)
+        entry = self.tracker.update_progress('KXP2-CORO-001', 100 * MB, now=20)
+
+        self.assertGreater(entry['throughput'], 5 * MB)
+        self.assertLess(entry['throughput'], 10 * MB)
+
+    def test_progress_without_phase_defaults_to_downloading(self):
+        """Test progress from an install the server never saw start."""
+        entry = self.tracker.update_progress('KXP2-CORO-001', 10 * MB, 100 * MB, now=100)
+        self.assertEqual(entry['phase'], 'downloading')
+
+    def test_success_completes_progress(self):
+        """Test success marks the full image written and clears the ETA."""
+        self.tracker.update_progress('KXP2-CORO-001', 0, 100 * MB, now=0)
+        self.tracker.update_progress('KXP2-CORO-001', 90 * MB, now=10)
+        self.tracker.set_phase('KXP2-CORO-001', 'success', now=20)
+
+        entry = self.tracker.get('KXP2-CORO-001')
+        self.assertEqual(entry['bytes_written'], 100 * MB)
+        self.assertIsNone(entry['throughput'])
+        self.assertIsNone(entry['eta_seconds'])
+
+    def test_changes_since_returns_deltas(self):
+        """Test only entries changed after a version are returned."""
+        self.tracker.set_phase('KXP2-CORO-001', 'downloading', now=100)
+        self.tracker.set_phase('KXP2-CORO-002', 'downloading', now=100)
+        version, updated, removed = self.tracker.changes_since(0)
+        self.assertEqual(len(updated), 2)
+        self.assertEqual(removed, [])
+
+        self.tracker.update_progress('KXP2-CORO-002', 10 * MB, now=101)
+        version, updated, removed = self.tracker.changes_since(version)
+        self.assertEqual([entry['hostname'] for entry in updated], ['KXP2-CORO-002'])
+
+        version, updated, removed = self.tracker.changes_since(version)
+        self.assertEqual(updated, [])
+
+    def test_prune_finished_and_stale(self):
+        """Test finished installs linger briefly and silent installs expire."""
+        self.tracker.set_phase('KXP2-CORO-001', 'success', now=0)
+        self.tracker.set_phase('KXP2-CORO-002', 'downloading', now=0)
+        version = self.tracker.version
+
+        self.assertEqual(self.tracker.prune(now=FINISHED_LINGER_SECONDS - 1), [])
+        self.assertEqual(self.tracker.prune(now=FINISHED_LINGER_SECONDS + 1), ['KXP2-CORO-001'])
+        self.assertEqual(self.tracker.prune(now=STALE_SECONDS + 1), ['KXP2-CORO-002'])
+
+        _, updated, removed = self.tracker.changes_since(version)
+        self.assertEqual(updated, [])
+        self.assertEqual(sorted(removed), ['KXP2-CORO-001', 'KXP2-CORO-002'])
+        self.assertEqual(self.tracker.snapshot(), [])
+
+    def test_wait_for_change(self):
+        """Test waiters wake up when progress arrives."""
+        version = self.tracker.version
+        self.assertFalse(self.tracker.wait_for_change(version, timeout=0.01))
+
+        timer = threading.Timer(0.05, self.tracker.update_progress, args=('KXP2-CORO-001', MB))
+        timer.start()
+        self.assertTrue(self.tracker.wait_for_change(version, timeout=2))
+        timer.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
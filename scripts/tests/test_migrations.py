@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Versioned Schema Migrations
+
+Every migration is applied to a populated database built with the original
+(release 1) schema, as a production upgrade would be.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import sqlite3
+import shutil
+import os
+import sys
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations
+from migrations import migrate, migration_status, build_indexes_online, initial_schema, LATEST_VERSION
+from database_setup import initialize_database, verify_schema
+
+VENUES = ['CORO', 'ARIA', 'VEGA']
+
+
+class TestMigrations(unittest.TestCase):
+    """Test migrating an original-schema database with data in it."""
+
+    def setUp(self):
+        """Create a release 1 database (no schema_version) with data."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+
+        conn = sqlite3.connect(self.db_path)
+        initial_schema(conn.cursor())
+        conn.executemany("INSERT INTO venues (code, name) VALUES (?, ?)", [(v, v.title()) for v in VENUES])
+        conn.executemany("""
+            INSERT INTO hostname_pool (product_type, venue_code, identifier, status, mac_address, serial_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            ('KXP2', VENUES[n % 3], f"{n:03d}", 'assigned' if n % 4 == 0 else 'available',
+             f"b8:27:eb:00:{n // 256:02x}:{n % 256:02x}" if n % 4 == 0 else None,
+             f"10000000{n:08x}" if n % 4 == 0 else None)
+            for n in range(1, 1201)
+        ])
+        conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, mac_address, serial_number, product_type, venue_code, deployment_status, started_at, error_message)
+            VALUES (?, ?, ?, 'KXP2', ?, ?, datetime('2025-01-01', ? || ' minutes'), ?)
+        """, [
+            (f"KXP2-{VENUES[n % 3]}-{n % 1200 + 1:03d}", f"b8:27:eb:00:00:{n % 256:02x}", f"10000000{n:08x}",
+             VENUES[n % 3], 'failed' if n % 10 == 0 else 'success', str(n),
+             'checksum mismatch' if n % 10 == 0 else None)
+            for n in range(3000)
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Remove the database directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _query(self, sql, params=()):
+        """Run a query on a fresh connection."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_upgrade_original_schema(self):
+        """Test every migration applies to a populated release 1 database."""
+        self.assertEqual(migrate(self.db_path), list(range(1, LATEST_VERSION + 1)))
+        self.assertTrue(verify_schema(self.db_path))
+
+        # Data untouched
+        self.assertEqual(self._query("SELECT COUNT(*) FROM hostname_pool")[0][0], 1200)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM deployment_history")[0][0], 3000)
+
+        # New columns added and backfilled
+        self.assertEqual(self._query("SELECT COUNT(*) FROM hostname_pool WHERE sort_key IS NULL")[0][0], 0)
+        self.assertEqual(self._query("SELECT sort_key FROM hostname_pool WHERE identifier = '042'")[0][0], 42)
+
+        # Counters match the data
+        self.assertEqual(
+            self._query("SELECT status, SUM(count) FROM hostname_pool_counts GROUP BY status ORDER BY status"),
+            self._query("SELECT status, COUNT(*) FROM hostname_pool GROUP BY status ORDER BY status")
+        )
+        self.assertEqual(
+            self._query("SELECT SUM(count) FROM deployment_history_counts WHERE deployment_status = 'failed'")[0][0],
+            300
+        )
+
+        # Existing rows are searchable
+        self.assertEqual(self._query(
+            "SELECT COUNT(*) FROM deployment_search WHERE deployment_search MATCH '\"checksum\"'"
+        )[0][0], 300)
+        self.assertEqual(len(self._query(
+            "SELECT rowid FROM hostname_search WHERE hostname_search MATCH '\"1000000000000004\"'"
+        )), 1)
+
+    def test_version_table_records_each_migration(self):
+        """Test schema_version lists every migration once, in order."""
+        migrate(self.db_path)
+        status = migration_status(self.db_path)
+        self.assertEqual([m['version'] for m in status], list(range(1, LATEST_VERSION + 1)))
+        self.assertTrue(all(m['applied_at'] for m in status))
+        self.assertEqual(self._query("SELECT COUNT(*) FROM schema_version")[0][0], LATEST_VERSION)
+
+    def test_rerun_is_a_noop(self):
+        """Test a second run applies nothing."""
+        migrate(self.db_path)
+        self.assertEqual(migrate(self.db_path), [])
+        self.assertTrue(initialize_database(self.db_path))
+
+    def test_target_version(self):
+        """Test migrating in steps reaches the same schema."""
+        self.assertEqual(migrate(self.db_path, target=3), [1, 2, 3])
+        self.assertFalse(verify_schema(self.db_path))
+        self.assertEqual(migrate(self.db_path), list(range(4, LATEST_VERSION + 1)))
+        self.assertTrue(verify_schema(self.db_path))
+
+    def test_failed_migration_rolls_back(self):
+        """Test a failing migration leaves no partial change and is retried next run."""
+        def broken(cursor):
+            cursor.execute("ALTER TABLE hostname_pool ADD COLUMN half_done TEXT")
+            raise sqlite3.OperationalError("disk I/O error")
+
+        failing = migrations.MIGRATIONS[:2] + [(3, 'broken', broken)]
+        with patch.object(migrations, 'MIGRATIONS', failing):
+            with self.assertRaises(sqlite3.OperationalError):
+                migrate(self.db_path)
+
+        self.assertEqual([row[0] for row in self._query("SELECT version FROM schema_version")], [1, 2])
+        columns = [row[1] for row in self._query("PRAGMA table_info(hostname_pool)")]
+        self.assertNotIn('half_done', columns)
+
+        self.assertEqual(migrate(self.db_path), list(range(3, LATEST_VERSION + 1)))
+
+    def test_online_index_build_resumes(self):
+        """Test an interrupted index migration keeps finished indexes and builds the rest."""
+        migrate(self.db_path)
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("DROP INDEX idx_deployment_status_started")
+        conn.execute("DELETE FROM schema_version WHERE name = 'deployment_history_indexes'")
+
+        indexes = next(step for _, name, step in migrations.MIGRATIONS if name == 'deployment_history_indexes')
+        self.assertEqual(build_indexes_online(conn, indexes), 1)
+        conn.close()
+
+        self.assertEqual(migrate(self.db_path), [5])
+        plan = ' '.join(row[3] for row in self._query(
+            "EXPLAIN QUERY PLAN SELECT id FROM deployment_history WHERE deployment_status = 'failed' "
+            "ORDER BY started_at DESC LIMIT 20"
+        ))
+        self.assertIn('idx_deployment_status_started', plan)
+
+    def test_readers_continue_during_index_build(self):
+        """Test an index build does not block readers (WAL)."""
+        migrate(self.db_path, target=4)
+        reader = sqlite3.connect(self.db_path, timeout=0)
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("CREATE INDEX idx_test_build ON deployment_history(hostname)")
+        try:
+            # The build's write lock is held: reads still succeed immediately
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM deployment_history").fetchone()[0], 3000)
+        finally:
+            conn.execute("ROLLBACK")
+            conn.close()
+            reader.close()
+
+    def test_batch_remaining_version(self):
+        """Test remaining_count changes bump the batch queue version after upgrading."""
+        migrate(self.db_path, target=13)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            INSERT INTO deployment_batches (venue_code, product_type, total_count, remaining_count, status)
+            VALUES ('CORO', 'KXP2', 5, 5, 'active')
+        """)
+        conn.commit()
+        conn.close()
+
+        def bumps(remaining):
+            version = self._query("SELECT version FROM batch_queue_state")[0][0]
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("UPDATE deployment_batches SET remaining_count = ?", (remaining,))
+            conn.commit()
+            conn.close()
+            return self._query("SELECT version FROM batch_queue_state")[0][0] - version
+
+        # The trigger as released with migration 9
+        self.assertEqual(bumps(4), 0)
+        self.assertEqual(migrate(self.db_path, target=14), [14])
+        self.assertEqual(bumps(3), 1)
+
+    def test_lease_batch_slots(self):
+        """Test upgraded pools record which batch a lease holds a slot in."""
+        migrate(self.db_path, target=14)
+        self.assertNotIn('lease_batch_id', [row[1] for row in self._query("PRAGMA table_info(hostname_pool)")])
+
+        self.assertEqual(migrate(self.db_path), [15])
+        self.assertIn('lease_batch_id', [row[1] for row in self._query("PRAGMA table_info(hostname_pool)")])
+
+    def test_newer_database_is_refused(self):
+        """Test code refuses to run against a schema from a later release."""
+        migrate(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO schema_version (version, name) VALUES (?, 'from_the_future')", (LATEST_VERSION + 1,))
+        conn.commit()
+        conn.close()
+
+        with self.assertRaises(RuntimeError):
+            migrate(self.db_path)
+
+
+class TestMasterImagesSchema(unittest.TestCase):
+    """Test the columns written by the image registration scripts exist."""
+
+    def test_registration_columns(self):
+        """Test master_images has the columns the shell scripts insert."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'deployment.db')
+            initialize_database(db_path)
+            conn = sqlite3.connect(db_path)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(master_images)")}
+            conn.close()
+
+            # register_master_image.sh and shrink_golden_image.sh
+            self.assertTrue({'filename', 'product_type', 'version', 'checksum', 'size_bytes',
+                             'is_active', 'uploaded_at', 'description'} <= columns)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ Tests all Pi installer functionality:
 - Image download and write operations
 - Installation verification
 - Hostname customization
-- Status reporting
+- Status and write progress reporting
 - Error handling (missing SD card, network errors, write failures)
 - Command-line argument parsing
 
@@ -477,6 +477,73 @@ class TestReportStatus(unittest.TestCase):
         call_kwargs = mock_post.call_args[1]
         self.assertEqual(call_kwargs['json']['error_message'], 'SD card write error')
 
+    @patch.object(PiInstaller, 'get_serial_number', return_value='12345678')
+    @patch.object(PiInstaller, 'get_mac_address', return_value='aa:bb:cc:dd:ee:ff')
+    @patch('requests.post')
+    def test_report_status_echoes_deployment_id(self, mock_post, mock_mac, mock_serial):
+        """Test report_status sends the deployment_id received with the config"""
+        mock_post.return_value.json.return_value = {
+            'hostname': 'KXP2-CORO-001',
+            'deployment_id': 42,
+            'version': '3.0'
+        }
+        self.installer.get_config()
+
+        self.installer.report_status('downloading', 'Image download started')
+
+        self.assertEqual(mock_post.call_args[1]['json']['deployment_id'], 42)
+
+
+class TestReportProgress(unittest.TestCase):
+    """Test write progress reporting to server"""
+
+    def setUp(self):
+        """Set up test installer"""
+        self.installer = PiInstaller("http://192.168.151.1:5001")
+        self.installer.hostname = "KXP2-CORO-001"
+
+    @patch('requests.post')
+    def test_report_progress_posts_bytes(self, mock_post):
+        """Test progress is posted to /api/progress with a short timeout"""
+        self.installer.report_progress(1024, 4096)
+
+        mock_post.assert_called_once()
+        self.assertTrue(mock_post.call_args[0][0].endswith('/api/progress'))
+        call_kwargs = mock_post.call_args[1]
+        self.assertEqual(call_kwargs['json'], {
+            'hostname': 'KXP2-CORO-001',
+            'bytes_written': 1024,
+            'total_bytes': 4096
+        })
+        self.assertLessEqual(call_kwargs['timeout'], 2)
+
+    @patch('requests.post', side_effect=Exception("Connection timeout"))
+    def test_report_progress_network_failure(self, mock_post):
+        """Test report_progress never raises"""
+        self.installer.report_progress(1024, 4096)
+
+    @patch('requests.get')
+    @patch('requests.post')
+    @patch('builtins.open', new_callable=mock_open)
+    @patch('os.fsync')
+    def test_download_reports_progress_periodically(self, mock_fsync, mock_file, mock_post, mock_get):
+        """Test the write loop reports progress on an interval, then at the end"""
+        mock_response = MagicMock()
+        mock_response.headers = {'content-length': str(10 * 8192)}
+        mock_response.iter_content.return_value = [b'X' * 8192] * 10
+        mock_get.return_value = mock_response
+
+        # Every clock read advances one second: a report every other chunk
+        clock = iter(range(1000))
+        with patch('pi_installer.time.monotonic', side_effect=lambda: next(clock)):
+            self.installer.download_and_write_image('http://192.168.151.1/images/test.img', 10 * 8192)
+
+        reported = [c[1]['json']['bytes_written'] for c in mock_post.call_args_list]
+        self.assertGreater(len(reported), 1)
+        self.assertLess(len(reported), 10)
+        self.assertEqual(reported, sorted(reported))
+        self.assertEqual(reported[-1], 10 * 8192)
+
 
 class TestInstallMethod(unittest.TestCase):
     """Test main install method orchestration"""
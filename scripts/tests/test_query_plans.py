@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Query Plan Checks for the Deployment Database
+
+Runs the statements of hostname_manager, the deployment server and the
+web interface against a synthetic fleet (synthetic_fleet.py) with the
+query profiler capturing their plans, and fails if any of them scans a
+large table (index_advisor.HOT_TABLES) without an index. A failure lists
+each statement with the index the advisor suggests; add it in a new
+index migration, which verify_schema then checks.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import sqlite3
+import shutil
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add scripts and web directories to path
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'web'))
+
+from database_setup import initialize_database, verify_schema
+from db_access import close_connections, release_connections
+from hostname_manager import HostnameManager
+from query_profiler import profiler
+from index_advisor import find_full_scans
+from synthetic_fleet import generate_fleet
+
+
+class TestQueryPlans(unittest.TestCase):
+    """Test no hot statement scans a large table."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Generate one synthetic fleet for all checks."""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.db_path = os.path.join(cls.temp_dir, 'deployment.db')
+        generate_fleet(cls.db_path, venues=20, pool=5000, history=20000, archive=2000)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Close pooled connections and remove the database."""
+        close_connections(cls.db_path)
+        shutil.rmtree(cls.temp_dir)
+
+    def setUp(self):
+        """Start each check with an empty profile."""
+        profiler.reset()
+
+    def tearDown(self):
+        """Drop the checked statements."""
+        release_connections()
+        profiler.reset()
+
+    def assertNoFullScans(self, component, min_statements):
+        """Fail listing every statement that scans a hot table."""
+        snapshot = profiler.snapshot(component)
+        planned = [shape for shape, stats in snapshot['statements'].items() if stats['plan']]
+        self.assertGreaterEqual(len(planned), min_statements, "too few statements were exercised")
+
+        problems = find_full_scans([snapshot], self.db_path)
+        self.assertEqual(problems, [], "\n".join(
+            f"\n{p['statement']}\n  scans {p['table']}: {p['plan']}\n  suggested: {p['suggestion']}"
+            for p in problems
+        ))
+
+    def test_hostname_manager(self):
+        """Test allocation, leases, bulk actions, listings, search and batches."""
+        manager = HostnameManager(self.db_path)
+        manager.create_venue('CORO', 'Corona Kart Track')
+        manager.bulk_import_kart_numbers('CORO', [str(n) for n in range(1, 21)])
+
+        leased = manager.assign_hostname('KXP2', 'CORO', mac_address='dc:a6:32:01:00:01', lease_seconds=300)
+        manager.extend_lease(leased)
+        manager.confirm_hostname(leased)
+        cancelled = manager.assign_hostname('KXP2', 'CORO', mac_address='dc:a6:32:01:00:02', lease_seconds=300)
+        manager.cancel_lease(cancelled)
+        manager.assign_hostname('RXP2', 'CORO', serial_number='10000000abcdef01')
+        manager.release_hostname(leased)
+        manager.sweep_expired_leases()
+
+        manager.bulk_retire_hostnames(hostnames=['KXP2-CORO-020'])
+        manager.bulk_release_hostnames(venue_code='V001', status='assigned')
+        manager.bulk_release_hostnames(assigned_before='2025-03-01')
+
+        page = manager.list_pool_page(venue_code='V002')
+        manager.list_pool_page(venue_code='V002', after=page['next_cursor'])
+        manager.list_pool_page(status='available')
+        manager.list_pool_page(product_type='KXP2', venue_code='V003')
+        manager.list_pool_page(prefix='01')
+        manager.count_pool_entries(venue_code='V002', status='available')
+        manager.count_pool_entries(prefix='01')
+        manager.search_pool('V004 01')
+        manager.list_venues()
+        manager.get_venue_statistics('V002')
+
+        batch_id = manager.create_deployment_batch('CORO', 'KXP2', 3, priority=5)
+        manager.start_batch(batch_id)
+        manager.get_active_batch('CORO', 'KXP2')
+        manager.assign_from_batch(batch_id, 'dc:a6:32:01:00:03', '10000000abcdef03')
+        manager.update_batch_priority(batch_id, 7)
+        manager.pause_batch(batch_id)
+        manager.get_all_batches(venue_code='CORO', status='paused')
+        manager.get_batch_by_id(batch_id)
+
+        self.assertNoFullScans('hostname_manager', min_statements=25)
+
+    def test_deployment_server(self):
+        """Test config, status (by id and by hostname), progress and health."""
+        import deployment_server
+
+        with patch('deployment_server.DB_PATH', Path(self.db_path)), \
+                patch('deployment_server.LOG_DIR', Path(self.temp_dir)), \
+                patch('deployment_server.hostname_mgr', HostnameManager(self.db_path)):
+            client = deployment_server.app.test_client()
+            for serial, venue in (('10000000feed0001', 'V005'), ('10000000feed0002', None)):
+                config = client.post('/api/config', json={
+                    'product_type': 'KXP2', 'venue_code': venue, 'serial_number': serial,
+                    'mac_address': 'dc:a6:32:02:00:01'
+                }).get_json()
+                hostname = config.get('hostname')
+                client.post('/api/status', json={'hostname': hostname, 'serial_number': serial,
+                                                 'deployment_id': config.get('deployment_id'),
+                                                 'status': 'downloading'})
+                client.post('/api/progress', json={'hostname': hostname, 'bytes_written': 1, 'total_bytes': 2})
+                client.post('/api/status', json={'hostname': hostname, 'serial_number': serial,
+                                                 'status': 'success'})
+            client.get('/health')
+
+        self.assertNoFullScans('deployment_server', min_statements=5)
+
+    def test_web_interface(self):
+        """Test every page and API that reads the database."""
+        from app import create_app
+
+        app = create_app({
+            'TESTING': True,
+            # Server errors are collected per URL and asserted below
+            'PROPAGATE_EXCEPTIONS': False,
+            'SECRET_KEY': 'test-secret-key-do-not-use-in-production',
+            'DATABASE_PATH': self.db_path,
+            'WTF_CSRF_ENABLED': False,
+            'ITEMS_PER_PAGE': 20,
+            'MAX_ITEMS_PER_PAGE': 100,
+            'QUERY_PROFILE_DIR': self.temp_dir
+        })
+        client = app.test_client()
+        failed = []
+        older = client.get('/api/deployments?limit=20').headers['Link'].split('<')[1].split('>')[0]
+        for url in (
+            '/', '/venues', '/venues/V001', '/batches', '/search?q=V001', '/system',
+            '/kart-numbers', '/kart-numbers?venue=V001', '/kart-numbers?status=available&product=KXP2',
+            '/deployments', '/deployments?venue=V001', '/deployments?status=failed&product=KXP2',
+            '/api/stats', '/api/venues', '/api/venues/V001/stats',
+            '/api/deployments?venue=V001', '/api/deployments?status=failed', '/api/deployments?product=KXP2',
+            '/api/deployments?venue=V002&status=success', '/api/deployments?venue=V002&product=KXP2',
+            older, '/api/deployments?archive=1',
+            '/api/kart-numbers?venue=V001', '/api/kart-numbers?status=assigned', '/api/search?q=aa:bb:cc',
+            '/api/reports/deployments', '/api/reports/deployments?granularity=hour&venue=V001',
+            '/api/reports/deployments?since=2025-06-01&until=2025-07-01&group_by=venue,status',
+            '/api/export/deployments?venue=V001', '/api/export/pool?status=available',
+            '/api/batches', '/api/batches?venue=V001&status=active', '/api/batches/active', '/api/batches/2',
+        ):
+            response = client.get(url)
+            response.get_data()
+            if response.status_code >= 500:
+                failed.append(url)
+
+        self.assertEqual(failed, [])
+        self.assertNoFullScans('web', min_statements=25)
+
+    def test_advisor_suggests_index(self):
+        """Test a scan of a hot table is reported with an index to add."""
+        conn = HostnameManager(self.db_path)._get_connection()
+        conn.execute("SELECT id FROM deployment_history WHERE error_message = ? ORDER BY id", ('x',)).fetchall()
+
+        problems = find_full_scans([profiler.snapshot('test')], self.db_path)
+
+        self.assertEqual([(p['table'], p['suggestion']) for p in problems], [
+            ('deployment_history',
+             'CREATE INDEX idx_deployment_history_error_message_id ON deployment_history(error_message, id)')])
+
+    def test_verify_schema_requires_plan_indexes(self):
+        """Test verify_schema fails without an index the plan check relies on."""
+        db_path = os.path.join(self.temp_dir, 'schema.db')
+        initialize_database(db_path)
+        self.assertTrue(verify_schema(db_path))
+        conn = sqlite3.connect(db_path)
+        conn.execute("DROP INDEX idx_rollup_hourly_venue")
+        conn.close()
+        self.assertFalse(verify_schema(db_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
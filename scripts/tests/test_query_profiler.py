@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Query Profiler
+
+Tests statement shapes, per-shape timing and row counts for every way a
+cursor is consumed, query plan capture, the slow query log, and the
+snapshot files read by db_admin and the web system page.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import initialize_database
+from db_access import connect, get_connection, close_connections
+from query_profiler import (
+    profiler, normalize_statement, full_scans, percentile_ms, top_statements, recent_slow,
+    load_profiles, profile_path, QueryProfileWriter, OTHER_STATEMENT, DEFAULT_SLOW_QUERY_MS
+)
+
+POOL_INSERT = """
+    INSERT INTO hostname_pool (product_type, venue_code, identifier, status)
+    VALUES ('KXP2', 'CORO', ?, 'available')
+"""
+
+
+class TestQueryProfiler(unittest.TestCase):
+    """Test statements run through db_access are profiled."""
+
+    def setUp(self):
+        """Create a database with 20 pool entries and an empty profile."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+        initialize_database(self.db_path)
+        self.conn = connect(self.db_path)
+        with self.conn:
+            self.conn.executemany(POOL_INSERT, [(f"{n:03d}",) for n in range(20)])
+        profiler.reset()
+
+    def tearDown(self):
+        """Close connections, restore the threshold and remove the directory."""
+        self.conn.close()
+        close_connections(self.db_path)
+        profiler.slow_ms = DEFAULT_SLOW_QUERY_MS
+        profiler.reset()
+        shutil.rmtree(self.temp_dir)
+
+    def _stats(self, sql):
+        """Statistics recorded for a statement."""
+        return profiler.snapshot()['statements'][normalize_statement(sql)]
+
+    def test_normalize_statement(self):
+        """Test literals, placeholder lists and whitespace do not create new shapes."""
+        self.assertEqual(
+            normalize_statement("SELECT *\n  FROM hostname_pool WHERE venue_code = 'CORO' AND id IN (1, 2,3)"),
+            normalize_statement("SELECT * FROM hostname_pool WHERE venue_code = ? AND id IN (?, ?)")
+        )
+        self.assertEqual(normalize_statement("SELECT * FROM t WHERE name = 'it''s' LIMIT 10"),
+                         "SELECT * FROM t WHERE name = ? LIMIT ?")
+        # Digits inside identifiers are kept
+        self.assertEqual(normalize_statement("SELECT kxp2_count FROM t2"), "SELECT kxp2_count FROM t2")
+
+    def test_rows_counted_however_results_are_read(self):
+        """Test rows are counted for fetchall, iteration, fetchmany and fetchone."""
+        sql = "SELECT * FROM hostname_pool WHERE venue_code = ?"
+        self.conn.execute(sql, ('CORO',)).fetchall()
+        for _ in self.conn.execute(sql, ('CORO',)):
+            pass
+        cursor = self.conn.execute(sql, ('CORO',))
+        while cursor.fetchmany(8):
+            pass
+        # Dropped after the first row: recorded when garbage collected
+        self.conn.execute(sql, ('CORO',)).fetchone()
+
+        stats = self._stats(sql)
+        self.assertEqual(stats['calls'], 4)
+        self.assertEqual(stats['rows'], 61)
+        self.assertEqual(sum(stats['histogram']), 4)
+        self.assertGreater(stats['total_ms'], 0)
+
+    def test_changed_rows_counted(self):
+        """Test INSERT/UPDATE/DELETE record the rows they changed."""
+        with self.conn:
+            self.conn.execute("UPDATE hostname_pool SET status = 'retired' WHERE identifier < '005'")
+            self.conn.executemany(POOL_INSERT, [('100',), ('101',)])
+
+        self.assertEqual(self._stats("UPDATE hostname_pool SET status = 'retired' WHERE identifier < '005'")['rows'], 5)
+        self.assertEqual(self._stats(POOL_INSERT)['rows'], 2)
+
+    def test_plan_captured_for_new_shapes(self):
+        """Test the first execution of a shape captures its plan and flags full scans."""
+        self.conn.execute("SELECT * FROM hostname_pool WHERE notes = ?", ('x',)).fetchall()
+        self.conn.execute("SELECT * FROM hostname_pool WHERE id = ?", (1,)).fetchall()
+
+        scan = self._stats("SELECT * FROM hostname_pool WHERE notes = ?")
+        self.assertEqual(scan['plan'], ['SCAN hostname_pool'])
+        self.assertEqual(scan['full_scans'], ['hostname_pool'])
+        search = self._stats("SELECT * FROM hostname_pool WHERE id = ?")
+        self.assertTrue(search['plan'][0].startswith('SEARCH hostname_pool'))
+        self.assertEqual(search['full_scans'], [])
+        self.assertEqual(full_scans(['SCAN deployment_history USING COVERING INDEX idx']), [])
+
+    def test_pooled_connections_profiled(self):
+        """Test connections from the pool are profiled too."""
+        get_connection(self.db_path).execute("SELECT COUNT(*) FROM venues").fetchone()
+        self.assertEqual(self._stats("SELECT COUNT(*) FROM venues")['calls'], 1)
+
+    def test_slow_statements_logged(self):
+        """Test statements over the threshold are logged and listed."""
+        profiler.slow_ms = 0.000001
+        with self.assertLogs('query_profiler', level='WARNING') as logs:
+            self.conn.execute("SELECT * FROM hostname_pool").fetchall()
+
+        self.assertIn('Slow query', logs.output[0])
+        slow = profiler.snapshot()['slow']
+        self.assertEqual(slow[-1]['statement'], 'SELECT * FROM hostname_pool')
+        self.assertEqual(slow[-1]['rows'], 20)
+
+    def test_statement_limit(self):
+        """Test shapes beyond max_statements are counted together."""
+        profiler.max_statements = 2
+        try:
+            for column in ('id', 'identifier', 'status', 'notes'):
+                self.conn.execute(f"SELECT {column} FROM hostname_pool").fetchall()
+        finally:
+            profiler.max_statements = 500
+
+        statements = profiler.snapshot()['statements']
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(statements[OTHER_STATEMENT]['calls'], 2)
+
+    def test_snapshots_ranked_across_components(self):
+        """Test saved snapshots are loaded and ranked together."""
+        for _ in range(3):
+            self.conn.execute("SELECT * FROM hostname_pool").fetchall()
+        profiler.save(profile_path(self.temp_dir, 'deployment_server'), 'deployment_server')
+        profiler.reset()
+        self.conn.execute("SELECT * FROM venues").fetchall()
+
+        snapshots = [profiler.snapshot('web')] + load_profiles(self.temp_dir, exclude='web')
+        top = top_statements(snapshots, limit=5, order_by='calls')
+
+        self.assertEqual((top[0]['component'], top[0]['statement'], top[0]['calls'], top[0]['rows']),
+                         ('deployment_server', 'SELECT * FROM hostname_pool', 3, 60))
+        self.assertIn(('web', 'SELECT * FROM venues'), [(row['component'], row['statement']) for row in top])
+        self.assertEqual(recent_slow(snapshots), [])
+        with self.assertRaises(ValueError):
+            top_statements(snapshots, order_by='statement')
+
+    def test_writer_saves_on_stop(self):
+        """Test the background writer leaves a final snapshot."""
+        self.conn.execute("SELECT * FROM venues").fetchall()
+        writer = QueryProfileWriter(profile_path(self.temp_dir, 'web'), 'web', interval=3600)
+        writer.start()
+        writer.stop()
+
+        snapshots = load_profiles(self.temp_dir)
+        self.assertEqual([s['component'] for s in snapshots], ['web'])
+        self.assertIn('SELECT * FROM venues', snapshots[0]['statements'])
+
+    def test_percentile_from_histogram(self):
+        """Test percentiles are bucket bounds capped at the maximum."""
+        stats = {'calls': 10, 'max_ms': 40.0, 'histogram': [0] * 14}
+        stats['histogram'][3] = 9    # <= 1 ms
+        stats['histogram'][8] = 1    # <= 50 ms
+        self.assertEqual(percentile_ms(stats, 0.5), 1)
+        self.assertEqual(percentile_ms(stats, 0.95), 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
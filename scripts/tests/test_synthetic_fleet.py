@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Synthetic Fleet Generator
+
+Tests row counts and distributions, determinism, time ordering, and that
+counters, search indexes, rollups and triggers match the generated rows.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import sqlite3
+import shutil
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import verify_schema, rebuild_deployment_rollups
+from synthetic_fleet import generate_fleet, BATCH_STATES, IN_PROGRESS_STATUSES, IN_FLIGHT_SECONDS
+
+END = datetime(2025, 10, 23, 14, 30, 0)
+
+
+class TestSyntheticFleet(unittest.TestCase):
+    """Test a fleet of 8 venues, 2000 pool entries and 20000 deployments."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Generate one fleet shared by the read-only checks."""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.db_path = os.path.join(cls.temp_dir, 'fleet.db')
+        cls.result = generate_fleet(cls.db_path, venues=8, pool=2000, history=20000, archive=5000,
+                                    days=60, end=END)
+        cls.conn = sqlite3.connect(cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Close the connection and remove the directory."""
+        cls.conn.close()
+        shutil.rmtree(cls.temp_dir)
+
+    def _scalar(self, sql, params=()):
+        """First column of the first row."""
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def test_counts(self):
+        """Test every table holds the requested rows."""
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM venues"), 8)
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM hostname_pool"), self.result['pool'])
+        self.assertGreater(self.result['pool'], 1990)
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM deployment_history"), 20000)
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM deployment_history_archive"), 5000)
+        self.assertEqual([row[0] for row in self.conn.execute(
+            "SELECT DISTINCT status FROM deployment_batches ORDER BY status")], sorted(BATCH_STATES))
+        self.assertEqual(self.conn.execute(
+            "SELECT product_type, filename FROM master_images WHERE is_active = 1 ORDER BY 1").fetchall(),
+            [('KXP2', 'kxp2_master_v1.7.img'), ('RXP2', 'rxp2_master_v1.7.img')])
+        self.assertTrue(verify_schema(self.db_path))
+
+    def test_history_in_time_order(self):
+        """Test ids follow started_at across the archive and the hot table, within the window."""
+        self.assertEqual(self._scalar("""
+            SELECT COUNT(*) FROM (
+                SELECT started_at, LAG(started_at) OVER (ORDER BY id) AS previous FROM deployment_history_all
+            ) WHERE started_at < previous
+        """), 0)
+        self.assertEqual(self._scalar("SELECT MAX(id) FROM deployment_history_archive"),
+                         self._scalar("SELECT MIN(id) FROM deployment_history") - 1)
+        self.assertEqual(self._scalar("SELECT seq FROM sqlite_sequence WHERE name = 'deployment_history'"), 25000)
+        self.assertGreaterEqual(self._scalar("SELECT MIN(started_at) FROM deployment_history_archive"),
+                                str(END - timedelta(days=60)))
+        self.assertLessEqual(self._scalar("SELECT MAX(started_at) FROM deployment_history"), str(END))
+        # No deployments at night
+        self.assertEqual(self._scalar(
+            "SELECT COUNT(*) FROM deployment_history WHERE strftime('%H', started_at) < '06'"), 0)
+
+    def test_status_distribution(self):
+        """Test mostly successes, a few failures, and in-progress rows only in the last minutes."""
+        statuses = dict(self.conn.execute(
+            "SELECT deployment_status, COUNT(*) FROM deployment_history GROUP BY 1").fetchall())
+        self.assertAlmostEqual(statuses['success'] / 20000, 0.935, delta=0.01)
+        self.assertAlmostEqual(statuses['failed'] / 20000, 0.06, delta=0.01)
+
+        in_flight = self.conn.execute(f"""
+            SELECT MIN(started_at) FROM deployment_history
+            WHERE deployment_status IN ({', '.join('?' for _ in IN_PROGRESS_STATUSES)})
+              AND deployment_status != 'started'
+        """, IN_PROGRESS_STATUSES).fetchone()[0]
+        self.assertGreaterEqual(in_flight, str(END - timedelta(seconds=IN_FLIGHT_SECONDS)))
+        self.assertEqual(self._scalar("""
+            SELECT COUNT(*) FROM deployment_history_archive
+            WHERE deployment_status NOT IN ('success', 'failed') OR completed_at IS NULL
+        """), 0)
+        self.assertEqual(self._scalar("""
+            SELECT COUNT(*) FROM deployment_history
+            WHERE deployment_status = 'failed' AND (error_message IS NULL OR completed_at <= started_at)
+        """), 0)
+
+    def test_derived_tables_match(self):
+        """Test counters, search indexes and rollups match the generated rows."""
+        self.assertEqual(self.conn.execute(
+            "SELECT venue_code, product_type, status, count FROM hostname_pool_counts ORDER BY 1, 2, 3"
+        ).fetchall(), self.conn.execute(
+            "SELECT venue_code, product_type, status, COUNT(*) FROM hostname_pool GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+        ).fetchall())
+        self.assertEqual(self._scalar("SELECT SUM(count) FROM deployment_history_counts"), 20000)
+        self.assertEqual(self._scalar("SELECT SUM(count) FROM deployment_archive_counts"), 5000)
+        self.assertEqual(self._scalar("SELECT SUM(count) FROM deployment_rollups_daily"), 25000)
+
+        hostname = self._scalar("SELECT hostname FROM deployment_history WHERE id = 12345")
+        self.assertEqual(
+            self._scalar("SELECT COUNT(*) FROM deployment_search WHERE deployment_search MATCH ?",
+                         (f'"{hostname}"',)),
+            self._scalar("SELECT COUNT(*) FROM deployment_history WHERE hostname = ?", (hostname,)))
+        self.assertEqual(
+            self._scalar("SELECT COUNT(*) FROM hostname_search WHERE hostname_search MATCH '\"KXP2 V003\"'"),
+            self._scalar("SELECT COUNT(*) FROM hostname_pool WHERE product_type = 'KXP2' AND venue_code = 'V003'"))
+
+        hourly = self.conn.execute("SELECT * FROM deployment_rollups_hourly ORDER BY 1, 2, 3, 4").fetchall()
+        daily = self.conn.execute("SELECT * FROM deployment_rollups_daily ORDER BY 1, 2, 3, 4").fetchall()
+        rebuild_deployment_rollups(self.conn.cursor())
+        self.assertEqual(self.conn.execute("SELECT * FROM deployment_rollups_hourly ORDER BY 1, 2, 3, 4").fetchall(),
+                         hourly)
+        self.assertEqual(self.conn.execute("SELECT * FROM deployment_rollups_daily ORDER BY 1, 2, 3, 4").fetchall(),
+                         daily)
+        self.conn.rollback()
+
+    def test_triggers_restored(self):
+        """Test deployments recorded after generation are counted."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
+                INSERT INTO deployment_history (hostname, product_type, venue_code, deployment_status, started_at)
+                VALUES ('KXP2-V000-001', 'KXP2', 'V000', 'started', '2025-10-23 14:31:00')
+            """)
+            self.assertEqual(conn.execute("SELECT SUM(count) FROM deployment_history_counts").fetchone()[0],
+                             20001)
+            self.assertEqual(conn.execute(
+                "SELECT rowid FROM deployment_search WHERE deployment_search MATCH '\"KXP2 V000 001\"' "
+                "ORDER BY rowid DESC LIMIT 1").fetchone()[0], 25001)
+        finally:
+            conn.rollback()
+            conn.close()
+
+    def test_deterministic(self):
+        """Test the same seed and end give the same rows, another seed different ones."""
+        def dump(path):
+            conn = sqlite3.connect(path)
+            try:
+                return [conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+                        for table in ('deployment_history', 'deployment_history_archive', 'hostname_pool',
+                                      'venues', 'master_images', 'deployment_batches')]
+            finally:
+                conn.close()
+
+        same = os.path.join(self.temp_dir, 'same.db')
+        other = os.path.join(self.temp_dir, 'other.db')
+        generate_fleet(same, venues=4, pool=300, history=2000, archive=200, days=30, end=END)
+        generate_fleet(other, venues=4, pool=300, history=2000, days=30, end=END, seed=7)
+        first = os.path.join(self.temp_dir, 'first.db')
+        time.sleep(1)
+        generate_fleet(first, venues=4, pool=300, history=2000, archive=200, days=30, end=END)
+
+        self.assertEqual(dump(first), dump(same))
+        self.assertNotEqual(dump(first)[0], dump(other)[0])
+
+    def test_refuses_existing_data(self):
+        """Test generating into a database with data, or with bad sizes, raises ValueError."""
+        with self.assertRaises(ValueError):
+            generate_fleet(self.db_path, venues=2, pool=10, history=10)
+        with self.assertRaises(ValueError):
+            generate_fleet(os.path.join(self.temp_dir, 'bad.db'), venues=0)
+        with self.assertRaises(ValueError):
+            generate_fleet(os.path.join(self.temp_dir, 'bad.db'), history=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for System Status Collector
+
+Tests batched systemctl parsing, statvfs disk usage, sysfs interface
+state, and the cached, coalescing collector.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import threading
+import sqlite3
+import shutil
+import time
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import system_status
+from system_status import SystemStatusCollector
+
+SYSTEMCTL_OUTPUT = """LoadState=loaded
+ActiveState=active
+SubState=running
+
+LoadState=loaded
+ActiveState=failed
+SubState=failed
+
+LoadState=not-found
+ActiveState=inactive
+SubState=dead
+"""
+
+
+class TestQueryServices(unittest.TestCase):
+    """Test batched service state queries."""
+
+    @patch('system_status.subprocess.run')
+    def test_single_batched_call(self, mock_run):
+        """Test all services are queried with one systemctl show call."""
+        mock_run.return_value = MagicMock(returncode=0, stdout=SYSTEMCTL_OUTPUT, stderr='')
+
+        statuses = system_status.query_services(['dnsmasq', 'nginx', 'rpi-web'])
+
+        mock_run.assert_called_once()
+        command = mock_run.call_args[0][0]
+        self.assertEqual(command[:2], ['systemctl', 'show'])
+        self.assertEqual(command[-3:], ['dnsmasq', 'nginx', 'rpi-web'])
+
+        self.assertEqual(statuses['dnsmasq'], {'running': True, 'status': 'active', 'sub_state': 'running'})
+        self.assertEqual(statuses['nginx']['status'], 'failed')
+        self.assertFalse(statuses['nginx']['running'])
+        self.assertEqual(statuses['rpi-web']['status'], 'inactive')
+
+    @patch('system_status.subprocess.run', side_effect=FileNotFoundError('systemctl'))
+    def test_systemctl_unavailable(self, mock_run):
+        """Test every service is unknown when systemctl cannot run."""
+        statuses = system_status.query_services(['dnsmasq', 'nginx'])
+        self.assertEqual({s['status'] for s in statuses.values()}, {'unknown'})
+
+    @patch('system_status.subprocess.run')
+    def test_systemctl_error_exit(self, mock_run):
+        """Test a failing systemctl (no systemd) reports unknown."""
+        mock_run.return_value = MagicMock(returncode=1, stdout='', stderr='System has not been booted with systemd')
+        self.assertEqual(system_status.query_services(['nginx'])['nginx']['status'], 'unknown')
+
+
+class TestDiskAndNetwork(unittest.TestCase):
+    """Test statvfs disk usage and sysfs interface state."""
+
+    def setUp(self):
+        """Create a fake /sys/class/net tree."""
+        self.sys_net = tempfile.mkdtemp()
+        self._interface('eth0', operstate='up', carrier='1', address='dc:a6:32:00:00:01',
+                        mtu='1500', speed='1000', rx_bytes='2097152', tx_bytes='1024')
+        # A down link: carrier and speed are unreadable
+        self._interface('eth1', operstate='down', address='dc:a6:32:00:00:02', mtu='1500', speed='-1')
+
+    def tearDown(self):
+        """Remove the fake sysfs tree."""
+        shutil.rmtree(self.sys_net)
+
+    def _interface(self, name, **attributes):
+        """Write sysfs attribute files for an interface."""
+        base = os.path.join(self.sys_net, name)
+        os.makedirs(os.path.join(base, 'statistics'))
+        for attribute, value in attributes.items():
+            path = os.path.join(base, 'statistics', attribute) if attribute.endswith('_bytes') \
+                else os.path.join(base, attribute)
+            with open(path, 'w') as f:
+                f.write(value + '\n')
+
+    def test_disk_usage_from_statvfs(self):
+        """Test usage is computed like df from statvfs."""
+        stat = os.statvfs_result((4096, 4096, 1000, 300, 250, 0, 0, 0, 0, 255))
+        with patch('system_status.os.statvfs', return_value=stat):
+            usage = system_status.disk_usage('/opt/rpi-deployment')
+
+        gb = 1024 ** 3
+        self.assertEqual(usage['total_gb'], round(1000 * 4096 / gb, 2))
+        # used = 700 blocks, available = 250: 700 / 950
+        self.assertEqual(usage['percent_used'], 73.7)
+
+    def test_disk_usage_missing_path(self):
+        """Test an unreadable path reports an error instead of raising."""
+        usage = system_status.disk_usage('/nonexistent/path/for/test')
+        self.assertIn('error', usage)
+
+    def test_interfaces_from_sysfs(self):
+        """Test interface attributes are read from sysfs."""
+        eth0, eth1, eth2 = system_status.network_interfaces(['eth0', 'eth1', 'eth2'], sys_path=self.sys_net)
+
+        self.assertEqual(eth0['operstate'], 'up')
+        self.assertTrue(eth0['carrier'])
+        self.assertEqual(eth0['speed_mbps'], 1000)
+        self.assertEqual(eth0['rx_bytes'], 2097152)
+
+        self.assertEqual(eth1['operstate'], 'down')
+        self.assertFalse(eth1['carrier'])
+        self.assertIsNone(eth1['speed_mbps'])
+
+        self.assertFalse(eth2['present'])
+        self.assertEqual(eth2['operstate'], 'missing')
+
+    def test_all_interfaces_by_default(self):
+        """Test every interface except loopback is listed by default."""
+        self._interface('lo', operstate='unknown')
+        names = [i['name'] for i in system_status.network_interfaces(sys_path=self.sys_net)]
+        self.assertEqual(names, ['eth0', 'eth1'])
+
+
+class TestSystemStatusCollector(unittest.TestCase):
+    """Test the cached background collector."""
+
+    def setUp(self):
+        """Create a database and a collector with a controllable service query."""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+        sqlite3.connect(self.db_path).close()
+
+        self.service_state = 'active'
+        self.queries = 0
+        patcher = patch('system_status.query_services', side_effect=self._query_services)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.changes = []
+        self.collector = SystemStatusCollector(
+            services=['dnsmasq', 'nginx'],
+            db_path=self.db_path,
+            interfaces=[],
+            disk_path=tempfile.gettempdir(),
+            interval=0.05,
+            on_change=self.changes.append
+        )
+
+    def tearDown(self):
+        """Stop the collector and remove the database."""
+        self.collector.stop()
+        os.unlink(self.db_path)
+
+    def _query_services(self, services):
+        """Stand-in for systemctl: slow enough to overlap concurrent callers."""
+        self.queries += 1
+        time.sleep(0.05)
+        return {name: {'running': self.service_state == 'active', 'status': self.service_state,
+                       'sub_state': None} for name in services}
+
+    def test_snapshot_is_cached(self):
+        """Test repeated snapshots do not re-query services."""
+        first = self.collector.snapshot()
+        for _ in range(10):
+            self.assertIs(self.collector.snapshot(), first)
+        self.assertEqual(self.queries, 1)
+        self.assertTrue(first['database']['accessible'])
+        self.assertEqual(first['services']['nginx']['status'], 'active')
+
+    def test_concurrent_requests_share_one_collection(self):
+        """Test simultaneous first requests trigger a single collection."""
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.collector.snapshot()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.queries, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_on_change_only_when_state_changes(self):
+        """Test the change callback fires for state changes, not every poll."""
+        self.collector.collect()
+        self.collector.collect()
+        self.assertEqual(self.changes, [])
+
+        self.service_state = 'failed'
+        self.collector.collect()
+        self.assertEqual(len(self.changes), 1)
+        self.assertEqual(self.changes[0]['services']['dnsmasq']['status'], 'failed')
+
+    def test_background_refresh(self):
+        """Test the background thread keeps collecting on its interval."""
+        self.collector.start()
+        deadline = time.time() + 2
+        while self.collector.collections < 3 and time.time() < deadline:
+            time.sleep(0.02)
+        self.collector.stop()
+        self.assertGreaterEqual(self.collector.collections, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Group-Commit Write Queue
+
+Tests write-through before start, batching of concurrent writes, log
+appends, commit callbacks, isolation of failing writes and draining on
+stop.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import unittest
+import tempfile
+import sqlite3
+import shutil
+import threading
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_setup import initialize_database
+from db_access import release_connections
+from write_queue import WriteQueue
+
+INSERT = """
+    INSERT INTO deployment_history (hostname, deployment_status, started_at)
+    VALUES (?, 'started', CURRENT_TIMESTAMP)
+"""
+
+
+class TestWriteQueue(unittest.TestCase):
+    """Test WriteQueue against a deployment database."""
+
+    def setUp(self):
+        """Create a database and an unstarted queue."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'deployment.db')
+        self.log_path = os.path.join(self.temp_dir, 'deployment_20251023.log')
+        initialize_database(self.db_path)
+        self.writer = WriteQueue(commit_interval=0.05)
+
+    def tearDown(self):
+        """Stop the writer and remove the database directory."""
+        self.writer.stop()
+        release_connections()
+        shutil.rmtree(self.temp_dir)
+
+    def _hostnames(self):
+        """Hostnames in deployment_history, in insert order."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [row[0] for row in conn.execute("SELECT hostname FROM deployment_history ORDER BY id")]
+        finally:
+            conn.close()
+
+    def test_writes_through_when_not_started(self):
+        """Test writes are made by the caller before start()."""
+        committed = []
+        self.writer.execute(self.db_path, INSERT, ('KXP2-CORO-001',), on_commit=lambda: committed.append(1))
+        self.writer.append_log(self.log_path, "line 1\n")
+
+        self.assertEqual(self._hostnames(), ['KXP2-CORO-001'])
+        self.assertEqual(committed, [1])
+        with open(self.log_path) as f:
+            self.assertEqual(f.read(), "line 1\n")
+
+    def test_write_through_raises(self):
+        """Test a failing write raises to the caller before start()."""
+        with self.assertRaises(sqlite3.Error):
+            self.writer.execute(self.db_path, "INSERT INTO no_such_table VALUES (1)")
+
+    def test_concurrent_writes_grouped(self):
+        """Test writes from many threads are committed in far fewer transactions."""
+        self.writer.start()
+
+        def report(worker):
+            for n in range(50):
+                self.writer.execute(self.db_path, INSERT, (f"KXP2-W{worker:03d}-{n:03d}",))
+                self.writer.append_log(self.log_path, f"{worker},{n}\n")
+
+        threads = [threading.Thread(target=report, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(self.writer.flush())
+
+        self.assertEqual(len(self._hostnames()), 400)
+        with open(self.log_path) as f:
+            self.assertEqual(len(f.readlines()), 400)
+        stats = self.writer.stats()
+        self.assertEqual(stats['writes'], 400)
+        self.assertEqual(stats['log_lines'], 400)
+        self.assertLess(stats['commits'], 400)
+        self.assertEqual(stats['pending'], 0)
+
+    def test_order_preserved(self):
+        """Test writes and log lines keep their enqueue order."""
+        self.writer.start()
+        for n in range(20):
+            self.writer.execute(self.db_path, INSERT, (f"KXP2-CORO-{n:03d}",))
+            self.writer.append_log(self.log_path, f"{n}\n")
+        self.writer.flush()
+
+        self.assertEqual(self._hostnames(), [f"KXP2-CORO-{n:03d}" for n in range(20)])
+        with open(self.log_path) as f:
+            self.assertEqual(f.read(), ''.join(f"{n}\n" for n in range(20)))
+
+    def test_callback_runs_after_commit(self):
+        """Test on_commit sees the write committed."""
+        seen = []
+        self.writer.start()
+        self.writer.execute(self.db_path, INSERT, ('KXP2-CORO-001',),
+                            on_commit=lambda: seen.append(self._hostnames()))
+        self.writer.flush()
+
+        self.assertEqual(seen, [['KXP2-CORO-001']])
+
+    def test_failing_write_isolated(self):
+        """Test a failing statement loses only itself, not its batch."""
+        self.writer.start()
+        self.writer.execute(self.db_path, INSERT, ('KXP2-CORO-001',))
+        self.writer.execute(self.db_path, "INSERT INTO no_such_table VALUES (1)")
+        self.writer.execute(self.db_path, INSERT, ('KXP2-CORO-002',))
+        self.writer.flush()
+
+        self.assertEqual(self._hostnames(), ['KXP2-CORO-001', 'KXP2-CORO-002'])
+        self.assertEqual(self.writer.stats()['failed_writes'], 1)
+
+    def test_statements_committed_together(self):
+        """Test execute_all statements are one write: a failure loses all of them, and only them."""
+        self.writer.start()
+        self.writer.execute_all(self.db_path, [(INSERT, ('KXP2-CORO-001',)), (INSERT, ('KXP2-CORO-002',))])
+        self.writer.execute_all(self.db_path, [(INSERT, ('KXP2-CORO-003',)),
+                                               ("INSERT INTO no_such_table VALUES (1)", ())])
+        self.writer.execute(self.db_path, INSERT, ('KXP2-CORO-004',))
+        self.writer.flush()
+
+        self.assertEqual(self._hostnames(), ['KXP2-CORO-001', 'KXP2-CORO-002', 'KXP2-CORO-004'])
+        self.assertEqual(self.writer.stats()['failed_writes'], 1)
+
+    def test_stop_drains_queue(self):
+        """Test stop() commits everything queued first."""
+        writer = WriteQueue(commit_interval=5.0)
+        writer.start()
+        for n in range(10):
+            writer.execute(self.db_path, INSERT, (f"KXP2-CORO-{n:03d}",))
+        writer.stop()
+
+        self.assertEqual(len(self._hostnames()), 10)
+        self.assertFalse(writer.running)
+
+    def test_commit_latency_bounded(self):
+        """Test a queued write is committed about commit_interval after it was queued."""
+        self.writer.start()
+        self.writer.execute(self.db_path, INSERT, ('KXP2-CORO-001',))
+        self.assertTrue(self.writer.flush(timeout=2.0))
+
+        self.assertLess(self.writer.stats()['max_wait_ms'], 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
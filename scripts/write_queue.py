@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Group-Commit Write Queue for Raspberry Pi Deployment System
+
+Every installer status report used to cost its request thread a database
+transaction and an open/append/close of the daily deployment log. With a
+fleet reporting several phases each, those small commits dominate the
+deployment server's write load.
+
+WriteQueue hands database writes and log lines to a single writer thread:
+
+- request handlers enqueue and return immediately
+- the writer commits everything queued within `commit_interval` of the
+  oldest pending item (or `max_batch` items, whichever comes first) in
+  one transaction, then appends the batch's log lines with one open and
+  write per log file
+- callbacks passed with a write (e.g. change events telling the web
+  interface to re-read the history) run only after it is committed
+
+Durability window: a report is acknowledged before it is committed, so a
+crash loses at most the writes queued in the last `commit_interval`
+seconds (plus the commit in progress). The writer's connection uses
+synchronous=FULL, so once a batch commits it survives a power cut too;
+one fsync per batch is affordable where one per report was not.
+
+If one statement in a batch fails, the batch is rolled back and its
+writes are retried one transaction each, so only the failing write is
+lost (and logged).
+
+Until start() is called (tests, scripts, the web interface) writes are
+executed by the caller and errors are raised to it.
+
+Author: Raspberry Pi Deployment System
+Date: 2025-10-23
+"""
+
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from db_access import connect, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Longest a queued write waits for its commit (seconds)
+DEFAULT_COMMIT_INTERVAL = 0.05
+
+# Most queued items (writes and log lines) handled per batch
+DEFAULT_MAX_BATCH = 1000
+
+# Queued items before enqueuing blocks (back-pressure on request threads)
+DEFAULT_MAX_PENDING = 10000
+
+
+class WriteQueue:
+    """
+    Batch database writes and log appends into periodic group commits.
+
+    Items are tuples (kind, enqueued_at, ...):
+    ('sql', t, db_path, statements, on_commit), ('log', t, path, line),
+    ('flush', t, event) and ('stop', t); statements is a list of
+    (sql, params) executed together as one write.
+    """
+
+    def __init__(
+        self,
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        synchronous: str = 'FULL'
+    ):
+        """
+        Args:
+            commit_interval: Longest a queued write waits for its commit
+            max_batch: Most queued items (writes and log lines) per batch
+            max_pending: Queued items before enqueuing blocks
+            synchronous: PRAGMA synchronous for the writer's connections
+        """
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.synchronous = synchronous
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'writes': 0,
+            'failed_writes': 0,
+            'log_lines': 0,
+            'commits': 0,
+            'largest_batch': 0,
+            'max_wait_ms': 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is running (writes are queued)."""
+        return self._thread is not None
+
+    def execute(
+        self,
+        db_path: str,
+        sql: str,
+        params: Sequence[Any] = (),
+        on_commit: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Queue a write statement.
+
+        Args:
+            db_path: Path to SQLite database file
+            sql: Statement to execute
+            params: Statement parameters
+            on_commit: Called (on the writer thread) once the write is committed
+
+        Raises:
+            sqlite3.Error: If the writer is not running and the write fails
+        """
+        self.execute_all(db_path, [(sql, params)], on_commit)
+
+    def execute_all(
+        self,
+        db_path: str,
+        statements: Sequence[Tuple[str, Sequence[Any]]],
+        on_commit: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Queue statements as one write: they are committed together or not at all.
+
+        Args:
+            db_path: Path to SQLite database file
+            statements: (sql, params) pairs, executed in order
+            on_commit: Called (on the writer thread) once the write is committed
+
+        Raises:
+            sqlite3.Error: If the writer is not running and the write fails
+        """
+        statements = [(sql, tuple(params)) for sql, params in statements]
+        if not self.running:
+            with get_connection(db_path) as conn:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+            self._record(writes=1, commits=1)
+            if on_commit:
+                on_commit()
+            return
+        self._queue.put(('sql', time.monotonic(), db_path, statements, on_commit))
+
+    def append_log(self, path: Any, line: str) -> None:
+        """
+        Queue a line for a log file.
+
+        Args:
+            path: Log file path
+            line: Text to append (including its newline)
+
+        Raises:
+            OSError: If the writer is not running and the file cannot be written
+        """
+        if not self.running:
+            with open(path, 'a') as f:
+                f.write(line)
+            self._record(log_lines=1)
+            return
+        self._queue.put(('log', time.monotonic(), path, line))
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Wait until everything queued so far is committed and logged.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if flushed, False on timeout
+        """
+        if not self.running:
+            return True
+        done = threading.Event()
+        self._queue.put(('flush', time.monotonic(), done))
+        return done.wait(timeout)
+
+    def start(self) -> None:
+        """Start the writer thread; from now on writes are queued."""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+        self._thread.start()
+        logger.info(f"Write queue started (commit interval {self.commit_interval * 1000:.0f} ms)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Commit everything queued and stop the writer thread.
+
+        Args:
+            timeout: Seconds to wait for the writer to finish
+        """
+        thread = self._thread
+        if not thread:
+            return
+        self._queue.put(('stop', time.monotonic()))
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get writer counters.
+
+        Returns:
+            dict: writes, failed_writes, log_lines, commits, largest_batch,
+            max_wait_ms (longest enqueue-to-commit time), pending and running
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 1)
+        stats['pending'] = self._queue.qsize()
+        stats['running'] = self.running
+        return stats
+
+    def _record(self, batch: int = 0, wait_ms: float = 0.0, **counts) -> None:
+        """Add to the counters."""
+        with self._stats_lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], batch)
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+
+    def _run(self) -> None:
+        """Collect and commit batches until a stop item arrives."""
+        connections: Dict[str, sqlite3.Connection] = {}
+        stopping = False
+        try:
+            while not stopping:
+                batch = [self._queue.get()]
+                deadline = batch[0][1] + self.commit_interval
+
+                # Gather until the oldest item is due, the batch is full, or stop
+                while len(batch) < self.max_batch and batch[-1][0] != 'stop':
+                    remaining = deadline - time.monotonic()
+                    try:
+                        batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                     else self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if batch[-1][0] == 'stop':
+                    stopping = True
+                    # Drain whatever was queued behind the stop request
+                    while True:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+
+                try:
+                    self._commit(batch, connections)
+                except Exception as e:
+                    logger.error(f"Write queue batch failed: {e}")
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+    def _connection(self, db_path: str, connections: Dict[str, sqlite3.Connection]) -> sqlite3.Connection:
+        """The writer's own connection to a database."""
+        conn = connections.get(db_path)
+        if conn is None:
+            conn = connect(db_path, isolation_level=None)
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+            connections[db_path] = conn
+        return conn
+
+    def _commit(self, batch: List[tuple], connections: Dict[str, sqlite3.Connection]) -> None:
+        """Commit a batch's writes, append its log lines, then run callbacks and release flushes."""
+        writes_by_db: Dict[str, List[tuple]] = OrderedDict()
+        logs_by_path: Dict[Any, List[str]] = OrderedDict()
+        for item in batch:
+            if item[0] == 'sql':
+                writes_by_db.setdefault(item[2], []).append(item)
+            elif item[0] == 'log':
+                logs_by_path.setdefault(item[2], []).append(item[3])
+
+        committed = []
+        for db_path, writes in writes_by_db.items():
+            conn = self._connection(db_path, connections)
+            try:
+                self._transaction(conn, writes)
+                committed.extend(writes)
+                self._record(commits=1)
+            except sqlite3.Error as e:
+                logger.warning(f"Batch of {len(writes)} writes failed ({e}), retrying one by one")
+                for write in writes:
+                    try:
+                        self._transaction(conn, [write])
+                        committed.append(write)
+                        self._record(commits=1)
+                    except sqlite3.Error as e:
+                        logger.error(f"Dropped write to {db_path}: {e} "
+                                     f"(params {[params for _, params in write[3]]})")
+                        self._record(failed_writes=1)
+
+        lines = 0
+        for path, path_lines in logs_by_path.items():
+            try:
+                with open(path, 'a') as f:
+                    f.write(''.join(path_lines))
+                lines += len(path_lines)
+            except OSError as e:
+                logger.error(f"Failed to append {len(path_lines)} lines to {path}: {e}")
+
+        now = time.monotonic()
+        self._record(batch=len(committed), writes=len(committed), log_lines=lines,
+                     wait_ms=(now - batch[0][1]) * 1000 if committed or lines else 0.0)
+
+        for write in committed:
+            if write[4]:
+                try:
+                    write[4]()
+                except Exception as e:
+                    logger.warning(f"Write queue callback failed: {e}")
+
+        for item in batch:
+            if item[0] == 'flush':
+                item[2].set()
+
+    @staticmethod
+    def _transaction(conn: sqlite3.Connection, writes: List[tuple]) -> None:
+        """Execute writes in one transaction."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for write in writes:
+                for sql, params in write[3]:
+                    conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
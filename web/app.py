@@ -6,19 +6,17 @@ and monitoring deployments for the Raspberry Pi mass deployment system.
 
 import os
 import sys
-import subprocess
 import sqlite3
 import re
 import threading
 import time
-import shutil
 import logging
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Tuple, Any
 from datetime import datetime
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, current_app
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, current_app
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from flask_cors import CORS
 from wtforms import Form, StringField, TextAreaField, SelectField, validators
 from wtforms.validators import ValidationError
@@ -26,9 +24,20 @@ from wtforms.validators import ValidationError
 # Add scripts directory to path for HostnameManager import
 sys.path.insert(0, '/opt/rpi-deployment/scripts')
 from hostname_manager import HostnameManager
+from system_status import SystemStatusCollector, DEFAULT_INTERVAL as DEFAULT_STATUS_INTERVAL
+from data_export import stream_export, export_filename, EXPORT_FORMATS
+from history_archive import HistoryArchiver, DEFAULT_RETENTION_DAYS, DEFAULT_ARCHIVE_INTERVAL
+from db_backup import BackupScheduler, DEFAULT_BACKUP_DIR, DEFAULT_BACKUP_INTERVAL, DEFAULT_BACKUP_KEEP
+from deployment_rollups import recent_deployment_totals, rollup_report
+from db_access import release_connections, connection_metrics
+from query_profiler import (
+    profiler, QueryProfileWriter, profile_path, load_profiles, top_statements, recent_slow,
+    DEFAULT_SLOW_QUERY_MS, DEFAULT_PROFILE_DIR, DEFAULT_PROFILE_INTERVAL
+)
+import change_events
 
 # Import configuration
-from config import get_config
+from config import get_config, Config
 
 # Configure logging
 LOG_DIR = Path("/opt/rpi-deployment/logs")
@@ -81,6 +90,51 @@ def create_app(config_dict: Optional[Dict[str, Any]] = None) -> Flask:
     db_path = app.config['DATABASE_PATH']
     app.hostname_manager = HostnameManager(db_path)
 
+    # Dashboard statistics shared by page loads, API, WebSocket and broadcasts
+    app.stats_cache = StatsCache(app.config.get('STATS_CACHE_TTL', 0))
+    app.dashboard_state = DashboardState()
+
+    # Live progress of in-flight installs, fed by deployment server events
+    app.install_progress = {}
+
+    # Service, disk, network and database health, collected in the background
+    app.system_status = SystemStatusCollector(
+        services=app.config.get('MONITORED_SERVICES', Config.MONITORED_SERVICES),
+        db_path=db_path,
+        interfaces=app.config.get('NETWORK_INTERFACES'),
+        interval=app.config.get('SYSTEM_STATUS_INTERVAL', DEFAULT_STATUS_INTERVAL),
+        on_change=lambda snapshot: push_system_status(app, socketio)
+    )
+
+    # Move finished deployments past the retention period to the archive
+    app.history_archiver = HistoryArchiver(
+        db_path,
+        older_than_days=app.config.get('ARCHIVE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS),
+        interval=app.config.get('ARCHIVE_INTERVAL', DEFAULT_ARCHIVE_INTERVAL)
+    )
+
+    # Consistent online backups of the database
+    app.backup_scheduler = BackupScheduler(
+        db_path,
+        backup_dir=app.config.get('BACKUP_DIR', DEFAULT_BACKUP_DIR),
+        interval=app.config.get('BACKUP_INTERVAL', DEFAULT_BACKUP_INTERVAL),
+        keep=app.config.get('BACKUP_KEEP', DEFAULT_BACKUP_KEEP)
+    )
+
+    # Statement latency profile, written where db_admin and other services read it
+    profiler.slow_ms = app.config.get('SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    app.query_profile_writer = QueryProfileWriter(
+        profile_path(app.config.get('QUERY_PROFILE_DIR', DEFAULT_PROFILE_DIR), 'web'),
+        'web',
+        interval=app.config.get('QUERY_PROFILE_INTERVAL', DEFAULT_PROFILE_INTERVAL)
+    )
+
+    # Hand each request thread's database connections back to the shared pool
+    app.teardown_appcontext(lambda exception: release_connections())
+
+    # Filters used by the page templates
+    app.add_template_filter(parse_datetime)
+
     # Register error handlers
     register_error_handlers(app)
 
@@ -90,12 +144,34 @@ def create_app(config_dict: Optional[Dict[str, Any]] = None) -> Flask:
     # Register WebSocket event handlers
     register_websocket_handlers(app, socketio)
 
-    # Start background thread for periodic stats updates
-    start_background_thread(app, socketio)
+    # Push updates to clients when the deployment data changes
+    start_change_listener(app, socketio)
+
+    # Keep the system status cache fresh (requests only read it)
+    if not app.config.get('TESTING', False):
+        app.system_status.start()
+        if app.config.get('ARCHIVE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS):
+            app.history_archiver.start()
+        if app.config.get('BACKUP_INTERVAL', DEFAULT_BACKUP_INTERVAL):
+            app.backup_scheduler.start()
+        app.query_profile_writer.start()
 
     return app
 
 
+def parse_datetime(value: str) -> datetime:
+    """
+    Template filter parsing a database timestamp ('YYYY-MM-DD HH:MM:SS').
+
+    Args:
+        value: Timestamp text
+
+    Returns:
+        datetime: Parsed timestamp
+    """
+    return datetime.fromisoformat(value)
+
+
 def register_error_handlers(app: Flask) -> None:
     """
     Register error handlers for the application.
@@ -132,13 +208,13 @@ def register_routes(app: Flask) -> None:
         manager = current_app.hostname_manager
 
         # Get overall statistics
-        stats = get_dashboard_stats(manager)
+        stats = get_cached_dashboard_stats(current_app)
 
         # Get recent deployments
         recent_deployments = get_recent_deployments(manager, limit=10)
 
-        # Get system status
-        system_status = get_system_status()
+        # Get system status (cached by the background collector)
+        system_status = get_system_status(current_app)
 
         return render_template('dashboard.html',
                              stats=stats,
@@ -194,6 +270,7 @@ def register_routes(app: Flask) -> None:
 
             try:
                 manager.create_venue(code, name, location, contact_email)
+                notify_change('venue', venue_code=code)
                 flash(f'Venue "{code}" created successfully!', 'success')
                 return redirect(url_for('venues_list'))
             except ValueError as e:
@@ -255,52 +332,44 @@ def register_routes(app: Flask) -> None:
     # Kart number management routes
     @app.route('/kart-numbers')
     def kart_numbers_list():
-        """Display list of kart numbers with optional venue filter."""
+        """
+        Display one page of kart numbers with optional filters.
+
+        Filtering, prefix search and paging happen in SQL; the first page is
+        rendered server-side and later pages are appended from
+        /api/kart-numbers (or followed via the 'after' cursor without JS).
+        """
         manager = current_app.hostname_manager
         venue_filter = request.args.get('venue', '').strip().upper()
+        product_filter = request.args.get('product', '').strip().upper()
+        status_filter = request.args.get('status', '').strip().lower()
+        search = request.args.get('q', '').strip().upper()
+        after = request.args.get('after') or None
+        limit = current_app.config.get('KART_NUMBERS_PER_PAGE', 100)
+
+        filters = {'venue_code': venue_filter or None, 'product_type': product_filter or None,
+                   'status': status_filter or None, 'prefix': search or None}
+        try:
+            result = manager.list_pool_page(after=after, limit=limit, **filters)
+            total = manager.count_pool_entries(**filters)
+        except ValueError as e:
+            flash(f'Invalid filter: {str(e)}', 'error')
+            return redirect(url_for('kart_numbers_list'))
 
         # Get all venues for filter dropdown
         venues = manager.list_venues()
 
-        # Get kart numbers
-        conn = manager._get_connection()
-        cursor = conn.cursor()
-
-        if venue_filter:
-            cursor.execute("""
-                SELECT id, product_type, venue_code, identifier, status,
-                       mac_address, assigned_date
-                FROM hostname_pool
-                WHERE venue_code = ?
-                ORDER BY product_type, identifier
-            """, (venue_filter,))
-        else:
-            cursor.execute("""
-                SELECT id, product_type, venue_code, identifier, status,
-                       mac_address, assigned_date
-                FROM hostname_pool
-                ORDER BY venue_code, product_type, identifier
-            """)
-
-        kart_numbers = []
-        for row in cursor.fetchall():
-            # Build hostname dynamically
-            hostname = f"{row[1]}-{row[2]}-{row[3]}"  # product_type-venue_code-identifier
-            kart_numbers.append({
-                'id': row[0],
-                'hostname': hostname,
-                'venue_code': row[2],
-                'product_type': row[1],
-                'kart_number': row[3],  # identifier is the kart number
-                'status': row[4],
-                'mac_address': row[5],
-                'assigned_date': row[6]
-            })
-
         return render_template('kart_numbers.html',
-                             kart_numbers=kart_numbers,
+                             kart_numbers=result['kart_numbers'],
+                             next_cursor=result['next_cursor'],
+                             total=total,
+                             page_size=limit,
                              venues=venues,
-                             venue_filter=venue_filter)
+                             venue_filter=venue_filter,
+                             product_filter=product_filter,
+                             status_filter=status_filter,
+                             search=search,
+                             paged=bool(after))
 
     @app.route('/kart-numbers/bulk-import', methods=['GET', 'POST'])
     def kart_numbers_bulk_import():
@@ -322,6 +391,7 @@ def register_routes(app: Flask) -> None:
 
             try:
                 result = manager.bulk_import_kart_numbers(venue_code, kart_numbers, product_type=product_type)
+                notify_change('pool', venue_code=venue_code)
                 imported = result['imported']
                 duplicates = result['duplicates']
 
@@ -349,6 +419,7 @@ def register_routes(app: Flask) -> None:
 
         try:
             result = manager.bulk_import_kart_numbers(venue_code, [kart_number])
+            notify_change('pool', venue_code=venue_code)
             if result['imported'] > 0:
                 flash(f'Kart number {kart_number} added successfully!', 'success')
             else:
@@ -371,6 +442,7 @@ def register_routes(app: Flask) -> None:
         try:
             success = manager.release_hostname(hostname)
             if success:
+                notify_change('pool', hostname=hostname)
                 flash(f'Hostname "{hostname}" released successfully.', 'success')
             else:
                 flash(f'Hostname "{hostname}" not found or already released.', 'warning')
@@ -379,73 +451,103 @@ def register_routes(app: Flask) -> None:
 
         return redirect(url_for('kart_numbers_list'))
 
+    @app.route('/kart-numbers/bulk-action', methods=['POST'])
+    def kart_numbers_bulk_action():
+        """
+        Release or retire many kart numbers in one operation.
+
+        Form fields:
+            action: 'release' or 'retire'
+            hostnames: Selected hostnames (optional, repeated)
+            venue_code, product_type, status, assigned_before: Filters used
+                when no hostnames are selected
+        """
+        manager = current_app.hostname_manager
+        action = request.form.get('action', '').strip().lower()
+        hostnames = [h.strip() for h in request.form.getlist('hostnames') if h.strip()]
+        venue_code = request.form.get('venue_code', '').strip().upper() or None
+
+        filters = {}
+        if not hostnames:
+            filters = {
+                'venue_code': venue_code,
+                'product_type': request.form.get('product_type', '').strip().upper() or None,
+                'status': request.form.get('status', '').strip().lower() or None,
+                'assigned_before': request.form.get('assigned_before', '').strip() or None
+            }
+
+        try:
+            if action == 'release':
+                count = manager.bulk_release_hostnames(hostnames=hostnames, **filters)
+                notify_change('pool', venue_code=venue_code)
+                flash(f'Released {count} kart numbers.', 'success')
+            elif action == 'retire':
+                count = manager.bulk_retire_hostnames(hostnames=hostnames, **filters)
+                notify_change('pool', venue_code=venue_code)
+                flash(f'Retired {count} kart numbers.', 'success')
+            else:
+                flash(f'Unknown bulk action "{action}".', 'error')
+        except ValueError as e:
+            flash(f'Error in bulk {action}: {str(e)}', 'error')
+        except Exception as e:
+            flash(f'Unexpected error: {str(e)}', 'error')
+
+        if venue_code:
+            return redirect(url_for('kart_numbers_list', venue=venue_code))
+        return redirect(url_for('kart_numbers_list'))
+
     # Deployment monitoring routes
     @app.route('/deployments')
     def deployments_list():
-        """Display deployment history with filters."""
+        """
+        Display deployment history with filters.
+
+        Pages are addressed by cursor ('before' for older, 'after' for newer
+        rows), so every page costs one index seek regardless of depth.
+        A bare 'page' number still works for old links. 'archive=1' includes
+        archived deployments.
+        """
         manager = current_app.hostname_manager
 
         # Get filter parameters
         venue_filter = request.args.get('venue', '').strip().upper()
         product_filter = request.args.get('product', '').strip().upper()
         status_filter = request.args.get('status', '').strip().lower()
-        page = max(1, int(request.args.get('page', 1)))
+        include_archive = request.args.get('archive', '').lower() in ('1', 'true', 'yes')
+        before = request.args.get('before') or None
+        after = request.args.get('after') or None
+        page = max(1, request.args.get('page', 1, type=int))
         limit = current_app.config['ITEMS_PER_PAGE']
-        offset = (page - 1) * limit
+        offset = 0 if before or after else (page - 1) * limit
 
-        # Build query
-        query = """
-            SELECT id, hostname, mac_address, serial_number, product_type, venue_code,
-                   ip_address, deployment_status, started_at, completed_at, error_message
-            FROM deployment_history
-            WHERE 1=1
-        """
-        params = []
-
-        if venue_filter:
-            query += " AND venue_code = ?"
-            params.append(venue_filter)
-        if product_filter:
-            query += " AND product_type = ?"
-            params.append(product_filter)
-        if status_filter:
-            query += " AND deployment_status = ?"
-            params.append(status_filter)
-
-        query += " ORDER BY started_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-
-        # Execute query
-        conn = manager._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
+        try:
+            result = get_deployment_page(
+                manager, venue_code=venue_filter, product_type=product_filter, status=status_filter,
+                before=before, after=after, limit=limit, offset=offset, include_archive=include_archive
+            )
+        except ValueError as e:
+            flash(f'Invalid page link: {str(e)}', 'error')
+            return redirect(url_for('deployments_list', venue=venue_filter, product=product_filter,
+                                    status=status_filter, archive=1 if include_archive else None))
 
-        deployments = []
-        for row in cursor.fetchall():
-            deployments.append({
-                'id': row[0],
-                'hostname': row[1],
-                'mac_address': row[2],
-                'serial_number': row[3],
-                'product_type': row[4],
-                'venue_code': row[5],
-                'ip_address': row[6],
-                'status': row[7],
-                'started_at': row[8],
-                'completed_at': row[9],
-                'error_message': row[10]
-            })
+        total = count_deployments(manager, venue_filter, product_filter, status_filter, include_archive)
+        total_pages = max(1, -(-total // limit))
 
         # Get venues for filter dropdown
         venues = manager.list_venues()
 
         return render_template('deployments.html',
-                             deployments=deployments,
+                             deployments=result['deployments'],
                              venues=venues,
                              venue_filter=venue_filter,
                              product_filter=product_filter,
                              status_filter=status_filter,
-                             page=page)
+                             archive=1 if include_archive else None,
+                             page=min(page, total_pages),
+                             total=total,
+                             total_pages=total_pages,
+                             next_cursor=result['next_cursor'],
+                             prev_cursor=result['prev_cursor'])
 
     # Deployment batch management routes
     @app.route('/batches')
@@ -491,6 +593,7 @@ def register_routes(app: Flask) -> None:
                     total_count=total_count,
                     priority=priority
                 )
+                notify_change('batch', batch_id=batch_id, status='pending')
 
                 flash(f'Deployment batch created successfully (ID: {batch_id})!', 'success')
                 return redirect(url_for('batches_list'))
@@ -508,6 +611,7 @@ def register_routes(app: Flask) -> None:
 
         try:
             manager.start_batch(batch_id)
+            notify_change('batch', batch_id=batch_id, status='active')
             flash(f'Batch {batch_id} started successfully.', 'success')
         except ValueError as e:
             flash(f'Error starting batch: {str(e)}', 'error')
@@ -523,6 +627,7 @@ def register_routes(app: Flask) -> None:
 
         try:
             manager.pause_batch(batch_id)
+            notify_change('batch', batch_id=batch_id, status='paused')
             flash(f'Batch {batch_id} paused successfully.', 'success')
         except ValueError as e:
             flash(f'Error pausing batch: {str(e)}', 'error')
@@ -539,6 +644,7 @@ def register_routes(app: Flask) -> None:
         try:
             priority = int(request.form.get('priority', '0'))
             manager.update_batch_priority(batch_id, priority)
+            notify_change('batch', batch_id=batch_id)
             flash(f'Batch {batch_id} priority updated to {priority}.', 'success')
         except ValueError as e:
             flash(f'Error updating priority: {str(e)}', 'error')
@@ -547,19 +653,41 @@ def register_routes(app: Flask) -> None:
 
         return redirect(url_for('batches_list'))
 
+    # Search routes
+    @app.route('/search')
+    def search():
+        """Search deployments and the hostname pool by serial, MAC, hostname or error text."""
+        manager = current_app.hostname_manager
+        query = request.args.get('q', '').strip()
+        limit = current_app.config['MAX_ITEMS_PER_PAGE']
+
+        deployments, hostnames = [], []
+        if query:
+            try:
+                deployments = search_deployments(manager, query, limit)
+                hostnames = manager.search_pool(query, limit)
+            except ValueError as e:
+                flash(str(e), 'error')
+
+        return render_template('search.html',
+                             query=query,
+                             deployments=deployments,
+                             hostnames=hostnames,
+                             limit=limit)
+
     # System status routes
     @app.route('/system')
     def system_status():
         """Display system status and monitoring information."""
-        status = get_system_status()
-        return render_template('system.html', status=status)
+        status = get_system_status(current_app)
+        queries = get_query_profile(current_app)
+        return render_template('system.html', status=status, queries=queries)
 
     # API endpoints (JSON)
     @app.route('/api/stats')
     def api_stats():
         """Get dashboard statistics as JSON."""
-        manager = current_app.hostname_manager
-        stats = get_dashboard_stats(manager)
+        stats = get_cached_dashboard_stats(current_app)
         return jsonify(stats)
 
     @app.route('/api/venues')
@@ -589,19 +717,205 @@ def register_routes(app: Flask) -> None:
 
     @app.route('/api/deployments')
     def api_deployments():
-        """Get recent deployments as JSON."""
+        """
+        Get deployments as JSON, newest first.
+
+        Query params:
+            limit: Page size (capped at MAX_ITEMS_PER_PAGE)
+            venue, product, status: Optional filters
+            before: Cursor for the next (older) page
+            after: Cursor for the previous (newer) page
+            archive: '1' to include archived deployments
+
+        The body is the list of deployments; the total matching count is in
+        the X-Total-Count header and cursors for adjacent pages are in the
+        Link header (rel="next" / rel="prev").
+        """
+        manager = current_app.hostname_manager
+        limit = min(request.args.get('limit', 20, type=int), current_app.config['MAX_ITEMS_PER_PAGE'])
+        venue_filter = request.args.get('venue', '').strip().upper()
+        product_filter = request.args.get('product', '').strip().upper()
+        status_filter = request.args.get('status', '').strip().lower()
+        include_archive = request.args.get('archive', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            result = get_deployment_page(
+                manager, venue_code=venue_filter, product_type=product_filter, status=status_filter,
+                before=request.args.get('before') or None, after=request.args.get('after') or None,
+                limit=max(1, limit), include_archive=include_archive
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        response = jsonify(result['deployments'])
+        response.headers['X-Total-Count'] = str(
+            count_deployments(manager, venue_filter, product_filter, status_filter, include_archive)
+        )
+
+        links = []
+        filters = {'limit': limit, 'venue': venue_filter or None,
+                   'product': product_filter or None, 'status': status_filter or None,
+                   'archive': 1 if include_archive else None}
+        if result['next_cursor']:
+            links.append(f'<{url_for("api_deployments", before=result["next_cursor"], **filters)}>; rel="next"')
+        if result['prev_cursor']:
+            links.append(f'<{url_for("api_deployments", after=result["prev_cursor"], **filters)}>; rel="prev"')
+        if links:
+            response.headers['Link'] = ', '.join(links)
+
+        return response
+
+    @app.route('/api/kart-numbers')
+    def api_kart_numbers():
+        """
+        Get one page of kart numbers as JSON.
+
+        Query params:
+            limit: Page size (capped at MAX_ITEMS_PER_PAGE)
+            venue, product, status: Optional filters
+            q: Optional identifier prefix
+            after: Cursor returned as next_cursor by the previous page
+
+        Returns {'kart_numbers': [...], 'next_cursor': str|null, 'total': int}.
+        """
+        manager = current_app.hostname_manager
+        limit = min(request.args.get('limit', current_app.config.get('KART_NUMBERS_PER_PAGE', 100), type=int),
+                    current_app.config['MAX_ITEMS_PER_PAGE'])
+        filters = {
+            'venue_code': request.args.get('venue', '').strip().upper() or None,
+            'product_type': request.args.get('product', '').strip().upper() or None,
+            'status': request.args.get('status', '').strip().lower() or None,
+            'prefix': request.args.get('q', '').strip().upper() or None
+        }
+
+        try:
+            result = manager.list_pool_page(after=request.args.get('after') or None,
+                                            limit=max(1, limit), **filters)
+            total = manager.count_pool_entries(**filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({**result, 'total': total})
+
+    @app.route('/api/search')
+    def api_search():
+        """
+        Search deployments and the hostname pool as JSON.
+
+        Query params:
+            q: Search text; every term is matched as a prefix
+            limit: Maximum results per section (capped at MAX_ITEMS_PER_PAGE)
+
+        Returns {'query', 'deployments': [...], 'hostnames': [...]}.
+        """
         manager = current_app.hostname_manager
-        limit = min(int(request.args.get('limit', 20)), current_app.config['MAX_ITEMS_PER_PAGE'])
+        query = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 20, type=int), current_app.config['MAX_ITEMS_PER_PAGE']))
 
-        deployments = get_recent_deployments(manager, limit=limit)
-        return jsonify(deployments)
+        try:
+            deployments = search_deployments(manager, query, limit)
+            hostnames = manager.search_pool(query, limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({'query': query, 'deployments': deployments, 'hostnames': hostnames})
+
+    @app.route('/api/reports/deployments')
+    def api_deployment_report():
+        """
+        Report deployment counts and average durations per hour or day.
+
+        Query params:
+            since, until: Optional date range (YYYY-MM-DD[ HH:MM:SS]); since
+                is inclusive, until exclusive
+            granularity: 'day' (default) or 'hour'
+            group_by: Comma-separated breakdown: venue, product, status
+            venue, product, status: Optional filters
+
+        Served from the rollup tables, so any range (archived deployments
+        included) costs one row per bucket and group.
+        """
+        granularity = request.args.get('granularity', 'day').strip().lower()
+        group_by = [name.strip() for name in request.args.get('group_by', '').lower().split(',') if name.strip()]
+
+        try:
+            with current_app.hostname_manager._get_connection() as conn:
+                rows = rollup_report(
+                    conn,
+                    since=request.args.get('since', '').strip() or None,
+                    until=request.args.get('until', '').strip() or None,
+                    granularity=granularity,
+                    group_by=group_by,
+                    venue_code=request.args.get('venue', '').strip().upper() or None,
+                    product_type=request.args.get('product', '').strip().upper() or None,
+                    status=request.args.get('status', '').strip().lower() or None
+                )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({'granularity': granularity, 'group_by': group_by, 'rows': rows})
+
+    @app.route('/api/export/<dataset>')
+    def api_export(dataset: str):
+        """
+        Stream a bulk export of deployments, the hostname pool or batches.
+
+        Query params:
+            format: 'csv' (default) or 'ndjson'
+            gzip: '1' to gzip the output
+            venue, product, status: Optional filters
+            since, until: Optional date range (YYYY-MM-DD[ HH:MM:SS]); since
+                is inclusive, until exclusive
+
+        The response is generated batch by batch while it is sent, so
+        memory use does not depend on the number of rows exported.
+        """
+        fmt = request.args.get('format', 'csv').lower()
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            chunks = stream_export(
+                current_app.config['DATABASE_PATH'], dataset, fmt, compress,
+                venue_code=request.args.get('venue', '').strip().upper() or None,
+                product_type=request.args.get('product', '').strip().upper() or None,
+                status=request.args.get('status', '').strip().lower() or None,
+                since=request.args.get('since', '').strip() or None,
+                until=request.args.get('until', '').strip() or None
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        filename = export_filename(dataset, fmt, compress)
+        return Response(
+            chunks,
+            mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
 
     @app.route('/api/system/status')
     def api_system_status():
         """Get system status as JSON."""
-        status = get_system_status()
+        status = get_system_status(current_app)
         return jsonify(status)
 
+    @app.route('/api/system/queries')
+    def api_system_queries():
+        """
+        Get the most expensive database statements as JSON.
+
+        Query params:
+            limit: Statements returned (capped at MAX_ITEMS_PER_PAGE)
+            order: total_ms (default), mean_ms, max_ms, calls or rows
+
+        Returns {'statements': [...], 'slow': [...], 'slow_ms'}.
+        """
+        limit = max(1, min(request.args.get('limit', 20, type=int), current_app.config['MAX_ITEMS_PER_PAGE']))
+        try:
+            profile = get_query_profile(current_app, limit, request.args.get('order', 'total_ms'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(profile)
+
     # Batch management API endpoints
     @app.route('/api/batches')
     def api_batches_list():
@@ -661,6 +975,7 @@ def register_routes(app: Flask) -> None:
                 total_count=total_count,
                 priority=priority
             )
+            notify_change('batch', batch_id=batch_id, status='pending')
 
             batch = manager.get_batch_by_id(batch_id)
             return jsonify(batch), 201
@@ -676,6 +991,7 @@ def register_routes(app: Flask) -> None:
 
         try:
             manager.start_batch(batch_id)
+            notify_change('batch', batch_id=batch_id, status='active')
             batch = manager.get_batch_by_id(batch_id)
             return jsonify(batch)
         except ValueError as e:
@@ -690,6 +1006,7 @@ def register_routes(app: Flask) -> None:
 
         try:
             manager.pause_batch(batch_id)
+            notify_change('batch', batch_id=batch_id, status='paused')
             batch = manager.get_batch_by_id(batch_id)
             return jsonify(batch)
         except ValueError as e:
@@ -707,6 +1024,7 @@ def register_routes(app: Flask) -> None:
             priority = int(data.get('priority', 0))
 
             manager.update_batch_priority(batch_id, priority)
+            notify_change('batch', batch_id=batch_id)
             batch = manager.get_batch_by_id(batch_id)
             return jsonify(batch)
         except ValueError as e:
@@ -717,87 +1035,253 @@ def register_routes(app: Flask) -> None:
 
 # Helper functions
 
+def notify_change(event_type: str, **fields) -> None:
+    """
+    Publish a change event for data modified by the web interface.
+
+    Goes through the same channel as the deployment server, so connected
+    dashboards are updated by the change listener.
+
+    Args:
+        event_type: Event type ('venue', 'pool' or 'batch')
+        **fields: Event fields
+    """
+    change_events.publish(event_type, socket_path=current_app.config.get('EVENT_SOCKET_PATH'), **fields)
+
+
+class StatsCache:
+    """
+    Short-lived cache for dashboard statistics with single-flight refresh.
+
+    The dashboard page, /api/stats, every 'request_stats' event and the
+    background broadcaster all want the same numbers. Within the TTL they
+    share one result; when it expires, the first caller recomputes while
+    concurrent callers wait for that result instead of each running the
+    queries themselves.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Args:
+            ttl: Seconds a computed result stays fresh (0 disables caching)
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires = 0.0
+
+    def get(self, compute) -> Any:
+        """
+        Return the cached value, calling compute() if it has expired.
+
+        Args:
+            compute: Zero-argument callable producing a fresh value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        if self.ttl <= 0:
+            return compute()
+
+        value = self._value
+        if value is not None and time.monotonic() < self._expires:
+            return value
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._value is not None and time.monotonic() < self._expires:
+                return self._value
+
+            value = compute()
+            self._value = value
+            self._expires = time.monotonic() + self.ttl
+            return value
+
+    def invalidate(self) -> None:
+        """Drop the cached value so the next get() recomputes."""
+        with self._lock:
+            self._value = None
+            self._expires = 0.0
+
+
+class DashboardState:
+    """
+    Versioned dashboard state used to send stats_update deltas.
+
+    Each time the statistics change, the sequence number is incremented and
+    only the changed fields and changed recent-deployment rows are sent:
+
+        {'full': False, 'seq': 8, 'base_seq': 7,
+         'changes': {'assigned_kxp2': 12, ...},
+         'deployments': [{'id': 41, 'status': 'success', ...}],
+         'timestamp': '...'}
+
+    Clients apply a delta only if base_seq matches the seq they hold and
+    otherwise ask for a full snapshot ('request_resync'):
+
+        {'full': True, 'seq': 8, ...all get_dashboard_stats fields}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seq = 0
+        self._stats = None
+
+    @staticmethod
+    def _fields(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Scalar fields compared between versions (timestamp excluded)."""
+        return {key: value for key, value in stats.items()
+                if key not in ('recent_deployments', 'timestamp')}
+
+    def update(self, stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Record new statistics and return the delta from the previous version.
+
+        Args:
+            stats: Output of get_dashboard_stats
+
+        Returns:
+            Delta payload, or None if nothing changed
+        """
+        with self._lock:
+            previous = self._stats
+            if previous is None:
+                self._stats = stats
+                self.seq += 1
+                return None
+
+            old_fields = self._fields(previous)
+            changes = {key: value for key, value in self._fields(stats).items()
+                       if old_fields.get(key) != value}
+
+            old_rows = {row['id']: row for row in previous['recent_deployments']}
+            deployments = [row for row in stats['recent_deployments']
+                           if old_rows.get(row['id']) != row]
+
+            self._stats = stats
+            if not changes and not deployments:
+                return None
+
+            self.seq += 1
+            return {
+                'full': False,
+                'seq': self.seq,
+                'base_seq': self.seq - 1,
+                'changes': changes,
+                'deployments': deployments,
+                'timestamp': stats['timestamp']
+            }
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the current state as a full stats_update payload.
+
+        Returns:
+            Full payload, or None before the first update
+        """
+        with self._lock:
+            if self._stats is None:
+                return None
+            return dict(self._stats, full=True, seq=self.seq)
+
+
+def refresh_dashboard_state(app: Flask) -> Optional[Dict[str, Any]]:
+    """
+    Load current statistics into the app's DashboardState.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        Delta payload if the statistics changed, else None
+    """
+    return app.dashboard_state.update(get_cached_dashboard_stats(app))
+
+
+def get_dashboard_snapshot(app: Flask) -> Dict[str, Any]:
+    """
+    Get a full stats_update payload, loading state on first use.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        Full stats_update payload
+    """
+    snapshot = app.dashboard_state.snapshot()
+    if snapshot is None:
+        refresh_dashboard_state(app)
+        snapshot = app.dashboard_state.snapshot()
+    return snapshot
+
+
+def get_cached_dashboard_stats(app: Flask) -> Dict[str, Any]:
+    """
+    Get dashboard statistics through the application's StatsCache.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        dict: Dashboard statistics (see get_dashboard_stats)
+    """
+    return app.stats_cache.get(lambda: get_dashboard_stats(app.hostname_manager))
+
+
 def get_dashboard_stats(manager: HostnameManager) -> Dict[str, Any]:
     """
     Get dashboard statistics for WebSocket and dashboard display.
 
+    Pool counts come from the trigger-maintained hostname_pool_counts table
+    and deployment counts from the hourly deployment rollup (the last 24
+    hours, rounded down to the hour), so the cost does not grow with pool or
+    history size.
+
     Args:
         manager: HostnameManager instance
 
     Returns:
         dict: Dashboard statistics with product-specific breakdowns
     """
-    conn = manager._get_connection()
-    cursor = conn.cursor()
-
-    # Count venues
-    cursor.execute("SELECT COUNT(*) FROM venues")
-    total_venues = cursor.fetchone()[0]
-
-    # Count total hostnames
-    cursor.execute("SELECT COUNT(*) FROM hostname_pool")
-    total_hostnames = cursor.fetchone()[0]
-
-    # Count available hostnames by product
-    cursor.execute("""
-        SELECT COUNT(*) FROM hostname_pool
-        WHERE status = 'available' AND product_type = 'KXP2'
-    """)
-    available_kxp2 = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COUNT(*) FROM hostname_pool
-        WHERE status = 'available' AND product_type = 'RXP2'
-    """)
-    available_rxp2 = cursor.fetchone()[0]
-
-    # Count assigned hostnames by product
-    cursor.execute("""
-        SELECT COUNT(*) FROM hostname_pool
-        WHERE status = 'assigned' AND product_type = 'KXP2'
-    """)
-    assigned_kxp2 = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COUNT(*) FROM hostname_pool
-        WHERE status = 'assigned' AND product_type = 'RXP2'
-    """)
-    assigned_rxp2 = cursor.fetchone()[0]
-
-    # Count all available and assigned (totals)
-    available_hostnames = available_kxp2 + available_rxp2
-    assigned_hostnames = assigned_kxp2 + assigned_rxp2
-
-    # Count recent deployments (last 24 hours)
-    cursor.execute("""
-        SELECT COUNT(*) FROM deployment_history
-        WHERE started_at >= datetime('now', '-1 day')
-    """)
-    recent_deployments_count = cursor.fetchone()[0]
-
-    # Count successful deployments (last 24 hours)
-    cursor.execute("""
-        SELECT COUNT(*) FROM deployment_history
-        WHERE started_at >= datetime('now', '-1 day')
-        AND deployment_status = 'completed'
-    """)
-    successful_deployments = cursor.fetchone()[0]
-
-    # Get recent deployments list (for WebSocket updates)
-    cursor.execute("""
-        SELECT hostname, deployment_status, started_at, completed_at
-        FROM deployment_history
-        ORDER BY started_at DESC
-        LIMIT 10
-    """)
-    recent_deployments_list = []
-    for row in cursor.fetchall():
-        recent_deployments_list.append({
-            'hostname': row[0],
-            'status': row[1],
-            'started_at': row[2],
-            'completed_at': row[3]
-        })
+    with manager._get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Venue count and pool totals per product/status in one pass
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM venues),
+                COALESCE(SUM(count), 0),
+                COALESCE(SUM(CASE WHEN product_type = 'KXP2' AND status = 'available' THEN count END), 0),
+                COALESCE(SUM(CASE WHEN product_type = 'RXP2' AND status = 'available' THEN count END), 0),
+                COALESCE(SUM(CASE WHEN product_type = 'KXP2' AND status = 'assigned' THEN count END), 0),
+                COALESCE(SUM(CASE WHEN product_type = 'RXP2' AND status = 'assigned' THEN count END), 0)
+            FROM hostname_pool_counts
+        """)
+        (total_venues, total_hostnames, available_kxp2, available_rxp2,
+         assigned_kxp2, assigned_rxp2) = cursor.fetchone()
+
+        # Recent and successful deployments (last 24 hours)
+        recent_deployments_count, successful_deployments = recent_deployment_totals(conn, 24)
+
+        # Get recent deployments list (for WebSocket updates)
+        cursor.execute("""
+            SELECT id, hostname, deployment_status, started_at, completed_at,
+                   product_type, venue_code
+            FROM deployment_history
+            ORDER BY started_at DESC
+            LIMIT 10
+        """)
+        recent_deployments_list = []
+        for row in cursor.fetchall():
+            recent_deployments_list.append({
+                'id': row[0],
+                'hostname': row[1],
+                'status': row[2],
+                'started_at': row[3],
+                'completed_at': row[4],
+                'product_type': row[5],
+                'venue_code': row[6]
+            })
 
     return {
         'total_venues': total_venues,
@@ -806,8 +1290,8 @@ def get_dashboard_stats(manager: HostnameManager) -> Dict[str, Any]:
         'available_rxp2': available_rxp2,
         'assigned_kxp2': assigned_kxp2,
         'assigned_rxp2': assigned_rxp2,
-        'available_hostnames': available_hostnames,
-        'assigned_hostnames': assigned_hostnames,
+        'available_hostnames': available_kxp2 + available_rxp2,
+        'assigned_hostnames': assigned_kxp2 + assigned_rxp2,
         'recent_deployments': recent_deployments_list,
         'recent_deployments_count': recent_deployments_count,
         'successful_deployments': successful_deployments,
@@ -815,6 +1299,37 @@ def get_dashboard_stats(manager: HostnameManager) -> Dict[str, Any]:
     }
 
 
+DEPLOYMENT_COLUMNS = """
+    id, hostname, mac_address, serial_number, product_type, venue_code,
+    ip_address, deployment_status, started_at, completed_at, error_message
+"""
+
+
+def deployment_from_row(row: tuple) -> Dict[str, Any]:
+    """
+    Convert a deployment_history row (DEPLOYMENT_COLUMNS order) to a dict.
+
+    Args:
+        row: Row selected with DEPLOYMENT_COLUMNS
+
+    Returns:
+        dict: Deployment record ('deployment_status' exposed as 'status')
+    """
+    return {
+        'id': row[0],
+        'hostname': row[1],
+        'mac_address': row[2],
+        'serial_number': row[3],
+        'product_type': row[4],
+        'venue_code': row[5],
+        'ip_address': row[6],
+        'status': row[7],
+        'started_at': row[8],
+        'completed_at': row[9],
+        'error_message': row[10]
+    }
+
+
 def get_recent_deployments(manager: HostnameManager, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get recent deployments.
@@ -826,222 +1341,483 @@ def get_recent_deployments(manager: HostnameManager, limit: int = 10) -> List[Di
     Returns:
         list: List of recent deployment records
     """
-    conn = manager._get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, hostname, mac_address, serial_number, product_type, venue_code,
-               ip_address, deployment_status, started_at, completed_at, error_message
-        FROM deployment_history
-        ORDER BY started_at DESC
-        LIMIT ?
-    """, (limit,))
-
-    deployments = []
-    for row in cursor.fetchall():
-        deployments.append({
-            'id': row[0],
-            'hostname': row[1],
-            'mac_address': row[2],
-            'serial_number': row[3],
-            'product_type': row[4],
-            'venue_code': row[5],
-            'ip_address': row[6],
-            'status': row[7],
-            'started_at': row[8],
-            'completed_at': row[9],
-            'error_message': row[10]
-        })
+    with manager._get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT {DEPLOYMENT_COLUMNS}
+            FROM deployment_history
+            ORDER BY started_at DESC, id DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
 
-    return deployments
+    return [deployment_from_row(row) for row in rows]
 
 
-def check_service_status(service_name: str) -> Dict[str, Any]:
+def encode_deployment_cursor(deployment: Dict[str, Any]) -> Optional[str]:
     """
-    Check if a systemd service is running.
+    Build the pagination cursor for a deployment row.
 
     Args:
-        service_name: Name of the systemd service
+        deployment: Deployment record with 'started_at' and 'id'
 
     Returns:
-        dict: Service status with 'running' (bool) and 'status' (str) keys
+        Cursor string 'started_at|id', or None if the row has no start time
     """
-    try:
-        result = subprocess.run(
-            ['systemctl', 'is-active', service_name],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        is_running = result.returncode == 0
-        status = result.stdout.strip() if result.stdout else 'unknown'
+    if not deployment.get('started_at'):
+        return None
+    return f"{deployment['started_at']}|{deployment['id']}"
 
-        return {
-            'running': is_running,
-            'status': status
-        }
-    except Exception as e:
-        return {
-            'running': False,
-            'status': f'error: {str(e)}'
-        }
+
+def parse_deployment_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Parse a cursor produced by encode_deployment_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        tuple: (started_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    started_at, sep, row_id = cursor.rpartition('|')
+    if not sep or not started_at or not row_id.isdigit():
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return started_at, int(row_id)
 
 
-def check_database_connectivity(db_path: str) -> Dict[str, Any]:
+def deployment_filters(venue_code: Optional[str] = None, product_type: Optional[str] = None,
+                       status: Optional[str] = None) -> Tuple[List[str], List[Any]]:
     """
-    Check database connectivity and size.
+    Build WHERE clauses for the deployment history filters.
 
     Args:
-        db_path: Path to SQLite database file
+        venue_code: Venue filter (optional)
+        product_type: Product filter (optional)
+        status: Deployment status filter (optional)
 
     Returns:
-        dict: Database status with 'accessible' (bool) and 'size_mb' (float) keys
+        tuple: (SQL conditions, parameters)
     """
-    try:
-        # Check if file exists and is accessible
-        if not os.path.exists(db_path):
-            return {'accessible': False, 'size_mb': 0.0}
+    conditions = []
+    params = []
+    for column, value in (('venue_code', venue_code), ('product_type', product_type),
+                          ('deployment_status', status)):
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return conditions, params
+
+
+def get_deployment_page(manager: HostnameManager, venue_code: Optional[str] = None,
+                        product_type: Optional[str] = None, status: Optional[str] = None,
+                        before: Optional[str] = None, after: Optional[str] = None,
+                        limit: int = 20, offset: int = 0,
+                        include_archive: bool = False) -> Dict[str, Any]:
+    """
+    Get one page of deployment history, newest first, by keyset pagination.
 
-        # Try to connect
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM sqlite_master")
-        cursor.fetchone()
-        conn.close()
+    Rows are ordered by (started_at, id). 'before' continues with rows older
+    than a cursor and 'after' with rows newer than it; either way the query
+    seeks into a (filters..., started_at) index and reads one page, so deep
+    pages cost the same as the first. 'offset' is only honoured without a
+    cursor (legacy page numbers).
 
-        # Get file size in MB
-        size_bytes = os.path.getsize(db_path)
-        size_mb = size_bytes / (1024 * 1024)
+    With include_archive, the hot table and deployment_history_archive are
+    each read up to one page from the cursor and the two pages merged, so
+    archived deployments appear in place (ids are kept when archiving).
 
-        return {
-            'accessible': True,
-            'size_mb': round(size_mb, 2)
-        }
-    except Exception as e:
-        return {
-            'accessible': False,
-            'size_mb': 0.0,
-            'error': str(e)
-        }
+    Args:
+        manager: HostnameManager instance
+        venue_code: Venue filter (optional)
+        product_type: Product filter (optional)
+        status: Deployment status filter (optional)
+        before: Cursor; return rows older than it
+        after: Cursor; return rows newer than it
+        limit: Page size
+        offset: Rows to skip when no cursor is given
+        include_archive: Also return archived deployments
+
+    Returns:
+        dict: 'deployments' (newest first), 'next_cursor' (older page) and
+              'prev_cursor' (newer page), cursors None at either end
+
+    Raises:
+        ValueError: If a cursor is malformed
+    """
+    conditions, params = deployment_filters(venue_code, product_type, status)
+    newer = after is not None
+    cursor = after if newer else before
+
+    if cursor is not None:
+        conditions.append(f"(started_at, id) {'>' if newer else '<'} (?, ?)")
+        params.extend(parse_deployment_cursor(cursor))
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = "ASC" if newer else "DESC"
+
+    def select_page(table: str) -> str:
+        return f"""
+            SELECT {DEPLOYMENT_COLUMNS}
+            FROM {table}
+            {where}
+            ORDER BY started_at {order}, id {order}
+            LIMIT ?
+        """
+
+    query = select_page('deployment_history')
+    skip = offset if cursor is None else 0
+    if include_archive:
+        # Each table contributes at most the rows the merged page can use
+        arm_params = params + [limit + 1 + skip]
+        query = f"""
+            SELECT * FROM ({query})
+            UNION ALL
+            SELECT * FROM ({select_page('deployment_history_archive')})
+            ORDER BY started_at {order}, id {order}
+            LIMIT ?
+        """
+        params = arm_params + arm_params
+    # One extra row tells whether another page follows
+    params.append(limit + 1)
+    if skip:
+        query += " OFFSET ?"
+        params.append(skip)
+
+    with manager._get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    has_more = len(rows) > limit
+    deployments = [deployment_from_row(row) for row in rows[:limit]]
+    if newer:
+        deployments.reverse()
+
+    first = deployments[0] if deployments else None
+    last = deployments[-1] if deployments else None
+    if newer:
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = cursor is not None or offset > 0, has_more
+
+    return {
+        'deployments': deployments,
+        'next_cursor': encode_deployment_cursor(last) if last and has_older else None,
+        'prev_cursor': encode_deployment_cursor(first) if first and has_newer else None
+    }
 
 
-def get_disk_usage(path: str = '/opt/rpi-deployment') -> Dict[str, Any]:
+def count_deployments(manager: HostnameManager, venue_code: Optional[str] = None,
+                      product_type: Optional[str] = None, status: Optional[str] = None,
+                      include_archive: bool = False) -> int:
     """
-    Get disk space usage for the deployment directory.
+    Count deployment history rows matching the filters.
+
+    Reads the trigger-maintained deployment_history_counts table (and
+    deployment_archive_counts), so the cost depends on the number of
+    venue/product/status combinations rather than on the size of the history.
 
     Args:
-        path: Path to check disk usage for
+        manager: HostnameManager instance
+        venue_code: Venue filter (optional)
+        product_type: Product filter (optional)
+        status: Deployment status filter (optional)
+        include_archive: Also count archived deployments
 
     Returns:
-        dict: Disk usage with total_gb, used_gb, available_gb, percent_used keys
+        int: Number of matching deployments
     """
-    try:
-        stat = shutil.disk_usage(path)
-        total_gb = stat.total / (1024 ** 3)
-        used_gb = stat.used / (1024 ** 3)
-        free_gb = stat.free / (1024 ** 3)
-        percent_used = (stat.used / stat.total) * 100 if stat.total > 0 else 0
-
-        return {
-            'total_gb': round(total_gb, 2),
-            'used_gb': round(used_gb, 2),
-            'available_gb': round(free_gb, 2),
-            'percent_used': round(percent_used, 1)
-        }
-    except Exception as e:
-        return {
-            'total_gb': 0.0,
-            'used_gb': 0.0,
-            'available_gb': 0.0,
-            'percent_used': 0.0,
-            'error': str(e)
-        }
-
+    conditions, params = deployment_filters(venue_code, product_type, status)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-def get_system_status(db_path: str = '/opt/rpi-deployment/database/deployment.db') -> Dict[str, Any]:
+    with manager._get_connection() as conn:
+        try:
+            row = conn.execute(
+                f"SELECT COALESCE(SUM(count), 0) FROM deployment_history_counts {where}", params
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Database predates the counters (initialize_database adds them)
+            row = conn.execute(f"SELECT COUNT(*) FROM deployment_history {where}", params).fetchone()
+        total = row[0]
+        if include_archive:
+            total += conn.execute(
+                f"SELECT COALESCE(SUM(count), 0) FROM deployment_archive_counts {where}", params
+            ).fetchone()[0]
+    return total
+
+
+def search_deployments(manager: HostnameManager, text: str, limit: int = 20) -> List[Dict[str, Any]]:
     """
-    Get comprehensive system status for WebSocket broadcasts and API.
+    Full-text search of deployment history, newest first.
+
+    Matches hostname, serial number, MAC address and error message by prefix
+    through the deployment_search FTS5 index; only the newest `limit`
+    matching rowids are read, however large the history is.
 
     Args:
-        db_path: Path to database file for connectivity check
+        manager: HostnameManager instance
+        text: Search text (see HostnameManager.search_expression)
+        limit: Maximum number of results
 
     Returns:
-        dict: System status including service health, database, and disk space
+        list: Matching deployment records
 
-    Note:
-        For WebSocket use, call get_system_status_websocket()
-        This function maintains backwards compatibility with existing templates/tests
+    Raises:
+        ValueError: If the text contains nothing searchable
     """
-    # Get individual service statuses
-    dnsmasq_status = check_service_status('dnsmasq')
-    nginx_status = check_service_status('nginx')
+    with manager._get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT {DEPLOYMENT_COLUMNS}
+            FROM deployment_history
+            WHERE id IN (
+                SELECT rowid FROM deployment_search
+                WHERE deployment_search MATCH ?
+                ORDER BY rowid DESC
+                LIMIT ?
+            )
+            ORDER BY id DESC
+        """, (HostnameManager.search_expression(text), limit)).fetchall()
 
-    # Maintain backward compatibility with old structure
-    services = {
-        'dnsmasq': dnsmasq_status.get('status', 'unknown'),
-        'nginx': nginx_status.get('status', 'unknown')
-    }
+    return [deployment_from_row(row) for row in rows]
 
-    # Get disk space
-    try:
-        result = subprocess.run(
-            ['df', '-h', '/opt/rpi-deployment'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        disk_output = result.stdout if result.returncode == 0 else ''
-    except Exception:
-        disk_output = ''
 
-    # Get network info
-    try:
-        result = subprocess.run(
-            ['ip', 'addr', 'show'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        network_output = result.stdout[:500] if result.returncode == 0 else ''
-    except Exception:
-        network_output = ''
+def get_system_status(app: Flask) -> Dict[str, Any]:
+    """
+    Get system status for pages and the JSON API.
+
+    Reads the background collector's cache; no subprocess is started here.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        dict: 'services' (name -> state string), 'network' ('interfaces'
+        status plus per-interface 'devices'), 'disk' ('status' plus usage),
+        'database', 'connections' (this process's pool counters) and
+        'timestamp'
+    """
+    snapshot = app.system_status.snapshot()
+    devices = snapshot['network']
 
     return {
-        'services': services,
+        'services': {name: state['status'] for name, state in snapshot['services'].items()},
         'network': {
-            'interfaces': 'ok' if network_output else 'unknown',
-            'output': network_output
+            'interfaces': 'ok' if any(device['present'] for device in devices) else 'unknown',
+            'devices': devices
         },
         'disk': {
-            'status': 'ok' if disk_output else 'unknown',
-            'output': disk_output
+            'status': 'error' if 'error' in snapshot['disk'] else 'ok',
+            **snapshot['disk']
         },
-        'timestamp': datetime.now().isoformat()
+        'database': snapshot['database'],
+        'connections': connection_metrics(),
+        'timestamp': snapshot['timestamp']
     }
 
 
-def get_system_status_websocket(db_path: str = '/opt/rpi-deployment/database/deployment.db') -> Dict[str, Any]:
+def get_query_profile(app: Flask, limit: Optional[int] = None, order_by: str = 'total_ms') -> Dict[str, Any]:
     """
-    Get system status formatted for WebSocket broadcasts.
+    Get the most expensive database statements of every service.
+
+    This process is read live; the deployment server and others from the
+    snapshots they write to QUERY_PROFILE_DIR.
 
     Args:
-        db_path: Path to database file for connectivity check
+        app: Flask application instance
+        limit: Statements returned (default QUERY_PROFILE_TOP)
+        order_by: Statistic to rank by (see query_profiler.ORDER_KEYS)
 
     Returns:
-        dict: System status with detailed service health, database, and disk space
+        dict: 'statements' (top statements with latency percentiles, rows
+        and query plan), 'slow' (recent slow statements, newest first) and
+        'slow_ms' (this process's threshold)
+
+    Raises:
+        ValueError: If order_by is unknown
     """
+    limit = limit or app.config.get('QUERY_PROFILE_TOP', 10)
+    snapshots = [profiler.snapshot('web')]
+    snapshots.extend(load_profiles(app.config.get('QUERY_PROFILE_DIR', DEFAULT_PROFILE_DIR), exclude='web'))
     return {
-        'dnsmasq': check_service_status('dnsmasq'),
-        'nginx': check_service_status('nginx'),
-        'database': check_database_connectivity(db_path),
-        'disk_space': get_disk_usage(),
-        'timestamp': datetime.now().isoformat()
+        'statements': top_statements(snapshots, limit, order_by),
+        'slow': recent_slow(snapshots, limit),
+        'slow_ms': profiler.slow_ms
+    }
+
+
+def get_system_status_websocket(app: Flask) -> Dict[str, Any]:
+    """
+    Get system status formatted for WebSocket broadcasts.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        dict: One {'running', 'status'} entry per monitored service, plus
+        'database', 'disk_space', 'network' and 'timestamp'
+    """
+    snapshot = app.system_status.snapshot()
+    status = {
+        name: {'running': state['running'], 'status': state['status']}
+        for name, state in snapshot['services'].items()
     }
+    status.update({
+        'database': snapshot['database'],
+        'disk_space': snapshot['disk'],
+        'network': snapshot['network'],
+        'timestamp': snapshot['timestamp']
+    })
+    return status
+
+
+def push_system_status(app: Flask, socketio_instance: SocketIO) -> None:
+    """
+    Send the current system status to every connected client.
+
+    Called by the collector when a service, link, database or disk state
+    changes, so clients need not poll.
+
+    Args:
+        app: Flask application instance
+        socketio_instance: SocketIO instance for broadcasts
+    """
+    if get_subscriber_count() == 0:
+        return
+    socketio_instance.emit('system_status', get_system_status_websocket(app))
+
+
+# WebSocket rooms. Every client starts in ALL_ROOM (whole-fleet dashboard);
+# clients that subscribe to a venue, batch or hostname leave it and receive
+# only updates for what they subscribed to.
+ALL_ROOM = 'all'
+
+
+def venue_room(venue_code: str) -> str:
+    """Room name for updates about one venue."""
+    return f"venue:{venue_code.upper()}"
+
+
+def batch_room(batch_id: int) -> str:
+    """Room name for updates about one deployment batch."""
+    return f"batch:{int(batch_id)}"
+
+
+def hostname_room(hostname: str) -> str:
+    """Room name for updates about one device."""
+    return f"host:{hostname}"
+
+
+def venue_from_hostname(hostname: Optional[str]) -> Optional[str]:
+    """
+    Extract the venue code from a PRODUCT-VENUE-ID hostname.
+
+    Args:
+        hostname: Hostname such as 'KXP2-CORO-001'
+
+    Returns:
+        Venue code, or None if the hostname has another format
+    """
+    parts = (hostname or '').split('-')
+    if len(parts) == 3 and len(parts[1]) == 4:
+        return parts[1].upper()
+    return None
+
+
+def deployment_rooms(deployment_data: Dict[str, Any]) -> List[str]:
+    """
+    Rooms interested in a deployment update.
+
+    Args:
+        deployment_data: Deployment update with hostname and/or venue_code
+
+    Returns:
+        list: ALL_ROOM plus the device's hostname and venue rooms
+    """
+    targets = [ALL_ROOM]
+    hostname = deployment_data.get('hostname')
+    venue_code = deployment_data.get('venue_code') or venue_from_hostname(hostname)
+    if hostname:
+        targets.append(hostname_room(hostname))
+    if venue_code:
+        targets.append(venue_room(venue_code))
+    return targets
+
+
+def current_subscriptions() -> List[str]:
+    """
+    Rooms joined by the client of the current Socket.IO event.
+
+    Returns:
+        list: Sorted room names (excluding the client's private room)
+    """
+    return sorted(room for room in rooms() if room != request.sid)
+
+
+def room_has_members(socketio_instance: SocketIO, room: str) -> bool:
+    """
+    Check whether any client is in a room.
+
+    Args:
+        socketio_instance: SocketIO instance
+        room: Room name
+
+    Returns:
+        bool: True if at least one client has joined the room
+    """
+    participants = socketio_instance.server.manager.get_participants('/', room)
+    return next(iter(participants), None) is not None
+
+
+def subscription_rooms(data: Any) -> List[str]:
+    """
+    Translate a subscribe/unsubscribe payload into room names.
+
+    Args:
+        data: Dict with any of 'all' (bool), 'venue' (venue code),
+              'batch_id' (int) and 'hostname' (str)
+
+    Returns:
+        list: Room names
+
+    Raises:
+        ValueError: If the payload names no valid room
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Subscription must be an object')
+
+    targets = []
+    if data.get('all'):
+        targets.append(ALL_ROOM)
+
+    venue_code = data.get('venue')
+    if venue_code is not None:
+        if not isinstance(venue_code, str) or not re.match(r'^[A-Za-z]{4}$', venue_code):
+            raise ValueError(f'Invalid venue code: {venue_code}')
+        targets.append(venue_room(venue_code))
+
+    batch_id = data.get('batch_id')
+    if batch_id is not None:
+        try:
+            targets.append(batch_room(batch_id))
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid batch id: {batch_id}')
+
+    hostname = data.get('hostname')
+    if hostname is not None:
+        if not isinstance(hostname, str) or not re.match(r'^[A-Za-z0-9-]{1,64}$', hostname):
+            raise ValueError(f'Invalid hostname: {hostname}')
+        targets.append(hostname_room(hostname))
+
+    if not targets:
+        raise ValueError('Subscription names no venue, batch_id, hostname or all')
+    return targets
 
 
 def broadcast_deployment_update(socketio_instance, deployment_data: Dict[str, Any]) -> None:
     """
-    Broadcast deployment status update to all connected clients.
+    Broadcast deployment status update to interested clients.
+
+    Sent to the fleet-wide room and to the device's hostname and venue
+    rooms (see deployment_rooms); each client receives it at most once.
 
     Args:
         socketio_instance: SocketIO instance for broadcasting
@@ -1056,7 +1832,8 @@ def broadcast_deployment_update(socketio_instance, deployment_data: Dict[str, An
         - timestamp: str (ISO format)
     """
     if socketio_instance:
-        socketio_instance.emit('deployment_update', deployment_data, namespace='/')
+        socketio_instance.emit('deployment_update', deployment_data,
+                               to=deployment_rooms(deployment_data), namespace='/')
 
 
 # WebSocket Event Handlers
@@ -1079,15 +1856,17 @@ def register_websocket_handlers(app: Flask, socketio_instance: SocketIO) -> None
             - 'status' event with connection confirmation
             - 'stats_update' event with initial statistics
         """
+        _adjust_subscribers(1)
+        join_room(ALL_ROOM)
+
         emit('status', {
             'message': 'Connected to deployment server',
             'timestamp': datetime.now().isoformat()
         })
 
-        # Send initial stats immediately on connect
+        # Send full state immediately on connect; deltas follow from its seq
         try:
-            stats = get_dashboard_stats(app.hostname_manager)
-            emit('stats_update', stats)
+            emit('stats_update', get_dashboard_snapshot(app))
         except Exception as e:
             emit('status', {
                 'message': f'Error loading initial stats: {str(e)}',
@@ -1097,7 +1876,7 @@ def register_websocket_handlers(app: Flask, socketio_instance: SocketIO) -> None
     @socketio_instance.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection."""
-        pass  # Clean disconnect, no action needed
+        _adjust_subscribers(-1)
 
     @socketio_instance.on('request_stats')
     def handle_request_stats():
@@ -1105,21 +1884,100 @@ def register_websocket_handlers(app: Flask, socketio_instance: SocketIO) -> None
         Handle manual stats request from client.
 
         Sends:
-            - 'stats_update' event with current statistics (broadcast to all clients)
+            - 'stats_update' delta broadcast to all clients if stats changed
+            - 'stats_update' full snapshot to the requesting client
 
         Note:
-            This broadcasts to all clients so everyone stays in sync
+            Other clients only receive what changed, so they stay in sync
+            without everyone receiving the full state
+        """
+        try:
+            delta = refresh_dashboard_state(app)
+            if delta:
+                socketio_instance.emit('stats_update', delta, to=ALL_ROOM, namespace='/')
+            emit('stats_update', app.dashboard_state.snapshot())
+        except Exception as e:
+            emit('status', {
+                'message': f'Error retrieving stats: {str(e)}',
+                'timestamp': datetime.now().isoformat()
+            })
+
+    @socketio_instance.on('request_resync')
+    def handle_request_resync():
+        """
+        Handle resync request from a client that missed a delta.
+
+        Sends:
+            - 'stats_update' full snapshot to the requesting client
         """
         try:
-            stats = get_dashboard_stats(app.hostname_manager)
-            # Broadcast to all clients (not just the requester)
-            socketio_instance.emit('stats_update', stats, namespace='/')
+            emit('stats_update', get_dashboard_snapshot(app))
         except Exception as e:
             emit('status', {
                 'message': f'Error retrieving stats: {str(e)}',
                 'timestamp': datetime.now().isoformat()
             })
 
+    @socketio_instance.on('subscribe')
+    def handle_subscribe(data):
+        """
+        Subscribe to updates for a venue, batch or device.
+
+        Subscribing to anything other than 'all' leaves the fleet-wide
+        room, so the client receives only what it asked for.
+
+        Args:
+            data: {'venue': 'CORO'}, {'batch_id': 12},
+                  {'hostname': 'KXP2-CORO-001'} or {'all': true}
+
+        Sends:
+            - 'subscriptions' event with the client's current rooms
+            - 'venue_stats' event for each newly subscribed venue
+        """
+        try:
+            targets = subscription_rooms(data)
+        except ValueError as e:
+            emit('status', {'message': f'Error subscribing: {str(e)}',
+                            'timestamp': datetime.now().isoformat()})
+            return
+
+        for room in targets:
+            join_room(room)
+        if ALL_ROOM not in targets:
+            leave_room(ALL_ROOM)
+
+        emit('subscriptions', {'rooms': current_subscriptions()})
+
+        if data.get('venue'):
+            try:
+                emit('venue_stats', app.hostname_manager.get_venue_statistics(data['venue'].upper()))
+            except Exception as e:
+                emit('status', {'message': f'Error retrieving venue stats: {str(e)}',
+                                'timestamp': datetime.now().isoformat()})
+
+    @socketio_instance.on('unsubscribe')
+    def handle_unsubscribe(data):
+        """
+        Unsubscribe from venue, batch, device or fleet-wide updates.
+
+        Args:
+            data: Same format as 'subscribe'
+
+        Sends:
+            - 'subscriptions' event with the client's current rooms
+        """
+        try:
+            targets = subscription_rooms(data)
+        except ValueError as e:
+            emit('status', {'message': f'Error unsubscribing: {str(e)}',
+                            'timestamp': datetime.now().isoformat()})
+            return
+
+        for room in targets:
+            leave_room(room)
+
+        emit('subscriptions', {'rooms': current_subscriptions()})
+
     @socketio_instance.on('request_deployments')
     def handle_request_deployments():
         """
@@ -1146,15 +2004,27 @@ def register_websocket_handlers(app: Flask, socketio_instance: SocketIO) -> None
             - 'system_status' event with service health and disk space
         """
         try:
-            db_path = app.config.get('DATABASE_PATH', '/opt/rpi-deployment/database/deployment.db')
-            status = get_system_status_websocket(db_path)
-            emit('system_status', status)
+            emit('system_status', get_system_status_websocket(app))
         except Exception as e:
             emit('status', {
                 'message': f'Error retrieving system status: {str(e)}',
                 'timestamp': datetime.now().isoformat()
             })
 
+    @socketio_instance.on('request_install_progress')
+    def handle_request_install_progress():
+        """
+        Handle request for the live progress of in-flight installs.
+
+        Sends:
+            - 'install_progress' event with every tracked install (full=True)
+        """
+        emit('install_progress', {
+            'installs': sorted(app.install_progress.values(), key=lambda entry: entry['hostname']),
+            'removed': [],
+            'full': True
+        })
+
     @socketio_instance.on('trigger_deployment_update')
     def handle_trigger_deployment_update(data):
         """
@@ -1167,73 +2037,204 @@ def register_websocket_handlers(app: Flask, socketio_instance: SocketIO) -> None
             data: Deployment information dictionary
 
         Broadcasts:
-            - 'deployment_update' event to all clients
+            - 'deployment_update' event to interested clients
         """
+        if not isinstance(data, dict):
+            return
+
         # Add timestamp if not present
         if 'timestamp' not in data:
             data['timestamp'] = datetime.now().isoformat()
 
-        # Broadcast to all clients (don't use broadcast parameter, just emit to namespace)
-        socketio_instance.emit('deployment_update', data, namespace='/')
+        # Send to the fleet-wide room and the device's venue/hostname rooms
+        broadcast_deployment_update(socketio_instance, data)
+
+
+# Change-driven updates
+
+# Connected WebSocket clients; updates are only computed while this is > 0
+_subscriber_count = 0
+_subscriber_lock = threading.Lock()
+
+# Listener receiving change events from the deployment server and web routes
+_change_listener = None
+
+
+def get_subscriber_count() -> int:
+    """Return the number of connected WebSocket clients."""
+    return _subscriber_count
+
+
+def _adjust_subscribers(delta: int) -> None:
+    """Add delta to the connected WebSocket client count."""
+    global _subscriber_count
+    with _subscriber_lock:
+        _subscriber_count = max(0, _subscriber_count + delta)
+
 
+def apply_install_progress(app: Flask, events: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Merge progress events into the application's install progress table.
 
-# Background Tasks
+    Args:
+        app: Flask application instance
+        events: 'progress' change events (installs and removed hostnames)
 
-# Flag to track if background thread is running
-_background_thread = None
-_background_thread_stop = False
+    Returns:
+        tuple: (latest entry per updated install, removed hostnames)
+    """
+    updated = {}
+    removed = set()
+    for event in events:
+        for hostname in event.get('removed') or []:
+            app.install_progress.pop(hostname, None)
+            updated.pop(hostname, None)
+            removed.add(hostname)
+        for entry in event.get('installs') or []:
+            hostname = entry.get('hostname')
+            if hostname:
+                app.install_progress[hostname] = entry
+                updated[hostname] = entry
+                removed.discard(hostname)
+    return list(updated.values()), sorted(removed)
+
+
+def push_install_progress(socketio_instance: SocketIO, installs: List[Dict[str, Any]],
+                          removed: List[str]) -> None:
+    """
+    Send install progress changes to clients watching everything or the venue.
 
+    Changes are grouped per venue so each group goes out in a single emit
+    (a client in both rooms receives it once).
 
-def start_background_thread(app: Flask, socketio_instance: SocketIO) -> None:
+    Args:
+        socketio_instance: SocketIO instance for broadcasts
+        installs: Updated install entries
+        removed: Hostnames no longer tracked
+    """
+    groups = {}
+    for entry in installs:
+        venue_code = venue_from_hostname(entry['hostname'])
+        groups.setdefault(venue_code, ([], []))[0].append(entry)
+    for hostname in removed:
+        groups.setdefault(venue_from_hostname(hostname), ([], []))[1].append(hostname)
+
+    for venue_code, (venue_installs, venue_removed) in groups.items():
+        targets = [ALL_ROOM] + ([venue_room(venue_code)] if venue_code else [])
+        socketio_instance.emit('install_progress', {
+            'installs': venue_installs,
+            'removed': venue_removed,
+            'full': False
+        }, to=targets, namespace='/')
+
+
+def handle_change_events(app: Flask, socketio_instance: SocketIO, events: List[Dict[str, Any]]) -> None:
     """
-    Start background thread for periodic stats updates.
+    Push updates to connected clients for a burst of change events.
+
+    The stats cache is invalidated for data changes so the next page load
+    is fresh; nothing else is computed while no client is connected.
+    Progress events are memory-only and never touch the database.
 
     Args:
         app: Flask application instance
         socketio_instance: SocketIO instance for broadcasts
+        events: Change events (see change_events module)
     """
-    global _background_thread, _background_thread_stop
+    progress_events = [event for event in events if event.get('type') == 'progress']
+    events = [event for event in events if event.get('type') != 'progress']
 
-    # Don't start background thread in testing mode
-    if app.config.get('TESTING', False):
-        return
+    if progress_events:
+        installs, removed = apply_install_progress(app, progress_events)
+        if (installs or removed) and get_subscriber_count():
+            push_install_progress(socketio_instance, installs, removed)
 
-    # Don't start if already running
-    if _background_thread is not None:
+    if not events:
         return
 
-    _background_thread_stop = False
+    app.stats_cache.invalidate()
 
-    def background_stats_updater():
-        """Background thread that broadcasts stats every 5 seconds."""
-        global _background_thread_stop
+    if get_subscriber_count() == 0:
+        return
 
-        while not _background_thread_stop:
-            # Sleep first (so tests don't have to wait on first call)
-            time.sleep(5)
+    with app.app_context():
+        batch_events = {}
+        venues = set()
+        for event in events:
+            event_type = event.get('type')
+            fields = {key: value for key, value in event.items() if key != 'type'}
+
+            if event_type == 'deployment':
+                broadcast_deployment_update(socketio_instance, fields)
+                venues.add(fields.get('venue_code') or venue_from_hostname(fields.get('hostname')))
+            elif event_type == 'batch' and 'batch_id' in fields:
+                batch_events.setdefault(fields['batch_id'], []).append(fields)
+            else:
+                venues.add(fields.get('venue_code') or venue_from_hostname(fields.get('hostname')))
+
+        for batch_id, changes in batch_events.items():
+            batch = app.hostname_manager.get_batch_by_id(batch_id)
+            targets = [ALL_ROOM, batch_room(batch_id)]
+            if batch:
+                targets.append(venue_room(batch['venue_code']))
+                venues.add(batch['venue_code'])
+            for fields in changes:
+                if fields.get('status'):
+                    socketio_instance.emit('batch_status_change', fields, to=targets, namespace='/')
+            if batch:
+                socketio_instance.emit('batch_update', batch, to=targets, namespace='/')
+
+        # Per-venue pool counts, only for venues someone is watching
+        for venue_code in sorted(v for v in venues if v):
+            room = venue_room(venue_code)
+            if room_has_members(socketio_instance, room):
+                socketio_instance.emit('venue_stats',
+                                       app.hostname_manager.get_venue_statistics(venue_code),
+                                       to=room, namespace='/')
+
+        delta = refresh_dashboard_state(app)
+        if delta and room_has_members(socketio_instance, ALL_ROOM):
+            socketio_instance.emit('stats_update', delta, to=ALL_ROOM, namespace='/')
+
+
+def start_change_listener(app: Flask, socketio_instance: SocketIO) -> None:
+    """
+    Start listening for change events and pushing updates to clients.
 
-            if _background_thread_stop:
-                break
+    Replaces periodic polling: with no changes (or no clients) the listener
+    does no database work at all.
 
-            try:
-                with app.app_context():
-                    stats = get_dashboard_stats(app.hostname_manager)
-                    socketio_instance.emit('stats_update', stats, namespace='/')
-            except Exception as e:
-                # Log error but don't stop the thread
-                print(f"Error in background stats updater: {e}")
+    Args:
+        app: Flask application instance
+        socketio_instance: SocketIO instance for broadcasts
+    """
+    global _change_listener
 
-    _background_thread = threading.Thread(target=background_stats_updater, daemon=True)
-    _background_thread.start()
+    # Don't start listener in testing mode
+    if app.config.get('TESTING', False):
+        return
 
+    # Don't start if already running
+    if _change_listener is not None:
+        return
 
-def stop_background_thread() -> None:
-    """Stop the background stats update thread."""
-    global _background_thread, _background_thread_stop
-    _background_thread_stop = True
-    if _background_thread:
-        _background_thread.join(timeout=1)
-        _background_thread = None
+    _change_listener = change_events.ChangeListener(
+        lambda events: handle_change_events(app, socketio_instance, events),
+        socket_path=app.config.get('EVENT_SOCKET_PATH')
+    )
+    try:
+        _change_listener.start()
+    except OSError as e:
+        logger.error(f"Could not start change listener: {e}")
+        _change_listener = None
+
+
+def stop_change_listener() -> None:
+    """Stop the change event listener."""
+    global _change_listener
+    if _change_listener:
+        _change_listener.stop()
+        _change_listener = None
 
 
 # Form classes
@@ -19,6 +19,15 @@ class Config:
     ITEMS_PER_PAGE = 20
     MAX_ITEMS_PER_PAGE = 100
 
+    # Kart numbers loaded per page (and per "Load more" request)
+    KART_NUMBERS_PER_PAGE = 100
+
+    # Unix socket on which the deployment server publishes change events
+    EVENT_SOCKET_PATH = os.environ.get('RPI_EVENT_SOCKET') or '/opt/rpi-deployment/run/events.sock'
+
+    # Dashboard statistics cache lifetime in seconds (0 disables caching)
+    STATS_CACHE_TTL = 2.0
+
     # File upload configuration
     UPLOAD_FOLDER = '/opt/rpi-deployment/web/static/uploads'
     MAX_CONTENT_LENGTH = 8 * 1024 * 1024 * 1024  # 8GB max file size
@@ -38,6 +47,30 @@ class Config:
     # Network interfaces to monitor
     NETWORK_INTERFACES = ['eth0', 'eth1']
 
+    # Seconds between background system status collections
+    SYSTEM_STATUS_INTERVAL = 10.0
+
+    # Finished deployments older than this many days move to the archive
+    # table (0 disables scheduled archival)
+    ARCHIVE_RETENTION_DAYS = 90
+
+    # Seconds between scheduled archival runs
+    ARCHIVE_INTERVAL = 3600.0
+
+    # Online database backups: directory, seconds between scheduled
+    # backups (0 disables them) and scheduled backups kept
+    BACKUP_DIR = os.environ.get('BACKUP_DIR') or '/opt/rpi-deployment/database/backups'
+    BACKUP_INTERVAL = 86400.0
+    BACKUP_KEEP = 7
+
+    # Query profiling: statements at least this slow (ms) are logged, the
+    # profile snapshot directory (shared with the deployment server), seconds
+    # between snapshots and statements listed on the system page
+    SLOW_QUERY_MS = 100.0
+    QUERY_PROFILE_DIR = os.environ.get('QUERY_PROFILE_DIR') or '/opt/rpi-deployment/logs'
+    QUERY_PROFILE_INTERVAL = 60.0
+    QUERY_PROFILE_TOP = 10
+
     # Management network
     MANAGEMENT_IP = '192.168.101.146'
     MANAGEMENT_PORT = 5000
@@ -0,0 +1,115 @@
+/**
+ * Kart Numbers JavaScript
+ * Appends further pages of the kart number list from /api/kart-numbers
+ */
+
+/**
+ * Initialize page functionality
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    const button = document.getElementById('kart-numbers-more');
+    if (!button) {
+        return;
+    }
+
+    button.addEventListener('click', function(event) {
+        // Without JS the button is a plain link to the next page
+        event.preventDefault();
+        loadMoreKartNumbers(button);
+    });
+});
+
+/**
+ * Fetch the page after the button's cursor and append its rows
+ * @param {HTMLElement} button - The "Load more" link
+ */
+function loadMoreKartNumbers(button) {
+    const url = new URL(button.dataset.apiUrl, window.location.origin);
+    url.searchParams.set('after', button.dataset.nextCursor);
+
+    button.classList.add('disabled');
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+
+            const body = document.getElementById('kart-numbers-body');
+            const fragment = document.createDocumentFragment();
+            data.kart_numbers.forEach(kart => {
+                fragment.appendChild(createKartNumberRow(kart, button.dataset.deleteUrl));
+            });
+            body.appendChild(fragment);
+
+            const shown = document.getElementById('kart-numbers-shown');
+            shown.textContent = body.rows.length;
+
+            if (data.next_cursor) {
+                button.dataset.nextCursor = data.next_cursor;
+                button.classList.remove('disabled');
+            } else {
+                button.remove();
+            }
+        })
+        .catch(error => {
+            console.error('[KartNumbers] Failed to load more:', error);
+            button.classList.remove('disabled');
+        });
+}
+
+/**
+ * Build a table row matching the server-rendered rows
+ * @param {Object} kart - Kart number entry from the API
+ * @param {string} deleteUrl - Delete URL with a __HOSTNAME__ placeholder
+ * @returns {HTMLTableRowElement} Table row
+ */
+function createKartNumberRow(kart, deleteUrl) {
+    const row = document.createElement('tr');
+
+    const select = document.createElement('input');
+    select.type = 'checkbox';
+    select.className = 'form-check-input';
+    select.name = 'hostnames';
+    select.value = kart.hostname;
+    select.setAttribute('form', 'bulk-action-form');
+    row.insertCell().appendChild(select);
+
+    const hostname = document.createElement('strong');
+    hostname.textContent = kart.hostname;
+    row.insertCell().appendChild(hostname);
+
+    row.insertCell().textContent = kart.venue_code;
+
+    const product = document.createElement('span');
+    product.className = 'badge bg-secondary';
+    product.textContent = kart.product_type;
+    row.insertCell().appendChild(product);
+
+    row.insertCell().textContent = kart.kart_number;
+
+    const status = document.createElement('span');
+    status.className = `badge badge-${kart.status}`;
+    status.textContent = kart.status;
+    row.insertCell().appendChild(status);
+
+    row.insertCell().textContent = kart.mac_address || 'N/A';
+    row.insertCell().textContent = kart.assigned_date ? kart.assigned_date.slice(0, 10) : 'N/A';
+
+    const actions = row.insertCell();
+    if (kart.status === 'available') {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = deleteUrl.replace('__HOSTNAME__', encodeURIComponent(kart.hostname));
+        form.style.display = 'inline';
+        form.innerHTML = '<button type="submit" class="btn btn-sm btn-danger"><i class="bi bi-trash"></i></button>';
+        form.querySelector('button').addEventListener('click', function(event) {
+            if (!confirm('Are you sure you want to delete this kart number?')) {
+                event.preventDefault();
+            }
+        });
+        actions.appendChild(form);
+    }
+
+    return row;
+}
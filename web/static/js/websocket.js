@@ -4,6 +4,7 @@
  * Provides real-time updates for:
  * - Dashboard statistics
  * - Deployment status changes
+ * - Live install progress (per-kart grid)
  * - System health monitoring
  *
  * Uses Socket.IO for WebSocket communication with Flask backend.
@@ -15,6 +16,23 @@ let socket = null;
 // Connection state
 let isConnected = false;
 
+// Dashboard state mirrored from the server (see DashboardState in app.py)
+const dashboardState = {
+    seq: null,
+    stats: {},
+    deployments: []
+};
+
+// Room subscriptions, re-sent after every (re)connect since the server
+// forgets them when the connection drops
+const subscriptions = [];
+
+// Live progress of in-flight installs, keyed by hostname
+const installProgress = new Map();
+
+// Number of rows kept in the recent deployments table
+const RECENT_DEPLOYMENTS_LIMIT = 10;
+
 // Reconnection settings
 const RECONNECT_DELAY = 3000; // 3 seconds
 let reconnectAttempts = 0;
@@ -49,8 +67,12 @@ function registerConnectionHandlers() {
         reconnectAttempts = 0;
         updateConnectionStatus(true);
 
-        // Request initial data
+        // Restore room subscriptions, then request initial data
+        subscriptions.forEach(scope => socket.emit('subscribe', scope));
         requestStats();
+        if (document.getElementById('install-progress-grid')) {
+            socket.emit('request_install_progress');
+        }
     });
 
     // Connection lost
@@ -98,8 +120,7 @@ function registerConnectionHandlers() {
 function registerDataHandlers() {
     // Dashboard statistics update
     socket.on('stats_update', function(data) {
-        console.log('[WebSocket] Stats update received');
-        updateDashboardStats(data);
+        handleStatsUpdate(data);
     });
 
     // Single deployment status update
@@ -120,6 +141,21 @@ function registerDataHandlers() {
         updateSystemStatus(data);
     });
 
+    // Per-venue pool counts (venue subscribers only)
+    socket.on('venue_stats', function(data) {
+        updateVenueStats(data);
+    });
+
+    // Current room subscriptions
+    socket.on('subscriptions', function(data) {
+        console.log('[WebSocket] Subscribed rooms:', data.rooms.join(', '));
+    });
+
+    // Live install progress (throttled by the deployment server)
+    socket.on('install_progress', function(data) {
+        handleInstallProgress(data);
+    });
+
     // Batch progress update
     socket.on('batch_update', function(data) {
         console.log('[WebSocket] Batch update received:', data);
@@ -133,6 +169,34 @@ function registerDataHandlers() {
     });
 }
 
+/**
+ * Subscribe to updates for a venue, batch or device
+ *
+ * scope: {venue: 'CORO'}, {batch_id: 12}, {hostname: 'KXP2-CORO-001'} or {all: true}.
+ * Anything other than {all: true} replaces the fleet-wide feed with
+ * updates for the given scope only.
+ */
+function subscribe(scope) {
+    subscriptions.push(scope);
+    if (isConnected) {
+        socket.emit('subscribe', scope);
+    }
+}
+
+/**
+ * Unsubscribe from a scope previously passed to subscribe()
+ */
+function unsubscribe(scope) {
+    const key = JSON.stringify(scope);
+    const index = subscriptions.findIndex(existing => JSON.stringify(existing) === key);
+    if (index !== -1) {
+        subscriptions.splice(index, 1);
+    }
+    if (isConnected) {
+        socket.emit('unsubscribe', scope);
+    }
+}
+
 /**
  * Request fresh statistics from server
  */
@@ -181,32 +245,288 @@ function updateConnectionStatus(connected) {
 }
 
 /**
- * Update dashboard statistics in UI
+ * Apply a stats_update payload (full snapshot or delta)
+ *
+ * Deltas carry seq/base_seq; a delta that does not follow the sequence
+ * number we hold means an update was missed, so a full resync is requested.
+ */
+function handleStatsUpdate(data) {
+    if (data.full) {
+        console.log(`[WebSocket] Stats snapshot received (seq ${data.seq})`);
+        const { recent_deployments, full, seq, timestamp, ...fields } = data;
+        dashboardState.seq = seq;
+        dashboardState.stats = fields;
+        dashboardState.deployments = [];
+        mergeRecentDeployments(recent_deployments || []);
+        updateDashboardStats(fields, timestamp);
+        return;
+    }
+
+    if (dashboardState.seq === null || data.seq <= dashboardState.seq) {
+        return;  // Not initialised yet, or already applied
+    }
+
+    if (data.base_seq !== dashboardState.seq) {
+        console.warn(`[WebSocket] Stats gap (have ${dashboardState.seq}, got base ${data.base_seq}), resyncing`);
+        dashboardState.seq = null;
+        socket.emit('request_resync');
+        return;
+    }
+
+    dashboardState.seq = data.seq;
+    Object.assign(dashboardState.stats, data.changes);
+    updateDashboardStats(data.changes, data.timestamp);
+    if (data.deployments && data.deployments.length) {
+        mergeRecentDeployments(data.deployments);
+    }
+}
+
+/**
+ * Update dashboard statistics in UI (only the fields given)
+ */
+function updateDashboardStats(fields, timestamp) {
+    const elementIds = {
+        total_venues: 'total-venues',
+        total_hostnames: 'total-hostnames',
+        available_kxp2: 'available-kxp2',
+        available_rxp2: 'available-rxp2',
+        assigned_kxp2: 'assigned-kxp2',
+        assigned_rxp2: 'assigned-rxp2',
+        available_hostnames: 'available-hostnames',
+        assigned_hostnames: 'assigned-hostnames',
+        recent_deployments_count: 'recent-deployments-count',
+        successful_deployments: 'successful-deployments'
+    };
+
+    for (const [field, value] of Object.entries(fields)) {
+        if (elementIds[field]) {
+            updateElementText(elementIds[field], value);
+        }
+    }
+
+    if (timestamp) {
+        updateElementText('last-update-time', new Date(timestamp).toLocaleTimeString());
+    }
+}
+
+/**
+ * Merge new or changed rows into the recent deployments state and table
+ */
+function mergeRecentDeployments(rows) {
+    const byId = new Map(dashboardState.deployments.map(row => [row.id, row]));
+    rows.forEach(row => byId.set(row.id, row));
+
+    dashboardState.deployments = Array.from(byId.values())
+        .sort((a, b) => (b.started_at || '').localeCompare(a.started_at || '') || b.id - a.id)
+        .slice(0, RECENT_DEPLOYMENTS_LIMIT);
+
+    patchRecentDeploymentsTable(dashboardState.deployments);
+}
+
+/**
+ * Patch the dashboard's recent deployments table in place
+ *
+ * Rows are keyed by deployment id: unchanged rows are left alone, changed
+ * rows have their cells updated, and rows are only created or removed
+ * when deployments enter or leave the list.
+ */
+function patchRecentDeploymentsTable(deployments) {
+    const tableBody = document.getElementById('recent-deployments-body');
+    if (!tableBody) return;
+
+    const existing = new Map();
+    tableBody.querySelectorAll('tr[data-deployment-id]').forEach(row => {
+        existing.set(Number(row.dataset.deploymentId), row);
+    });
+
+    let previous = null;
+    deployments.forEach(deployment => {
+        let row = existing.get(deployment.id);
+        if (row) {
+            existing.delete(deployment.id);
+            if (row.dataset.status !== deployment.status) {
+                setRecentDeploymentStatus(row, deployment.status);
+                highlightRow(row);
+            }
+        } else {
+            row = createRecentDeploymentRow(deployment);
+            highlightRow(row);
+        }
+
+        // Keep DOM order equal to state order, moving only misplaced rows
+        const expected = previous ? previous.nextSibling : tableBody.firstChild;
+        if (row !== expected) {
+            tableBody.insertBefore(row, expected);
+        }
+        previous = row;
+    });
+
+    // Rows that dropped out of the list
+    existing.forEach(row => row.remove());
+}
+
+/**
+ * Create a recent deployments table row
+ */
+function createRecentDeploymentRow(deployment) {
+    const row = document.createElement('tr');
+    row.dataset.deploymentId = deployment.id;
+
+    const hostname = document.createElement('td');
+    hostname.textContent = deployment.hostname;
+    const product = document.createElement('td');
+    product.innerHTML = '<span class="badge bg-secondary"></span>';
+    product.firstChild.textContent = deployment.product_type || '';
+    const venue = document.createElement('td');
+    venue.textContent = deployment.venue_code || '';
+    const status = document.createElement('td');
+    const started = document.createElement('td');
+    started.textContent = deployment.started_at ? deployment.started_at.slice(0, 19) : 'N/A';
+
+    row.append(hostname, product, venue, status, started);
+    setRecentDeploymentStatus(row, deployment.status);
+    return row;
+}
+
+/**
+ * Set the status cell of a recent deployments row
+ */
+function setRecentDeploymentStatus(row, status) {
+    const icon = status === 'completed' || status === 'success' ? 'check-circle'
+        : status === 'failed' ? 'x-circle' : 'clock';
+    const cell = row.children[3];
+    cell.innerHTML = `<span class="status-${status}"><i class="bi bi-${icon}"></i> </span>`;
+    cell.firstChild.append(status || '');
+    row.dataset.status = status;
+}
+
+/**
+ * Update per-venue statistics on the venue detail page
+ */
+function updateVenueStats(stats) {
+    const container = document.querySelector('[data-ws-venue]');
+    if (!container || container.dataset.wsVenue !== stats.venue_code) return;
+
+    updateElementText('venue-total-hostnames', stats.total_hostnames);
+    updateElementText('venue-available-hostnames', stats.available_hostnames);
+    updateElementText('venue-assigned-hostnames', stats.assigned_hostnames);
+    updateElementText('venue-retired-hostnames', stats.retired_hostnames);
+}
+
+/**
+ * Apply an install_progress message (full snapshot or delta)
+ */
+function handleInstallProgress(data) {
+    if (data.full) {
+        installProgress.clear();
+    }
+    (data.removed || []).forEach(hostname => installProgress.delete(hostname));
+    (data.installs || []).forEach(entry => installProgress.set(entry.hostname, entry));
+
+    renderInstallProgress(data.full ? null : data.installs, data.full ? null : data.removed);
+}
+
+/**
+ * Patch the per-kart progress grid
+ *
+ * With `changed`/`removed` given only those tiles are touched; otherwise
+ * the grid is rebuilt from installProgress.
  */
-function updateDashboardStats(stats) {
-    // Update venue count
-    updateElementText('total-venues', stats.total_venues);
+function renderInstallProgress(changed, removed) {
+    const grid = document.getElementById('install-progress-grid');
+    if (!grid) return;
+
+    if (!changed) {
+        grid.replaceChildren();
+        changed = Array.from(installProgress.values());
+        removed = [];
+    }
 
-    // Update hostname counts
-    updateElementText('available-kxp2', stats.available_kxp2);
-    updateElementText('available-rxp2', stats.available_rxp2);
-    updateElementText('assigned-kxp2', stats.assigned_kxp2);
-    updateElementText('assigned-rxp2', stats.assigned_rxp2);
-    updateElementText('available-hostnames', stats.available_hostnames);
-    updateElementText('assigned-hostnames', stats.assigned_hostnames);
+    removed.forEach(hostname => {
+        const tile = grid.querySelector(`[data-hostname="${CSS.escape(hostname)}"]`);
+        if (tile) tile.remove();
+    });
 
-    // Update deployment counts
-    updateElementText('recent-deployments-count', stats.recent_deployments_count);
-    updateElementText('successful-deployments', stats.successful_deployments);
+    changed.forEach(entry => {
+        let tile = grid.querySelector(`[data-hostname="${CSS.escape(entry.hostname)}"]`);
+        if (!tile) {
+            tile = createInstallProgressTile(entry.hostname);
+            const next = Array.from(grid.children).find(el => el.dataset.hostname > entry.hostname);
+            grid.insertBefore(tile, next || null);
+        }
+        updateInstallProgressTile(tile, entry);
+    });
 
-    // Update recent deployments list if present
-    if (stats.recent_deployments && Array.isArray(stats.recent_deployments)) {
-        updateRecentDeploymentsList(stats.recent_deployments);
+    updateElementText('install-progress-count', installProgress.size);
+    const empty = document.getElementById('install-progress-empty');
+    if (empty) {
+        empty.hidden = installProgress.size > 0;
     }
+}
 
-    // Update last update time
-    const timestamp = new Date(stats.timestamp);
-    updateElementText('last-update-time', timestamp.toLocaleTimeString());
+/**
+ * Create an empty progress tile for one device
+ */
+function createInstallProgressTile(hostname) {
+    const tile = document.createElement('div');
+    tile.className = 'col-xl-2 col-md-3 col-sm-4 mb-3';
+    tile.dataset.hostname = hostname;
+    tile.innerHTML = `
+        <div class="border rounded p-2 h-100">
+            <div class="d-flex justify-content-between">
+                <code class="install-hostname"></code>
+                <span class="badge install-phase"></span>
+            </div>
+            <div class="progress my-2" style="height: 8px;">
+                <div class="progress-bar" role="progressbar" aria-valuemin="0" aria-valuemax="100"></div>
+            </div>
+            <small class="text-muted install-detail"></small>
+        </div>
+    `;
+    tile.querySelector('.install-hostname').textContent = hostname;
+    return tile;
+}
+
+/**
+ * Fill a progress tile from an install entry
+ */
+function updateInstallProgressTile(tile, entry) {
+    const percent = entry.total_bytes
+        ? Math.min(100, Math.floor(entry.bytes_written / entry.total_bytes * 100))
+        : 0;
+
+    const phase = tile.querySelector('.install-phase');
+    phase.className = `badge install-phase bg-${getStatusBadgeClass(entry.phase)}`;
+    phase.textContent = entry.phase || '';
+
+    const bar = tile.querySelector('.progress-bar');
+    bar.style.width = `${percent}%`;
+    bar.setAttribute('aria-valuenow', percent);
+    bar.classList.toggle('bg-danger', entry.phase === 'failed');
+    bar.classList.toggle('bg-success', entry.phase === 'success');
+
+    let detail = `${percent}%`;
+    if (entry.throughput) {
+        detail += ` · ${(entry.throughput / (1024 * 1024)).toFixed(1)} MB/s`;
+    }
+    if (entry.eta_seconds !== null && entry.eta_seconds !== undefined) {
+        detail += ` · ${formatDuration(entry.eta_seconds)} left`;
+    }
+    if (entry.phase === 'failed' && entry.error_message) {
+        detail = entry.error_message;
+    }
+    tile.querySelector('.install-detail').textContent = detail;
+}
+
+/**
+ * Format seconds as m:ss (or h:mm:ss)
+ */
+function formatDuration(seconds) {
+    seconds = Math.max(0, Math.round(seconds));
+    const hours = Math.floor(seconds / 3600);
+    const minutes = Math.floor((seconds % 3600) / 60);
+    const secs = String(seconds % 60).padStart(2, '0');
+    return hours ? `${hours}:${String(minutes).padStart(2, '0')}:${secs}` : `${minutes}:${secs}`;
 }
 
 /**
@@ -311,34 +631,6 @@ function refreshDeploymentsList(deployments) {
     });
 }
 
-/**
- * Update recent deployments list (compact view)
- */
-function updateRecentDeploymentsList(deployments) {
-    const list = document.getElementById('recent-deployments-list');
-    if (!list) return;
-
-    list.innerHTML = '';
-
-    if (deployments.length === 0) {
-        list.innerHTML = '<li class="list-group-item text-muted">No recent deployments</li>';
-        return;
-    }
-
-    deployments.slice(0, 5).forEach(deployment => {
-        const item = document.createElement('li');
-        item.className = 'list-group-item d-flex justify-content-between align-items-center';
-        item.innerHTML = `
-            <div>
-                <strong>${deployment.hostname}</strong><br>
-                <small class="text-muted">${new Date(deployment.started_at).toLocaleString()}</small>
-            </div>
-            <span class="badge bg-${getStatusBadgeClass(deployment.status)}">${deployment.status}</span>
-        `;
-        list.appendChild(item);
-    });
-}
-
 /**
  * Update system status display
  */
@@ -428,7 +720,7 @@ function highlightRow(row) {
  */
 function updateElementText(elementId, text) {
     const element = document.getElementById(elementId);
-    if (element) {
+    if (element && element.textContent !== String(text)) {
         element.textContent = text;
     }
 }
@@ -507,5 +799,12 @@ function showNotification(type, message) {
 // Auto-initialize when DOM is ready
 document.addEventListener('DOMContentLoaded', function() {
     console.log('[WebSocket] DOM ready, initializing WebSocket connection');
+
+    // Pages showing a single venue only need that venue's updates
+    const venuePage = document.querySelector('[data-ws-venue]');
+    if (venuePage) {
+        subscriptions.push({venue: venuePage.dataset.wsVenue});
+    }
+
     initializeWebSocket();
 });
@@ -12,6 +12,7 @@ import pytest
 sys.path.insert(0, '/opt/rpi-deployment/scripts')
 
 from hostname_manager import HostnameManager
+from database_setup import initialize_database
 
 
 @pytest.fixture
@@ -51,6 +52,7 @@ def test_db_path() -> Generator[str, None, None]:
             product_type TEXT NOT NULL CHECK(product_type IN ('KXP2', 'RXP2')),
             venue_code TEXT NOT NULL CHECK(length(venue_code) = 4),
             identifier TEXT NOT NULL,
+            sort_key INTEGER,
             status TEXT NOT NULL CHECK(status IN ('available', 'assigned', 'retired')),
             mac_address TEXT,
             serial_number TEXT,
@@ -110,6 +112,78 @@ def test_db_path() -> Generator[str, None, None]:
         os.remove(db_path)
 
 
+@pytest.fixture
+def schema_db_path() -> Generator[str, None, None]:
+    """
+    Create a temporary database with the production schema.
+
+    Unlike test_db_path, the schema comes from database_setup, so features
+    that depend on production-only tables, columns and triggers can be tested.
+
+    Yields:
+        str: Path to temporary test database file
+    """
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    initialize_database(db_path)
+
+    yield db_path
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+@pytest.fixture
+def schema_manager(schema_db_path: str) -> HostnameManager:
+    """
+    Create a HostnameManager on the production-schema test database.
+
+    Args:
+        schema_db_path: Path to production-schema test database
+
+    Returns:
+        HostnameManager: Configured hostname manager for testing
+    """
+    return HostnameManager(schema_db_path)
+
+
+@pytest.fixture
+def schema_app(schema_db_path: str):
+    """
+    Create Flask application backed by the production-schema database.
+
+    Args:
+        schema_db_path: Path to production-schema test database
+
+    Returns:
+        Flask: Configured Flask application
+    """
+    sys.path.insert(0, '/opt/rpi-deployment/web')
+    from app import create_app
+    return create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test-secret-key-do-not-use-in-production',
+        'DATABASE_PATH': schema_db_path,
+        'WTF_CSRF_ENABLED': False,
+        'ITEMS_PER_PAGE': 20,
+        'MAX_ITEMS_PER_PAGE': 100
+    })
+
+
+@pytest.fixture
+def schema_client(schema_app):
+    """
+    Create Flask test client for the production-schema application.
+
+    Args:
+        schema_app: Flask application
+
+    Returns:
+        FlaskClient: Test client for making requests
+    """
+    return schema_app.test_client()
+
+
 @pytest.fixture
 def hostname_manager(test_db_path: str) -> HostnameManager:
     """
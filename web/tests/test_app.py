@@ -591,3 +591,542 @@ class TestIntegrationWorkflows:
         assert response2.status_code == 200
         # Dashboard should reflect the new venue
         assert b'DASH' in response2.data or b'4' in response2.data  # 4th venue
+
+
+class TestBulkPoolActions:
+    """Test bulk release/retire of kart numbers."""
+
+    def _seed(self, manager) -> None:
+        """Create a venue with five kart numbers, three of them assigned."""
+        manager.create_venue('CORO', 'Corona Karting')
+        manager.bulk_import_kart_numbers('CORO', ['001', '002', '003', '004', '005'])
+        for _ in range(3):
+            manager.assign_hostname('KXP2', 'CORO')
+
+    def test_bulk_release_by_venue_and_status(self, schema_client, schema_manager) -> None:
+        """Test releasing every assigned kart number at a venue."""
+        self._seed(schema_manager)
+        response = schema_client.post('/kart-numbers/bulk-action', data={
+            'action': 'release',
+            'venue_code': 'CORO',
+            'status': 'assigned'
+        })
+        assert response.status_code == 302
+        assert schema_manager.get_venue_statistics('CORO')['available_hostnames'] == 5
+
+    def test_bulk_retire_selected_hostnames(self, schema_client, schema_manager) -> None:
+        """Test selected rows take precedence over filters."""
+        self._seed(schema_manager)
+        response = schema_client.post('/kart-numbers/bulk-action', data={
+            'action': 'retire',
+            'venue_code': 'CORO',
+            'status': 'available',
+            'hostnames': ['KXP2-CORO-001', 'KXP2-CORO-004']
+        })
+        assert response.status_code == 302
+        stats = schema_manager.get_venue_statistics('CORO')
+        assert stats['retired_hostnames'] == 2
+        assert stats['assigned_hostnames'] == 2
+
+    def test_bulk_action_without_selection_rejected(self, schema_client, schema_manager) -> None:
+        """Test a bulk action with no rows and no filters changes nothing."""
+        self._seed(schema_manager)
+        response = schema_client.post('/kart-numbers/bulk-action',
+                                      data={'action': 'retire'}, follow_redirects=True)
+        assert response.status_code == 200
+        assert schema_manager.get_venue_statistics('CORO')['retired_hostnames'] == 0
+
+
+class TestDashboardStatsCache:
+    """Test grouped dashboard statistics and their cache."""
+
+    def test_stats_counts_match_pool(self, schema_client, schema_manager) -> None:
+        """Test grouped aggregates report per-product pool counts."""
+        schema_manager.create_venue('CORO', 'Corona Karting')
+        schema_manager.bulk_import_kart_numbers('CORO', ['001', '002', '003'])
+        schema_manager.assign_hostname('KXP2', 'CORO')
+        schema_manager.assign_hostname('RXP2', 'CORO', serial_number='10000000ABCD1234')
+
+        stats = json.loads(schema_client.get('/api/stats').data)
+
+        assert stats['total_venues'] == 1
+        assert stats['total_hostnames'] == 4
+        assert stats['available_kxp2'] == 2
+        assert stats['assigned_kxp2'] == 1
+        assert stats['assigned_rxp2'] == 1
+        assert stats['assigned_hostnames'] == 2
+
+    def test_stats_cached_within_ttl(self) -> None:
+        """Test values are reused until the TTL expires or are invalidated."""
+        from app import StatsCache
+        calls = []
+        cache = StatsCache(ttl=60)
+
+        assert cache.get(lambda: calls.append(1) or len(calls)) == 1
+        assert cache.get(lambda: calls.append(1) or len(calls)) == 1
+        cache.invalidate()
+        assert cache.get(lambda: calls.append(1) or len(calls)) == 2
+
+    def test_stats_cache_disabled_with_zero_ttl(self) -> None:
+        """Test a zero TTL recomputes on every call."""
+        from app import StatsCache
+        calls = []
+        cache = StatsCache(ttl=0)
+
+        cache.get(lambda: calls.append(1))
+        cache.get(lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_stats_cache_single_flight(self) -> None:
+        """Test concurrent callers share one computation."""
+        import threading
+        import time
+        from app import StatsCache
+        calls = []
+        cache = StatsCache(ttl=60)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'value': len(calls)}
+
+        threads = [threading.Thread(target=cache.get, args=(compute,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+
+
+class TestDeploymentPagination:
+    """Test keyset pagination and counts for deployment history."""
+
+    def _seed(self, db_path: str, count: int = 45) -> None:
+        """Insert deployments alternating between two venues, some sharing a start time."""
+        import sqlite3
+        conn = sqlite3.connect(db_path)
+        conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, mac_address, product_type, venue_code, deployment_status, started_at)
+            VALUES (?, ?, 'KXP2', ?, ?, ?)
+        """, [
+            (f'KXP2-{venue}-{i:03d}', f'aa:bb:cc:dd:ee:{i:02x}', venue,
+             'failed' if i % 5 == 0 else 'success', f'2025-10-{1 + i // 10:02d} 10:00:00')
+            for i in range(count)
+            for venue in [('CORO' if i % 2 else 'ARIA')]
+        ])
+        conn.commit()
+        conn.close()
+
+    def _walk(self, client, url: str) -> list:
+        """Follow rel="next" links and return every deployment id seen."""
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            ids.extend(d['id'] for d in json.loads(response.data))
+            links = response.headers.get('Link', '')
+            url = None
+            for link in links.split(', '):
+                if link.endswith('rel="next"'):
+                    url = link[1:link.index('>')]
+        return ids
+
+    def test_api_cursor_walk_covers_history_once(self, schema_client, schema_db_path) -> None:
+        """Test following next cursors visits every row once, newest first."""
+        self._seed(schema_db_path)
+        ids = self._walk(schema_client, '/api/deployments?limit=10')
+
+        import sqlite3
+        conn = sqlite3.connect(schema_db_path)
+        expected = [row[0] for row in conn.execute(
+            "SELECT id FROM deployment_history ORDER BY started_at DESC, id DESC")]
+        conn.close()
+        assert ids == expected
+
+    def test_api_filters_and_total_count(self, schema_client, schema_db_path) -> None:
+        """Test filters apply to pages and X-Total-Count."""
+        self._seed(schema_db_path)
+        response = schema_client.get('/api/deployments?limit=5&venue=coro&status=failed')
+        data = json.loads(response.data)
+
+        assert response.headers['X-Total-Count'] == '4'
+        assert all(d['venue_code'] == 'CORO' and d['status'] == 'failed' for d in data)
+        assert len(self._walk(schema_client, '/api/deployments?limit=3&venue=CORO&status=failed')) == 4
+
+    def test_api_prev_cursor_returns_previous_page(self, schema_client, schema_db_path) -> None:
+        """Test the prev link of page two returns page one."""
+        self._seed(schema_db_path)
+        first = schema_client.get('/api/deployments?limit=10')
+        next_url = first.headers['Link'].split('>')[0][1:]
+        second = schema_client.get(next_url)
+        prev_url = [link for link in second.headers['Link'].split(', ') if link.endswith('rel="prev"')][0]
+
+        back = schema_client.get(prev_url[1:prev_url.index('>')])
+        assert json.loads(back.data) == json.loads(first.data)
+
+    def test_api_invalid_cursor_rejected(self, schema_client) -> None:
+        """Test malformed cursors return 400."""
+        response = schema_client.get('/api/deployments?before=garbage')
+        assert response.status_code == 400
+
+    def test_deployments_page_navigation(self, schema_client, schema_db_path) -> None:
+        """Test the HTML view shows totals and cursor links."""
+        self._seed(schema_db_path)
+        response = schema_client.get('/deployments')
+        assert response.status_code == 200
+        assert b'Showing 20 of 45 deployments' in response.data
+        assert b'Page 1 of 3' in response.data
+        assert b'before=' in response.data
+
+        response = schema_client.get('/deployments?before=2025-10-03+10%3A00%3A00%7C21&page=2')
+        assert response.status_code == 200
+        assert b'Page 2 of 3' in response.data
+        assert b'after=' in response.data
+
+    def test_archived_rows_listed_on_request(self, schema_client, schema_db_path) -> None:
+        """Test archive=1 pages through hot and archived rows as one history."""
+        import sqlite3
+        from history_archive import archive_batch
+        self._seed(schema_db_path)
+        expected = self._walk(schema_client, '/api/deployments?limit=10')
+
+        # Move the 20 deployments started before 2025-10-03
+        conn = sqlite3.connect(schema_db_path, isolation_level=None)
+        assert archive_batch(conn, '2025-10-03', batch_rows=100) == 20
+        conn.close()
+
+        assert len(self._walk(schema_client, '/api/deployments?limit=10')) == 25
+        assert self._walk(schema_client, '/api/deployments?limit=7&archive=1') == expected
+
+        response = schema_client.get('/api/deployments?limit=2&venue=CORO&status=failed&archive=1')
+        assert response.headers['X-Total-Count'] == '4'
+        assert 'archive=1' in response.headers['Link']
+
+        response = schema_client.get('/deployments?archive=1&page=2')
+        assert b'Showing 20 of 45 deployments' in response.data
+        assert b'Page 2 of 3' in response.data
+
+    def test_deployment_queries_use_indexes(self, schema_manager) -> None:
+        """Test every filter combination seeks an index without sorting."""
+        import sqlite3
+        from itertools import product
+        conn = sqlite3.connect(schema_manager.db_path)
+        from app import deployment_filters, DEPLOYMENT_COLUMNS
+        for venue, product_type, status in product([None, 'CORO'], [None, 'KXP2'], [None, 'failed']):
+            conditions, params = deployment_filters(venue, product_type, status)
+            conditions.append("(started_at, id) < (?, ?)")
+            plan = ' '.join(row[3] for row in conn.execute(f"""
+                EXPLAIN QUERY PLAN
+                SELECT {DEPLOYMENT_COLUMNS} FROM deployment_history WHERE {' AND '.join(conditions)}
+                ORDER BY started_at DESC, id DESC LIMIT 21
+            """, params + ['2025-10-01', 1]))
+            assert plan.startswith('SEARCH') and 'INDEX' in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
+        conn.close()
+
+
+class TestKartNumberPagination:
+    """Test server-side filtering and cursor paging of kart numbers."""
+
+    def _seed(self, manager) -> None:
+        """Import 150 kart numbers at CORO and a few at ARIA, assigning two."""
+        manager.create_venue(code='CORO', name='Corona')
+        manager.create_venue(code='ARIA', name='Aria')
+        manager.bulk_import_kart_numbers('CORO', [str(n) for n in range(1, 151)])
+        manager.bulk_import_kart_numbers('ARIA', ['1', '2', '3'])
+        manager.assign_hostname('KXP2', 'CORO')
+        manager.assign_hostname('KXP2', 'ARIA')
+
+    def _walk(self, client, url: str) -> list:
+        """Follow next_cursor values and return every hostname seen."""
+        hostnames = []
+        cursor = None
+        while True:
+            response = client.get(url + (f'&after={cursor}' if cursor else ''))
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            hostnames.extend(k['hostname'] for k in data['kart_numbers'])
+            cursor = data['next_cursor']
+            if not cursor:
+                return hostnames
+
+    def test_api_cursor_walk_covers_pool_once(self, schema_client, schema_manager) -> None:
+        """Test following cursors visits every entry once in listing order."""
+        self._seed(schema_manager)
+        hostnames = self._walk(schema_client, '/api/kart-numbers?limit=40')
+
+        assert len(hostnames) == 153
+        assert len(set(hostnames)) == 153
+        assert hostnames[:4] == ['KXP2-ARIA-001', 'KXP2-ARIA-002', 'KXP2-ARIA-003', 'KXP2-CORO-001']
+        assert hostnames[-1] == 'KXP2-CORO-150'
+
+    def test_api_filters_and_total(self, schema_client, schema_manager) -> None:
+        """Test filters and prefix search apply to pages and totals."""
+        self._seed(schema_manager)
+
+        data = json.loads(schema_client.get('/api/kart-numbers?status=assigned').data)
+        assert data['total'] == 2
+        assert [k['hostname'] for k in data['kart_numbers']] == ['KXP2-ARIA-001', 'KXP2-CORO-001']
+
+        data = json.loads(schema_client.get('/api/kart-numbers?venue=coro&q=01').data)
+        assert data['total'] == 10
+        assert data['next_cursor'] is None
+
+        assert self._walk(schema_client, '/api/kart-numbers?limit=5&product=RXP2') == []
+
+    def test_api_invalid_input_rejected(self, schema_client) -> None:
+        """Test bad filters and cursors return 400."""
+        assert schema_client.get('/api/kart-numbers?after=garbage').status_code == 400
+        assert schema_client.get('/api/kart-numbers?status=broken').status_code == 400
+        assert schema_client.get('/api/kart-numbers?q=%25').status_code == 400
+
+    def test_page_renders_first_page_only(self, schema_client, schema_manager) -> None:
+        """Test the HTML view renders one page and a load-more cursor."""
+        self._seed(schema_manager)
+        response = schema_client.get('/kart-numbers')
+        assert response.status_code == 200
+        assert b'KXP2-CORO-097' in response.data
+        assert b'KXP2-CORO-098' not in response.data
+        assert b'of 153' in response.data
+        assert b'data-next-cursor="CORO|KXP2|97|097"' in response.data
+
+        response = schema_client.get('/kart-numbers?venue=CORO&after=CORO%7CKXP2%7C97%7C097')
+        assert response.status_code == 200
+        assert b'KXP2-CORO-098' in response.data
+        assert b'KXP2-CORO-097' not in response.data
+        assert b'kart-numbers-more' not in response.data
+
+    def test_page_invalid_filter_redirects(self, schema_client) -> None:
+        """Test an invalid filter on the HTML view redirects with a message."""
+        response = schema_client.get('/kart-numbers?status=broken')
+        assert response.status_code == 302
+
+
+class TestSearch:
+    """Test full-text search over deployments and the hostname pool."""
+
+    def _seed(self, db_path: str, manager) -> None:
+        """Create a venue, an assigned device and a failed deployment."""
+        import sqlite3
+        manager.create_venue(code='CORO', name='Corona')
+        manager.bulk_import_kart_numbers('CORO', ['1', '2'])
+        manager.assign_hostname('KXP2', 'CORO', mac_address='b8:27:eb:12:34:56',
+                                serial_number='10000000a1b2c3d4')
+        conn = sqlite3.connect(db_path)
+        conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, mac_address, serial_number, product_type, venue_code, deployment_status, error_message)
+            VALUES (?, ?, ?, 'KXP2', 'CORO', ?, ?)
+        """, [
+            ('KXP2-CORO-001', 'b8:27:eb:12:34:56', '10000000a1b2c3d4', 'failed', 'SD card write failed'),
+            ('KXP2-CORO-001', 'b8:27:eb:12:34:56', '10000000a1b2c3d4', 'success', None),
+            ('KXP2-CORO-002', 'dc:a6:32:00:00:01', '10000000ffff0000', 'success', None)
+        ])
+        conn.commit()
+        conn.close()
+
+    def test_api_search_by_serial_prefix(self, schema_client, schema_manager, schema_db_path) -> None:
+        """Test a serial prefix finds history (newest first) and the pool entry."""
+        self._seed(schema_db_path, schema_manager)
+        data = json.loads(schema_client.get('/api/search?q=10000000a1b2').data)
+
+        assert [d['id'] for d in data['deployments']] == [2, 1]
+        assert [h['hostname'] for h in data['hostnames']] == ['KXP2-CORO-001']
+
+    def test_api_search_by_mac_and_error_text(self, schema_client, schema_manager, schema_db_path) -> None:
+        """Test MAC prefixes and error words match."""
+        self._seed(schema_db_path, schema_manager)
+
+        data = json.loads(schema_client.get('/api/search?q=dc:a6:32').data)
+        assert [d['hostname'] for d in data['deployments']] == ['KXP2-CORO-002']
+
+        data = json.loads(schema_client.get('/api/search?q=card+writ').data)
+        assert [d['status'] for d in data['deployments']] == ['failed']
+
+    def test_api_search_requires_text(self, schema_client) -> None:
+        """Test empty or punctuation-only searches return 400."""
+        assert schema_client.get('/api/search').status_code == 400
+        assert schema_client.get('/api/search?q=%22*').status_code == 400
+
+    def test_search_page(self, schema_client, schema_manager, schema_db_path) -> None:
+        """Test the HTML search page lists both result sections."""
+        self._seed(schema_db_path, schema_manager)
+        response = schema_client.get('/search?q=KXP2-CORO-002')
+
+        assert response.status_code == 200
+        assert b'10000000ffff0000' in response.data
+        assert b'No matching hostnames' not in response.data
+
+
+class TestExport:
+    """Test streaming CSV/NDJSON export downloads."""
+
+    def _seed(self, db_path: str, manager) -> None:
+        """Create a venue, pool entries and two deployments."""
+        import sqlite3
+        manager.create_venue(code='CORO', name='Corona')
+        manager.bulk_import_kart_numbers('CORO', ['1', '2', '3'])
+        conn = sqlite3.connect(db_path)
+        conn.executemany("""
+            INSERT INTO deployment_history (hostname, product_type, venue_code, deployment_status, started_at)
+            VALUES (?, 'KXP2', 'CORO', ?, ?)
+        """, [('KXP2-CORO-001', 'success', '2025-10-20 09:00:00'),
+              ('KXP2-CORO-002', 'failed', '2025-10-21 09:00:00')])
+        conn.commit()
+        conn.close()
+
+    def test_csv_download(self, schema_client, schema_manager, schema_db_path) -> None:
+        """Test the default export is a CSV attachment."""
+        self._seed(schema_db_path, schema_manager)
+        response = schema_client.get('/api/export/deployments')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'filename="deployments.csv"' in response.headers['Content-Disposition']
+        lines = response.data.decode('utf-8').splitlines()
+        assert lines[0].startswith('id,hostname,')
+        assert len(lines) == 3
+
+    def test_ndjson_with_filters(self, schema_client, schema_manager, schema_db_path) -> None:
+        """Test NDJSON output honours status and date filters."""
+        self._seed(schema_db_path, schema_manager)
+        response = schema_client.get('/api/export/deployments?format=ndjson&status=failed&since=2025-10-21')
+
+        assert response.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        assert [row['hostname'] for row in rows] == ['KXP2-CORO-002']
+
+    def test_gzip_download(self, schema_client, schema_manager, schema_db_path) -> None:
+        """Test gzip=1 compresses the pool export."""
+        import gzip
+        self._seed(schema_db_path, schema_manager)
+        response = schema_client.get('/api/export/pool?gzip=1&venue=coro')
+
+        assert response.mimetype == 'application/gzip'
+        assert 'filename="pool.csv.gz"' in response.headers['Content-Disposition']
+        assert len(gzip.decompress(response.data).decode('utf-8').splitlines()) == 4
+
+    def test_invalid_requests(self, schema_client) -> None:
+        """Test unknown datasets, formats and filters are rejected."""
+        assert schema_client.get('/api/export/venues').status_code == 400
+        assert schema_client.get('/api/export/pool?format=xml').status_code == 400
+        assert schema_client.get('/api/export/pool?status=deleted').status_code == 400
+        assert schema_client.get('/api/export/deployments?until=soon').status_code == 400
+
+
+class TestDeploymentReport:
+    """Test the rollup-backed deployment report endpoint."""
+
+    def _seed(self, db_path: str) -> None:
+        """Insert deployments over two days at two venues."""
+        import sqlite3
+        conn = sqlite3.connect(db_path)
+        conn.executemany("""
+            INSERT INTO deployment_history
+            (hostname, product_type, venue_code, deployment_status, started_at, completed_at)
+            VALUES (?, 'KXP2', ?, ?, ?, ?)
+        """, [('KXP2-CORO-001', 'CORO', 'success', '2025-10-20 09:00:00', '2025-10-20 09:04:00'),
+              ('KXP2-CORO-002', 'CORO', 'failed', '2025-10-20 10:00:00', '2025-10-20 10:02:00'),
+              ('KXP2-ARIA-001', 'ARIA', 'success', '2025-10-21 09:00:00', '2025-10-21 09:06:00')])
+        conn.commit()
+        conn.close()
+
+    def test_daily_report(self, schema_client, schema_db_path) -> None:
+        """Test the default report is per day with average durations."""
+        self._seed(schema_db_path)
+        data = json.loads(schema_client.get('/api/reports/deployments').data)
+
+        assert data['granularity'] == 'day'
+        assert [(r['bucket'], r['deployments'], r['avg_duration_seconds']) for r in data['rows']] == [
+            ('2025-10-20', 2, 180.0), ('2025-10-21', 1, 360.0)]
+
+    def test_grouped_hourly_report(self, schema_client, schema_db_path) -> None:
+        """Test hourly buckets, grouping and filters."""
+        self._seed(schema_db_path)
+        response = schema_client.get(
+            '/api/reports/deployments?granularity=hour&group_by=status&venue=coro&since=2025-10-20&until=2025-10-21')
+        rows = json.loads(response.data)['rows']
+
+        assert [(r['bucket'], r['deployment_status'], r['deployments']) for r in rows] == [
+            ('2025-10-20 09:00:00', 'success', 1), ('2025-10-20 10:00:00', 'failed', 1)]
+
+    def test_invalid_report_requests(self, schema_client) -> None:
+        """Test unknown granularities, groupings and dates are rejected."""
+        assert schema_client.get('/api/reports/deployments?granularity=week').status_code == 400
+        assert schema_client.get('/api/reports/deployments?group_by=hostname').status_code == 400
+        assert schema_client.get('/api/reports/deployments?since=soon').status_code == 400
+
+
+class TestSystemStatusCache:
+    """Test system status is served from the background collector's cache."""
+
+    def test_requests_share_cached_status(self, schema_client) -> None:
+        """Test repeated page and API requests run systemctl at most once."""
+        from unittest.mock import patch, MagicMock
+        with patch('system_status.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(
+                returncode=0, stderr='',
+                stdout='ActiveState=active\nSubState=running\n\nActiveState=inactive\nSubState=dead\n'
+            )
+            for _ in range(3):
+                assert schema_client.get('/system').status_code == 200
+                data = json.loads(schema_client.get('/api/system/status').data)
+
+        assert mock_run.call_count <= 1
+        assert 'services' in data and 'timestamp' in data
+        assert data['disk']['status'] in ('ok', 'error')
+
+    def test_api_reports_structured_status(self, schema_app) -> None:
+        """Test the API exposes per-service state, disk usage and interfaces."""
+        snapshot = {
+            'services': {'dnsmasq': {'running': True, 'status': 'active', 'sub_state': 'running'},
+                         'nginx': {'running': False, 'status': 'failed', 'sub_state': 'failed'}},
+            'disk': {'total_gb': 100.0, 'used_gb': 40.0, 'available_gb': 60.0, 'percent_used': 40.0},
+            'network': [{'name': 'eth0', 'present': True, 'operstate': 'up', 'carrier': True,
+                         'mac_address': 'dc:a6:32:00:00:01', 'mtu': 1500, 'speed_mbps': 1000,
+                         'rx_bytes': 0, 'tx_bytes': 0}],
+            'database': {'accessible': True, 'size_mb': 0.1},
+            'timestamp': '2025-10-23T10:00:00'
+        }
+        schema_app.system_status._snapshot = snapshot
+        client = schema_app.test_client()
+
+        data = json.loads(client.get('/api/system/status').data)
+        assert data['services'] == {'dnsmasq': 'active', 'nginx': 'failed'}
+        assert data['disk']['percent_used'] == 40.0
+        assert data['network']['interfaces'] == 'ok'
+
+        response = client.get('/system')
+        assert b'eth0' in response.data
+        assert b'40.0 GB used of 100.0 GB' in response.data
+
+
+class TestQueryProfile:
+    """Test the query profile on the system page and API."""
+
+    def test_system_page_lists_queries(self, schema_app, tmp_path) -> None:
+        """Test this process's statements and other services' snapshots are shown."""
+        from query_profiler import QueryProfiler, profile_path
+        other = QueryProfiler()
+        other.record('SELECT * FROM hostname_pool WHERE status = ?', 0.250, 40, ['SCAN hostname_pool'])
+        other.save(profile_path(str(tmp_path), 'deployment_server'), 'deployment_server')
+        schema_app.config['QUERY_PROFILE_DIR'] = str(tmp_path)
+        client = schema_app.test_client()
+
+        client.get('/api/deployments')
+        data = json.loads(client.get('/api/system/queries?order=max_ms').data)
+
+        assert data['statements'][0]['component'] == 'deployment_server'
+        assert data['statements'][0]['full_scans'] == ['hostname_pool']
+        assert data['slow'][0]['statement'] == 'SELECT * FROM hostname_pool WHERE status = ?'
+        assert any(row['component'] == 'web' for row in data['statements'])
+
+        response = client.get('/system')
+        assert b'Database Queries' in response.data
+        assert b'full scan: hostname_pool' in response.data
+
+    def test_invalid_order(self, schema_client) -> None:
+        """Test an unknown ranking is rejected."""
+        assert schema_client.get('/api/system/queries?order=statement').status_code == 400
@@ -652,6 +652,335 @@ def test_high_frequency_requests(socketio_client):
     assert len(stats_events) >= 1, "Should receive at least one stats response"
 
 
+# =============================================================================
+# 7. CHANGE-DRIVEN UPDATES
+# =============================================================================
+
+def test_change_events_push_updates(schema_app, schema_manager):
+    """
+    Test change events are pushed to connected clients.
+
+    Expected Behavior:
+        - A deployment event is forwarded as 'deployment_update'
+        - A batch event results in 'batch_status_change' and 'batch_update'
+        - Fresh 'stats_update' is broadcast once per burst
+    """
+    from app import socketio, handle_change_events
+
+    schema_manager.create_venue('CORO', 'Corona Karting')
+    schema_manager.bulk_import_kart_numbers('CORO', ['001', '002', '003', '004', '005'])
+    batch_id = schema_manager.create_deployment_batch('CORO', 'KXP2', 5)
+    client = socketio.test_client(schema_app, namespace='/')
+    client.get_received()
+    schema_manager.assign_hostname('KXP2', 'CORO')
+
+    handle_change_events(schema_app, socketio, [
+        {'type': 'deployment', 'hostname': 'KXP2-CORO-001', 'status': 'started'},
+        {'type': 'batch', 'batch_id': batch_id, 'status': 'active'},
+        {'type': 'deployment', 'hostname': 'KXP2-CORO-001', 'status': 'downloading'}
+    ])
+
+    received = client.get_received()
+    client.disconnect()
+    names = [msg['name'] for msg in received]
+
+    assert names.count('deployment_update') == 2
+    assert names.count('stats_update') == 1
+    assert 'batch_status_change' in names
+    batch_updates = [msg['args'][0] for msg in received if msg['name'] == 'batch_update']
+    assert batch_updates[0]['id'] == batch_id
+    delta = [msg['args'][0] for msg in received if msg['name'] == 'stats_update'][0]
+    assert delta['full'] is False
+    assert delta['changes']['assigned_kxp2'] == 1
+
+
+def test_change_events_idle_without_subscribers(schema_app, monkeypatch):
+    """
+    Test no database work is done for change events when nobody is connected.
+    """
+    import app as app_module
+
+    calls = []
+    monkeypatch.setattr(app_module, 'get_dashboard_stats', lambda manager: calls.append(manager))
+    assert app_module.get_subscriber_count() == 0
+
+    app_module.handle_change_events(schema_app, app_module.socketio, [{'type': 'pool'}])
+
+    assert calls == []
+
+
+def test_stats_snapshot_on_connect_and_resync(schema_app, schema_manager):
+    """
+    Test clients get a full, sequenced snapshot on connect and on resync.
+    """
+    from app import socketio
+
+    schema_manager.create_venue('CORO', 'Corona Karting')
+    client = socketio.test_client(schema_app, namespace='/')
+
+    snapshot = [msg['args'][0] for msg in client.get_received() if msg['name'] == 'stats_update'][0]
+    assert snapshot['full'] is True
+    assert snapshot['total_venues'] == 1
+
+    client.emit('request_resync')
+    resync = [msg['args'][0] for msg in client.get_received() if msg['name'] == 'stats_update'][0]
+    client.disconnect()
+
+    assert resync['full'] is True
+    assert resync['seq'] == snapshot['seq']
+
+
+def test_stats_delta_contains_only_changes(schema_app, schema_manager):
+    """
+    Test stats deltas carry consecutive sequence numbers and changed data only.
+    """
+    from app import socketio, handle_change_events
+
+    schema_manager.create_venue('CORO', 'Corona Karting')
+    schema_manager.bulk_import_kart_numbers('CORO', ['001', '002'])
+    client = socketio.test_client(schema_app, namespace='/')
+    snapshot = [msg['args'][0] for msg in client.get_received() if msg['name'] == 'stats_update'][0]
+
+    # No change: nothing is sent
+    handle_change_events(schema_app, socketio, [{'type': 'pool'}])
+    assert [msg for msg in client.get_received() if msg['name'] == 'stats_update'] == []
+
+    schema_manager.assign_hostname('KXP2', 'CORO')
+    handle_change_events(schema_app, socketio, [{'type': 'pool'}])
+    delta = [msg['args'][0] for msg in client.get_received() if msg['name'] == 'stats_update'][0]
+    client.disconnect()
+
+    assert delta['base_seq'] == snapshot['seq']
+    assert delta['seq'] == snapshot['seq'] + 1
+    assert delta['changes'] == {'available_kxp2': 1, 'assigned_kxp2': 1,
+                                'available_hostnames': 1, 'assigned_hostnames': 1}
+    assert delta['deployments'] == []
+
+
+def test_dashboard_state_deployment_rows():
+    """
+    Test DashboardState reports only new or changed deployment rows.
+    """
+    from app import DashboardState
+
+    def stats(rows):
+        return {'total_venues': 1, 'recent_deployments': rows, 'timestamp': 'now'}
+
+    first = {'id': 1, 'hostname': 'KXP2-CORO-001', 'status': 'started'}
+    second = {'id': 2, 'hostname': 'KXP2-CORO-002', 'status': 'started'}
+    state = DashboardState()
+
+    assert state.update(stats([first])) is None
+    delta = state.update(stats([second, first]))
+    assert delta['deployments'] == [second]
+    assert delta['changes'] == {}
+
+    done = dict(first, status='success')
+    delta = state.update(stats([second, done]))
+    assert delta['deployments'] == [done]
+    assert state.snapshot()['seq'] == delta['seq']
+
+
+# =============================================================================
+# 8. ROOM SUBSCRIPTIONS
+# =============================================================================
+
+def _names(client):
+    """Return event names received by a test client since the last call."""
+    return [msg['name'] for msg in client.get_received()]
+
+
+def test_venue_subscription_filters_deployment_updates(schema_app, schema_manager):
+    """
+    Test venue subscribers only receive their venue's deployment updates.
+
+    Expected Behavior:
+        - Fleet-wide clients receive every update
+        - A CORO subscriber receives CORO updates but not ARIA updates
+    """
+    from app import socketio
+
+    schema_manager.create_venue('CORO', 'Corona Karting')
+    fleet = socketio.test_client(schema_app, namespace='/')
+    coro = socketio.test_client(schema_app, namespace='/')
+    coro.emit('subscribe', {'venue': 'coro'})
+
+    subscribed = [msg['args'][0] for msg in coro.get_received() if msg['name'] == 'subscriptions']
+    assert subscribed[-1]['rooms'] == ['venue:CORO']
+    fleet.get_received()
+
+    fleet.emit('trigger_deployment_update', {'hostname': 'KXP2-ARIA-001', 'status': 'started'})
+    fleet.emit('trigger_deployment_update', {'hostname': 'KXP2-CORO-001', 'status': 'started'})
+
+    fleet_updates = [msg['args'][0]['hostname'] for msg in fleet.get_received()
+                     if msg['name'] == 'deployment_update']
+    coro_updates = [msg['args'][0]['hostname'] for msg in coro.get_received()
+                    if msg['name'] == 'deployment_update']
+    fleet.disconnect()
+    coro.disconnect()
+
+    assert fleet_updates == ['KXP2-ARIA-001', 'KXP2-CORO-001']
+    assert coro_updates == ['KXP2-CORO-001']
+
+
+def test_hostname_and_batch_subscriptions(schema_app, schema_manager):
+    """
+    Test device and batch subscribers receive only matching updates.
+    """
+    from app import socketio, handle_change_events
+
+    schema_manager.create_venue('CORO', 'Corona Karting')
+    schema_manager.bulk_import_kart_numbers('CORO', ['001', '002'])
+    batch_id = schema_manager.create_deployment_batch('CORO', 'KXP2', 1)
+
+    device = socketio.test_client(schema_app, namespace='/')
+    device.emit('subscribe', {'hostname': 'KXP2-CORO-002'})
+    batch = socketio.test_client(schema_app, namespace='/')
+    batch.emit('subscribe', {'batch_id': batch_id})
+    device.get_received()
+    batch.get_received()
+
+    handle_change_events(schema_app, socketio, [
+        {'type': 'deployment', 'hostname': 'KXP2-CORO-001', 'status': 'started'},
+        {'type': 'deployment', 'hostname': 'KXP2-CORO-002', 'status': 'started'},
+        {'type': 'batch', 'batch_id': batch_id, 'status': 'active'}
+    ])
+
+    device_received = device.get_received()
+    batch_names = _names(batch)
+    device.disconnect()
+    batch.disconnect()
+
+    assert [msg['args'][0]['hostname'] for msg in device_received
+            if msg['name'] == 'deployment_update'] == ['KXP2-CORO-002']
+    assert 'batch_update' not in [msg['name'] for msg in device_received]
+    assert 'stats_update' not in [msg['name'] for msg in device_received]
+    assert 'batch_status_change' in batch_names
+    assert 'batch_update' in batch_names
+    assert 'deployment_update' not in batch_names
+
+
+def test_venue_stats_sent_to_venue_room(schema_app, schema_manager):
+    """
+    Test pool changes push venue_stats to that venue's subscribers only.
+    """
+    from app import socketio, handle_change_events
+
+    schema_manager.create_venue('CORO', 'Corona Karting')
+    schema_manager.create_venue('ARIA', 'Arizona Motorsports')
+    schema_manager.bulk_import_kart_numbers('CORO', ['001', '002'])
+    coro = socketio.test_client(schema_app, namespace='/')
+    coro.emit('subscribe', {'venue': 'CORO'})
+    aria = socketio.test_client(schema_app, namespace='/')
+    aria.emit('subscribe', {'venue': 'ARIA'})
+
+    initial = [msg['args'][0] for msg in coro.get_received() if msg['name'] == 'venue_stats']
+    assert initial[-1]['available_hostnames'] == 2
+    aria.get_received()
+
+    schema_manager.assign_hostname('KXP2', 'CORO')
+    handle_change_events(schema_app, socketio, [{'type': 'pool', 'venue_code': 'CORO'}])
+
+    coro_stats = [msg['args'][0] for msg in coro.get_received() if msg['name'] == 'venue_stats']
+    aria_names = _names(aria)
+    coro.disconnect()
+    aria.disconnect()
+
+    assert coro_stats[-1]['assigned_hostnames'] == 1
+    assert aria_names == []
+
+
+def test_unsubscribe_and_invalid_subscription(socketio_client):
+    """
+    Test unsubscribing leaves a room and invalid payloads are rejected.
+    """
+    socketio_client.get_received()
+
+    socketio_client.emit('subscribe', {'venue': 'TOOLONG'})
+    errors = [msg['args'][0] for msg in socketio_client.get_received() if msg['name'] == 'status']
+    assert 'Error subscribing' in errors[0]['message']
+
+    socketio_client.emit('subscribe', {'venue': 'CORO', 'all': True})
+    socketio_client.emit('unsubscribe', {'venue': 'CORO'})
+    rooms = [msg['args'][0]['rooms'] for msg in socketio_client.get_received()
+             if msg['name'] == 'subscriptions']
+    assert rooms == [['all', 'venue:CORO'], ['all']]
+
+
+# =============================================================================
+# 9. LIVE INSTALL PROGRESS
+# =============================================================================
+
+def test_install_progress_pushed_without_database_work(schema_app, monkeypatch):
+    """
+    Test progress events are relayed to clients without touching the database.
+
+    Expected Behavior:
+        - Fleet-wide clients receive 'install_progress' deltas
+        - Venue subscribers only receive their venue's installs
+        - No stats are recomputed and the stats cache is kept
+    """
+    import app as app_module
+    from app import socketio, handle_change_events
+
+    fleet = socketio.test_client(schema_app, namespace='/')
+    coro = socketio.test_client(schema_app, namespace='/')
+    coro.emit('subscribe', {'venue': 'CORO'})
+    fleet.get_received()
+    coro.get_received()
+
+    calls = []
+    monkeypatch.setattr(app_module, 'get_dashboard_stats', lambda manager: calls.append(manager))
+    monkeypatch.setattr(schema_app.stats_cache, 'invalidate', lambda: calls.append('invalidate'))
+
+    handle_change_events(schema_app, socketio, [
+        {'type': 'progress', 'removed': [], 'installs': [
+            {'hostname': 'KXP2-CORO-001', 'phase': 'downloading', 'bytes_written': 10, 'total_bytes': 100},
+            {'hostname': 'KXP2-ARIA-001', 'phase': 'downloading', 'bytes_written': 20, 'total_bytes': 100}
+        ]},
+        {'type': 'progress', 'removed': [], 'installs': [
+            {'hostname': 'KXP2-CORO-001', 'phase': 'downloading', 'bytes_written': 30, 'total_bytes': 100}
+        ]}
+    ])
+
+    fleet_installs = [entry for msg in fleet.get_received() if msg['name'] == 'install_progress'
+                      for entry in msg['args'][0]['installs']]
+    coro_installs = [entry for msg in coro.get_received() if msg['name'] == 'install_progress'
+                     for entry in msg['args'][0]['installs']]
+    fleet.disconnect()
+    coro.disconnect()
+
+    assert calls == []
+    assert sorted(entry['hostname'] for entry in fleet_installs) == ['KXP2-ARIA-001', 'KXP2-CORO-001']
+    assert [(entry['hostname'], entry['bytes_written']) for entry in coro_installs] == [('KXP2-CORO-001', 30)]
+
+
+def test_install_progress_snapshot_on_request(schema_app):
+    """
+    Test clients can fetch every tracked install, and removals are applied.
+    """
+    from app import socketio, handle_change_events
+
+    handle_change_events(schema_app, socketio, [
+        {'type': 'progress', 'removed': [], 'installs': [
+            {'hostname': 'KXP2-CORO-002', 'phase': 'verifying', 'bytes_written': 100, 'total_bytes': 100},
+            {'hostname': 'KXP2-CORO-001', 'phase': 'success', 'bytes_written': 100, 'total_bytes': 100}
+        ]}
+    ])
+    handle_change_events(schema_app, socketio, [
+        {'type': 'progress', 'installs': [], 'removed': ['KXP2-CORO-001']}
+    ])
+
+    client = socketio.test_client(schema_app, namespace='/')
+    client.get_received()
+    client.emit('request_install_progress')
+    snapshots = [msg['args'][0] for msg in client.get_received() if msg['name'] == 'install_progress']
+    client.disconnect()
+
+    assert snapshots[0]['full'] is True
+    assert [entry['hostname'] for entry in snapshots[0]['installs']] == ['KXP2-CORO-002']
+
+
 # =============================================================================
 # SUMMARY
 # =============================================================================